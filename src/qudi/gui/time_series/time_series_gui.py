@@ -193,7 +193,7 @@ class TimeSeriesGui(GuiBase):
                            recording=logic.data_recording_active)
         self.update_channel_settings(logic.active_channel_names, logic.averaged_channel_names)
         self.update_trace_settings(logic.trace_settings)
-        self.update_data(*logic.trace_data, *logic.averaged_trace_data)
+        self.update_data(*logic.get_trace_view(max_points=logic.trace_view_points))
         self._apply_trace_view_settings(self.trace_view_settings)
         index = self._mw.current_value_combobox.findText(self._current_value_channel)
         if index < 0:
@@ -359,30 +359,35 @@ class TimeSeriesGui(GuiBase):
 
     @QtCore.Slot(object, object, object, object)
     def update_data(self, data_time, data, smooth_time, smooth_data):
-        """ The function that grabs the data and sends it to the plot """
+        """ The function that grabs the data and sends it to the plot.
+        The logic emits decimated copies of its running trace buffers with approx. two points per
+        horizontal pixel, so the plot stays fast for long trace windows.
+        """
+        logic = self._time_series_logic_con()
+        logic.trace_view_points = 2 * max(self._mw.trace_plot_widget.width(), 256)
         shift_time = data_time[0] != 0
+        time_offset = data_time[0] if shift_time else 0
         if data is not None:
             if shift_time:
-                data_time = data_time - data_time[0]
+                data_time = data_time - time_offset
             for channel, y_arr in data.items():
                 self.curves[channel].setData(y=y_arr, x=data_time)
         if smooth_data is not None:
             if shift_time:
-                smooth_time = smooth_time + (
-                    data_time[data_time.shape[0] - smooth_time.shape[0]] - smooth_time[0]
-                )
+                smooth_time = smooth_time - time_offset
             for channel, y_arr in smooth_data.items():
                 self.averaged_curves[channel].setData(y=y_arr, x=smooth_time)
 
         channel = self._mw.current_value_combobox.currentText()
         if channel and channel != 'None':
             try:
+                latest_values, latest_smooth_values = logic.latest_values
                 if channel.startswith('average '):
                     channel = channel.split('average ', 1)[-1]
-                    val = smooth_data[channel][-1]
+                    val = latest_smooth_values[channel]
                 else:
-                    val = data[channel][-1]
-                constraints = self._time_series_logic_con().streamer_constraints
+                    val = latest_values[channel]
+                constraints = logic.streamer_constraints
                 ch_unit = constraints.channel_units[channel]
                 precision = self._current_value_channel_precision[channel]
                 if np.isnan(val):
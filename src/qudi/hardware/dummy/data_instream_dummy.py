@@ -32,6 +32,7 @@ from qudi.util.mutex import Mutex
 from qudi.util.helpers import is_integer_type
 from qudi.interface.data_instream_interface import DataInStreamInterface, DataInStreamConstraints
 from qudi.interface.data_instream_interface import StreamingMode, SampleTiming
+from qudi.interface.mixins.shared_stream import SharedStreamMixin
 
 
 def _make_sine_func(sample_rate: float) -> Callable[[np.ndarray, np.ndarray], None]:
@@ -225,7 +226,7 @@ class SampleGenerator:
         return available
 
 
-class InStreamDummy(DataInStreamInterface):
+class InStreamDummy(SharedStreamMixin, DataInStreamInterface):
     """
     A dummy module to act as data in-streaming device (continuously read values)
 
@@ -312,6 +313,7 @@ class InStreamDummy(DataInStreamInterface):
         )
 
     def on_deactivate(self):
+        self.detach_shared_stream()
         # Free memory
         self._sample_generator = None
 
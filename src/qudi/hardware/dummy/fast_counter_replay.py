@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+
+"""
+This file contains a qudi fast counter replaying recorded raw data (time traces or time tags).
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+__all__ = ['FastCounterReplay', 'TIME_TAG_DTYPE', 'convert_timetagger_dump']
+
+import os
+import time
+import numpy as np
+
+from qudi.core.configoption import ConfigOption
+from qudi.util.mutex import Mutex
+from qudi.util.datastorage import get_header_from_file, get_info_from_header
+from qudi.util.npy_stream import NpyStreamWriter
+from qudi.interface.fast_counter_interface import FastCounterInterface
+
+# Record format of time tag replay files (structured .npy array sorted by time)
+TIME_TAG_DTYPE = np.dtype([('channel', np.int32), ('time', np.int64)])  # time in ps
+
+
+def convert_timetagger_dump(ttbin_path, npy_path, events_per_read=1000000):
+    """ Convert a Swabian Instruments TimeTagger FileWriter dump (.ttbin) into a time tag replay
+    file (.npy with dtype TIME_TAG_DTYPE). Requires the TimeTagger python package.
+
+    @param str ttbin_path: path of the TimeTagger FileWriter dump
+    @param str npy_path: path of the replay file to create
+    @param int events_per_read: number of time tags to convert at once
+
+    @return int: number of converted time tags
+    """
+    import TimeTagger as tt
+
+    reader = tt.FileReader(ttbin_path)
+    with NpyStreamWriter(npy_path, dtype=TIME_TAG_DTYPE, chunk_rows=events_per_read) as writer:
+        while reader.hasData():
+            buffer = reader.getData(events_per_read)
+            channels = buffer.getChannels()
+            time_tags = np.empty(len(channels), dtype=TIME_TAG_DTYPE)
+            time_tags['channel'] = channels
+            time_tags['time'] = buffer.getTimestamps()
+            writer.append(time_tags)
+    return writer.rows_written
+
+
+class FastCounterReplay(FastCounterInterface):
+    """ Fast counter replaying recorded raw data at a configurable sweep rate, e.g. to benchmark
+    or regression-test the pulsed toolchain at realistic data rates without hardware.
+
+    Two kinds of replay files are supported:
+
+    Time traces, i.e. raw data accumulated over <recorded_sweeps> sweeps, 1D (ungated) or 2D
+    (gated, [gate_index, timebin_index]). Raw timetraces saved by the PulsedMeasurementLogic
+    (.npy with "_metadata.txt" or text files with header), FastComTec .mpa files
+    (save_raw_data) and plain text columns (.asc) are accepted. Bin width, gated mode and number
+    of sweeps are taken from the qudi metadata if available. The trace returned by
+    get_data_trace grows proportionally to the number of elapsed sweeps. Larger bin widths are
+    realized by summing neighbouring bins.
+
+    Time tags in the qudi replay format (.npy with dtype TIME_TAG_DTYPE, see
+    convert_timetagger_dump for TimeTagger FileWriter dumps). Each time tag on <sweep_channel>
+    marks the start of a sweep (ungated) or of a gate (gated, gate index counting modulo the
+    number of gates over all replayed starts). Time tags on <click_channels> are histogrammed
+    relative to the preceding start.
+
+    .npy files are memory-mapped, so replay files can be larger than the available memory.
+
+    Example config for copy-paste:
+
+    fast_counter_replay:
+        module.Class: 'dummy.fast_counter_replay.FastCounterReplay'
+        options:
+            replay_file: 'C:\\data\\20210101-1200-00_rabi_raw_timetrace.npy'
+            sweep_rate: 10000 # optional, replayed sweeps per second
+            loop: True # optional, restart the replay file when all sweeps have been replayed
+            #trace_bin_width: 1e-9 # optional, bin width of a recorded time trace (s)
+            #recorded_sweeps: 1000 # optional, number of sweeps accumulated in a recorded trace
+            #gated: False # optional, gated mode (defaults to the recorded trace shape)
+            #sweep_channel: 1 # optional, time tag channel of sweep/gate starts
+            #click_channels: [2] # optional, time tag channels of detector clicks
+    """
+
+    _replay_file = ConfigOption('replay_file', missing='error')
+    _sweep_rate = ConfigOption('sweep_rate', 1e4, missing='nothing')
+    _loop = ConfigOption('loop', True, missing='nothing')
+    _trace_bin_width = ConfigOption('trace_bin_width', None, missing='nothing')
+    _recorded_sweeps = ConfigOption('recorded_sweeps', None, missing='nothing')
+    _gated = ConfigOption('gated', None, missing='nothing')
+    _sweep_channel = ConfigOption('sweep_channel', 1, missing='nothing')
+    _click_channels = ConfigOption('click_channels', [2], missing='nothing')
+
+    # Maximum number of time tag records histogrammed at once
+    _records_per_chunk = 1 << 22
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._thread_lock = Mutex()
+        self._data = None
+        self._is_time_tags = False
+        self.statusvar = -1
+
+        self._binwidth = 1e-9
+        self._number_of_bins = 0
+        self._number_of_gates = 0
+        # time trace replay: trace of one sweep in the configured binning
+        self._trace = None
+        # time tag replay: record indices of the sweep/gate start tags
+        self._start_positions = None
+        self._next_start = 0
+        self._replayed_starts = 0
+        self._histogram = None
+
+        self._elapsed_time = 0
+        self._start_time = 0
+        # sweeps replayed before and elapsed time of the last sweep rate change
+        self._sweep_offset = 0
+        self._rate_change_time = 0
+
+    def on_activate(self):
+        """ Initialisation performed during activation of the module.
+        """
+        self._load_replay_file()
+        self.statusvar = 0
+
+    def on_deactivate(self):
+        """ Deinitialisation performed during deactivation of the module.
+        """
+        self._data = None
+        self._trace = None
+        self._histogram = None
+        self._start_positions = None
+        self.statusvar = -1
+
+    def _load_replay_file(self):
+        path = os.path.abspath(self._replay_file)
+        extension = os.path.splitext(path)[1].lower()
+        metadata = dict()
+        if extension == '.npy':
+            data = np.load(path, mmap_mode='r', allow_pickle=False)
+            try:
+                header, _ = get_header_from_file(path[:-len(extension)] + '_metadata.txt')
+                _, metadata = get_info_from_header(header)
+            except FileNotFoundError:
+                pass
+        elif extension == '.mpa':
+            data = self._load_mpa_trace(path)
+        else:
+            try:
+                header, _ = get_header_from_file(path)
+                _, metadata = get_info_from_header(header)
+            except Exception:
+                pass
+            data = np.loadtxt(path, dtype=np.int64, comments='#', ndmin=1)
+        # ConfigParser lowercases the metadata keys of qudi headers, so compare lowercase keys
+        metadata = {str(key).lower(): value for key, value in metadata.items()}
+
+        self._is_time_tags = data.dtype.names is not None
+        if self._is_time_tags:
+            if not {'channel', 'time'}.issubset(data.dtype.names):
+                raise ValueError('Time tag replay file "{0}" must contain the fields "channel" and '
+                                 '"time".'.format(path))
+            self._data = data
+            self._gated = bool(self._gated)
+            self.log.info('Replaying {0:d} time tags from "{1}".'.format(data.shape[0], path))
+            return
+
+        if data.ndim == 2 and data.shape[1] == 1:
+            data = data[:, 0]
+        if self._gated is None:
+            self._gated = bool(metadata.get('gated counting', data.ndim == 2))
+        if self._gated and data.ndim != 2:
+            raise ValueError('Gated replay requires a 2D time trace but the trace in "{0}" has '
+                             'shape {1}.'.format(path, data.shape))
+        if not self._gated and data.ndim != 1:
+            data = data.sum(axis=0)
+        if self._trace_bin_width is None:
+            self._trace_bin_width = float(metadata.get('bin width (s)', 1e-9))
+        if self._recorded_sweeps is None:
+            recorded_sweeps = metadata.get('measurement sweeps')
+            self._recorded_sweeps = 1 if recorded_sweeps is None else int(recorded_sweeps)
+        self._recorded_sweeps = max(1, int(self._recorded_sweeps))
+        self._data = data
+        self.log.info('Replaying time trace with shape {0} ({1:d} sweeps) from "{2}".'
+                      ''.format(data.shape, self._recorded_sweeps, path))
+
+    @staticmethod
+    def _load_mpa_trace(path):
+        """ Read the first data block of a FastComTec MPA file """
+        with open(path, 'r') as file:
+            lines = file.read().splitlines()
+        try:
+            start = next(ii for ii, line in enumerate(lines) if line.startswith('[DATA')) + 1
+        except StopIteration:
+            raise ValueError('No data block found in FastComTec file "{0}".'.format(path))
+        stop = next((ii for ii in range(start, len(lines)) if lines[ii].startswith('[')),
+                    len(lines))
+        return np.array(lines[start:stop], dtype=np.int64)
+
+    def get_constraints(self):
+        """ Retrieve the hardware constrains from the Fast counting device.
+
+        @return dict: dict with keys being the constraint names as string and
+                      items are the definition for the constaints.
+        """
+        constraints = dict()
+        if self._is_time_tags:
+            constraints['hardware_binwidth_list'] = [1e-12 * 2 ** ii for ii in range(20)]
+        else:
+            constraints['hardware_binwidth_list'] = [self._trace_bin_width * 2 ** ii for ii in
+                                                     range(8)]
+        return constraints
+
+    def configure(self, bin_width_s, record_length_s, number_of_gates=0):
+        """ Configuration of the fast counter.
+
+        @param float bin_width_s: Length of a single time bin in the time trace
+                                  histogram in seconds.
+        @param float record_length_s: Total length of the timetrace/each single
+                                      gate in seconds.
+        @param int number_of_gates: optional, number of gates in the pulse
+                                    sequence. Ignore for not gated counter.
+
+        @return tuple(binwidth_s, gate_length_s, number_of_gates):
+                    binwidth_s: float the actual set binwidth in seconds
+                    gate_length_s: the actual set gate length in seconds
+                    number_of_gates: the number of gated, which are accepted
+        """
+        with self._thread_lock:
+            if self._is_time_tags:
+                binwidth = max(1, int(round(bin_width_s * 1e12))) * 1e-12
+                number_of_gates = int(number_of_gates) if self._gated else 0
+                if self._gated and number_of_gates < 1:
+                    self.log.warning('Gated replay of time tags needs at least 1 gate but {0:d} '
+                                     'were requested. Using 1 gate.'.format(number_of_gates))
+                    number_of_gates = 1
+            else:
+                rebin = max(1, int(round(bin_width_s / self._trace_bin_width)))
+                binwidth = rebin * self._trace_bin_width
+                number_of_gates = self._data.shape[0] if self._gated else 0
+            number_of_bins = max(1, int(np.ceil(round(record_length_s / binwidth, 6))))
+
+            self._binwidth = binwidth
+            self._number_of_bins = number_of_bins
+            self._number_of_gates = number_of_gates
+            if self._is_time_tags:
+                self._start_positions = self._find_start_positions()
+                shape = (number_of_gates, number_of_bins) if self._gated else (number_of_bins,)
+                self._histogram = np.zeros(shape, dtype=np.int64)
+            else:
+                self._trace = self._rebin_trace(rebin, number_of_bins)
+            self._reset_replay()
+            self.statusvar = 1
+        return binwidth, number_of_bins * binwidth, number_of_gates if self._gated else None
+
+    def _rebin_trace(self, rebin, number_of_bins):
+        """ Sum neighbouring bins of the recorded trace and crop/pad it to number_of_bins """
+        recorded_bins = min(self._data.shape[-1] // rebin, number_of_bins)
+        trace = np.zeros((*self._data.shape[:-1], number_of_bins), dtype=np.int64)
+        recorded = np.asarray(self._data[..., :recorded_bins * rebin], dtype=np.int64)
+        trace[..., :recorded_bins] = recorded.reshape(
+            (*self._data.shape[:-1], recorded_bins, rebin)).sum(axis=-1)
+        return trace
+
+    def _find_start_positions(self):
+        """ Record indices of all time tags on the sweep channel. The memory-mapped file is read in
+        chunks.
+        """
+        positions = list()
+        for start in range(0, self._data.shape[0], self._records_per_chunk):
+            channels = self._data['channel'][start:start + self._records_per_chunk]
+            positions.append(np.flatnonzero(channels == self._sweep_channel) + start)
+        positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.int64)
+        if positions.size == 0:
+            self.log.error('No time tags on sweep channel {0} found in the replay file.'
+                           ''.format(self._sweep_channel))
+        return positions
+
+    def _reset_replay(self):
+        self._elapsed_time = 0
+        self._sweep_offset = 0
+        self._rate_change_time = 0
+        self._next_start = 0
+        self._replayed_starts = 0
+        if self._histogram is not None:
+            self._histogram[...] = 0
+
+    def get_status(self):
+        """ Receives the current status of the Fast Counter and outputs it as
+            return value.
+
+        0 = unconfigured
+        1 = idle
+        2 = running
+        3 = paused
+        -1 = error state
+        """
+        return self.statusvar
+
+    def start_measure(self):
+        with self._thread_lock:
+            if self.statusvar < 1:
+                self.log.error('Unable to start replay. Fast counter is not configured.')
+                return -1
+            self._reset_replay()
+            self._start_time = time.perf_counter()
+            self.statusvar = 2
+        return 0
+
+    def pause_measure(self):
+        """ Pauses the current measurement.
+
+        Fast counter must be initially in the run state to make it pause.
+        """
+        with self._thread_lock:
+            if self.statusvar == 2:
+                self._elapsed_time += time.perf_counter() - self._start_time
+                self.statusvar = 3
+        return 0
+
+    def stop_measure(self):
+        """ Stop the fast counter. """
+        with self._thread_lock:
+            if self.statusvar == 2:
+                self._elapsed_time += time.perf_counter() - self._start_time
+            if self.statusvar > 0:
+                self.statusvar = 1
+        return 0
+
+    def continue_measure(self):
+        """ Continues the current measurement.
+
+        If fast counter is in pause state, then fast counter will be continued.
+        """
+        with self._thread_lock:
+            if self.statusvar == 3:
+                self._start_time = time.perf_counter()
+                self.statusvar = 2
+        return 0
+
+    def is_gated(self):
+        """ Check the gated counting possibility.
+
+        @return bool: Boolean value indicates if the fast counter is a gated
+                      counter (TRUE) or not (FALSE).
+        """
+        return bool(self._gated)
+
+    def get_binwidth(self):
+        """ Returns the width of a single timebin in the timetrace in seconds.
+
+        @return float: current length of a single bin in seconds (seconds/bin)
+        """
+        return self._binwidth
+
+    def get_sweep_rate(self):
+        """ Number of sweeps replayed per second """
+        return self._sweep_rate
+
+    def set_sweep_rate(self, rate):
+        """ Set the number of sweeps replayed per second. Sweeps replayed so far are kept.
+
+        @param float rate: sweeps per second
+
+        @return float: the actually set sweep rate
+        """
+        with self._thread_lock:
+            elapsed_time = self._get_elapsed_time()
+            self._sweep_offset += int((elapsed_time - self._rate_change_time) * self._sweep_rate)
+            self._rate_change_time = elapsed_time
+            self._sweep_rate = max(0., float(rate))
+        return self._sweep_rate
+
+    def get_data_trace(self):
+        """ Polls the current timetrace data from the fast counter.
+
+        Return value is a numpy array (dtype = int64).
+        The binning, specified by calling configure() in forehand, must be
+        taken care of in this hardware class. A possible overflow of the
+        histogram bins must be caught here and taken care of.
+        If the counter is NOT GATED it will return a tuple (1D-numpy-array, info_dict) with
+            returnarray[timebin_index]
+        If the counter is GATED it will return a tuple (2D-numpy-array, info_dict) with
+            returnarray[gate_index, timebin_index]
+
+        info_dict is a dictionary with keys :
+            - 'elapsed_sweeps' : the elapsed number of sweeps
+            - 'elapsed_time' : the elapsed time in seconds
+
+        If the hardware does not support these features, the values should be None
+        """
+        with self._thread_lock:
+            if self.statusvar < 1:
+                return np.zeros(0, dtype=np.int64), {'elapsed_sweeps': None,
+                                                     'elapsed_time': None}
+            self._update_replay()
+            sweeps = self._replayed_sweeps()
+            if self._is_time_tags:
+                data = self._histogram.copy()
+            else:
+                full, partial = divmod(sweeps, self._recorded_sweeps)
+                data = self._trace * full + (self._trace * partial) // self._recorded_sweeps
+            return data, {'elapsed_sweeps': sweeps, 'elapsed_time': self._get_elapsed_time()}
+
+    def _get_elapsed_time(self):
+        if self.statusvar == 2:
+            return self._elapsed_time + time.perf_counter() - self._start_time
+        return self._elapsed_time
+
+    def _get_target_sweeps(self):
+        sweeps = self._sweep_offset + int(
+            (self._get_elapsed_time() - self._rate_change_time) * self._sweep_rate)
+        if not self._loop:
+            if self._is_time_tags:
+                starts_per_sweep = max(1, self._number_of_gates)
+                sweeps = min(sweeps, self._start_positions.size // starts_per_sweep)
+            else:
+                sweeps = min(sweeps, self._recorded_sweeps)
+        return sweeps
+
+    def _replayed_sweeps(self):
+        if self._is_time_tags:
+            return self._replayed_starts // max(1, self._number_of_gates)
+        return self._get_target_sweeps()
+
+    def _update_replay(self):
+        """ Histogram all time tags up to the current number of sweeps (time tag replay only) """
+        if not self._is_time_tags or self._start_positions.size == 0:
+            return
+        total_starts = self._start_positions.size
+        remaining = self._get_target_sweeps() * max(1, self._number_of_gates) - \
+                    self._replayed_starts
+        while remaining > 0:
+            first = self._next_start
+            last = min(total_starts, first + remaining)
+            # Limit the number of records processed at once
+            stop_positions = self._start_positions[first + 1:last + 1]
+            if stop_positions.size > 0 and stop_positions[-1] - self._start_positions[first] > \
+                    self._records_per_chunk:
+                last = first + max(1, int(np.searchsorted(
+                    stop_positions, self._start_positions[first] + self._records_per_chunk)))
+            self._histogram_starts(first, last)
+            self._replayed_starts += last - first
+            remaining -= last - first
+            self._next_start = last
+            if self._next_start == total_starts:
+                if not self._loop:
+                    break
+                self._next_start = 0
+
+    def _histogram_starts(self, first, last):
+        """ Histogram the clicks following the sweep/gate starts with indices first to last - 1 """
+        record_start = self._start_positions[first]
+        if last < self._start_positions.size:
+            record_stop = self._start_positions[last]
+        else:
+            record_stop = self._data.shape[0]
+        records = np.asarray(self._data[record_start:record_stop])
+        is_start = records['channel'] == self._sweep_channel
+        # Index of the preceding start for each record. The first record is a start.
+        start_indices = np.cumsum(is_start, dtype=np.int64) - 1
+        is_click = np.isin(records['channel'], self._click_channels)
+        start_times = records['time'][is_start]
+        click_starts = start_indices[is_click]
+        delays = records['time'][is_click] - start_times[click_starts]
+        bins = delays // int(round(self._binwidth * 1e12))
+        valid = (bins >= 0) & (bins < self._number_of_bins)
+        if self._gated:
+            gates = (click_starts + self._replayed_starts) % self._number_of_gates
+            flat_indices = gates[valid] * self._number_of_bins + bins[valid]
+            self._histogram.reshape(-1)[:] += np.bincount(flat_indices,
+                                                          minlength=self._histogram.size)
+        else:
+            self._histogram += np.bincount(bins[valid], minlength=self._number_of_bins)
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains a streamer for the raw list mode (time tag) file written by the FastComTec
+server during acquisition, shared by the FastComTec MCS6 and P7887 hardware modules.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+__all__ = ['ListFileStreamer']
+
+import os
+import queue
+import threading
+import numpy as np
+
+
+class ListFileStreamer:
+    """ Streams the binary event records of a list file while it is written by the FastComTec
+    server (save mode "write list file").
+
+    A dedicated reader thread waits for the file to appear, skips the ASCII header (up to and
+    including the line starting with header_end) and reads the records into a pool of
+    preallocated chunk buffers. Chunks holding complete records are passed to the consumer through
+    a queue and collected with get_records. If the consumer does not keep up, the reader waits
+    for free chunk buffers. Since the list file itself keeps all data, this does not lose any
+    records. Upon stop, all remaining records of the list file are read (into additional chunk
+    buffers if necessary) and can be collected with get_records afterwards.
+
+    Records are returned as raw numpy values of record_dtype, decoding depends on the list file
+    format configured in the FastComTec server (data length, tag bits, etc.).
+    """
+
+    def __init__(self, file_path, record_dtype='<u8', chunk_records=65536, chunk_count=8,
+                 header_end=b'[DATA]', poll_interval=0.01):
+        """
+        @param str file_path: path of the list file written by the FastComTec server
+        @param numpy.dtype record_dtype: dtype of a single list file record
+        @param int chunk_records: number of records per chunk buffer
+        @param int chunk_count: number of chunk buffers in the pool
+        @param bytes header_end: start of the last header line
+        @param float poll_interval: time to wait for new data in s
+        """
+        self.file_path = file_path
+        self.record_dtype = np.dtype(record_dtype)
+        self._chunk_bytes = max(1, int(chunk_records)) * self.record_dtype.itemsize
+        self._chunk_count = max(2, int(chunk_count))
+        self._header_end = header_end
+        self._poll_interval = float(poll_interval)
+
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._free_chunks = None
+        self._filled_chunks = None
+        self._error = None
+        self.records_read = 0
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """ Start the reader thread. The list file does not need to exist yet. """
+        if self.is_running:
+            raise RuntimeError('List file streamer is already running.')
+        self._stop_event.clear()
+        self._error = None
+        self.records_read = 0
+        self._free_chunks = queue.Queue()
+        for _ in range(self._chunk_count):
+            self._free_chunks.put(bytearray(self._chunk_bytes))
+        self._filled_chunks = queue.Queue()
+        self._thread = threading.Thread(target=self._read_loop,
+                                        name='fastcomtec-list-reader',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """ Stop the reader thread after all data written to the list file so far has been read.
+
+        @param float timeout: optional, time to wait for the reader thread in s
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                raise TimeoutError('List file reader thread did not stop within {0} s.'
+                                   ''.format(timeout))
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def get_records(self):
+        """ Collect all records read since the last call.
+
+        @return numpy.ndarray: 1D array of records (record_dtype)
+        """
+        if self._filled_chunks is None:
+            return np.empty(0, dtype=self.record_dtype)
+        records = list()
+        while True:
+            try:
+                chunk, byte_count = self._filled_chunks.get_nowait()
+            except queue.Empty:
+                break
+            records.append(np.frombuffer(chunk, dtype=self.record_dtype,
+                                         count=byte_count // self.record_dtype.itemsize).copy())
+            self._free_chunks.put(chunk)
+        if not records:
+            return np.empty(0, dtype=self.record_dtype)
+        return np.concatenate(records) if len(records) > 1 else records[0]
+
+    def _read_loop(self):
+        try:
+            file = self._open_list_file()
+            if file is None:
+                return
+            with file:
+                data = self._skip_header(file)
+                if data is not None:
+                    self._read_records(file, data)
+        except Exception as err:
+            self._error = err
+
+    def _open_list_file(self):
+        while not os.path.isfile(self.file_path):
+            if self._stop_event.wait(self._poll_interval):
+                return None
+        # Unbuffered, so reads at the end of the growing file are retried by the OS
+        return open(self.file_path, 'rb', buffering=0)
+
+    def _skip_header(self, file):
+        """ Read the file until the end of the header.
+
+        @return bytes: data following the header, None if stopped before the end of the header
+        """
+        header = b''
+        while True:
+            data = file.read(4096)
+            if not data:
+                if self._stop_event.wait(self._poll_interval):
+                    return None
+                continue
+            header += data
+            if header.startswith(self._header_end):
+                start = 0
+            else:
+                start = header.find(b'\n' + self._header_end)
+                if start < 0:
+                    continue
+                start += 1
+            end = header.find(b'\n', start)
+            if end >= 0:
+                return header[end + 1:]
+
+    def _read_records(self, file, data):
+        itemsize = self.record_dtype.itemsize
+        chunk = None
+        fill = 0
+        stopping = False
+        while True:
+            if chunk is None:
+                chunk = self._get_free_chunk()
+            if data:
+                # Data read together with the header
+                read = min(len(data), self._chunk_bytes - fill)
+                chunk[fill:fill + read] = data[:read]
+                data = data[read:]
+            else:
+                read = file.readinto(memoryview(chunk)[fill:]) or 0
+            fill += read
+            if read and fill < self._chunk_bytes:
+                continue
+
+            # Chunk is full or no new data is available: hand over all complete records and keep
+            # an incomplete last record for the next chunk.
+            complete = fill - fill % itemsize
+            if complete > 0:
+                remainder = bytes(chunk[complete:fill])
+                self._filled_chunks.put((chunk, complete))
+                self.records_read += complete // itemsize
+                chunk = None
+                fill = 0
+                if remainder:
+                    chunk = self._get_free_chunk()
+                    chunk[:len(remainder)] = remainder
+                    fill = len(remainder)
+            if not read:
+                if stopping:
+                    return
+                # Read the remaining data written until the stop request once more
+                stopping = self._stop_event.wait(self._poll_interval)
+
+    def _get_free_chunk(self):
+        while True:
+            if self._stop_event.is_set():
+                # The consumer collects the remaining records after stop returned, so do not wait
+                # for free chunk buffers anymore
+                try:
+                    return self._free_chunks.get_nowait()
+                except queue.Empty:
+                    return bytearray(self._chunk_bytes)
+            try:
+                return self._free_chunks.get(timeout=self._poll_interval)
+            except queue.Empty:
+                pass
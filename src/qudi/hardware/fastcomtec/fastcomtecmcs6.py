@@ -23,12 +23,14 @@ If not, see <https://www.gnu.org/licenses/>.
 #TODO: start stop works but pause does not work, i guess gui/logic problem
 #TODO: Check if there are more modules which are missing, and more settings for FastComtec which need to be put, should we include voltage threshold?
 
+import os
 import time
 import ctypes
 import numpy as np
 
 from qudi.core.configoption import ConfigOption
 from qudi.interface.fast_counter_interface import FastCounterInterface
+from qudi.hardware.fastcomtec.fastcomtec_readout import ListFileStreamer
 
 
 """
@@ -124,10 +126,10 @@ class ACQDATA(ctypes.Structure):
                 ('region', ctypes.POINTER(ctypes.c_ulong)),
                 ('comment', ctypes.c_char_p),
                 ('cnt', ctypes.POINTER(ctypes.c_double)),
-                ('hs0', ctypes.c_int),
-                ('hrg', ctypes.c_int),
-                ('hcm', ctypes.c_int),
-                ('hct', ctypes.c_int), ]
+                ('hs0', ctypes.c_void_p),
+                ('hrg', ctypes.c_void_p),
+                ('hcm', ctypes.c_void_p),
+                ('hct', ctypes.c_void_p), ]
 
 
 class BOARDSETTING(ctypes.Structure):
@@ -171,13 +173,28 @@ class FastComtec(FastCounterInterface):
             trigger_safety: 400e-9
             aom_delay: 390e-9
             minimal_binwidth: 0.2e-9
-
+            zero_copy_readout: False  # optional, read the spectrum memory of the server directly
+            list_record_dtype: '<u8'  # optional, record dtype for list file streaming
+
+    With zero_copy_readout the spectrum memory of the MCS6 server (DLL function GetData) is
+    accessed through a numpy view instead of copying it with LVGetDat into a preallocated buffer.
+    The view shows the live memory of the running acquisition, so the server may add counts
+    while the spectrum is converted. A returned trace is therefore not guaranteed to be a
+    consistent snapshot of a single point in time. get_data_trace always returns a new int64 array
+    owned by the caller.
+
+    Raw list mode data can be streamed with start_list_stream while a measurement is running:
+    the MCS6 server writes the list file and a reader thread reads the records as they are
+    written (see get_list_records). list_record_dtype must match the data length of the list file
+    records configured in the MCS6 server.
     """
 
     gated = ConfigOption('gated', False, missing='warn')
     trigger_safety = ConfigOption('trigger_safety', 400e-9, missing='warn')
     aom_delay = ConfigOption('aom_delay', 390e-9, missing='warn')
     minimal_binwidth = ConfigOption('minimal_binwidth', 0.2e-9, missing='warn')
+    zero_copy_readout = ConfigOption('zero_copy_readout', False, missing='nothing')
+    list_record_dtype = ConfigOption('list_record_dtype', '<u8', missing='nothing')
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -185,13 +202,19 @@ class FastComtec(FastCounterInterface):
         #this variable has to be added because there is no difference
         #in the fastcomtec it can be on "stopped" or "halt"
         self.stopped_or_halt = "stopped"
-        self.timetrace_tmp = []
+        self.timetrace_tmp = None
+        self._readout_buffer = np.empty(0, dtype=np.uint32)
+        self._list_streamer = None
+        self._list_streaming = False
 
     def on_activate(self):
         """ Initialisation performed during activation of the module.
         """
 
         self.dll = ctypes.windll.LoadLibrary('C:\Windows\System32\DMCS6.dll')
+        if self.zero_copy_readout and not hasattr(self.dll, 'GetData'):
+            self.log.warning('DLL does not provide GetData. Falling back to LVGetDat readout.')
+            self.zero_copy_readout = False
         if self.gated:
             self.change_sweep_mode(gated=True)
         else:
@@ -201,6 +224,8 @@ class FastComtec(FastCounterInterface):
     def on_deactivate(self):
         """ Deinitialisation performed during deactivation of the module.
         """
+        self.stop_list_stream()
+        self._readout_buffer = np.empty(0, dtype=np.uint32)
         return
 
     def get_constraints(self):
@@ -328,7 +353,8 @@ class FastComtec(FastCounterInterface):
         while self.get_status() != 1:
             time.sleep(0.05)
         if self.gated:
-            self.timetrace_tmp = []
+            self.timetrace_tmp = None
+        self.stop_list_stream()
         return status
 
     def pause_measure(self):
@@ -339,7 +365,7 @@ class FastComtec(FastCounterInterface):
             time.sleep(0.05)
 
         if self.gated:
-            self.timetrace_tmp = self.get_data_trace()
+            self.timetrace_tmp = self.get_data_trace()[0]
         return status
 
     def continue_measure(self):
@@ -392,18 +418,24 @@ class FastComtec(FastCounterInterface):
             H = bsetting.cycles
             if H==0:
                 H=1
-            data = np.empty((H, int(N / H)), dtype=np.uint32)
-
+            shape = (H, int(N / H))
         else:
-            data = np.empty((N,), dtype=np.uint32)
-
-        p_type_ulong = ctypes.POINTER(ctypes.c_uint32)
-        ptr = data.ctypes.data_as(p_type_ulong)
-        self.dll.LVGetDat(ptr, 0)
-        time_trace = np.int64(data)
-
-        if self.gated and self.timetrace_tmp != []:
-            time_trace = time_trace + self.timetrace_tmp
+            shape = (N,)
+
+        data = self._get_spectrum_view(N) if self.zero_copy_readout else None
+        if data is None:
+            if self._readout_buffer.size != N:
+                self._readout_buffer = np.empty(N, dtype=np.uint32)
+            data = self._readout_buffer
+            p_type_ulong = ctypes.POINTER(ctypes.c_uint32)
+            ptr = data.ctypes.data_as(p_type_ulong)
+            self.dll.LVGetDat(ptr, 0)
+        data = data[:int(np.prod(shape))].reshape(shape)
+
+        if self.gated and self.timetrace_tmp is not None:
+            time_trace = np.add(data, self.timetrace_tmp, dtype=np.int64)
+        else:
+            time_trace = data.astype(np.int64)
 
         info_dict = {'elapsed_sweeps': None,
                      'elapsed_time': None}  # TODO : implement that according to hardware capabilities
@@ -414,6 +446,23 @@ class FastComtec(FastCounterInterface):
     #                           Non Interface methods
     # =========================================================================
 
+    def _get_spectrum_view(self, size):
+        """ Map the spectrum memory of the MCS6 server into a numpy array without copying.
+
+        The server keeps writing into this memory while a measurement is running, so the values
+        may change while the view is read.
+
+        @param int size: number of values in the spectrum
+
+        @return numpy.ndarray: uint32 view of the spectrum, None if not available
+        """
+        acq_data = ACQDATA()
+        self.dll.GetData(ctypes.byref(acq_data), 0)
+        if not acq_data.s0 or size < 1:
+            return None
+        ptr = ctypes.cast(acq_data.s0, ctypes.POINTER(ctypes.c_uint32))
+        return np.ctypeslib.as_array(ptr, shape=(size,))
+
     def set_gated(self, gated):
         """ Change the gated status of the fast counter.
 
@@ -851,6 +900,66 @@ class FastComtec(FastCounterInterface):
         self.dll.RunCmd(0, bytes(cmd, 'ascii'))
         return filename
 
+    def change_list_filename(self, name):
+        """ Changes the filename of the list file
+
+        @param str name: Location and name of the list file
+        """
+        cmd = 'datname=%s' % name
+        self.dll.RunCmd(0, bytes(cmd, 'ascii'))
+        return name
+
+
+############################### Methods for list mode streaming ######################################
+
+
+    def start_list_stream(self, file_path):
+        """ Write a list file during the next measurement and read its records in a reader thread
+        while they are written. Call before start_measure, streaming ends with stop_measure.
+
+        @param str file_path: Location and name of the list file, must not exist yet
+
+        @return int: error code (0:OK, -1:error)
+        """
+        if self._list_streaming:
+            self.log.error('List file streaming is already running.')
+            return -1
+        if os.path.exists(file_path):
+            self.log.error('List file "{0}" already exists.'.format(file_path))
+            return -1
+        self.change_list_filename(file_path)
+        self.change_save_mode(2)
+        self._list_streamer = ListFileStreamer(file_path, record_dtype=self.list_record_dtype)
+        self._list_streamer.start()
+        self._list_streaming = True
+        return 0
+
+    def stop_list_stream(self):
+        """ Stop writing the list file and read the remaining records.
+
+        @return int: error code (0:OK, -1:error)
+        """
+        if not self._list_streaming:
+            return 0
+        self._list_streaming = False
+        self.change_save_mode(0)
+        try:
+            self._list_streamer.stop()
+        except Exception:
+            self.log.exception('Error while streaming list file "{0}":'
+                               ''.format(self._list_streamer.file_path))
+            return -1
+        return 0
+
+    def get_list_records(self):
+        """ Get the raw list file records read since the last call.
+
+        @return numpy.ndarray: 1D array of records (dtype given by ConfigOption list_record_dtype)
+        """
+        if self._list_streamer is None:
+            return np.empty(0, dtype=self.list_record_dtype)
+        return self._list_streamer.get_records()
+
 
 
 
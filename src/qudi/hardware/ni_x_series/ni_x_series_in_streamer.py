@@ -40,6 +40,7 @@ from qudi.util.helpers import natural_sort
 from qudi.util.constraints import ScalarConstraint
 from qudi.interface.data_instream_interface import DataInStreamInterface, DataInStreamConstraints
 from qudi.interface.data_instream_interface import StreamingMode, SampleTiming
+from qudi.interface.mixins.shared_stream import SharedStreamMixin
 
 
 class AnalogMultiChannelReader(_AnalogMultiChannelReader):
@@ -78,7 +79,7 @@ class AnalogMultiChannelReader(_AnalogMultiChannelReader):
         return samps_per_chan_read
 
 
-class NIXSeriesInStreamer(DataInStreamInterface):
+class NIXSeriesInStreamer(SharedStreamMixin, DataInStreamInterface):
     """
     A National Instruments device that can detect and count digital pulses and measure analog
     voltages as data stream.
@@ -286,6 +287,7 @@ class NIXSeriesInStreamer(DataInStreamInterface):
 
     def on_deactivate(self):
         """ Shut down the NI card. """
+        self.detach_shared_stream()
         self._terminate_all_tasks()
 
     @property
@@ -19,7 +19,10 @@ You should have received a copy of the GNU Lesser General Public License along w
 If not, see <https://www.gnu.org/licenses/>.
 """
 
+import os
+import queue
 import ctypes
+import threading
 import numpy as np
 import time
 from qtpy import QtCore
@@ -28,6 +31,7 @@ from qudi.core.configoption import ConfigOption
 from qudi.util.paths import get_main_dir
 from qudi.util.mutex import Mutex
 from qudi.interface.fast_counter_interface import FastCounterInterface
+from qudi.hardware.picoquant.tttr_decoder import PicoHarpTTTRDecoder
 
 # =============================================================================
 # Wrapper around the PHLib.DLL. The current file is based on the header files
@@ -96,14 +100,22 @@ class PicoHarp300(FastCounterInterface):
         options:
             deviceID: 0 # a device index from 0 to 7.
             mode: 0 # 0: histogram mode, 2: T2 mode, 3: T3 mode
-        
+            gated: False # optional, sort photons into gates (sync periods since the sweep marker)
+            sweep_marker: 1 # optional, marker bit mask marking the start of a sweep (gated only)
+            fifo_buffer_count: 8 # optional, number of preallocated FIFO read buffers
+
+    The fast counter interface records the TTTR stream (T2 or T3 mode, T2 if histogram mode is
+    configured). The sync input is the sequence trigger (ungated) or the gate trigger (gated).
+    A reader thread reads the FIFO into a pool of preallocated buffers which are decoded in a
+    separate thread. See get_readout_statistics for throughput and backpressure counters.
     """
 
     _deviceID = ConfigOption('deviceID', 0, missing='warn') # a device index from 0 to 7.
     _mode = ConfigOption('mode', 0, missing='warn')
+    _gated = ConfigOption('gated', False, missing='nothing')
+    _sweep_marker = ConfigOption('sweep_marker', 1, missing='nothing')
+    _fifo_buffer_count = ConfigOption('fifo_buffer_count', 8, missing='nothing')
 
-    sigReadoutPicoharp = QtCore.Signal()
-    sigAnalyzeData = QtCore.Signal(object, object)
     sigStart = QtCore.Signal()
 
     def __init__(self, *args, **kwargs):
@@ -132,6 +144,20 @@ class PicoHarp300(FastCounterInterface):
         #locking for thread safety
         self.threadlock = Mutex()
 
+        # TTTR record decoder holding the histogram, created by configure
+        self._decoder = None
+        self._reader_thread = None
+        self._decoder_thread = None
+        self._stop_reading = threading.Event()
+        # Pool of preallocated FIFO read buffers and queue of filled buffers to decode
+        self._fifo_buffers = list()
+        self._free_buffers = None
+        self._filled_buffers = None
+        self._readout_statistics = self._empty_readout_statistics()
+        self._paused = False
+        self._elapsed_time = 0
+        self._start_time = 0
+
 
     def on_activate(self):
         """ Activate and establish the connection to Picohard and initialize.
@@ -148,18 +174,14 @@ class PicoHarp300(FastCounterInterface):
         # anything to pass through:
 
         self.sigStart.connect(self.start_measure)
-        self.sigReadoutPicoharp.connect(self.get_fresh_data_loop, QtCore.Qt.QueuedConnection) # ,QtCore.Qt.QueuedConnection
-        self.sigAnalyzeData.connect(self.analyze_received_data, QtCore.Qt.QueuedConnection)
-        self.result = []
 
 
     def on_deactivate(self):
         """ Deactivates and disconnects the device.
         """
-
+        self._stop_reader()
         self.close_connection()
-        self.sigReadoutPicoharp.disconnect()
-        self.sigAnalyzeData.disconnect()
+        self.sigStart.disconnect()
 
     def _create_errorcode(self):
         """ Create a dictionary with the errorcode for the device.
@@ -223,6 +245,8 @@ class PicoHarp300(FastCounterInterface):
         self.HISTCHAN = 65536    # number of histogram channels 2^16
         self.TTREADMAX = 131072  # 128K event records (2^17)
 
+        self.FLAG_FIFOFULL = 0x0003  # T-modes
+
         # in Hz:
         self.COUNTFREQ = 10
 
@@ -687,11 +711,12 @@ class PicoHarp300(FastCounterInterface):
     # To check whether you can use the TTTR mode (must be purchased in
     # addition) you can call PH_GetFeatures to check.
 
-    def tttr_read_fifo(self):#, num_counts):
+    def tttr_read_fifo(self, buffer=None):
         """ Read out the buffer of the FIFO.
 
-        @param int num_counts: number of TTTR records to be fetched. Maximal
-                               TTREADMAX
+        @param numpy.ndarray buffer: optional, preallocated 1D uint32 array with at least TTREADMAX
+                                     entries to read the TTTR records into. A new array is
+                                     allocated if not given.
 
         @return tuple (buffer, actual_num_counts):
                     buffer = data array where the TTTR data are stored.
@@ -707,39 +732,20 @@ class PicoHarp300(FastCounterInterface):
         Function will return after a timeout period of 80 ms even if not all
         data could be fetched. Return value indicates how many records were
         fetched. Buffer must not be accessed until the function returns!
-        """
-
-        # if type(num_counts) is not int:
-        #     num_counts = self.TTREADMAX
-        # elif (num_counts<0) or (num_counts>self.TTREADMAX):
-        #     self.log.error('PicoHarp: num_counts were expected to within the '
-        #                 'interval [0,{0}], but a value of {1} was '
-        #                 'passed'.format(self.TTREADMAX, num_counts))
-        #     num_counts = self.TTREADMAX
-
-        # PicoHarp T3 Format (for analysis and interpretation):
-        # The bit allocation in the record for the 32bit event is, starting
-        # from the MSB:
-        #       channel:     4 bit
-        #       dtime:      12 bit
-        #       nsync:      16 bit
-        # The channel code 15 (all bits ones) marks a special record.
-        # Special records can be overflows or external markers. To
-        # differentiate this, dtime must be checked:
-        #
-        #     If it is zero, the record marks an overflow.
-        #     If it is >=1 the individual bits are external markers.
 
+        See qudi.hardware.picoquant.tttr_decoder.PicoHarpTTTRDecoder for the
+        record format.
+        """
         num_counts = self.TTREADMAX
 
-        buffer = np.zeros((num_counts,), dtype=np.uint32)
+        if buffer is None:
+            buffer = np.zeros((num_counts,), dtype=np.uint32)
 
         actual_num_counts = ctypes.c_int32()
 
         self.check(self._dll.PH_ReadFiFo(self._deviceID, buffer.ctypes.data,
                                          num_counts, ctypes.byref(actual_num_counts)))
 
-
         return buffer, actual_num_counts.value
 
     def tttr_set_marker_edges(self, me0, me1, me2, me3):
@@ -1054,29 +1060,48 @@ class PicoHarp300(FastCounterInterface):
 
     #FIXME: The interface connection to the fast counter must be established!
 
-    def configure(self, bin_width_ns, record_length_ns, number_of_gates = 0):
-        """
-        Configuration of the fast counter.
-        bin_width_ns: Length of a single time bin in the time trace histogram
-                      in nanoseconds.
-        record_length_ns: Total length of the timetrace/each single gate in
-                          nanoseconds.
-        number_of_gates: Number of gates in the pulse sequence. Ignore for
-                         ungated counter.
-        """
-        #        self.initialize(mode=3)
-        self._bin_width_ns = bin_width_ns
-        self._record_length_ns = record_length_ns
-        self._number_of_gates = number_of_gates
+    def configure(self, bin_width_s, record_length_s, number_of_gates=0):
+        """ Configuration of the fast counter.
 
-        #FIXME: actualle only an unsigned array will be needed. Change that later.
-        #        self.data_trace = np.zeros(number_of_gates, dtype=np.int64 )
-        self.data_trace = [0]*number_of_gates
-        self.count = 0
+        @param float bin_width_s: Length of a single time bin in the time trace histogram in
+                                  seconds. Rounded to a multiple of the device resolution.
+        @param float record_length_s: Total length of the timetrace/each single gate in seconds.
+        @param int number_of_gates: optional, number of gates in the pulse sequence. Ignored for
+                                    ungated counter.
 
-        self.result = []
-        self.initialize(2)
-        return
+        @return tuple(binwidth_s, record_length_s, number_of_gates):
+                    binwidth_s: float the actual set binwidth in seconds
+                    gate_length_s: the actual record length in seconds
+                    number_of_gates: the number of gated, which are accepted, None if not-gated
+        """
+        if self._reader_thread is not None:
+            self._stop_reader()
+        mode = self._mode if self._mode in (self.MODE_T2, self.MODE_T3) else self.MODE_T2
+        self.initialize(mode)
+
+        if mode == self.MODE_T3:
+            resolution_ps = self.get_resolution()
+        else:
+            resolution_ps = PicoHarpTTTRDecoder.T2_RESOLUTION_PS
+        bin_width_ps = max(1, round(bin_width_s * 1e12 / resolution_ps)) * resolution_ps
+        number_of_bins = max(1, int(np.ceil(round(record_length_s * 1e12 / bin_width_ps, 6))))
+        number_of_gates = int(number_of_gates) if self._gated else 0
+
+        with self.threadlock:
+            self._decoder = PicoHarpTTTRDecoder(mode=mode,
+                                                resolution_ps=resolution_ps,
+                                                bin_width_ps=bin_width_ps,
+                                                number_of_bins=number_of_bins,
+                                                number_of_gates=number_of_gates,
+                                                sweep_marker=self._sweep_marker)
+            self._paused = False
+            self._elapsed_time = 0
+        self._bin_width_ns = bin_width_ps / 1e3
+        self._record_length_ns = number_of_bins * bin_width_ps / 1e3
+        self._number_of_gates = number_of_gates
+        return (bin_width_ps * 1e-12,
+                number_of_bins * bin_width_ps * 1e-12,
+                number_of_gates if self._gated else None)
 
     def get_status(self):
         """
@@ -1090,42 +1115,45 @@ class PicoHarp300(FastCounterInterface):
         """
         if not self.connected_to_device:
             return -1
-        else:
-            returnvalue = self._get_status()
-            if returnvalue == 0:
-                return 2
-            else:
-                return 1
-
+        if self._reader_thread is not None and self._reader_thread.is_alive():
+            return 2
+        if self._paused:
+            return 3
+        if self._decoder is None:
+            return 0
+        return 1
 
     def pause_measure(self):
         """
         Pauses the current measurement if the fast counter is in running state.
         """
-
-        self.stop_measure()
-        self.meas_run = False
+        if self._reader_thread is not None:
+            self._stop_reader()
+            self._paused = True
 
     def continue_measure(self):
         """
         Continues the current measurement if the fast counter is in pause state.
         """
-        self.meas_run = True
-        self.start(self._record_length_ns/1e6)
+        if self._paused:
+            self._paused = False
+            # The device time restarts, the histogram is kept
+            with self.threadlock:
+                self._decoder.reset(clear_histogram=False)
+            self._start_reader()
 
     def is_gated(self):
         """
         Boolean return value indicates if the fast counter is a gated counter
         (TRUE) or not (FALSE).
         """
-        return False
+        return bool(self._gated)
 
     def get_binwidth(self):
         """
         returns the width of a single timebin in the timetrace in seconds
         """
-        #FIXME: Must be implemented
-        return 2e-9
+        return self._bin_width_ns * 1e-9
 
     def get_data_trace(self):
         """
@@ -1138,166 +1166,193 @@ class PicoHarp300(FastCounterInterface):
           - If the counter is gated it will return a 2D-numpy-array with
             returnarray[gate_index, timebin_index]
         """
-
-        info_dict = {'elapsed_sweeps': None,
-                     'elapsed_time': None}  # TODO : implement that according to hardware capabilities
-        return self.data_trace, info_dict
-
-    # =========================================================================
-    #  Test routine for continuous readout
-    # =========================================================================
-
+        with self.threadlock:
+            if self._decoder is None:
+                return np.zeros(0, dtype=np.int64), {'elapsed_sweeps': None,
+                                                     'elapsed_time': None}
+            data = self._decoder.histogram.copy()
+            elapsed_sweeps = self._decoder.elapsed_sweeps
+            elapsed_time = self._elapsed_time
+            if self._reader_thread is not None:
+                elapsed_time += time.perf_counter() - self._start_time
+        info_dict = {'elapsed_sweeps': elapsed_sweeps,
+                     'elapsed_time': elapsed_time}
+        return data, info_dict
 
     def start_measure(self):
         """
         Starts the fast counter.
         """
-        self.lock()
-
-        self.meas_run = True
-
-        # start the device:
-        self.start(int(self._record_length_ns/1e6))
-
-        self.sigReadoutPicoharp.emit()
+        if self._decoder is None:
+            self.log.error('PicoHarp: Unable to start measurement. Call configure first.')
+            return -1
+        if self._reader_thread is not None:
+            self._stop_reader()
+        with self.threadlock:
+            self._decoder.reset()
+            self._paused = False
+            self._elapsed_time = 0
+        self._readout_statistics = self._empty_readout_statistics()
+        self._start_reader()
+        return 0
 
     def stop_measure(self):
-        """ By setting the Flag, the measurement should stop.  """
-        self.meas_run = False
-
-
-    def get_fresh_data_loop(self):
-        """ This method will be run infinitely until the measurement stops. """
-
-        # for testing one can also take another array:
-        buffer, actual_counts = self.tttr_read_fifo()
-        #        buffer, actual_counts = [1,2,3,4,5,6,7,8,9], 9
-
-        # This analysis signel should be analyzed in a queued thread:
-        self.sigAnalyzeData.emit(buffer[0:actual_counts-1], actual_counts)
-
-        if not self.meas_run:
-            with self.threadlock:
-                self.unlock()
-                self.stop_device()
-                return
+        """ Stop the measurement. The histogram is kept until the next start. """
+        self._paused = False
+        self._stop_reader()
+        return 0
 
-        print('get new data.')
-        # get the next data:
-        self.sigReadoutPicoharp.emit()
+    def get_readout_statistics(self):
+        """ Counters of the TTTR readout since the last start of a measurement.
+
+        @return dict: 'fifo_reads': number of FIFO reads,
+                      'records_read': number of TTTR records read from the FIFO,
+                      'full_reads': number of FIFO reads returning TTREADMAX records (readout is
+                                    running at its limit),
+                      'backpressure_waits': number of times the reader had to wait for the
+                                            decoder to free a buffer,
+                      'fifo_overruns': number of device FIFO overruns (data lost),
+                      'queued_buffers': number of buffers currently waiting to be decoded,
+                      'max_queued_buffers': maximum number of buffers waiting to be decoded,
+                      'buffer_count': size of the FIFO buffer pool,
+                      'records_decoded', 'photons', 'markers': decoded events
+        """
+        statistics = self._readout_statistics.copy()
+        statistics['buffer_count'] = len(self._fifo_buffers)
+        filled_buffers = self._filled_buffers
+        statistics['queued_buffers'] = 0 if filled_buffers is None else filled_buffers.qsize()
+        with self.threadlock:
+            if self._decoder is not None:
+                statistics['records_decoded'] = self._decoder.records
+                statistics['photons'] = self._decoder.photons
+                statistics['markers'] = self._decoder.markers
+        return statistics
+
+    @staticmethod
+    def _empty_readout_statistics():
+        return {'fifo_reads': 0,
+                'records_read': 0,
+                'full_reads': 0,
+                'backpressure_waits': 0,
+                'fifo_overruns': 0,
+                'max_queued_buffers': 0,
+                'records_decoded': 0,
+                'photons': 0,
+                'markers': 0}
 
+    # =========================================================================
+    #  TTTR readout running in separate reader and decoder threads
+    # =========================================================================
 
+    def _start_reader(self):
+        """ Start the device, the thread reading the FIFO and the thread decoding the records """
+        if self.module_state() != 'locked':
+            self.module_state.lock()
+        buffer_count = max(2, int(self._fifo_buffer_count))
+        if len(self._fifo_buffers) != buffer_count:
+            self._fifo_buffers = [np.empty(self.TTREADMAX, dtype=np.uint32) for _ in
+                                  range(buffer_count)]
+        self._free_buffers = queue.Queue()
+        for buffer in self._fifo_buffers:
+            self._free_buffers.put(buffer)
+        self._filled_buffers = queue.Queue(maxsize=buffer_count)
+        self._stop_reading.clear()
+
+        self.start(self.ACQTMAX)
+        self._start_time = time.perf_counter()
+        self._decoder_thread = threading.Thread(target=self._tttr_decoder_loop,
+                                                name='picoharp300-tttr-decoder',
+                                                daemon=True)
+        self._decoder_thread.start()
+        self._reader_thread = threading.Thread(target=self._tttr_reader_loop,
+                                               name='picoharp300-tttr-reader',
+                                               daemon=True)
+        self._reader_thread.start()
+
+    def _stop_reader(self):
+        """ Stop the reader thread and the device. Records already read are decoded before this
+        method returns.
+        """
+        if self._reader_thread is None:
+            return
+        self._stop_reading.set()
+        self._reader_thread.join()
+        self._reader_thread = None
+        self.stop_device()
+        self._decoder_thread.join()
+        self._decoder_thread = None
+        with self.threadlock:
+            self._elapsed_time += time.perf_counter() - self._start_time
+        if self.module_state() == 'locked':
+            self.module_state.unlock()
+        if self._readout_statistics['backpressure_waits'] > 0:
+            self.log.warning('PicoHarp: TTTR decoding could not keep up with the FIFO readout '
+                             '{0:d} times ({1:d} buffers).'
+                             ''.format(self._readout_statistics['backpressure_waits'],
+                                       len(self._fifo_buffers)))
+
+    def _tttr_reader_loop(self):
+        """ Reads the FIFO into free buffers of the buffer pool and queues them for decoding until
+        the reader is stopped. Each FIFO read returns after at most 80 ms, so stopping the reader
+        takes effect quickly.
+        """
+        statistics = self._readout_statistics
+        try:
+            while not self._stop_reading.is_set():
+                try:
+                    buffer = self._free_buffers.get_nowait()
+                except queue.Empty:
+                    # All buffers are waiting to be decoded
+                    statistics['backpressure_waits'] += 1
+                    buffer = self._free_buffers.get()
+                buffer, actual_counts = self.tttr_read_fifo(buffer)
+                statistics['fifo_reads'] += 1
+                if actual_counts > 0:
+                    statistics['records_read'] += actual_counts
+                    if actual_counts >= self.TTREADMAX:
+                        statistics['full_reads'] += 1
+                    self._filled_buffers.put((buffer, actual_counts))
+                    statistics['max_queued_buffers'] = max(statistics['max_queued_buffers'],
+                                                           self._filled_buffers.qsize())
+                else:
+                    self._free_buffers.put(buffer)
+                if self.get_flags() & self.FLAG_FIFOFULL:
+                    statistics['fifo_overruns'] += 1
+                    self.log.error('PicoHarp: FIFO overrun. The TTTR data could not be read out '
+                                   'fast enough, measurement stopped.')
+                    break
+                if actual_counts == 0 and self._get_status() > 0:
+                    self.log.warning('PicoHarp: Maximum acquisition time reached, measurement '
+                                     'stopped.')
+                    break
+        finally:
+            # Signal the decoder thread to finish after the queued buffers
+            self._filled_buffers.put(None)
+
+    def _tttr_decoder_loop(self):
+        """ Decodes the queued FIFO buffers and returns them to the buffer pool """
+        while True:
+            item = self._filled_buffers.get()
+            if item is None:
+                break
+            buffer, actual_counts = item
+            try:
+                self.analyze_received_data(buffer, actual_counts)
+            except Exception:
+                self.log.exception('PicoHarp: Decoding of TTTR records failed:')
+            finally:
+                self._free_buffers.put(buffer)
 
     def analyze_received_data(self, arr_data, actual_counts):
         """ Analyze the actual data obtained from the TTTR mode of the device.
 
-        @param arr_data: numpy uint32 array with length 'actual_counts'.
-        @param actual_counts: int, number of read out events from the buffer.
-
-        Write the obtained arr_data to the predefined array data_trace,
-        initialized in the configure method.
-
-        The received array contains 32bit words. The bit assignment starts from
-        the MSB (most significant bit), which is here displayed as the most
-        left bit.
-
-        For T2 (initialized device with mode=2):
-        ----------------------------------------
-
-        [ 4 bit for channel-number |28 bit for time-tag] = [32 bit word]
-
-        channel-number: 4 marker, which serve for the different channels.
-                            0001 = marker 1
-                            0010 = marker 2
-                            0011 = marker 3
-                            0100 = marker 4
-
-                        The channel code 15 (all bits ones, 1111) marks a
-                        special record. Special records can be overflows or
-                        external markers. To differentiate this, the lower 4
-                        bits of timetag must be checked:
-                            - If they are all zero, the record marks an
-                              overflow.
-                            - If they are >=1 the individual bits are external
-                              markers.
-
-                        Overflow period: 210698240
-
-                        the first bit is the overflow bit. It will be set if
-                        the time-tag reached 2^28:
-
-                            0000 = overflow
-
-                        Afterwards both overflow marker and time-tag
-                        will be reseted. This overflow should be detected and
-                        the time axis should be adjusted accordingly.
-
-        time-tag: The resolution is fixed to 4ps. Within the time of
-                  4ps*2^28 = 1.073741824 ms
-                  another photon event should occur so that the time axis can
-                  be computed properly.
-
-        For T3 (initialized device with mode=3):
-        ----------------------------------------
-
-        [ 4 bit for channel-number | 12 bit for start-stop-time | 16 bit for sync counter] = [32 bit word]
-
-        channel-number: 4 marker, which serve for the different channels.
-                            0001 = marker 1
-                            0010 = marker 2
-                            0011 = marker 3
-                            0100 = marker 4
-
-                        the first bit is the overflow bit. It will be set if
-                        the sync-counter reached 65536 events:
-
-                            1000 = overflow
+        @param arr_data: numpy uint32 array containing at least 'actual_counts' TTTR records.
+        @param actual_counts: int, number of read out records in the buffer.
 
-                        Afterwards both, overflow marker and sync-counter
-                        will be reseted. This overflow should be detected and
-                        the time axis should be adjusted accordingly.
-
-        start-stop-time: time between to consecutive sync pulses. Maximal time
-                         between two sync pulses is therefore limited to
-                             2^12 * Res
-                         where Res is the Resolution
-                             Res = {4,8,16,32,54,128,256,512} (in ps)
-                         For largest Resolution of 512ps you have 2097.152 ns.
-        sync-counter: can hold up to 2^16 = 65536 events. It that number is
-                      reached overflow will be set. That means all 4 bits in
-                      the channel-number are set to high (i.e. 1).
+        The records are decoded (see qudi.hardware.picoquant.tttr_decoder.PicoHarpTTTRDecoder for
+        the bit layout of T2 and T3 records) and the photons are added to the histogram returned
+        by get_data_trace. Overflows are unwrapped across consecutive calls, so the data must be
+        passed in the order it has been read from the FIFO.
         """
-
-        # at first just a simple test
-        time.sleep(0.2)
-
-        self.data_trace[self.count] = actual_counts
-        self.count += 1
-
-        if self.count > self._number_of_gates-1:
-            self.count = 0
-
-        if actual_counts == self.TTREADMAX:
-            self.log.warning('Overflow!')
-
-        print('Data analyzed.')
-
-#        self.result = []
-#        for entry in arr_data[0:actual_counts-1]:
-#
-#            # apply three bitmasks to extract the relavent numbers:
-#            overflow = entry & (2**(32-1) )
-#            marker_ch = entry & (2**(32-2)  + 2**(32-3) + 2**(32-4))
-#            time_tag = entry & (2**32 -1 - 2**(32-1) + 2**(32-2) + 2**(32-3) + 2**(32-4))
-
-
-
-
-
-
-
-
-
-
-
-
+        with self.threadlock:
+            self._decoder.process(arr_data[:actual_counts])
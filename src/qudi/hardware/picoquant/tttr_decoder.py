@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains a vectorized decoder and histogrammer for the TTTR records of the PicoHarp300.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+__all__ = ['DecodedTTTR', 'PicoHarpTTTRDecoder']
+
+import numpy as np
+from collections import namedtuple
+
+
+DecodedTTTR = namedtuple('DecodedTTTR', ['channels',
+                                         'sync_indices',
+                                         'sync_delays_ps',
+                                         'marker_sync_indices',
+                                         'marker_bits',
+                                         'preceding_markers',
+                                         'overflows'])
+DecodedTTTR.__doc__ = """ Photon and marker events decoded from a block of TTTR records.
+
+channels: detector channel of each photon
+sync_indices: index of the sync period (number of sync pulses since start) of each photon
+sync_delays_ps: time of each photon after the preceding sync pulse in ps
+marker_sync_indices: index of the sync period each marker record occurred in
+marker_bits: marker bit pattern of each marker record
+preceding_markers: number of marker records of the block preceding each photon
+overflows: number of overflow records in the block
+"""
+
+
+class PicoHarpTTTRDecoder:
+    """ Decodes blocks of 32 bit PicoHarp300 TTTR records (T2 or T3 mode) as read from the FIFO and
+    accumulates the photon events into a (gated) histogram.
+
+    T3 record, starting from the MSB:
+        [channel: 4 bit | dtime: 12 bit | nsync: 16 bit]
+    T2 record, starting from the MSB:
+        [channel: 4 bit | time tag: 28 bit]   (4 ps resolution, channel 0 is the sync input)
+
+    Channel 15 marks special records. If the marker bits (lowest 4 bits of dtime in T3 mode or of
+    the time tag in T2 mode) are all zero, the record marks an overflow of nsync/time tag.
+    Otherwise the set bits are the external markers. Overflows are unwrapped across consecutive
+    blocks, so blocks must be passed to the decoder in the order they have been read from the FIFO.
+
+    Ungated histograms count photons in bins of the time after the preceding sync pulse. Gated
+    histograms additionally sort photons into gates by the number of sync periods since the last
+    sweep marker (marker bits matching sweep_marker). Photons before the first sweep marker and
+    beyond the last gate or bin are discarded.
+
+    All decoding and histogramming is done vectorized with numpy for whole blocks of records.
+    """
+
+    T2_WRAPAROUND = 210698240
+    T3_WRAPAROUND = 65536
+    T2_RESOLUTION_PS = 4
+
+    def __init__(self, mode, resolution_ps, bin_width_ps, number_of_bins, number_of_gates=0,
+                 sweep_marker=1):
+        """
+        @param int mode: TTTR mode of the device (2: T2, 3: T3)
+        @param float resolution_ps: resolution of dtime in ps (T3 mode only)
+        @param float bin_width_ps: width of a histogram bin in ps
+        @param int number_of_bins: number of histogram bins (per gate)
+        @param int number_of_gates: number of gates, 0 for an ungated histogram
+        @param int sweep_marker: marker bit mask marking the start of a sweep (gated mode only)
+        """
+        if mode not in (2, 3):
+            raise ValueError('TTTR mode must be 2 (T2) or 3 (T3) but {0} was given.'.format(mode))
+        self.mode = mode
+        self.resolution_ps = float(self.T2_RESOLUTION_PS if mode == 2 else resolution_ps)
+        self.bin_width_ps = float(bin_width_ps)
+        self.number_of_bins = max(1, int(number_of_bins))
+        self.number_of_gates = max(0, int(number_of_gates))
+        self.sweep_marker = int(sweep_marker)
+        if self.number_of_gates > 0:
+            shape = (self.number_of_gates, self.number_of_bins)
+        else:
+            shape = (self.number_of_bins,)
+        self.histogram = np.zeros(shape, dtype=np.int64)
+        self.reset()
+
+    @property
+    def is_gated(self):
+        return self.number_of_gates > 0
+
+    def reset(self, clear_histogram=True):
+        """ Reset the time reference (e.g. for a restart of the device) and the event counters.
+
+        @param bool clear_histogram: also clear the accumulated histogram and sweep count
+        """
+        self._overflow_count = 0
+        self._sync_count = 0
+        self._last_sync_time = -1
+        self._sweep_start_sync = -1
+        if clear_histogram:
+            self.histogram[...] = 0
+            self.elapsed_sweeps = 0
+            self.records = 0
+            self.photons = 0
+            self.markers = 0
+            self.overflows = 0
+        # Sweeps (sync periods) counted before the reset of the time reference in ungated mode
+        self._elapsed_sweeps_offset = self.elapsed_sweeps
+
+    def decode(self, records):
+        """ Decode a block of TTTR records and unwrap the overflows with respect to the previous
+        blocks.
+
+        @param numpy.ndarray records: 1D uint32 array of TTTR records
+        @return DecodedTTTR: the decoded photon and marker events
+        """
+        records = np.asarray(records, dtype=np.uint32)
+        channels = records >> 28
+        special = channels == 15
+        if self.mode == 2:
+            time_tags = (records & 0x0FFFFFFF).astype(np.int64)
+            marker_bits = time_tags & 0xF
+            wraparound = self.T2_WRAPAROUND
+        else:
+            time_tags = (records & 0xFFFF).astype(np.int64)
+            dtimes = ((records >> 16) & 0xFFF).astype(np.int64)
+            marker_bits = dtimes & 0xF
+            wraparound = self.T3_WRAPAROUND
+
+        is_overflow = special & (marker_bits == 0)
+        is_marker = special & ~is_overflow
+        # Overflows apply to all following records (including those of later blocks)
+        overflows = np.cumsum(is_overflow, dtype=np.int64)
+        overflows += self._overflow_count
+        times = time_tags + overflows * wraparound
+        n_overflows = int(overflows[-1] - self._overflow_count) if records.size > 0 else 0
+        self._overflow_count += n_overflows
+
+        if self.mode == 2:
+            is_sync = ~special & (channels == 0)
+            is_photon = ~special & ~is_sync
+            sync_times = times[is_sync]
+            # Number of sync records up to each record. 0 refers to the last sync pulse of the
+            # previous blocks.
+            syncs_before = np.cumsum(is_sync, dtype=np.int64)
+            preceding_sync = syncs_before[is_photon]
+            sync_indices = preceding_sync + (self._sync_count - 1)
+            sync_times_ext = np.concatenate(([self._last_sync_time], sync_times))
+            sync_delays_ps = times[is_photon] - sync_times_ext[preceding_sync]
+            sync_delays_ps = sync_delays_ps * self.resolution_ps
+            # Photons without any preceding sync pulse can not be assigned
+            sync_delays_ps[sync_indices < 0] = -1
+            marker_sync_indices = syncs_before[is_marker] + (self._sync_count - 1)
+            if sync_times.size > 0:
+                self._sync_count += sync_times.size
+                self._last_sync_time = sync_times[-1]
+        else:
+            is_photon = ~special
+            sync_indices = times[is_photon]
+            sync_delays_ps = dtimes[is_photon] * self.resolution_ps
+            marker_sync_indices = times[is_marker]
+            if records.size > 0:
+                self._sync_count = int(times[-1]) + 1
+
+        decoded = DecodedTTTR(channels=channels[is_photon],
+                              sync_indices=sync_indices,
+                              sync_delays_ps=sync_delays_ps,
+                              marker_sync_indices=marker_sync_indices,
+                              marker_bits=marker_bits[is_marker],
+                              preceding_markers=np.cumsum(is_marker, dtype=np.int64)[is_photon],
+                              overflows=n_overflows)
+        self.records += records.size
+        self.photons += decoded.sync_indices.size
+        self.markers += decoded.marker_bits.size
+        self.overflows += n_overflows
+        return decoded
+
+    def add_to_histogram(self, decoded):
+        """ Accumulate decoded photon events into the histogram.
+
+        @param DecodedTTTR decoded: photon and marker events returned by decode
+        """
+        bins = np.floor_divide(decoded.sync_delays_ps, self.bin_width_ps).astype(np.int64)
+        valid = (bins >= 0) & (bins < self.number_of_bins)
+
+        if not self.is_gated:
+            self.histogram += np.bincount(bins[valid], minlength=self.number_of_bins)
+            self.elapsed_sweeps = self._elapsed_sweeps_offset + self._sync_count
+            return
+
+        is_sweep_start = (decoded.marker_bits & self.sweep_marker) != 0
+        sweep_start_syncs = decoded.marker_sync_indices[is_sweep_start]
+        # Number of sweep markers preceding each photon. 0 refers to the last sweep marker of the
+        # previous blocks.
+        sweep_starts_before = np.concatenate(([0], np.cumsum(is_sweep_start, dtype=np.int64)))
+        preceding_start = sweep_starts_before[decoded.preceding_markers]
+        sweep_start_syncs_ext = np.concatenate(([self._sweep_start_sync], sweep_start_syncs))
+        start_syncs = sweep_start_syncs_ext[preceding_start]
+        gates = decoded.sync_indices - start_syncs
+        valid &= (start_syncs >= 0) & (gates >= 0) & (gates < self.number_of_gates)
+        flat_indices = gates[valid] * self.number_of_bins + bins[valid]
+        self.histogram.reshape(-1)[:] += np.bincount(flat_indices, minlength=self.histogram.size)
+        if sweep_start_syncs.size > 0:
+            self._sweep_start_sync = int(sweep_start_syncs[-1])
+            self.elapsed_sweeps += sweep_start_syncs.size
+
+    def process(self, records):
+        """ Decode a block of TTTR records and accumulate the photons into the histogram.
+
+        @param numpy.ndarray records: 1D uint32 array of TTTR records
+        @return DecodedTTTR: the decoded photon and marker events
+        """
+        decoded = self.decode(records)
+        self.add_to_histogram(decoded)
+        return decoded
@@ -27,12 +27,13 @@ import numpy as np
 
 from qudi.interface.switch_interface import SwitchInterface
 from qudi.interface.pulser_interface import PulserInterface, PulserConstraints
+from qudi.interface.mixins.digital_pattern_pulser import DigitalPatternPulserMixin
 from qudi.core.configoption import ConfigOption
 from qudi.util.mutex import Mutex
 from qudi.util.network import netobtain
 
 
-class PulseBlasterESRPRO(SwitchInterface, PulserInterface):
+class PulseBlasterESRPRO(DigitalPatternPulserMixin, SwitchInterface, PulserInterface):
     """ Hardware class to control the PulseBlasterESR-PRO card from SpinCore.
 
     This file is compatible with the PCI version SP18A of the PulseBlasterESR.
@@ -1819,6 +1820,48 @@ class PulseBlasterESRPRO(SwitchInterface, PulserInterface):
 
         return chunk_length, [self._current_pb_waveform_name]
 
+    def write_digital_pattern(self, name, run_lengths, digital_states,
+                              total_number_of_samples):
+        """ Write a new waveform given as run-length encoded digital pattern.
+            Unlike write_waveform no sample arrays are needed.
+
+        @param str name: the name of the waveform to be created
+        @param numpy.ndarray run_lengths: int64 array containing the length of
+                                          each run in samples
+        @param dict digital_states: keys are the generic digital channel names
+                                    (i.e. 'd_ch1') and values are bool arrays
+                                    (same length as run_lengths) containing
+                                    the channel state in each run
+        @param int total_number_of_samples: The number of sample points for the
+                                            entire waveform
+
+        @return (int, list): number of samples written (-1 indicates failed
+                             process) and list of created waveform names.
+        """
+        run_lengths = np.asarray(netobtain(run_lengths), dtype=np.int64)
+        digital_states = netobtain(digital_states)
+
+        if not digital_states or len(run_lengths) == 0:
+            self._current_pb_waveform_theoretical = [{'active_channels': [], 'length': self.LEN_MIN}]
+            self._current_pb_waveform = [{'active_channels': [], 'length': self.LEN_MIN}]
+            self._current_pb_waveform_name = ''
+            return 0, list()
+
+        chan = list(digital_states)
+        chan.sort()
+        self._current_activation_config = chan
+
+        self._current_pb_waveform_theoretical = self._convert_runs_to_pb_sequence(run_lengths,
+                                                                                  digital_states)
+        self._current_pb_waveform_name = name
+        self._current_pb_waveform = self._correct_sequence_for_delays(self._current_pb_waveform_theoretical)
+        self.write_pulse_form(self._current_pb_waveform)
+        self.log.debug('Digital pattern written in PulseBlaster with name "{0}" '
+                       'and a total length of {1} sequence '
+                       'entries.'.format(self._current_pb_waveform_name,
+                                          len(self._current_pb_waveform)))
+        return int(np.sum(run_lengths)), [self._current_pb_waveform_name]
+
     def _convert_sample_to_pb_sequence(self, digital_samples):
         """ Helper method to create a pulse blaster sequence.
 
@@ -1844,61 +1887,62 @@ class PulseBlasterESRPRO(SwitchInterface, PulserInterface):
 
         ch_list = list(digital_samples)
         ch_list.sort()
-        num_ch = len(ch_list)
 
         # take on of the channel and obtain the channel length
         num_entries = len(digital_samples[ch_list[0]])
 
-        last_sequence_dict = None
-        pb_sequence_list = list()
-
-        for index in range(num_entries):
-
-            # create at first a temporary array, with the minimal granularity
-            # length. The sampling freq is fixed anyway and cannot be changed.
-            temp_sequence_dict = {'active_channels': [],
-                                  'length': self.GRAN_MIN}
+        # find the sample indices where any of the channels changes its state
+        samples = np.array([digital_samples[ch_name] for ch_name in ch_list], dtype=bool)
+        changes = np.any(samples[:, 1:] != samples[:, :-1], axis=0)
+        run_starts = np.flatnonzero(np.concatenate(([num_entries > 0], changes)))
+        run_lengths = np.diff(np.append(run_starts, num_entries))
 
-            for ch_name in ch_list:
+        digital_states = {ch_name: samples[ii, run_starts] for ii, ch_name in enumerate(ch_list)}
+        return self._convert_runs_to_pb_sequence(run_lengths, digital_states)
 
-                if digital_samples[ch_name][index]:
-                    temp_sequence_dict['active_channels'].append(int(ch_name.replace('d_ch', ''))-1)
+    def _convert_runs_to_pb_sequence(self, run_lengths, digital_states):
+        """ Helper method to create a pulse blaster sequence from a run-length
+            encoded digital pattern. Consecutive runs with the same active
+            channels are merged.
 
-            # compare it with the last array if present
+        @param numpy.ndarray run_lengths: int array containing the length of
+                                          each run in samples
+        @param dict digital_states: keys are the generic digital channel names
+                                    and values are bool arrays containing the
+                                    channel state in each run
 
-            # if not present start to count
-            if last_sequence_dict is None:
-                last_sequence_dict = temp_sequence_dict
+        @return list: a sequence list with dictionaries formated for the generic
+                      method 'write_pulse_form' (see
+                      _convert_sample_to_pb_sequence)
+        """
+        ch_list = list(digital_states)
+        ch_list.sort()
+        ch_numbers = [int(ch_name.replace('d_ch', '')) - 1 for ch_name in ch_list]
+        states = [np.asarray(digital_states[ch_name], dtype=bool) for ch_name in ch_list]
 
+        pb_sequence_list = list()
+        for index, run_length in enumerate(run_lengths):
+            active_channels = [ch_num for ch_num, ch_states in zip(ch_numbers, states) if
+                               ch_states[index]]
+            # if the same channels are active as in the last entry, accumulate length
+            if pb_sequence_list and pb_sequence_list[-1]['active_channels'] == active_channels:
+                pb_sequence_list[-1]['length'] += int(run_length) * self.GRAN_MIN
             else:
-
-                 # if present and the same channels, accumulate length
-                if temp_sequence_dict['active_channels'] == last_sequence_dict['active_channels']:
-                    last_sequence_dict['length'] += temp_sequence_dict['length']
-
-                # if present and not the same channels, append last array to
-                # sequence array
-                else:
-                    # increase length by 1%, to remove the ambiguity for the
-                    # comparison
-                    if last_sequence_dict['length']*1.01 < self.LEN_MIN:
-                        self.log.warning('Current waveform contains a pulse of '
-                                         'length {0:.2f}ns, which is smaller '
-                                         'than the minimal allowed length of '
-                                         '{1:.2f}ns! Pulse sequence might '
-                                         'most probably look unexpected. '
-                                         'Increase the length of the smallest '
-                                         'pulse!'
-                                         ''.format(last_sequence_dict['length']*1e9,
-                                                   self.LEN_MIN*1e9))
-
-                    pb_sequence_list.append(last_sequence_dict)
-
-                    # and temporary array becomes last array for the next round
-                    last_sequence_dict = temp_sequence_dict
-
-        # do not forget to add the last sequence
-        pb_sequence_list.append(last_sequence_dict)
+                pb_sequence_list.append({'active_channels': active_channels,
+                                         'length': int(run_length) * self.GRAN_MIN})
+
+        # increase length by 1%, to remove the ambiguity for the comparison
+        for last_sequence_dict in pb_sequence_list[:-1]:
+            if last_sequence_dict['length'] * 1.01 < self.LEN_MIN:
+                self.log.warning('Current waveform contains a pulse of '
+                                 'length {0:.2f}ns, which is smaller '
+                                 'than the minimal allowed length of '
+                                 '{1:.2f}ns! Pulse sequence might '
+                                 'most probably look unexpected. '
+                                 'Increase the length of the smallest '
+                                 'pulse!'
+                                 ''.format(last_sequence_dict['length'] * 1e9,
+                                           self.LEN_MIN * 1e9))
 
         return pb_sequence_list
 
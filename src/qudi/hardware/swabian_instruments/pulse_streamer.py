@@ -26,9 +26,10 @@ import pulsestreamer as ps
 from qudi.core.configoption import ConfigOption
 from qudi.core.statusvariable import StatusVar
 from qudi.interface.pulser_interface import PulserInterface, PulserConstraints
+from qudi.interface.mixins.digital_pattern_pulser import DigitalPatternPulserMixin
 
 
-class PulseStreamer(PulserInterface):
+class PulseStreamer(DigitalPatternPulserMixin, PulserInterface):
     """ Methods to control the Swabian Instruments Pulse Streamer 8/2
 
     Example config for copy-paste:
@@ -695,6 +696,41 @@ class PulseStreamer(PulserInterface):
 
         return len(samples), [self.__current_waveform_name]
 
+    def write_digital_pattern(self, name, run_lengths, digital_states, total_number_of_samples):
+        """
+        Write a new purely digital waveform given as run-length encoded pattern. The pulse pattern
+        of each channel is created directly from the runs without any sample arrays.
+
+        @param str name: the name of the waveform to be created
+        @param numpy.ndarray run_lengths: 1D int64 array containing the length of each run in
+                                          samples (time bins)
+        @param dict digital_states: keys are the generic digital channel names (i.e. 'd_ch1') and
+                                    values are 1D bool arrays containing the channel state in each
+                                    run
+        @param int total_number_of_samples: The number of sample points for the entire waveform
+
+        @return (int, list): Number of samples written (-1 indicates failed process) and list of
+                             created waveform names
+        """
+        run_lengths = np.asarray(run_lengths, dtype=np.int64)
+        self.__current_waveform_name = name
+        self.__current_waveform = dict()
+        for channel_number, states in digital_states.items():
+            states = np.asarray(states, dtype=bool)
+            # merge consecutive runs in which this channel does not change
+            new_channel_indices = np.flatnonzero(
+                np.concatenate(([states.size > 0], states[1:] != states[:-1])))
+            if new_channel_indices.size > 0:
+                durations = np.add.reduceat(run_lengths, new_channel_indices)
+            else:
+                durations = run_lengths[:0]
+            self.__current_waveform[channel_number] = [
+                [int(duration), int(state)] for duration, state in
+                zip(durations, states[new_channel_indices])
+            ]
+        self.__samples_written = int(np.sum(run_lengths))
+        return self.__samples_written, [self.__current_waveform_name]
+
     def write_sequence(self, name, sequence_parameters):
         """
         Write a new sequence on the device memory.
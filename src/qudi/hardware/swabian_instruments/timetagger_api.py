@@ -1,7 +1,7 @@
 
 from os.path import join, getsize, isfile
 import numpy as np
-from TimeTagger import createTimeTagger, Dump, Correlation, Histogram, Counter, CountBetweenMarkers, FileWriter, Countrate, Combiner, TimeDifferences
+from TimeTagger import createTimeTagger, Dump, Correlation, Histogram, Counter, CountBetweenMarkers, FileWriter, Countrate, Combiner, TimeDifferences, CHANNEL_UNUSED
 from qudi.core.configoption import ConfigOption
 from qudi.core.module import Base
 
@@ -159,11 +159,13 @@ class TT(Base):
                                 n_values)     
 
 
-    def time_differences(self, click_channel, start_channel, next_channel, binwidth,n_bins, n_histograms):
+    def time_differences(self, click_channel, start_channel, next_channel, binwidth,n_bins, n_histograms,
+                         sync_channel=CHANNEL_UNUSED):
         return TimeDifferences(self.tagger, 
                             click_channel=click_channel,
                             start_channel=start_channel,
                             next_channel=next_channel,
+                            sync_channel=sync_channel,
                             binwidth=binwidth,
                             n_bins=n_bins,
                             n_histograms=n_histograms)
@@ -20,6 +20,7 @@ You should have received a copy of the GNU Lesser General Public License along w
 If not, see <https://www.gnu.org/licenses/>.
 """
 
+import time
 import numpy as np
 import TimeTagger as tt
 
@@ -40,9 +41,19 @@ class TimeTaggerFastCounter(FastCounterInterface):
             timetagger_channel_detect: 2
             timetagger_channel_sequence: 3
             timetagger_sum_channels: 4
+            sync_on_sequence_channel: True  # optional, restart gate counting on each sequence trigger
         connect:
             tagger: 'tagger'
 
+    With sync_on_sequence_channel the sequence channel is used as sync channel of the
+    TimeDifferences measurement, i.e. each sequence trigger restarts the gate index at 0. The
+    number of elapsed sweeps is the number of histogram index rollovers reported by the TimeTagger.
+
+    get_data_trace returns the TimeTagger data converted to int64 in a single step. The caller
+    owns the returned array. TimeTagger allocates the full data array on each call anyway, so
+    keeping a persistent buffer and converting only the changed gates into it would need an
+    additional full copy to hand out a caller-owned array and saves nothing. The gates that may
+    have received counts since the last call are reported by get_changed_gates instead.
     """
     timetagger = Connector(interface='TT')
     _channel_apd_0 = ConfigOption('timetagger_channel_apd_0', missing='error')
@@ -50,6 +61,9 @@ class TimeTaggerFastCounter(FastCounterInterface):
     _channel_detect = ConfigOption('timetagger_channel_detect', missing='error')
     _channel_sequence = ConfigOption('timetagger_channel_sequence', missing='error')
     _sum_channels = ConfigOption('timetagger_sum_channels', True, missing='warn')
+    _sync_on_sequence_channel = ConfigOption('sync_on_sequence_channel',
+                                             default=True,
+                                             missing='nothing')
 
     def on_activate(self):
         """ Connect and configure the access to the FPGA.
@@ -60,6 +74,10 @@ class TimeTaggerFastCounter(FastCounterInterface):
         self._number_of_gates = int(100)
         self._bin_width = 1
         self._record_length = int(4000)
+        self._last_position = None
+        self._changed_gates = np.empty(0, dtype=np.int64)
+        self._elapsed_time = 0.
+        self._run_start_time = None
 
         if self._sum_channels:
             self._channel_combined = self._tagger.combiner(channels=[self._channel_apd_0, self._channel_apd_1])#tt.Combiner(self._tagger, channels=[self._channel_apd_0, self._channel_apd_1])
@@ -151,17 +169,26 @@ class TimeTaggerFastCounter(FastCounterInterface):
         bin_width = int(bin_width_s*1e12)
         n_values = int(record_length_s*1e12/bin_width)
         # self.pulsed = self._tagger.counter(channels = [self._channel_apd], bin_width=bin_width, n_values=n_values)
+        if self._sync_on_sequence_channel:
+            sync_channel = self._channel_sequence
+        else:
+            sync_channel = tt.CHANNEL_UNUSED
         self.pulsed = self._tagger.time_differences(
            click_channel=self._channel_apd,
            start_channel=self._channel_detect,
            next_channel=self._channel_detect,
-           #sync_channel=tt.CHANNEL_UNUSED,
+           sync_channel=sync_channel,
            binwidth=int(np.round(self._bin_width * 1000)),
            n_bins=int(self._record_length),
            n_histograms=number_of_gates
         )
         self.pulsed.stop()
 
+        self._last_position = None
+        self._changed_gates = np.empty(0, dtype=np.int64)
+        self._elapsed_time = 0.
+        self._run_start_time = None
+
         return bin_width_s, record_length_s, number_of_gates
 
     def start_measure(self):
@@ -170,6 +197,10 @@ class TimeTaggerFastCounter(FastCounterInterface):
         self.pulsed.clear()
         self.pulsed.start()
         self._tagger.tagger.sync()
+        # Buffer contains data of the last measurement, so all gates must be copied again
+        self._last_position = None
+        self._elapsed_time = 0.
+        self._run_start_time = time.perf_counter()
         self.statusvar = 2
         return 0
 
@@ -178,6 +209,7 @@ class TimeTaggerFastCounter(FastCounterInterface):
         if self.module_state() == 'locked':
             self.pulsed.stop()
             self.module_state.unlock()
+        self._stop_elapsed_time()
         self.statusvar = 1
         return 0
 
@@ -188,6 +220,7 @@ class TimeTaggerFastCounter(FastCounterInterface):
         """
         if self.module_state() == 'locked':
             self.pulsed.stop()
+            self._stop_elapsed_time()
             self.statusvar = 3
         return 0
 
@@ -198,6 +231,7 @@ class TimeTaggerFastCounter(FastCounterInterface):
         """
         if self.module_state() == 'locked':
             self.pulsed.start()
+            self._run_start_time = time.perf_counter()
             self.statusvar = 2
         return 0
 
@@ -220,11 +254,70 @@ class TimeTaggerFastCounter(FastCounterInterface):
         The binning, specified by calling configure() in forehand, must be taken
         care of in this hardware class. A possible overflow of the histogram
         bins must be caught here and taken care of.
+
+        """
+        # Read the histogram position before the data, so counts arriving in between are copied
+        # (again) with the next call.
+        position = self._get_histogram_position()
+        data = self.pulsed.getData()
+
+        # TimeTagger returns a newly allocated array, so converting it is the only copy needed
+        data = np.asarray(data, dtype=np.int64)
+
+        changed = self._gates_changed_since(self._last_position, position)
+        self._last_position = position
+        if changed is None:
+            changed = np.arange(data.shape[0])
+        self._changed_gates = changed
+
+        elapsed_time = self._elapsed_time
+        if self._run_start_time is not None:
+            elapsed_time += time.perf_counter() - self._run_start_time
+        info_dict = {'elapsed_sweeps': int(self.pulsed.getCounts()),
+                     'elapsed_time': elapsed_time}
+        return data, info_dict
+
+    def get_changed_gates(self):
+        """ Indices of the gates that may have received counts between the last two calls of
+        get_data_trace. All gates are reported after (re-)starting a measurement.
+
+        @return numpy.ndarray: 1D array of gate indices
+        """
+        return self._changed_gates.copy()
+
+    def _get_histogram_position(self):
+        """ Monotonic position of the TimeDifferences measurement in units of gates, combining
+        the number of histogram index rollovers and the current histogram index.
+
+        @return int: number of gates passed since the start of the measurement
+        """
+        rollovers = int(self.pulsed.getCounts())
+        index = max(0, int(self.pulsed.getHistogramIndex()))
+        return rollovers * self._gate_count() + index
+
+    def _gates_changed_since(self, last_position, position):
+        """ Gates that may have received counts between two histogram positions (see
+        _get_histogram_position).
+
+        @param int last_position: histogram position of the older data, None if unknown
+        @param int position: histogram position of the newer data
+        @return numpy.ndarray: gate indices or None if all gates may have changed
         """
-        info_dict = {'elapsed_sweeps': None,
-                     'elapsed_time': None}  # TODO : implement that according to hardware capabilities
-        
-        return np.array(self.pulsed.getData(), dtype='int64'), info_dict
+        number_of_gates = self._gate_count()
+        if last_position is None or position - last_position >= number_of_gates - 1 or \
+                position < last_position:
+            return None
+        first_gate = last_position % number_of_gates
+        return (first_gate + np.arange(position - last_position + 1)) % number_of_gates
+
+    def _gate_count(self):
+        """ Number of histograms of the TimeDifferences measurement """
+        return max(1, int(self._number_of_gates))
+
+    def _stop_elapsed_time(self):
+        if self._run_start_time is not None:
+            self._elapsed_time += time.perf_counter() - self._run_start_time
+            self._run_start_time = None
 
     def get_status(self):
         """ Receives the current status of the Fast Counter and outputs it as
@@ -38,11 +38,12 @@ from qudi.util.mutex import Mutex
 from qudi.util.constraints import ScalarConstraint
 from qudi.interface.data_instream_interface import DataInStreamInterface, DataInStreamConstraints, StreamingMode, \
     SampleTiming
+from qudi.interface.mixins.shared_stream import SharedStreamMixin
 from qudi.hardware.wavemeter.high_finesse_proxy import HighFinesseProxy
 from qudi.hardware.wavemeter.high_finesse_constants import GetFrequencyError
 
 
-class HighFinesseWavemeter(DataInStreamInterface):
+class HighFinesseWavemeter(SharedStreamMixin, DataInStreamInterface):
     """
     HighFinesse wavelength meter as an in-streaming device.
 
@@ -141,6 +142,7 @@ class HighFinesseWavemeter(DataInStreamInterface):
 
     def on_deactivate(self) -> None:
         self.stop_stream()
+        self.detach_shared_stream()
 
         # free memory
         self._data_buffer = None
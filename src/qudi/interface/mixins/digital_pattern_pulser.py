@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+__all__ = ['DigitalPatternPulserMixin']
+
+from abc import abstractmethod
+
+
+class DigitalPatternPulserMixin:
+    """ Mixin to inherit alongside qudi.interface.pulser_interface.PulserInterface by pulse
+    generators describing digital waveforms as a list of channel states with durations (e.g.
+    PulseStreamer, PulseBlaster) instead of sample arrays.
+
+    For waveforms without analog channels the SequenceGeneratorLogic does not sample the waveform
+    but hands over a run-length encoded pattern directly via "write_digital_pattern". The pattern
+    consists of an integer array of run lengths (in samples/time bins at the current sample rate)
+    and one bool array per digital channel holding the channel state during each run.
+
+    Use like this:
+
+        class MyHardwareModule(DigitalPatternPulserMixin, PulserInterface):
+            ...
+    """
+
+    @abstractmethod
+    def write_digital_pattern(self, name, run_lengths, digital_states, total_number_of_samples):
+        """
+        Write a new purely digital waveform given as run-length encoded pattern to the device
+        memory. Replaces write_waveform (with is_first_chunk and is_last_chunk both set) for
+        waveforms without analog channels.
+
+        Consecutive runs may have identical channel states.
+
+        @param str name: the name of the waveform to be created
+        @param numpy.ndarray run_lengths: 1D int64 array containing the length of each run in
+                                          samples (time bins). All entries are larger than 0.
+        @param dict digital_states: keys are the generic digital channel names (i.e. 'd_ch1') and
+                                    values are 1D numpy arrays of type bool with the same length as
+                                    run_lengths containing the channel state in each run.
+        @param int total_number_of_samples: The number of sample points of the waveform (equal to
+                                            the sum of run_lengths)
+
+        @return (int, list): Number of samples written (-1 indicates failed process) and list of
+                             created waveform names
+        """
+        pass
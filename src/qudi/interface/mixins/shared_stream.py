@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+__all__ = ['SharedStreamMixin']
+
+import numpy as np
+
+from qudi.util.shared_stream import SharedStreamBuffer
+
+
+class SharedStreamMixin:
+    """ Mixin to inherit alongside qudi.interface.data_instream_interface.DataInStreamInterface to
+    let a hardware module publish its samples into a qudi.util.shared_stream.SharedStreamBuffer.
+
+    The consumer (e.g. a logic module running in another qudi process on the same host) creates
+    the shared memory buffer and lets the hardware module attach to it by name. Afterwards each
+    call to "read_data_into_shared_stream" makes the hardware read its samples directly into
+    shared memory, so only the sample count needs to pass the remote connection.
+
+    Use like this:
+
+        class MyHardwareModule(SharedStreamMixin, DataInStreamInterface):
+            ...
+
+    Call "detach_shared_stream" in on_deactivate.
+    """
+
+    _shared_stream = None
+
+    @property
+    def shared_stream_attached(self) -> bool:
+        return self._shared_stream is not None
+
+    def attach_shared_stream(self, name: str) -> None:
+        """ Attach to the SharedStreamBuffer with given name. Any previously attached buffer is
+        detached first.
+        """
+        self.detach_shared_stream()
+        stream = SharedStreamBuffer.attach(name)
+        channel_count = len(self.active_channels)
+        if stream.dtype != np.dtype(self.constraints.data_type) or \
+                stream.channel_count != channel_count:
+            stream.close()
+            raise ValueError(
+                f'SharedStreamBuffer "{name}" does not match streamer configuration (dtype: '
+                f'{stream.dtype} vs. {np.dtype(self.constraints.data_type)}, channels: '
+                f'{stream.channel_count:d} vs. {channel_count:d}).'
+            )
+        self._shared_stream = stream
+
+    def detach_shared_stream(self) -> None:
+        """ Detach from the currently attached SharedStreamBuffer (if any) """
+        stream = self._shared_stream
+        self._shared_stream = None
+        if stream is not None:
+            stream.close()
+
+    def read_data_into_shared_stream(self, samples_per_channel: int) -> int:
+        """ Read <samples_per_channel> samples from the stream directly into the attached
+        SharedStreamBuffer. Blocks just like "read_data_into_buffer".
+        Returns the number of samples per channel written to the shared buffer.
+        """
+        stream = self._shared_stream
+        if stream is None:
+            raise RuntimeError('Unable to read data into shared stream. No SharedStreamBuffer '
+                               'attached.')
+        samples_per_channel = int(samples_per_channel)
+        for data_view, times_view in stream.writable_segments(samples_per_channel):
+            count = data_view.size // stream.channel_count
+            self.read_data_into_buffer(data_buffer=data_view,
+                                       samples_per_channel=count,
+                                       timestamp_buffer=times_view)
+            stream.commit(count)
+        return samples_per_channel
+
+    def read_available_data_into_shared_stream(self) -> int:
+        """ Read all currently available samples (limited by free space in the shared buffer)
+        directly into the attached SharedStreamBuffer.
+        Returns the number of samples per channel written to the shared buffer.
+        """
+        stream = self._shared_stream
+        if stream is None:
+            raise RuntimeError('Unable to read data into shared stream. No SharedStreamBuffer '
+                               'attached.')
+        return self.read_data_into_shared_stream(min(self.available_samples, stream.free))
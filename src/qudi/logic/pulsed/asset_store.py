@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains a single file database to store the pulse objects (PulseBlock,
+PulseBlockEnsemble, PulseSequence) of the SequenceGeneratorLogic.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import pickle
+import sqlite3
+from contextlib import contextmanager
+
+from qudi.util.mutex import Mutex
+
+
+class PulseAssetStore:
+    """
+    SQLite database storing the dict representations (see get_dict_representation) of pulse
+    objects. Each asset is identified by its kind ('block', 'ensemble' or 'sequence') and name.
+
+    Writes are committed immediately unless they happen inside a batch() context. In that case all
+    writes are committed at once when the outermost batch context is left.
+    """
+    _kinds = ('block', 'ensemble', 'sequence')
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = Mutex()
+        self._batch_depth = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS assets ('
+                                 'kind TEXT NOT NULL, '
+                                 'name TEXT NOT NULL, '
+                                 'data BLOB NOT NULL, '
+                                 'PRIMARY KEY (kind, name))')
+        self._connection.commit()
+
+    @property
+    def path(self):
+        return self._path
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.commit()
+                self._connection.close()
+                self._connection = None
+
+    def names(self, kind):
+        """
+        Get the names of all stored assets of a kind without loading them.
+
+        @param str kind: asset kind ('block', 'ensemble' or 'sequence')
+        @return list: asset names
+        """
+        self._check_kind(kind)
+        with self._lock:
+            cursor = self._connection.execute('SELECT name FROM assets WHERE kind=?', (kind,))
+            return [row[0] for row in cursor]
+
+    def load(self, kind, name):
+        """
+        Load the dict representation of an asset.
+
+        @param str kind: asset kind ('block', 'ensemble' or 'sequence')
+        @param str name: asset name
+        @return dict: dict representation of the asset or None if it is not stored
+        """
+        self._check_kind(kind)
+        with self._lock:
+            row = self._connection.execute('SELECT data FROM assets WHERE kind=? AND name=?',
+                                           (kind, name)).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def store(self, kind, name, dict_repr):
+        """
+        Store (or replace) the dict representation of an asset.
+
+        @param str kind: asset kind ('block', 'ensemble' or 'sequence')
+        @param str name: asset name
+        @param dict dict_repr: dict representation of the asset
+        """
+        self._check_kind(kind)
+        data = pickle.dumps(dict_repr, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO assets (kind, name, data) VALUES (?, ?, ?)',
+                (kind, name, sqlite3.Binary(data))
+            )
+            if self._batch_depth == 0:
+                self._connection.commit()
+
+    def delete(self, kind, name):
+        """
+        Remove an asset from the store. Does nothing if the asset is not stored.
+
+        @param str kind: asset kind ('block', 'ensemble' or 'sequence')
+        @param str name: asset name
+        """
+        self._check_kind(kind)
+        with self._lock:
+            self._connection.execute('DELETE FROM assets WHERE kind=? AND name=?', (kind, name))
+            if self._batch_depth == 0:
+                self._connection.commit()
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager grouping all writes into a single transaction. Can be nested.
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._connection is not None:
+                    self._connection.commit()
+
+    def _check_kind(self, kind):
+        if kind not in self._kinds:
+            raise ValueError('Unknown pulse asset kind "{0}". Valid kinds are {1}.'
+                             ''.format(kind, self._kinds))
+
+
+class LazyAssetDict(dict):
+    """
+    dict of pulse objects that only knows the names of the stored objects initially. Objects are
+    loaded by calling loader(name) on first access. If the loader returns None, the name is removed
+    from the dict.
+    """
+    _not_loaded = object()
+
+    def __init__(self, loader, names=None):
+        super().__init__()
+        self._loader = loader
+        if names is not None:
+            for name in names:
+                super().__setitem__(name, self._not_loaded)
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if value is self._not_loaded:
+            value = self._loader(key)
+            if value is None:
+                super().pop(key, None)
+                raise KeyError(key)
+            super().__setitem__(key, value)
+        return value
+
+    def __iter__(self):
+        # Overriding __iter__ (and keys) makes dict(...) and dict.update(...) use __getitem__
+        # instead of copying the internal placeholders
+        return iter(list(super().keys()))
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, list(self))
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *args):
+        try:
+            value = self[key]
+        except KeyError:
+            if args:
+                return args[0]
+            raise
+        super().pop(key)
+        return value
+
+    def keys(self):
+        # dict(...) and dict.update(...) call keys() before __getitem__. Loading all objects here
+        # drops the names the loader can not provide instead of raising a KeyError.
+        return [key for key, _ in self.items()]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def items(self):
+        items = list()
+        for key in list(super().keys()):
+            try:
+                items.append((key, self[key]))
+            except KeyError:
+                pass
+        return items
+
+    def copy(self):
+        return dict(self.items())
+
+    def is_loaded(self, key):
+        """ Check if the object "key" has already been loaded """
+        return super().get(key, self._not_loaded) is not self._not_loaded
+
+    def loaded_names(self):
+        """ Names of all objects that have been loaded or added already """
+        return [key for key in list(super().keys()) if self.is_loaded(key)]
@@ -24,8 +24,6 @@ import sys
 import inspect
 import importlib
 
-from qudi.util.helpers import natural_sort, iter_modules_recursive
-
 
 class PulseAnalyzerBase:
     """
@@ -76,6 +74,14 @@ class PulseAnalyzer(PulseAnalyzerBase):
     7) Make sure that no two analysis methods in any module share a keyword argument of different
        default data type.
     8) The keyword "method" must not be used in the analysis method parameters
+    9) Optionally, an analysis method "analyse_<name>" can support running sums by providing
+       "window_sums_<name>(laser_data, **kwargs)" and
+       "signal_from_window_sums_<name>(window_sums, number_of_bins, **kwargs)" with the same
+       keyword arguments. window_sums_<name> must be linear in laser_data, i.e. the window sums of
+       accumulated laser data are the sum of the window sums of its parts.
+       signal_from_window_sums_<name> must return the same as analyse_<name> for laser data with
+       <number_of_bins> time bins. This enables incremental analysis of the counts accumulated
+       since the last analysis run.
 
     See BasicPulseAnalyzer class for an example usage.
     """
@@ -86,11 +92,17 @@ class PulseAnalyzer(PulseAnalyzerBase):
 
         # Dictionary holding references to all analysis methods
         self._analysis_methods = dict()
+        # Dictionary holding references to window sum methods (see rule 9 above)
+        self._window_sum_methods = dict()
         # dictionary containing all possible parameters that can be used by the analysis methods
         self._parameters = dict()
         # Currently selected analysis method
         self._current_analysis_method = None
 
+        # qudi-core helpers are only needed to collect the analyzer classes. Importing them here
+        # keeps PulseAnalyzerBase and the analyzer modules importable on their own.
+        from qudi.util.helpers import natural_sort, iter_modules_recursive
+
         # import analysis modules from default namespace package
         # "qudi.logic.pulsed.pulsed_analysis_methods"
         try:
@@ -234,6 +246,48 @@ class PulseAnalyzer(PulseAnalyzerBase):
         kwargs = self._get_analysis_method_kwargs(analysis_method)
         return analysis_method(laser_data=laser_data, **kwargs)
 
+    @property
+    def supports_window_sums(self):
+        """
+        Flag indicating if the currently selected analysis method supports running sums.
+
+        @return bool: True if get_window_sums and analyse_window_sums can be used
+        """
+        return self._current_analysis_method in self._window_sum_methods
+
+    def get_window_sums(self, laser_data):
+        """
+        Calculate the window sums of laser_data for the currently selected analysis method. Window
+        sums of several parts of the laser data can be added up.
+
+        @param numpy.ndarray laser_data: 2D numpy array (dtype='int64') containing the timetraces
+                                         for all extracted laser pulses.
+        @return numpy.ndarray: window sums or None if not supported by the analysis method
+        """
+        methods = self._window_sum_methods.get(self._current_analysis_method)
+        if methods is None:
+            return None
+        kwargs = self._get_analysis_method_kwargs(
+            self._analysis_methods[self._current_analysis_method]
+        )
+        return methods[0](laser_data, **kwargs)
+
+    def analyse_window_sums(self, window_sums, number_of_bins):
+        """
+        Evaluate the signal from window sums (see get_window_sums) with the currently selected
+        analysis method.
+
+        @param numpy.ndarray window_sums: window sums as returned by get_window_sums
+        @param int number_of_bins: number of time bins of the laser pulses
+        @return (numpy.ndarray, numpy.ndarray): signal data and measurement error as returned by
+                                                analyse_laser_pulses
+        """
+        methods = self._window_sum_methods[self._current_analysis_method]
+        kwargs = self._get_analysis_method_kwargs(
+            self._analysis_methods[self._current_analysis_method]
+        )
+        return methods[1](window_sums, number_of_bins, **kwargs)
+
     def _get_analysis_method_kwargs(self, method):
         """
         Get the proper values for keyword arguments other than "laser_data" for <method>.
@@ -297,10 +351,16 @@ class PulseAnalyzer(PulseAnalyzerBase):
         @param list instance_list: List containing instances of analyzer classes
         """
         self._analysis_methods = dict()
+        self._window_sum_methods = dict()
         for instance in instance_list:
             for method_name, method_ref in inspect.getmembers(instance, inspect.ismethod):
                 if method_name.startswith('analyse_'):
-                    self._analysis_methods[method_name[8:]] = method_ref
+                    name = method_name[8:]
+                    self._analysis_methods[name] = method_ref
+                    sums_method = getattr(instance, 'window_sums_' + name, None)
+                    signal_method = getattr(instance, 'signal_from_window_sums_' + name, None)
+                    if callable(sums_method) and callable(signal_method):
+                        self._window_sum_methods[name] = (sums_method, signal_method)
         return
 
     def __populate_parameter_dict(self):
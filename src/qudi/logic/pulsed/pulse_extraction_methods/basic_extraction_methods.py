@@ -25,6 +25,47 @@ from scipy import ndimage
 from qudi.logic.pulsed.pulse_extractor import PulseExtractorBase
 
 
+class _BlockedExtremumSearch:
+    """ Helper to repeatedly search the global maximum/minimum of a 1D array while parts of the
+    array are set to zero between searches.
+
+    Maxima and minima of fixed size blocks are cached, so each search only needs to scan the block
+    extrema and a single block instead of the whole array. Results (including the first index
+    rule for ties) are identical to numpy.argmax/numpy.argmin of the modified array.
+    """
+    def __init__(self, arr, block_size=4096):
+        self.arr = arr
+        self._block_size = block_size
+        block_count = -(-arr.size // block_size)
+        padded = np.empty(block_count * block_size, dtype=arr.dtype)
+        padded[:arr.size] = arr
+        padded[arr.size:] = -np.inf
+        self._block_max = padded.reshape(block_count, block_size).max(axis=1)
+        padded[arr.size:] = np.inf
+        self._block_min = padded.reshape(block_count, block_size).min(axis=1)
+
+    def argmax(self):
+        start = int(np.argmax(self._block_max)) * self._block_size
+        return start + int(np.argmax(self.arr[start:start + self._block_size]))
+
+    def argmin(self):
+        start = int(np.argmin(self._block_min)) * self._block_size
+        return start + int(np.argmin(self.arr[start:start + self._block_size]))
+
+    def set_zero(self, start, stop):
+        """ Set self.arr[start:stop] to zero and update the affected block extrema """
+        self.arr[start:stop] = 0
+        start, stop, _ = slice(start, stop).indices(self.arr.size)
+        if start >= stop:
+            return
+        first_block = start // self._block_size
+        last_block = (stop - 1) // self._block_size
+        for block in range(first_block, last_block + 1):
+            block_data = self.arr[block * self._block_size:(block + 1) * self._block_size]
+            self._block_max[block] = block_data.max()
+            self._block_min[block] = block_data.min()
+
+
 class BasicPulseExtractor(PulseExtractorBase):
     """
 
@@ -77,6 +118,11 @@ class BasicPulseExtractor(PulseExtractorBase):
         else:
             # slice the data array to cut off anything but laser pulses
             laser_arr = count_data[:, rising_ind:falling_ind]
+            # flat indices into count_data (used by PulseExtractor to cache the geometry)
+            return_dict['laser_source_indices'] = (
+                    np.arange(count_data.shape[0])[:, np.newaxis] * count_data.shape[1] +
+                    np.arange(rising_ind, falling_ind)
+            )
 
         return_dict['laser_counts_arr'] = laser_arr.astype('int64')
         return_dict['laser_indices_rising'] = rising_ind
@@ -166,12 +212,16 @@ class BasicPulseExtractor(PulseExtractorBase):
         rising_ind = np.empty(number_of_lasers, dtype='int64')
         falling_ind = np.empty(number_of_lasers, dtype='int64')
 
+        # Global maximum/minimum search with cached block extrema. Avoids scanning the whole
+        # derived time trace for each flank.
+        deriv_search = _BlockedExtremumSearch(conv_deriv)
+
         # Find as many rising and falling flanks as there are laser pulses in
         # the trace:
         for i in range(number_of_lasers):
             # save the index of the absolute maximum of the derived time trace
             # as rising edge position
-            rising_ind[i] = np.argmax(conv_deriv)
+            rising_ind[i] = deriv_search.argmax()
 
             # refine the rising edge detection, by using a small and fixed
             # conv_std_dev parameter to find the inflection point more precise
@@ -198,11 +248,11 @@ class BasicPulseExtractor(PulseExtractorBase):
                 del_ind_stop = conv_deriv.size - 1
             else:
                 del_ind_stop = rising_ind[i] + int(2 * conv_std_dev)
-                conv_deriv[del_ind_start:del_ind_stop] = 0
+                deriv_search.set_zero(del_ind_start, del_ind_stop)
 
             # save the index of the absolute minimum of the derived time trace
             # as falling edge position
-            falling_ind[i] = np.argmin(conv_deriv)
+            falling_ind[i] = deriv_search.argmin()
 
             # refine the falling edge detection, by using a small and fixed
             # conv_std_dev parameter to find the inflection point more precise
@@ -229,7 +279,7 @@ class BasicPulseExtractor(PulseExtractorBase):
                 del_ind_stop = conv_deriv.size - 1
             else:
                 del_ind_stop = falling_ind[i] + int(2 * conv_std_dev)
-            conv_deriv[del_ind_start:del_ind_stop] = 0
+            deriv_search.set_zero(del_ind_start, del_ind_stop)
 
         # sort all indices of rising and falling flanks
         rising_ind.sort()
@@ -240,14 +290,13 @@ class BasicPulseExtractor(PulseExtractorBase):
 
         # initialize the empty output array
         laser_arr = np.zeros((number_of_lasers, laser_length), dtype='int64')
-        # slice the detected laser pulses of the timetrace and save them in the
-        # output array according to the found rising edge
-        for i in range(number_of_lasers):
-            if rising_ind[i] + laser_length > count_data.size:
-                lenarr = count_data[rising_ind[i]:].size
-                laser_arr[i, 0:lenarr] = count_data[rising_ind[i]:]
-            else:
-                laser_arr[i] = count_data[rising_ind[i]:rising_ind[i] + laser_length]
+        # gather the detected laser pulses of the timetrace into the output array according to the
+        # found rising edge. Pulses exceeding the end of the timetrace are padded with zeros.
+        gather_ind = rising_ind[:, np.newaxis] + np.arange(laser_length)
+        valid = gather_ind < count_data.size
+        laser_arr[valid] = count_data[gather_ind[valid]]
+        gather_ind[~valid] = -1
+        return_dict['laser_source_indices'] = gather_ind
 
         return_dict['laser_counts_arr'] = laser_arr.astype('int64')
         return_dict['laser_indices_rising'] = rising_ind
@@ -300,35 +349,40 @@ class BasicPulseExtractor(PulseExtractorBase):
         # get all bin indices with counts > threshold value
         bigger_indices = np.where(count_data >= count_threshold)[0]
 
-        # get all indices with consecutive numbering (bin chains not interrupted by
-        # values < threshold
-        index_list = np.split(bigger_indices,
-                              np.where(np.diff(bigger_indices) >= threshold_tolerance)[0] + 1)
-        for i, index_group in enumerate(index_list):
-            if index_group.size > 0:
-                start, end = index_list[i][0], index_list[i][-1]
-                index_list[i] = np.arange(start, end + 1)
-        consecutive_indices_unfiltered = index_list
+        # get start and end indices of all consecutive bin chains (chains not interrupted by
+        # values < threshold for threshold_tolerance bins or more)
+        breaks = np.where(np.diff(bigger_indices) >= threshold_tolerance)[0] + 1
+        if bigger_indices.size > 0:
+            group_starts = bigger_indices[np.concatenate(([0], breaks))]
+            group_ends = bigger_indices[np.concatenate((breaks - 1, [-1]))]
+        else:
+            group_starts = group_ends = bigger_indices
+        group_lengths = group_ends - group_starts + 1
 
         # sort out all groups shorter than minimum laser length
-        consecutive_indices = [item for item in consecutive_indices_unfiltered if
-                               len(item) > min_laser_length]
+        keep = group_lengths > min_laser_length
+        group_starts = group_starts[keep]
+        group_ends = group_ends[keep]
+        group_lengths = group_lengths[keep]
 
         # Check if the number of lasers matches the number of remaining index groups
-        if number_of_lasers != len(consecutive_indices):
+        if number_of_lasers != group_starts.size:
             return return_dict
 
         # determine max length of laser pulse and initialize laser array
-        max_laser_length = max([index_array.size for index_array in consecutive_indices])
-        return_dict['laser_counts_arr'] = np.zeros((number_of_lasers, max_laser_length),
-                                                   dtype='int64')
+        max_laser_length = group_lengths.max()
+        laser_arr = np.zeros((number_of_lasers, max_laser_length), dtype='int64')
 
-        # fill laser array with slices of raw data array. Also populate the rising/falling index
+        # gather slices of raw data array into laser array. Also populate the rising/falling index
         # arrays
-        for i, index_group in enumerate(consecutive_indices):
-            return_dict['laser_indices_rising'][i] = index_group[0]
-            return_dict['laser_indices_falling'][i] = index_group[-1]
-            return_dict['laser_counts_arr'][i, :index_group.size] = count_data[index_group]
+        bin_offsets = np.arange(max_laser_length)
+        valid = bin_offsets < group_lengths[:, np.newaxis]
+        gather_ind = np.where(valid, group_starts[:, np.newaxis] + bin_offsets, -1)
+        laser_arr[valid] = count_data[gather_ind[valid]]
+        return_dict['laser_source_indices'] = gather_ind
+        return_dict['laser_counts_arr'] = laser_arr
+        return_dict['laser_indices_rising'][:] = group_starts
+        return_dict['laser_indices_falling'][:] = group_ends
 
         return return_dict
 
@@ -382,13 +436,21 @@ class BasicPulseExtractor(PulseExtractorBase):
         num_col = max_laser_length + 2 * safety_bins
         # compute from laser_start_indices and laser length the respective position of the laser
         # pulses
-        laser_pulses = np.empty((num_rows, num_col))
-        for ii in range(num_rows):
-            laser_pulses[ii][:] = count_data[
-                np.arange(laser_rising_bins[ii] + delay_bins - safety_bins,
-                          laser_rising_bins[ii] + delay_bins + safety_bins + max_laser_length)]
+        pulse_indices = (laser_rising_bins[:, np.newaxis] + (delay_bins - safety_bins) +
+                         np.arange(num_col))
+        # pad bins outside of the timetrace with zeros and mark them with index -1, as the
+        # cached extraction in PulseExtractor does
+        outside = (pulse_indices < 0) | (pulse_indices >= count_data.size)
+        pulse_indices[outside] = -1
+        laser_pulses = np.zeros(pulse_indices.shape, dtype=float)
+        laser_pulses[~outside] = count_data[pulse_indices[~outside]]
         # use the gated extraction method
         return_dict = self.gated_conv_deriv(laser_pulses, conv_std_dev)
+        # translate flat indices into laser_pulses into indices into count_data
+        if 'laser_source_indices' in return_dict:
+            return_dict['laser_source_indices'] = pulse_indices.ravel()[
+                return_dict['laser_source_indices']
+            ]
         return return_dict
 
     def ungated_pass_through(self, count_data):
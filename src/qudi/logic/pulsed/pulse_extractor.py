@@ -21,12 +21,31 @@ If not, see <https://www.gnu.org/licenses/>.
 
 import os
 import sys
+import time
 import inspect
 import importlib
+import numpy as np
 
 from qudi.util.helpers import natural_sort, iter_modules_recursive
 
 
+def _hashable(obj):
+    """ Helper to convert (nested) settings containers into a hashable representation used as
+    extraction cache key.
+    """
+    if isinstance(obj, dict):
+        return tuple(sorted((str(k), _hashable(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return tuple(_hashable(v) for v in obj)
+    if isinstance(obj, np.ndarray):
+        return obj.shape, obj.dtype.str, hash(obj.tobytes())
+    try:
+        hash(obj)
+    except TypeError:
+        return repr(obj)
+    return obj
+
+
 class PulseExtractorBase:
     """
     All extractor classes to import from must inherit exclusively from this base class.
@@ -77,13 +96,36 @@ class PulseExtractor(PulseExtractorBase):
        default data type.
     8) The keyword "method" must not be used in the extraction method parameters
 
+    Extraction methods can optionally return the key "laser_source_indices" in their result
+    dictionary. It must hold an integer array of the same shape as "laser_counts_arr" containing
+    the flat index into count_data for each element (-1 for zero padding). This enables caching of
+    the extraction geometry: As long as the pulse sequence, fast counter settings and extraction
+    settings do not change, the laser pulses are simply gathered from count_data using the cached
+    indices instead of running the full extraction method again. The cache is only used after two
+    consecutive extraction runs yielded the same geometry (flank positions within
+    _stability_tolerance bins) and is optionally re-validated periodically.
+
     See BasicPulseExtractor class for an example usage.
     """
+    # Maximum deviation of flank positions in bins between two extraction runs to consider the
+    # extraction geometry as stable
+    _stability_tolerance = 1
 
     def __init__(self, pulsedmeasurementlogic):
         # Init base class
         super().__init__(pulsedmeasurementlogic)
 
+        # Extraction geometry cache
+        self._cache_enabled = bool(pulsedmeasurementlogic.extraction_cache_enabled)
+        self._revalidation_interval = pulsedmeasurementlogic.extraction_revalidation_interval
+        self._cache_key = None
+        self._cache_candidate = None
+        self._cache = None
+        self._cache_shape = None
+        self._cache_validation_time = 0
+        # Incremented whenever the cached extraction geometry changes
+        self._cache_generation = 0
+
         # Dictionaries holding references to the extraction methods
         self._gated_extraction_methods = dict()
         self._ungated_extraction_methods = dict()
@@ -244,12 +286,151 @@ class PulseExtractor(PulseExtractorBase):
             self.log.error('"is_gated" flag is set to True but the count data to extract laser '
                            'pulses from is in the format of an ungated timetrace (1D numpy array).')
 
+        extraction_method = self._get_current_extraction_method()
+        kwargs = self._get_extraction_method_kwargs(extraction_method)
+        if not self._cache_enabled:
+            return_dict = extraction_method(count_data=count_data, **kwargs)
+            return_dict.pop('laser_source_indices', None)
+            return return_dict
+
+        # Use cached extraction geometry if nothing has changed
+        cache_key = self._get_cache_key(count_data, kwargs)
+        if cache_key != self._cache_key:
+            self.invalidate_cache()
+            self._cache_key = cache_key
+        elif self._cache is not None and not self._revalidation_due():
+            return self._gather_from_cache(count_data)
+
+        return_dict = extraction_method(count_data=count_data, **kwargs)
+        self._update_cache(return_dict)
+        return return_dict
+
+    def invalidate_cache(self):
+        """ Discard the cached extraction geometry. The laser pulses are detected again by the next
+        call to extract_laser_pulses.
+        """
+        self._cache_key = None
+        self._cache_candidate = None
+        self._set_cache(None)
+
+    @property
+    def cache_generation(self):
+        """
+        Counter incremented whenever the cached extraction geometry changes or is discarded.
+        Laser pulses gathered with the same cache generation share the same geometry.
+
+        @return int: cache generation
+        """
+        return self._cache_generation
+
+    def is_cache_valid(self, count_data):
+        """
+        Check if the cached extraction geometry can be used for count_data, i.e. if
+        extract_laser_pulses would gather the laser pulses from the cache.
+
+        @param numpy.ndarray count_data: 1D (ungated) or 2D (gated) numpy array
+        @return bool: True if gather_laser_pulses is up-to-date for count_data
+        """
+        if not self._cache_enabled or self._cache is None:
+            return False
+        kwargs = self._get_extraction_method_kwargs(self._get_current_extraction_method())
+        return self._get_cache_key(count_data, kwargs) == self._cache_key and \
+            not self._revalidation_due()
+
+    def gather_laser_pulses(self, count_data):
+        """
+        Extract laser pulses from count_data using the cached extraction geometry without running
+        any flank detection. Useful to extract laser pulses from partial data (e.g. the counts
+        accumulated since the last analysis run) with the geometry found in the full data.
+
+        @param numpy.ndarray count_data: 1D (ungated) or 2D (gated) numpy array of the same shape
+                                         as the data used to build the cache.
+        @return numpy.ndarray: laser pulse array or None if no valid geometry is cached
+        """
+        if self._cache is None or self._cache_key is None or \
+                self._cache_key[2] != count_data.shape:
+            return None
+        return self._gather_from_cache(count_data)['laser_counts_arr']
+
+    def _get_current_extraction_method(self):
         if self.is_gated:
-            extraction_method = self._gated_extraction_methods[self._current_extraction_method]
+            return self._gated_extraction_methods[self._current_extraction_method]
+        return self._ungated_extraction_methods[self._current_extraction_method]
+
+    def _set_cache(self, cache):
+        self._cache = cache
+        self._cache_generation += 1
+
+    def _get_cache_key(self, count_data, kwargs):
+        return (self.is_gated,
+                self._current_extraction_method,
+                count_data.shape,
+                _hashable(kwargs),
+                _hashable(self.fast_counter_settings),
+                _hashable(self.measurement_settings.get('number_of_lasers')),
+                _hashable(self.sampling_information))
+
+    def _revalidation_due(self):
+        interval = self._revalidation_interval
+        if not interval or interval <= 0:
+            return False
+        return (time.monotonic() - self._cache_validation_time) >= interval
+
+    def _update_cache(self, return_dict):
+        """ Update the extraction geometry cache from the result of a full extraction run.
+        The geometry is only cached if two consecutive runs yield the same geometry.
+        """
+        source_indices = return_dict.pop('laser_source_indices', None)
+        if source_indices is None:
+            self._cache_candidate = None
+            self._set_cache(None)
+            return
+        rising = np.array(return_dict['laser_indices_rising'], copy=True)
+        falling = np.array(return_dict['laser_indices_falling'], copy=True)
+        if self._is_stable_geometry(self._cache_candidate, (source_indices, rising, falling)):
+            if self._cache is None:
+                self.log.debug('Laser pulse extraction geometry is stable. Using cached geometry '
+                               'until settings change.')
+            valid = source_indices >= 0
+            if valid.all():
+                self._set_cache((source_indices, None, rising, falling))
+            else:
+                self._set_cache((source_indices[valid], np.flatnonzero(valid), rising, falling))
+            self._cache_shape = source_indices.shape
+            self._cache_validation_time = time.monotonic()
         else:
-            extraction_method = self._ungated_extraction_methods[self._current_extraction_method]
-        kwargs = self._get_extraction_method_kwargs(extraction_method)
-        return extraction_method(count_data=count_data, **kwargs)
+            if self._cache is not None:
+                self.log.debug('Laser pulse extraction geometry changed during re-validation.')
+            self._set_cache(None)
+        self._cache_candidate = (source_indices, rising, falling)
+
+    def _is_stable_geometry(self, previous, current):
+        """ Check if two extraction geometries (source indices, rising indices, falling indices)
+        agree. Flank positions may jitter by <_stability_tolerance> bins due to count noise.
+        """
+        if previous is None or previous[0].shape != current[0].shape:
+            return False
+        for prev_ind, curr_ind in zip(previous[1:], current[1:]):
+            prev_ind = np.asarray(prev_ind)
+            curr_ind = np.asarray(curr_ind)
+            if prev_ind.shape != curr_ind.shape:
+                return False
+            if prev_ind.size > 0 and np.max(np.abs(prev_ind - curr_ind)) > self._stability_tolerance:
+                return False
+        return True
+
+    def _gather_from_cache(self, count_data):
+        """ Extract laser pulses from count_data using the cached extraction geometry """
+        source_indices, target_indices, rising, falling = self._cache
+        flat_data = count_data.ravel()
+        if target_indices is None:
+            laser_arr = flat_data.take(source_indices).astype('int64', copy=False)
+        else:
+            laser_arr = np.zeros(self._cache_shape, dtype='int64')
+            laser_arr.ravel()[target_indices] = flat_data.take(source_indices)
+        return {'laser_counts_arr'     : laser_arr,
+                'laser_indices_rising' : rising.copy(),
+                'laser_indices_falling': falling.copy()}
 
     def _get_extraction_method_kwargs(self, method):
         """
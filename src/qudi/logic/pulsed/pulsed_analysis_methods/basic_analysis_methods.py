@@ -24,6 +24,22 @@ import numpy as np
 from qudi.logic.pulsed.pulse_analyzer import PulseAnalyzerBase
 
 
+def _window_length(number_of_bins, start_bin, end_bin):
+    """ Number of bins within the window [start_bin:end_bin] of a laser pulse with number_of_bins
+    bins. The window is applied with python slicing rules.
+    """
+    return len(range(number_of_bins)[start_bin:end_bin])
+
+
+def _window_mean(window_sum, window_length):
+    """ Mean of all laser pulses within a window from the window sums. The mean of an empty window
+    is 0.
+    """
+    if window_length > 0:
+        return window_sum / window_length
+    return np.zeros(window_sum.shape[0], dtype=float)
+
+
 class BasicPulseAnalyzer(PulseAnalyzerBase):
     """
 
@@ -31,6 +47,31 @@ class BasicPulseAnalyzer(PulseAnalyzerBase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+    def _get_window_bins(self, *window_times):
+        """ Convert window borders in seconds to bins (i.e. array indices).
+
+        @return list: window borders in bins or None if the counter bin width is not known
+        """
+        bin_width = self.fast_counter_settings.get('bin_width')
+        if not isinstance(bin_width, float):
+            return None
+        return [round(t / bin_width) for t in window_times]
+
+    def _get_window_sums(self, laser_data, *window_times):
+        """ Sum of all laser pulses within each window [start, end) at once.
+
+        @param 2D numpy.ndarray laser_data: dim 0: gate number; dim 1: time bin
+        @param float window_times: start and end of each window in s
+
+        @return 2D numpy.ndarray: dim 0: gate number; dim 1: window
+        """
+        window_bins = self._get_window_bins(*window_times)
+        window_count = len(window_times) // 2
+        if window_bins is None:
+            return np.zeros((laser_data.shape[0], window_count), dtype=laser_data.dtype)
+        return np.stack([laser_data[:, window_bins[2 * ii]:window_bins[2 * ii + 1]].sum(axis=1)
+                         for ii in range(window_count)], axis=1)
+
     def analyse_mean_norm(self, laser_data, signal_start=0.0, signal_end=200e-9, norm_start=300e-9,
                           norm_end=500e-9):
         """
@@ -42,48 +83,50 @@ class BasicPulseAnalyzer(PulseAnalyzerBase):
         @param norm_end:
         @return:
         """
+        window_sums = self.window_sums_mean_norm(laser_data, signal_start, signal_end, norm_start,
+                                                 norm_end)
+        return self.signal_from_window_sums_mean_norm(window_sums, laser_data.shape[1],
+                                                      signal_start, signal_end, norm_start,
+                                                      norm_end)
+
+    def window_sums_mean_norm(self, laser_data, signal_start=0.0, signal_end=200e-9,
+                              norm_start=300e-9, norm_end=500e-9):
+        """ Additive window sums of analyse_mean_norm (see PulseAnalyzer) """
+        return self._get_window_sums(laser_data, signal_start, signal_end, norm_start, norm_end)
+
+    def signal_from_window_sums_mean_norm(self, window_sums, number_of_bins, signal_start=0.0,
+                                          signal_end=200e-9, norm_start=300e-9, norm_end=500e-9):
+        """ Result of analyse_mean_norm from its window sums (see PulseAnalyzer) """
         # Get number of lasers
-        num_of_lasers = laser_data.shape[0]
-        # Get counter bin width
-        bin_width = self.fast_counter_settings.get('bin_width')
-
-        if not isinstance(bin_width, float):
-            return np.zeros(num_of_lasers), np.zeros(num_of_lasers)
-
+        num_of_lasers = window_sums.shape[0]
         # Convert the times in seconds to bins (i.e. array indices)
-        signal_start_bin = round(signal_start / bin_width)
-        signal_end_bin = round(signal_end / bin_width)
-        norm_start_bin = round(norm_start / bin_width)
-        norm_end_bin = round(norm_end / bin_width)
-
-        # initialize data arrays for signal and measurement error
-        signal_data = np.empty(num_of_lasers, dtype=float)
-        error_data = np.empty(num_of_lasers, dtype=float)
-
-        # loop over all laser pulses and analyze them
-        for ii, laser_arr in enumerate(laser_data):
-            # calculate the sum and mean of the data in the normalization window
-            tmp_data = laser_arr[norm_start_bin:norm_end_bin]
-            reference_sum = np.sum(tmp_data)
-            reference_mean = (reference_sum / len(tmp_data)) if len(tmp_data) != 0 else 0.0
-
-            # calculate the sum and mean of the data in the signal window
-            tmp_data = laser_arr[signal_start_bin:signal_end_bin]
-            signal_sum = np.sum(tmp_data)
-            signal_mean = (signal_sum / len(tmp_data)) if len(tmp_data) != 0 else 0.0
-
-            # Calculate normalized signal while avoiding division by zero
-            if reference_mean > 0 and signal_mean >= 0:
-                signal_data[ii] = signal_mean / reference_mean
-            else:
-                signal_data[ii] = 0.0
-
-            # Calculate measurement error while avoiding division by zero
-            if reference_sum > 0 and signal_sum > 0:
-                # calculate with respect to gaussian error 'evolution'
-                error_data[ii] = signal_data[ii] * np.sqrt(1 / signal_sum + 1 / reference_sum)
-            else:
-                error_data[ii] = 0.0
+        window_bins = self._get_window_bins(signal_start, signal_end, norm_start, norm_end)
+        if window_bins is None:
+            return np.zeros(num_of_lasers), np.zeros(num_of_lasers)
+        signal_start_bin, signal_end_bin, norm_start_bin, norm_end_bin = window_bins
+
+        # calculate the mean of the data in the normalization and signal window for all laser
+        # pulses at once
+        signal_sum = window_sums[:, 0]
+        reference_sum = window_sums[:, 1]
+        signal_mean = _window_mean(
+            signal_sum, _window_length(number_of_bins, signal_start_bin, signal_end_bin)
+        )
+        reference_mean = _window_mean(
+            reference_sum, _window_length(number_of_bins, norm_start_bin, norm_end_bin)
+        )
+
+        # Calculate normalized signal while avoiding division by zero
+        signal_data = np.zeros(num_of_lasers, dtype=float)
+        valid = (reference_mean > 0) & (signal_mean >= 0)
+        np.divide(signal_mean, reference_mean, out=signal_data, where=valid)
+
+        # Calculate measurement error while avoiding division by zero
+        # (with respect to gaussian error 'evolution')
+        error_data = np.zeros(num_of_lasers, dtype=float)
+        valid = (reference_sum > 0) & (signal_sum > 0)
+        error_data[valid] = signal_data[valid] * np.sqrt(1 / signal_sum[valid] +
+                                                         1 / reference_sum[valid])
 
         return signal_data, error_data
 
@@ -94,35 +137,28 @@ class BasicPulseAnalyzer(PulseAnalyzerBase):
         @param signal_end:
         @return:
         """
-        # Get number of lasers
-        num_of_lasers = laser_data.shape[0]
-        # Get counter bin width
-        bin_width = self.fast_counter_settings.get('bin_width')
+        window_sums = self.window_sums_sum(laser_data, signal_start, signal_end)
+        return self.signal_from_window_sums_sum(window_sums, laser_data.shape[1], signal_start,
+                                                signal_end)
 
-        if not isinstance(bin_width, float):
+    def window_sums_sum(self, laser_data, signal_start=0.0, signal_end=200e-9):
+        """ Additive window sums of analyse_sum (see PulseAnalyzer) """
+        return self._get_window_sums(laser_data, signal_start, signal_end)
+
+    def signal_from_window_sums_sum(self, window_sums, number_of_bins, signal_start=0.0,
+                                    signal_end=200e-9):
+        """ Result of analyse_sum from its window sums (see PulseAnalyzer) """
+        # Get number of lasers
+        num_of_lasers = window_sums.shape[0]
+        if self._get_window_bins(signal_start, signal_end) is None:
             return np.zeros(num_of_lasers), np.zeros(num_of_lasers)
 
-        # Convert the times in seconds to bins (i.e. array indices)
-        signal_start_bin = round(signal_start / bin_width)
-        signal_end_bin = round(signal_end / bin_width)
-
-        # initialize data arrays for signal and measurement error
-        signal_data = np.empty(num_of_lasers, dtype=float)
-        error_data = np.empty(num_of_lasers, dtype=float)
-
-        # loop over all laser pulses and analyze them
-        for ii, laser_arr in enumerate(laser_data):
-            # calculate the sum of the data in the signal window
-            signal = laser_arr[signal_start_bin:signal_end_bin].sum()
-            signal_error = np.sqrt(signal)
-
-            # Avoid numpy C type variables overflow and NaN values
-            if signal < 0 or signal != signal:
-                signal_data[ii] = 0.0
-                error_data[ii] = 0.0
-            else:
-                signal_data[ii] = signal
-                error_data[ii] = signal_error
+        # Avoid numpy C type variables overflow and NaN values
+        signal = window_sums[:, 0]
+        signal_data = np.zeros(num_of_lasers, dtype=float)
+        valid = signal >= 0
+        signal_data[valid] = signal[valid]
+        error_data = np.sqrt(signal_data)
 
         return signal_data, error_data
 
@@ -134,36 +170,40 @@ class BasicPulseAnalyzer(PulseAnalyzerBase):
         @param signal_end:
         @return:
         """
-        # Get number of lasers
-        num_of_lasers = laser_data.shape[0]
-        # Get counter bin width
-        bin_width = self.fast_counter_settings.get('bin_width')
+        window_sums = self.window_sums_mean(laser_data, signal_start, signal_end)
+        return self.signal_from_window_sums_mean(window_sums, laser_data.shape[1], signal_start,
+                                                 signal_end)
 
-        if not isinstance(bin_width, float):
-            return np.zeros(num_of_lasers), np.zeros(num_of_lasers)
+    def window_sums_mean(self, laser_data, signal_start=0.0, signal_end=200e-9):
+        """ Additive window sums of analyse_mean (see PulseAnalyzer) """
+        return self._get_window_sums(laser_data, signal_start, signal_end)
 
+    def signal_from_window_sums_mean(self, window_sums, number_of_bins, signal_start=0.0,
+                                     signal_end=200e-9):
+        """ Result of analyse_mean from its window sums (see PulseAnalyzer) """
+        # Get number of lasers
+        num_of_lasers = window_sums.shape[0]
         # Convert the times in seconds to bins (i.e. array indices)
-        signal_start_bin = round(signal_start / bin_width)
-        signal_end_bin = round(signal_end / bin_width)
+        window_bins = self._get_window_bins(signal_start, signal_end)
+        if window_bins is None:
+            return np.zeros(num_of_lasers), np.zeros(num_of_lasers)
+        signal_start_bin, signal_end_bin = window_bins
 
         # initialize data arrays for signal and measurement error
-        signal_data = np.empty(num_of_lasers, dtype=float)
-        error_data = np.empty(num_of_lasers, dtype=float)
-
-        # loop over all laser pulses and analyze them
-        for ii, laser_arr in enumerate(laser_data):
-            # calculate the mean of the data in the signal window
-            signal = laser_arr[signal_start_bin:signal_end_bin].mean()
-            signal_sum = laser_arr[signal_start_bin:signal_end_bin].sum()
-            signal_error = np.sqrt(signal_sum) / (signal_end_bin - signal_start_bin)
-
-            # Avoid numpy C type variables overflow and NaN values
-            if signal < 0 or signal != signal:
-                signal_data[ii] = 0.0
-                error_data[ii] = 0.0
-            else:
-                signal_data[ii] = signal
-                error_data[ii] = signal_error
+        signal_data = np.zeros(num_of_lasers, dtype=float)
+        error_data = np.zeros(num_of_lasers, dtype=float)
+
+        # The mean of an empty window is not defined
+        window_length = _window_length(number_of_bins, signal_start_bin, signal_end_bin)
+        if window_length == 0:
+            return signal_data, error_data
+
+        # Avoid numpy C type variables overflow and NaN values
+        signal_sum = window_sums[:, 0]
+        signal = signal_sum / window_length
+        valid = signal >= 0
+        signal_data[valid] = signal[valid]
+        error_data[valid] = np.sqrt(signal_sum[valid]) / (signal_end_bin - signal_start_bin)
 
         return signal_data, error_data
 
@@ -200,39 +240,44 @@ class BasicPulseAnalyzer(PulseAnalyzerBase):
 
         @return numpy.ndarray, numpy.ndarray: analyzed data per laser pulse, error per laser pulse
         """
+        window_sums = self.window_sums_mean_reference(laser_data, signal_start, signal_end,
+                                                      norm_start, norm_end)
+        return self.signal_from_window_sums_mean_reference(window_sums, laser_data.shape[1],
+                                                           signal_start, signal_end, norm_start,
+                                                           norm_end)
+
+    def window_sums_mean_reference(self, laser_data, signal_start=0.0, signal_end=200e-9,
+                                   norm_start=300e-9, norm_end=500e-9):
+        """ Additive window sums of analyse_mean_reference (see PulseAnalyzer) """
+        return self._get_window_sums(laser_data, signal_start, signal_end, norm_start, norm_end)
+
+    def signal_from_window_sums_mean_reference(self, window_sums, number_of_bins, signal_start=0.0,
+                                               signal_end=200e-9, norm_start=300e-9,
+                                               norm_end=500e-9):
+        """ Result of analyse_mean_reference from its window sums (see PulseAnalyzer) """
         # Get number of lasers
-        num_of_lasers = laser_data.shape[0]
-        # Get counter bin width
-        bin_width = self.fast_counter_settings.get('bin_width')
-
-        if not isinstance(bin_width, float):
-            return np.zeros(num_of_lasers), np.zeros(num_of_lasers)
-
+        num_of_lasers = window_sums.shape[0]
         # Convert the times in seconds to bins (i.e. array indices)
-        signal_start_bin = round(signal_start / bin_width)
-        signal_end_bin = round(signal_end / bin_width)
-        norm_start_bin = round(norm_start / bin_width)
-        norm_end_bin = round(norm_end / bin_width)
-
-        # initialize data arrays for signal and measurement error
-        signal_data = np.empty(num_of_lasers, dtype=float)
-        error_data = np.empty(num_of_lasers, dtype=float)
-
-        # loop over all laser pulses and analyze them
-        for ii, laser_arr in enumerate(laser_data):
-            # calculate the sum and mean of the data in the normalization window
-            tmp_data = laser_arr[norm_start_bin:norm_end_bin]
-            reference_sum = np.sum(tmp_data)
-            reference_mean = (reference_sum / len(tmp_data)) if len(tmp_data) != 0 else 0.0
-
-            # calculate the sum and mean of the data in the signal window
-            tmp_data = laser_arr[signal_start_bin:signal_end_bin]
-            signal_sum = np.sum(tmp_data)
-            signal_mean = (signal_sum / len(tmp_data)) if len(tmp_data) != 0 else 0.0
-
-            signal_data[ii] = signal_mean - reference_mean
-
-            # calculate with respect to gaussian error 'evolution'
-            error_data[ii] = signal_data[ii] * np.sqrt(1 / abs(signal_sum) + 1 / abs(reference_sum))
+        window_bins = self._get_window_bins(signal_start, signal_end, norm_start, norm_end)
+        if window_bins is None:
+            return np.zeros(num_of_lasers), np.zeros(num_of_lasers)
+        signal_start_bin, signal_end_bin, norm_start_bin, norm_end_bin = window_bins
+
+        # calculate the mean of the data in the normalization and signal window for all laser
+        # pulses at once
+        signal_sum = window_sums[:, 0]
+        reference_sum = window_sums[:, 1]
+        signal_mean = _window_mean(
+            signal_sum, _window_length(number_of_bins, signal_start_bin, signal_end_bin)
+        )
+        reference_mean = _window_mean(
+            reference_sum, _window_length(number_of_bins, norm_start_bin, norm_end_bin)
+        )
+
+        signal_data = np.asarray(signal_mean - reference_mean, dtype=float)
+
+        # calculate with respect to gaussian error 'evolution'
+        with np.errstate(divide='ignore', invalid='ignore'):
+            error_data = signal_data * np.sqrt(1 / np.abs(signal_sum) + 1 / np.abs(reference_sum))
 
         return signal_data, error_data
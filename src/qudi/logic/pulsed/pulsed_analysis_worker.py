@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains a worker object to run the pulsed measurement analysis in a separate thread.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from PySide2 import QtCore
+
+from qudi.util.mutex import Mutex
+
+
+class PulsedAnalysisWorker(QtCore.QObject):
+    """
+    Worker object living in its own thread that calls an analysis function for raw data snapshots
+    submitted by PulsedMeasurementLogic and publishes the results via sigAnalysisFinished.
+
+    Only the most recent snapshot is kept. Snapshots submitted while the worker is still busy
+    replace any pending snapshot, so the worker never falls behind the data acquisition.
+    """
+
+    sigAnalysisFinished = QtCore.Signal(object)
+    _sigProcessSnapshot = QtCore.Signal()
+
+    def __init__(self, analysis_function, parent=None):
+        super().__init__(parent=parent)
+        self._analysis_function = analysis_function
+        self._lock = Mutex()
+        self._pending_snapshot = None
+        self._dropped_snapshots = 0
+        self._sigProcessSnapshot.connect(self._process_snapshot, QtCore.Qt.QueuedConnection)
+
+    @property
+    def dropped_snapshots(self):
+        """ Number of snapshots discarded because a newer snapshot arrived before processing """
+        return self._dropped_snapshots
+
+    def submit(self, snapshot):
+        """
+        Hand over a new snapshot to analyze. Can be called from any thread.
+
+        @param object snapshot: Argument for the analysis function
+        """
+        with self._lock:
+            if self._pending_snapshot is not None:
+                self._dropped_snapshots += 1
+            self._pending_snapshot = snapshot
+        self._sigProcessSnapshot.emit()
+
+    def discard_pending(self):
+        """ Discard the pending snapshot (if any) """
+        with self._lock:
+            self._pending_snapshot = None
+
+    @QtCore.Slot()
+    def _process_snapshot(self):
+        with self._lock:
+            snapshot = self._pending_snapshot
+            self._pending_snapshot = None
+        if snapshot is None:
+            return
+        result = self._analysis_function(snapshot)
+        if result is not None:
+            self.sigAnalysisFinished.emit(result)
@@ -103,6 +103,7 @@ class PulsedMasterLogic(LogicBase):
     sigGeneratorSettingsChanged = QtCore.Signal(dict)
     sigSamplingSettingsChanged = QtCore.Signal(dict)
     sigGeneratePredefinedSequence = QtCore.Signal(str, dict)
+    sigGeneratePredefinedSequenceBatch = QtCore.Signal(str, list, bool, str)
 
     # signals for master module (i.e. GUI) coming from SequenceGeneratorLogic
     sigBlockDictUpdated = QtCore.Signal(dict)
@@ -116,6 +117,8 @@ class PulsedMasterLogic(LogicBase):
     sigGeneratorSettingsUpdated = QtCore.Signal(dict)
     sigSamplingSettingsUpdated = QtCore.Signal(dict)
     sigPredefinedSequenceGenerated = QtCore.Signal(object, bool)
+    sigPredefinedBatchGenerated = QtCore.Signal(list)
+    sigSamplingProgress = QtCore.Signal(float, float)
 
     def __init__(self, *args, **kwargs):
         """ Create PulsedMasterLogic object with connectors.
@@ -222,6 +225,9 @@ class PulsedMasterLogic(LogicBase):
             self.sequencegeneratorlogic().set_generation_parameters, QtCore.Qt.QueuedConnection)
         self.sigGeneratePredefinedSequence.connect(
             self.sequencegeneratorlogic().generate_predefined_sequence, QtCore.Qt.QueuedConnection)
+        self.sigGeneratePredefinedSequenceBatch.connect(
+            self.sequencegeneratorlogic().generate_predefined_sequence_batch,
+            QtCore.Qt.QueuedConnection)
 
         # Connect signals coming from SequenceGeneratorLogic
         self.sequencegeneratorlogic().sigBlockDictUpdated.connect(
@@ -240,6 +246,8 @@ class PulsedMasterLogic(LogicBase):
             self.sigSamplingSettingsUpdated, QtCore.Qt.QueuedConnection)
         self.sequencegeneratorlogic().sigPredefinedSequenceGenerated.connect(
             self.predefined_sequence_generated, QtCore.Qt.QueuedConnection)
+        self.sequencegeneratorlogic().sigPredefinedBatchGenerated.connect(
+            self.predefined_batch_generated, QtCore.Qt.QueuedConnection)
         self.sequencegeneratorlogic().sigSampleEnsembleComplete.connect(
             self.sample_ensemble_finished, QtCore.Qt.QueuedConnection)
         self.sequencegeneratorlogic().sigSampleSequenceComplete.connect(
@@ -248,6 +256,8 @@ class PulsedMasterLogic(LogicBase):
             self.loaded_asset_updated, QtCore.Qt.QueuedConnection)
         self.sequencegeneratorlogic().sigBenchmarkComplete.connect(
             self.benchmark_completed, QtCore.Qt.QueuedConnection)
+        self.sequencegeneratorlogic().sigSamplingProgress.connect(
+            self.sigSamplingProgress, QtCore.Qt.QueuedConnection)
 
         return
 
@@ -299,6 +309,7 @@ class PulsedMasterLogic(LogicBase):
         self.sigGeneratorSettingsChanged.disconnect()
         self.sigSamplingSettingsChanged.disconnect()
         self.sigGeneratePredefinedSequence.disconnect()
+        self.sigGeneratePredefinedSequenceBatch.disconnect()
         # Disconnect signals coming from SequenceGeneratorLogic
         self.sequencegeneratorlogic().sigBlockDictUpdated.disconnect()
         self.sequencegeneratorlogic().sigEnsembleDictUpdated.disconnect()
@@ -308,10 +319,12 @@ class PulsedMasterLogic(LogicBase):
         self.sequencegeneratorlogic().sigGeneratorSettingsUpdated.disconnect()
         self.sequencegeneratorlogic().sigSamplingSettingsUpdated.disconnect()
         self.sequencegeneratorlogic().sigPredefinedSequenceGenerated.disconnect()
+        self.sequencegeneratorlogic().sigPredefinedBatchGenerated.disconnect()
         self.sequencegeneratorlogic().sigSampleEnsembleComplete.disconnect()
         self.sequencegeneratorlogic().sigSampleSequenceComplete.disconnect()
         self.sequencegeneratorlogic().sigLoadedAssetUpdated.disconnect()
         self.sequencegeneratorlogic().sigBenchmarkComplete.disconnect()
+        self.sequencegeneratorlogic().sigSamplingProgress.disconnect()
         return
 
     #######################################################################
@@ -1021,6 +1034,36 @@ class PulsedMasterLogic(LogicBase):
                 self.sample_ensemble(asset_name, True)
         return
 
+    @QtCore.Slot(str, list)
+    @QtCore.Slot(str, list, bool)
+    @QtCore.Slot(str, list, bool, str)
+    def generate_predefined_sequence_batch(self, generator_method_name, kwarg_dict_list,
+                                           sample=False, sequence_name=''):
+        """
+        Generate several parameter variants of a predefined method at once.
+        See SequenceGeneratorLogic.generate_predefined_sequence_batch.
+
+        @param str generator_method_name: name of the predefined generate method
+        @param list kwarg_dict_list: list of generate method parameter dicts, one per variant
+        @param bool sample: sample and write all variants to the pulse generator
+        @param str sequence_name: optional, name of the PulseSequence combining all variants
+        """
+        self.status_dict['predefined_generation_busy'] = True
+        if sample:
+            self.status_dict['sampling_ensemble_busy'] = True
+        self.sigGeneratePredefinedSequenceBatch.emit(generator_method_name,
+                                                     list(kwarg_dict_list),
+                                                     bool(sample),
+                                                     sequence_name if sequence_name else '')
+        return
+
+    @QtCore.Slot(list)
+    def predefined_batch_generated(self, asset_names):
+        self.status_dict['predefined_generation_busy'] = False
+        self.status_dict['sampling_ensemble_busy'] = False
+        self.sigPredefinedBatchGenerated.emit(asset_names)
+        return
+
     def get_ensemble_info(self, ensemble):
         """
         This helper method is just there for backwards compatibility. Essentially it will call the
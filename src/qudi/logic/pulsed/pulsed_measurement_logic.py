@@ -19,6 +19,7 @@ You should have received a copy of the GNU Lesser General Public License along w
 If not, see <https://www.gnu.org/licenses/>.
 """
 import os.path
+import collections
 
 from PySide2 import QtCore
 import numpy as np
@@ -30,6 +31,7 @@ from qudi.core.connector import Connector
 from qudi.core.configoption import ConfigOption
 from qudi.core.statusvariable import StatusVar
 from qudi.core.module import LogicBase
+from qudi.core.threadmanager import ThreadManager
 from qudi.util.mutex import Mutex
 from qudi.util.network import netobtain
 from qudi.util.datafitting import FitConfigurationsModel, FitContainer
@@ -39,6 +41,7 @@ from qudi.util.units import ScaledFloat
 from qudi.util.colordefs import QudiMatplotlibStyle
 from qudi.logic.pulsed.pulse_extractor import PulseExtractor
 from qudi.logic.pulsed.pulse_analyzer import PulseAnalyzer
+from qudi.logic.pulsed.pulsed_analysis_worker import PulsedAnalysisWorker
 
 
 def _data_storage_from_cfg_option(cfg_str):
@@ -64,6 +67,12 @@ class PulsedMeasurementLogic(LogicBase):
             raw_data_save_type: 'text'
             #additional_extraction_path: # optional
             #additional_analysis_path:   # optional
+            #extraction_cache: True  # optional, reuse detected laser pulse positions
+            #extraction_revalidation_interval: 0  # optional, re-detect laser pulses every x seconds
+            #incremental_analysis: False  # optional, analyze counts since last run (needs cache)
+            #interval_history_length: 1000  # optional, number of analysis intervals to keep
+            #drift_threshold: 4.0  # optional, reduced chi^2 of interval vs. accumulated signal
+            #threaded_analysis: True  # optional, run pulse extraction/analysis in separate thread
         connect:
             fastcounter: 'fast_counter_dummy'
             pulsegenerator: 'pulser_dummy'
@@ -78,6 +87,22 @@ class PulsedMeasurementLogic(LogicBase):
     # Optional additional paths to import from
     extraction_import_path = ConfigOption(name='additional_extraction_path', default=None)
     analysis_import_path = ConfigOption(name='additional_analysis_path', default=None)
+    # Cache laser pulse extraction geometry as long as sequence and settings do not change.
+    # Optionally re-run the full extraction every <extraction_revalidation_interval> seconds.
+    extraction_cache_enabled = ConfigOption(name='extraction_cache', default=True)
+    extraction_revalidation_interval = ConfigOption(name='extraction_revalidation_interval',
+                                                    default=0,
+                                                    constructor=lambda x: max(0, float(x)))
+    # Incremental analysis of the counts accumulated between two analysis runs (interval data).
+    # Enables per-interval statistics and drift detection.
+    _incremental_analysis = ConfigOption(name='incremental_analysis', default=False)
+    _interval_history_length = ConfigOption(name='interval_history_length',
+                                            default=1000,
+                                            constructor=lambda x: max(1, int(x)))
+    _drift_threshold = ConfigOption(name='drift_threshold', default=4.0)
+    # Run laser pulse extraction and analysis in a dedicated worker thread so the logic thread is
+    # not blocked by the analysis of large raw data arrays.
+    _threaded_analysis = ConfigOption(name='threaded_analysis', default=True)
     # Optional file type descriptor for saving raw data to file.
     # todo: doesn't warn if checker not satisfied
     _default_data_storage_cls = ConfigOption(name='default_data_storage_type',
@@ -224,6 +249,12 @@ class PulsedMeasurementLogic(LogicBase):
 
         # threading
         self._threadlock = Mutex()
+        # guards PulseExtractor, PulseAnalyzer and incremental analysis state
+        self._analysis_lock = Mutex()
+        self._analysis_worker = None
+        self._analysis_thread = None
+        self._analysis_snapshot_count = 0
+        self._last_analysis_id = 0
 
         # measurement data
         self.signal_data = np.empty((2, 0), dtype=float)
@@ -232,6 +263,12 @@ class PulsedMeasurementLogic(LogicBase):
         self.laser_data = np.zeros((10, 20), dtype='int64')
         self.raw_data = np.zeros((10, 20), dtype='int64')
 
+        # incremental analysis
+        self._previous_raw_data = None
+        self._running_sums = None
+        self._interval_history = collections.deque()
+        self._drift_detected = False
+
         self._saved_raw_data = dict()  # temporary saved raw data
         self._recalled_raw_data_tag = None  # the currently recalled raw data dict key
 
@@ -253,6 +290,12 @@ class PulsedMeasurementLogic(LogicBase):
         # Create an instance of PulseExtractor
         self._pulseextractor = PulseExtractor(pulsedmeasurementlogic=self)
         self._pulseanalyzer = PulseAnalyzer(pulsedmeasurementlogic=self)
+        # Interval data is extracted with the cached laser pulse positions only
+        if self._incremental_analysis and not self.extraction_cache_enabled:
+            self.log.warning('ConfigOption "incremental_analysis" requires the laser pulse '
+                             'extraction cache (ConfigOption "extraction_cache"). Incremental '
+                             'analysis disabled.')
+            self._incremental_analysis = False
 
         # QTimer must be created here instead of __init__ because otherwise the timer will not run
         # in this logic's thread but in the manager instead.
@@ -262,6 +305,17 @@ class PulsedMeasurementLogic(LogicBase):
         self.__analysis_timer.timeout.connect(self._pulsed_analysis_loop,
                                               QtCore.Qt.QueuedConnection)
 
+        # Worker thread for pulse extraction and analysis
+        if self._threaded_analysis:
+            self._analysis_thread = ThreadManager.instance().get_new_thread(
+                f'pulsed_analysis_{self.module_name}'
+            )
+            self._analysis_worker = PulsedAnalysisWorker(self._analyze_snapshot)
+            self._analysis_worker.moveToThread(self._analysis_thread)
+            self._analysis_worker.sigAnalysisFinished.connect(self._apply_analysis_results,
+                                                              QtCore.Qt.QueuedConnection)
+            self._analysis_thread.start()
+
         # Fitting
         self.fit_config_model = FitConfigurationsModel(parent=self)
         self.fit_config_model.load_configs(self._fit_configs)
@@ -309,6 +363,14 @@ class PulsedMeasurementLogic(LogicBase):
         self.__analysis_timer.timeout.disconnect()
         self.sigStartTimer.disconnect()
         self.sigStopTimer.disconnect()
+        if self._analysis_worker is not None:
+            self._analysis_worker.discard_pending()
+            self._analysis_worker.sigAnalysisFinished.disconnect()
+            thread_manager = ThreadManager.instance()
+            thread_manager.quit_thread(self._analysis_thread)
+            thread_manager.join_thread(self._analysis_thread)
+            self._analysis_worker = None
+            self._analysis_thread = None
         return
 
     @extraction_parameters.representer
@@ -777,7 +839,8 @@ class PulsedMeasurementLogic(LogicBase):
 
         # Use threadlock to update settings during a running measurement
         with self._threadlock:
-            self._pulseanalyzer.analysis_settings = settings_dict
+            with self._analysis_lock:
+                self._pulseanalyzer.analysis_settings = settings_dict
             self.sigAnalysisSettingsUpdated.emit(self.analysis_settings)
         return
 
@@ -802,10 +865,20 @@ class PulsedMeasurementLogic(LogicBase):
 
         # Use threadlock to update settings during a running measurement
         with self._threadlock:
-            self._pulseextractor.extraction_settings = settings_dict
+            with self._analysis_lock:
+                self._pulseextractor.extraction_settings = settings_dict
             self.sigExtractionSettingsUpdated.emit(self.extraction_settings)
         return
 
+    def invalidate_extraction_cache(self):
+        """
+        Discard the cached laser pulse positions. The laser pulses are detected again by the next
+        analysis run.
+        """
+        with self._analysis_lock:
+            self._pulseextractor.invalidate_cache()
+        return
+
     @QtCore.Slot(dict)
     def set_measurement_settings(self, settings_dict=None, **kwargs):
         """
@@ -904,8 +977,16 @@ class PulsedMeasurementLogic(LogicBase):
                 self.do_fit('No Fit', False)
                 self.do_fit('No Fit', True)
 
+                # discard pending analysis results of previous measurements
+                self._last_analysis_id = self._analysis_snapshot_count
+                if self._analysis_worker is not None:
+                    self._analysis_worker.discard_pending()
+
                 # initialize data arrays
                 self._initialize_data_arrays()
+                # detect laser pulses again for the new measurement
+                with self._analysis_lock:
+                    self._pulseextractor.invalidate_cache()
 
                 # recall stashed raw data
                 if stashed_raw_data_tag in self._saved_raw_data:
@@ -947,7 +1028,7 @@ class PulsedMeasurementLogic(LogicBase):
         """
         # Get raw data and analyze it a last time just before stopping the measurement.
         try:
-            self._pulsed_analysis_loop()
+            self._pulsed_analysis_loop(synchronous=True)
         except:
             pass
 
@@ -1094,7 +1175,7 @@ class PulsedMeasurementLogic(LogicBase):
         """ Analyse and display the data
         """
         if self.module_state() == 'locked':
-            self._pulsed_analysis_loop()
+            self._pulsed_analysis_loop(synchronous=True)
         return
 
     @QtCore.Slot(str)
@@ -1214,77 +1295,318 @@ class PulsedMeasurementLogic(LogicBase):
         return
 
     @QtCore.Slot()
-    def _pulsed_analysis_loop(self):
+    def _pulsed_analysis_loop(self, synchronous=False):
         """ Acquires laser pulses from fast counter,
             calculates fluorescence signal and creates plots.
+
+        If threaded analysis is enabled, only the raw data is acquired here and handed over to the
+        analysis worker thread. The results are published asynchronously. Set synchronous=True to
+        analyze the data in the calling thread instead.
         """
         with self._threadlock:
             if self.module_state() == 'locked':
-                # Update elapsed time
+                snapshot = self._acquire_analysis_snapshot()
+                if self._analysis_worker is not None and not synchronous:
+                    self._analysis_worker.submit(snapshot)
+                    self.sigTimerUpdated.emit(self.__elapsed_time, self.__elapsed_sweeps,
+                                              self.__timer_interval)
+                    return
+                if self._analysis_worker is not None:
+                    self._analysis_worker.discard_pending()
+                if not self._set_analysis_results(self._analyze_snapshot(snapshot)):
+                    return
 
-                self._extract_laser_pulses()
+            # emit signals
+            self.sigTimerUpdated.emit(self.__elapsed_time, self.__elapsed_sweeps,
+                                      self.__timer_interval)
+            self.sigMeasurementDataUpdated.emit()
+            return
 
-                tmp_signal, tmp_error = self._analyze_laser_pulses()
+    def _acquire_analysis_snapshot(self):
+        """
+        Get counter raw data (including recalled raw data from previous measurement) and bundle it
+        with all measurement settings needed for the analysis.
+        """
+        fc_data, info_dict = self._get_raw_data()
+        self.raw_data = fc_data
+        self.__elapsed_sweeps = info_dict['elapsed_sweeps']
+        self.__elapsed_time = info_dict['elapsed_time']
+
+        self._analysis_snapshot_count += 1
+        return {'id'                 : self._analysis_snapshot_count,
+                'raw_data'           : fc_data,
+                'elapsed_time'       : self.__elapsed_time,
+                'elapsed_sweeps'     : self.__elapsed_sweeps,
+                'controlled_variable': self.signal_data[0].copy(),
+                'alternating'        : bool(self._alternating),
+                'laser_ignore_list'  : list(self._laser_ignore_list)}
+
+    def _analyze_snapshot(self, snapshot):
+        """
+        Extracts and analyzes the laser pulses of a raw data snapshot and computes the alternative
+        data. Does not alter the measurement data arrays of this module, so it can run in the
+        analysis worker thread. Only state guarded by _analysis_lock is touched.
+
+        @param dict snapshot: raw data snapshot as returned by _acquire_analysis_snapshot
+        @return dict: analysis results to be applied with _set_analysis_results
+        """
+        try:
+            with self._analysis_lock:
+                # Incremental analysis only processes the counts accumulated since the last
+                # analysis run if the analysis method supports running window sums
+                incremental = None
+                if self._incremental_analysis:
+                    incremental = self._analyze_incremental(snapshot['raw_data'])
+                if incremental is None:
+                    # extract laser pulses from raw data
+                    return_dict = self._pulseextractor.extract_laser_pulses(snapshot['raw_data'])
+                    laser_data = return_dict['laser_counts_arr']
+                    tmp_signal, tmp_error = self._analyze_laser_pulses(laser_data)
+                    interval = None
+                else:
+                    laser_data, tmp_signal, tmp_error, interval = incremental
+                results = {'id'               : snapshot['id'],
+                           'laser_data'       : laser_data,
+                           'signal_data'      : None,
+                           'measurement_error': None,
+                           'signal_alt_data'  : None}
 
                 # exclude laser pulses to ignore
-                if len(self._laser_ignore_list) > 0:
+                ignore_list = snapshot['laser_ignore_list']
+                if len(ignore_list) > 0:
                     # Convert relative negative indices into absolute positive indices
-                    while self._laser_ignore_list[0] < 0:
-                        neg_index = self._laser_ignore_list[0]
-                        self._laser_ignore_list[0] = len(tmp_signal) + neg_index
-                        self._laser_ignore_list.sort()
-
-                    tmp_signal = np.delete(tmp_signal, self._laser_ignore_list)
-                    tmp_error = np.delete(tmp_error, self._laser_ignore_list)
+                    ignore_list = sorted(len(tmp_signal) + ii if ii < 0 else ii for ii in ignore_list)
+                    tmp_signal = np.delete(tmp_signal, ignore_list)
+                    tmp_error = np.delete(tmp_error, ignore_list)
 
                 # order data according to alternating flag
-                if self._alternating:
-                    if len(self.signal_data[0]) != len(tmp_signal[::2]):
+                controlled_variable = snapshot['controlled_variable']
+                if snapshot['alternating']:
+                    if len(controlled_variable) != len(tmp_signal[::2]):
                         self.log.error('Length of controlled variable ({0}) does not match length of number of readout '
-                                       'pulses ({1}).'.format(len(self.signal_data[0]), len(tmp_signal[::2])))
-                        return
-                    self.signal_data[1] = tmp_signal[::2]
-                    self.signal_data[2] = tmp_signal[1::2]
-                    self.measurement_error[1] = tmp_error[::2]
-                    self.measurement_error[2] = tmp_error[1::2]
+                                       'pulses ({1}).'.format(len(controlled_variable), len(tmp_signal[::2])))
+                        return results
+                    signal_data = np.vstack((controlled_variable, tmp_signal[::2], tmp_signal[1::2]))
+                    measurement_error = np.vstack(
+                        (controlled_variable, tmp_error[::2], tmp_error[1::2])
+                    )
                 else:
-                    if len(self.signal_data[0]) != len(tmp_signal):
+                    if len(controlled_variable) != len(tmp_signal):
                         self.log.error('Length of controlled variable ({0}) does not match length of number of readout '
-                                       'pulses ({1}).'.format(len(self.signal_data[0]), len(tmp_signal)))
-                        return
-                    self.signal_data[1] = tmp_signal
-                    self.measurement_error[1] = tmp_error
+                                       'pulses ({1}).'.format(len(controlled_variable), len(tmp_signal)))
+                        return results
+                    signal_data = np.vstack((controlled_variable, tmp_signal))
+                    measurement_error = np.vstack((controlled_variable, tmp_error))
+                results['signal_data'] = signal_data.astype(float)
+                results['measurement_error'] = measurement_error.astype(float)
+
+                # Analyze counts accumulated since the last analysis run
+                if incremental is None and self._incremental_analysis:
+                    self._update_interval_data(snapshot, results['signal_data'], ignore_list)
+                elif interval is not None:
+                    self._add_interval_data(snapshot, results['signal_data'], ignore_list,
+                                            *interval)
 
                 # Compute alternative data array from signal
-                self._compute_alt_data()
+                results['signal_alt_data'] = self._get_alt_data(results['signal_data'])
+                return results
+        except:
+            self.log.exception('Error during pulsed measurement analysis:')
+            return None
 
-            # emit signals
-            self.sigTimerUpdated.emit(self.__elapsed_time, self.__elapsed_sweeps,
-                                      self.__timer_interval)
+    def _set_analysis_results(self, results):
+        """
+        Apply analysis results to the measurement data arrays. Results older than the last applied
+        results are discarded. Must be called with _threadlock acquired.
+
+        @param dict results: analysis results as returned by _analyze_snapshot
+        @return bool: Flag indicating if the signal data has been updated
+        """
+        if results is None or results['id'] <= self._last_analysis_id:
+            return False
+        self._last_analysis_id = results['id']
+        self.laser_data = results['laser_data']
+        if results['signal_data'] is None or results['signal_data'].shape != self.signal_data.shape:
+            return False
+        self.signal_data = results['signal_data']
+        self.measurement_error = results['measurement_error']
+        self.signal_alt_data = results['signal_alt_data']
+        return True
+
+    @QtCore.Slot(object)
+    def _apply_analysis_results(self, results):
+        """ Slot receiving the results of the analysis worker thread """
+        with self._threadlock:
+            updated = self._set_analysis_results(results)
+        if updated:
             self.sigMeasurementDataUpdated.emit()
+
+    def _analyze_incremental(self, raw_data):
+        """
+        Incremental analysis with running window sums (see PulseAnalyzer). Only the raw data
+        accumulated since the last analysis run is extracted (using the cached extraction geometry)
+        and reduced to window sums, which are added to the running laser pulses and window sums.
+        The running sums are rebuilt from a full extraction if the extraction geometry or the
+        counter data changed. Must be called with _analysis_lock acquired.
+
+        @param numpy.ndarray raw_data: accumulated raw data of the fast counter
+        @return tuple: accumulated laser data, signal and error as well as the (signal, error) of
+                       the counts since the last analysis run (None if not available).
+                       None if the analysis method does not support running window sums.
+        """
+        if not self._pulseanalyzer.supports_window_sums:
+            self._running_sums = None
+            return None
+        previous_raw_data = self._previous_raw_data
+        self._previous_raw_data = raw_data.copy()
+        running = self._running_sums
+        analysis_settings = self._pulseanalyzer.analysis_settings
+
+        delta_raw_data = None
+        if running is not None and previous_raw_data is not None and \
+                previous_raw_data.shape == raw_data.shape and \
+                running['cache_generation'] == self._pulseextractor.cache_generation and \
+                self._pulseextractor.is_cache_valid(raw_data):
+            delta_raw_data = raw_data - previous_raw_data
+            if (delta_raw_data < 0).any():
+                self.log.debug('Raw data decreased since last analysis run (counter restarted?). '
+                               'Rebuilding running sums of incremental analysis.')
+                delta_raw_data = None
+
+        interval = None
+        if delta_raw_data is None:
+            laser_data = self._pulseextractor.extract_laser_pulses(raw_data)['laser_counts_arr']
+            running = {'laser_data'      : laser_data,
+                       'window_sums'     : self._pulseanalyzer.get_window_sums(laser_data),
+                       'settings'        : analysis_settings,
+                       'cache_generation': self._pulseextractor.cache_generation}
+            self._running_sums = running
+        else:
+            delta_laser_data = self._pulseextractor.gather_laser_pulses(delta_raw_data)
+            delta_window_sums = self._pulseanalyzer.get_window_sums(delta_laser_data)
+            running['laser_data'] += delta_laser_data
+            if running['settings'] != analysis_settings:
+                running['window_sums'] = self._pulseanalyzer.get_window_sums(
+                    running['laser_data']
+                )
+                running['settings'] = analysis_settings
+            else:
+                running['window_sums'] += delta_window_sums
+            if delta_raw_data.any():
+                interval = self._pulseanalyzer.analyse_window_sums(delta_window_sums,
+                                                                   delta_laser_data.shape[1])
+
+        laser_data = running['laser_data']
+        tmp_signal, tmp_error = self._pulseanalyzer.analyse_window_sums(running['window_sums'],
+                                                                        laser_data.shape[1])
+        # The running laser data is updated in place with the next analysis run
+        return laser_data.copy(), tmp_signal, tmp_error, interval
+
+    def _update_interval_data(self, snapshot, signal_data, ignore_list):
+        """
+        Incremental analysis for analysis methods without running window sums. Computes the raw
+        data accumulated since the last analysis run, extracts the laser pulses with the cached
+        extraction geometry and analyzes them in addition to the full analysis. Must be called
+        with _analysis_lock acquired.
+        """
+        raw_data = snapshot['raw_data']
+        previous_raw_data = self._previous_raw_data
+        self._previous_raw_data = raw_data.copy()
+        if previous_raw_data is None or previous_raw_data.shape != raw_data.shape:
+            return
+        delta_raw_data = raw_data - previous_raw_data
+        if not delta_raw_data.any():
+            return
+        if (delta_raw_data < 0).any():
+            self.log.debug('Raw data decreased since last analysis run (counter restarted?). '
+                           'Skipping interval analysis.')
+            return
+        delta_laser_data = self._pulseextractor.gather_laser_pulses(delta_raw_data)
+        if delta_laser_data is None:
+            # No stable laser pulse positions known yet
             return
 
-    def _extract_laser_pulses(self):
-        # Get counter raw data (including recalled raw data from previous measurement)
-        fc_data, info_dict = self._get_raw_data()
-        self.raw_data = fc_data
-        self.__elapsed_sweeps = info_dict['elapsed_sweeps']
-        self.__elapsed_time = info_dict['elapsed_time']
+        tmp_signal, tmp_error = self._pulseanalyzer.analyse_laser_pulses(delta_laser_data)
+        self._add_interval_data(snapshot, signal_data, ignore_list, tmp_signal, tmp_error)
 
-        # extract laser pulses from raw data
-        return_dict = self._pulseextractor.extract_laser_pulses(self.raw_data)
-        self.laser_data = return_dict['laser_counts_arr']
+    def _add_interval_data(self, snapshot, signal_data, ignore_list, tmp_signal, tmp_error):
+        """
+        Appends the signal of the counts accumulated since the last analysis run to the interval
+        history and compares it against the accumulated signal to detect drifts. Must be called
+        with _analysis_lock acquired.
+        """
+        if len(ignore_list) > 0:
+            tmp_signal = np.delete(tmp_signal, ignore_list)
+            tmp_error = np.delete(tmp_error, ignore_list)
+        if snapshot['alternating']:
+            interval_signal = np.vstack((tmp_signal[::2], tmp_signal[1::2]))
+            interval_error = np.vstack((tmp_error[::2], tmp_error[1::2]))
+        else:
+            interval_signal = np.asarray(tmp_signal, dtype=float).reshape(1, -1)
+            interval_error = np.asarray(tmp_error, dtype=float).reshape(1, -1)
+        if interval_signal.shape != signal_data[1:].shape:
+            return
+
+        # reduced chi^2 of interval signal with respect to accumulated signal
+        valid = interval_error > 0
+        if valid.any():
+            deviation = (interval_signal[valid] - signal_data[1:][valid]) / interval_error[valid]
+            chi2_red = float(np.mean(deviation ** 2))
+        else:
+            chi2_red = np.nan
+        if self._drift_threshold and chi2_red > self._drift_threshold:
+            if not self._drift_detected:
+                self.log.warning(f'Drift detected in pulsed measurement: Signal of last analysis '
+                                 f'interval deviates from accumulated signal (reduced chi^2: '
+                                 f'{chi2_red:.2f}).')
+            self._drift_detected = True
+        else:
+            self._drift_detected = False
+
+        self._interval_history.append((snapshot['elapsed_time'],
+                                       snapshot['elapsed_sweeps'],
+                                       interval_signal,
+                                       interval_error,
+                                       chi2_red))
+        while len(self._interval_history) > self._interval_history_length:
+            self._interval_history.popleft()
         return
 
-    def _analyze_laser_pulses(self):
+    @property
+    def interval_data(self):
+        """
+        Results of the incremental analysis (ConfigOption "incremental_analysis") for each analysis
+        run of the current measurement. Each interval contains only the counts accumulated since
+        the previous analysis run.
+
+        @return dict: 'elapsed_time' and 'elapsed_sweeps' at the end of each interval (1D arrays),
+                      'signal' and 'error' (3D arrays; dim 0: interval, dim 1: data trace,
+                      dim 2: controlled variable) and reduced chi^2 of each interval signal with
+                      respect to the accumulated signal 'chi2_red' (1D array)
+        """
+        with self._analysis_lock:
+            history = list(self._interval_history)
+        if not history:
+            return {'elapsed_time'  : np.empty(0, dtype=float),
+                    'elapsed_sweeps': np.empty(0, dtype=float),
+                    'signal'        : np.empty((0, 0, 0), dtype=float),
+                    'error'         : np.empty((0, 0, 0), dtype=float),
+                    'chi2_red'      : np.empty(0, dtype=float)}
+        elapsed_time, elapsed_sweeps, signal, error, chi2_red = zip(*history)
+        return {'elapsed_time'  : np.array(elapsed_time, dtype=float),
+                'elapsed_sweeps': np.array(elapsed_sweeps, dtype=float),
+                'signal'        : np.array(signal),
+                'error'         : np.array(error),
+                'chi2_red'      : np.array(chi2_red, dtype=float)}
+
+    def _analyze_laser_pulses(self, laser_data):
         # analyze pulses and get data points for signal array. Also check if extraction
         # worked (non-zero array returned).
-        if self.laser_data.any():
-            tmp_signal, tmp_error = self._pulseanalyzer.analyse_laser_pulses(
-                self.laser_data)
+        if laser_data.any():
+            tmp_signal, tmp_error = self._pulseanalyzer.analyse_laser_pulses(laser_data)
         else:
-            tmp_signal = np.zeros(self.laser_data.shape[0])
-            tmp_error = np.zeros(self.laser_data.shape[0])
+            tmp_signal = np.zeros(laser_data.shape[0])
+            tmp_error = np.zeros(laser_data.shape[0])
         return tmp_signal, tmp_error
 
     def _get_raw_data(self):
@@ -1359,6 +1681,13 @@ class PulsedMeasurementLogic(LogicBase):
         else:
             self.raw_data = np.zeros(number_of_bins, dtype='int64')
 
+        # reset incremental analysis
+        with self._analysis_lock:
+            self._previous_raw_data = None
+            self._running_sums = None
+            self._interval_history.clear()
+            self._drift_detected = False
+
         self.sigMeasurementDataUpdated.emit()
         return
 
@@ -1734,28 +2063,38 @@ class PulsedMeasurementLogic(LogicBase):
         """
         Performing transformations on the measurement data (e.g. fourier transform).
         """
-        if self._alternative_data_type == 'Delta' and len(self.signal_data) == 3:
-            self.signal_alt_data = np.empty((2, self.signal_data.shape[1]), dtype=float)
-            self.signal_alt_data[0] = self.signal_data[0]
-            self.signal_alt_data[1] = self.signal_data[1] - self.signal_data[2]
-        elif self._alternative_data_type == 'FFT' and self.signal_data.shape[1] >= 2:
-            fft_x, fft_y = compute_ft(x_val=self.signal_data[0],
-                                      y_val=self.signal_data[1],
+        self.signal_alt_data = self._get_alt_data(self.signal_data)
+        return
+
+    def _get_alt_data(self, signal_data):
+        """
+        Computes the alternative data array from signal_data (e.g. fourier transform).
+
+        @param numpy.ndarray signal_data: signal data array (dim 0: controlled variable and traces)
+        @return numpy.ndarray: alternative data array
+        """
+        if self._alternative_data_type == 'Delta' and len(signal_data) == 3:
+            signal_alt_data = np.empty((2, signal_data.shape[1]), dtype=float)
+            signal_alt_data[0] = signal_data[0]
+            signal_alt_data[1] = signal_data[1] - signal_data[2]
+        elif self._alternative_data_type == 'FFT' and signal_data.shape[1] >= 2:
+            fft_x, fft_y = compute_ft(x_val=signal_data[0],
+                                      y_val=signal_data[1],
                                       zeropad_num=self.zeropad,
                                       window=self.window,
                                       base_corr=self.base_corr,
                                       psd=self.psd)
-            self.signal_alt_data = np.empty((len(self.signal_data), len(fft_x)), dtype=float)
-            self.signal_alt_data[0] = fft_x
-            self.signal_alt_data[1] = fft_y
-            for dim in range(2, len(self.signal_data)):
-                dummy, self.signal_alt_data[dim] = compute_ft(x_val=self.signal_data[0],
-                                                              y_val=self.signal_data[dim],
-                                                              zeropad_num=self.zeropad,
-                                                              window=self.window,
-                                                              base_corr=self.base_corr,
-                                                              psd=self.psd)
+            signal_alt_data = np.empty((len(signal_data), len(fft_x)), dtype=float)
+            signal_alt_data[0] = fft_x
+            signal_alt_data[1] = fft_y
+            for dim in range(2, len(signal_data)):
+                dummy, signal_alt_data[dim] = compute_ft(x_val=signal_data[0],
+                                                         y_val=signal_data[dim],
+                                                         zeropad_num=self.zeropad,
+                                                         window=self.window,
+                                                         base_corr=self.base_corr,
+                                                         psd=self.psd)
         else:
-            self.signal_alt_data = np.zeros(self.signal_data.shape, dtype=float)
-            self.signal_alt_data[0] = self.signal_data[0]
-        return
+            signal_alt_data = np.zeros(signal_data.shape, dtype=float)
+            signal_alt_data[0] = signal_data[0]
+        return signal_alt_data
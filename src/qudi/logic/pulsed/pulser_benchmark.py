@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains a benchmark suite measuring the sampling, waveform upload (write_waveform) and
+load (load_waveform) performance of pulse generator hardware modules. The results are stored in
+the same format as the benchmark models of the SequenceGeneratorLogic (see
+SequenceGeneratorLogic.import_benchmark_models).
+
+The benchmark can be run from the command line without a running qudi instance against the
+PulserDummy hardware module:
+
+    python -m qudi.logic.pulsed.pulser_benchmark --samples 1e5 1e6 1e7 --repetitions 3 \
+        --output pulser_benchmark.json
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+__all__ = ['get_benchmark_key', 'benchmark_pulser', 'save_benchmark_models', 'main']
+
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+from qudi.util.helpers import natural_sort
+from qudi.util.benchmark import BenchmarkTool
+from qudi.logic.pulsed.sampling_functions import SamplingFunctions
+
+
+def get_benchmark_key(pulser, active_channels):
+    """
+    Key identifying the benchmark models of a pulse generator class with a certain set of active
+    channels, e.g. "PulserDummy[a_ch1,a_ch2,d_ch1]".
+
+    @param object|str pulser: pulse generator instance or class name
+    @param iterable active_channels: active generic channel descriptors
+    @return str: benchmark key
+    """
+    name = pulser if isinstance(pulser, str) else type(pulser).__name__
+    return '{0}[{1}]'.format(name, ','.join(natural_sort(active_channels)))
+
+
+def benchmark_pulser(pulser, sample_counts, repetitions=3, waveform_name='qudi_benchmark_chunk',
+                     log=None):
+    """
+    Benchmark sampling, writing and loading of waveforms with the currently active channels of a
+    pulse generator. For each number of samples in sample_counts a sine waveform is sampled on all
+    active analog channels (random states on digital channels), written to the device and loaded
+    repetitions times. The first run is discarded to warm up caches.
+
+    @param PulserInterface pulser: activated pulse generator hardware module
+    @param iterable sample_counts: numbers of samples to benchmark
+    @param int repetitions: number of benchmark runs per number of samples
+    @param str waveform_name: name of the benchmark waveform on the device
+    @param logging.Logger log: optional, logger for progress messages
+    @return (str, dict): benchmark key (see get_benchmark_key) and dict of BenchmarkTool instances
+                         for 'sampling', 'upload' and 'load'
+    """
+    if not hasattr(SamplingFunctions, 'Sin'):
+        SamplingFunctions.import_sampling_functions(list())
+
+    channel_states = pulser.get_active_channels()
+    active_channels = {chnl for chnl, state in channel_states.items() if state}
+    analog_channels = natural_sort(chnl for chnl in active_channels if chnl.startswith('a'))
+    digital_channels = natural_sort(chnl for chnl in active_channels if chnl.startswith('d'))
+    sample_rate = float(pulser.get_sample_rate())
+    sine = SamplingFunctions.Sin(amplitude=0.25, frequency=sample_rate / 10, phase=0)
+    rng = np.random.default_rng()
+
+    sample_counts = [int(n_samples) for n_samples in sample_counts]
+    tools = {kind: BenchmarkTool(n_save_datapoints=max(20, len(sample_counts) * repetitions)) for
+             kind in ('sampling', 'upload', 'load')}
+    for n_samples in sample_counts:
+        analog_samples = {chnl: np.empty(n_samples, dtype='float32') for chnl in analog_channels}
+        digital_samples = {chnl: rng.integers(0, 2, n_samples, dtype=bool) for chnl in
+                           digital_channels}
+        for run in range(repetitions + 1):
+            start_time = time.perf_counter()
+            for chnl, samples in analog_samples.items():
+                sine.get_samples_into(0, n_samples, samples, sample_rate)
+            sampling_time = time.perf_counter() - start_time
+
+            pulser.delete_waveform([wfm for wfm in pulser.get_waveform_names() if
+                                    wfm.startswith(waveform_name + '_')])
+            start_time = time.perf_counter()
+            written_samples, waveforms = pulser.write_waveform(
+                name=waveform_name,
+                analog_samples=analog_samples,
+                digital_samples=digital_samples,
+                is_first_chunk=True,
+                is_last_chunk=True,
+                total_number_of_samples=n_samples)
+            upload_time = time.perf_counter() - start_time
+            if written_samples != n_samples:
+                raise RuntimeError('Writing of benchmark waveform with {0:d} samples failed.'
+                                   ''.format(n_samples))
+
+            start_time = time.perf_counter()
+            pulser.load_waveform(waveforms)
+            load_time = time.perf_counter() - start_time
+
+            # ignore first run to warm up caches, etc.
+            if run == 0:
+                continue
+            tools['sampling'].add_benchmark(sampling_time, n_samples)
+            tools['upload'].add_benchmark(upload_time, n_samples)
+            tools['load'].add_benchmark(load_time, n_samples)
+        if log is not None:
+            log.info('Benchmarked {0:d} samples: sampling {1:.2f} MSa/s, upload {2:.2f} MSa/s, '
+                     'load {3:.2f} MSa/s'.format(n_samples,
+                                                 tools['sampling'].estimate_speed(False) / 1e6,
+                                                 tools['upload'].estimate_speed(False) / 1e6,
+                                                 tools['load'].estimate_speed(False) / 1e6))
+
+    pulser.delete_waveform([wfm for wfm in pulser.get_waveform_names() if
+                            wfm.startswith(waveform_name + '_')])
+    return get_benchmark_key(pulser, active_channels), tools
+
+
+def save_benchmark_models(file_path, key, tools):
+    """
+    Add benchmark models to a JSON file that can be imported by the SequenceGeneratorLogic
+    (see SequenceGeneratorLogic.import_benchmark_models). Existing models with the same key are
+    replaced.
+
+    @param str file_path: path of the JSON file
+    @param str key: benchmark key (see get_benchmark_key)
+    @param dict tools: BenchmarkTool instances for each benchmark kind
+    """
+    try:
+        with open(file_path, 'r') as file:
+            models = json.load(file)
+    except FileNotFoundError:
+        models = dict()
+    models[key] = dict()
+    for kind, tool in tools.items():
+        saved = tool.save()
+        for name in ('_datapoints', '_datapoints_fixed'):
+            saved[name] = [[float(time_s), float(y)] for time_s, y in saved[name]]
+        models[key][kind] = saved
+    with open(file_path, 'w') as file:
+        json.dump(models, file, indent=2)
+
+
+def main(argv=None):
+    """ Command line interface running the benchmark against PulserDummy """
+    import logging
+    from qudi.hardware.dummy.pulser_dummy import PulserDummy
+
+    parser = argparse.ArgumentParser(
+        prog='python -m qudi.logic.pulsed.pulser_benchmark',
+        description='Benchmark sampling, waveform upload and load of the qudi PulserDummy.'
+    )
+    parser.add_argument('--samples', type=float, nargs='+', default=[1e5, 1e6, 5e6],
+                        help='numbers of samples per waveform to benchmark')
+    parser.add_argument('--repetitions', type=int, default=3,
+                        help='number of runs per number of samples')
+    parser.add_argument('--activation-config', default=None,
+                        help='name of the PulserDummy activation config to benchmark')
+    parser.add_argument('--output', default=None,
+                        help='JSON file to add the benchmark models to')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    log = logging.getLogger('pulser_benchmark')
+
+    pulser = PulserDummy(qudi_main_weakref=lambda: None, name='pulser_benchmark_dummy')
+    pulser.module_state.activate()
+    try:
+        if args.activation_config is not None:
+            configs = pulser.get_constraints().activation_config
+            if args.activation_config not in configs:
+                parser.error('Unknown activation config "{0}". Available configs: {1}'
+                             ''.format(args.activation_config, natural_sort(configs)))
+            pulser.set_active_channels({chnl: chnl in configs[args.activation_config] for chnl in
+                                        pulser.get_active_channels()})
+        key, tools = benchmark_pulser(pulser, args.samples, args.repetitions, log=log)
+    finally:
+        pulser.module_state.deactivate()
+
+    print('{0}:'.format(key))
+    for kind, tool in tools.items():
+        print('    {0:<10} {1:10.2f} MSa/s  ({2:d} benchmarks)'.format(
+            kind, tool.estimate_speed(False) / 1e6, tool.n_benchmarks))
+    if args.output:
+        save_benchmark_models(args.output, key, tools)
+        print('Benchmark models saved to "{0}".'.format(args.output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
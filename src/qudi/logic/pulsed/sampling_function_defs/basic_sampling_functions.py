@@ -36,6 +36,12 @@ class Idle(SamplingBase):
         samples_arr = np.zeros(len(time_array))
         return samples_arr
 
+    def get_samples_into(self, time_offset, n, out, sample_rate):
+        out[:n] = 0
+
+    def get_offset_key(self, offset_bin, sample_rate):
+        return 0
+
 
 class DC(SamplingBase):
     """
@@ -60,6 +66,12 @@ class DC(SamplingBase):
         samples_arr = self._get_dc(time_array, self.voltage)
         return samples_arr
 
+    def get_samples_into(self, time_offset, n, out, sample_rate):
+        out[:n] = self.voltage
+
+    def get_offset_key(self, offset_bin, sample_rate):
+        return 0
+
 
 class Sin(SamplingBase):
     """
@@ -95,6 +107,14 @@ class Sin(SamplingBase):
         samples_arr = self._get_sine(time_array, self.amplitude, self.frequency, phase_rad)
         return samples_arr
 
+    def get_samples_into(self, time_offset, n, out, sample_rate):
+        phase_rad = np.pi * self.phase / 180
+        self._sine_into(out[:n], time_offset, sample_rate, self.amplitude, self.frequency,
+                        phase_rad)
+
+    def get_offset_key(self, offset_bin, sample_rate):
+        return self._get_phase_offset_key(offset_bin, sample_rate, self.frequency)
+
 
 class DoubleSinSum(SamplingBase):
     """
@@ -153,6 +173,16 @@ class DoubleSinSum(SamplingBase):
         samples_arr += self._get_sine(time_array, self.amplitude_2, self.frequency_2, phase_rad)
         return samples_arr
 
+    def get_samples_into(self, time_offset, n, out, sample_rate):
+        out = out[:n]
+        self._sine_into(out, time_offset, sample_rate,
+                        self.amplitude_1, self.frequency_1, np.pi * self.phase_1 / 180)
+        self._sine_into(out, time_offset, sample_rate,
+                        self.amplitude_2, self.frequency_2, np.pi * self.phase_2 / 180, 'add')
+
+    def get_offset_key(self, offset_bin, sample_rate):
+        return self._get_phase_offset_key(offset_bin, sample_rate, self.frequency_1, self.frequency_2)
+
 
 class DoubleSinProduct(SamplingBase):
     """
@@ -211,6 +241,16 @@ class DoubleSinProduct(SamplingBase):
         samples_arr *= self._get_sine(time_array, self.amplitude_2, self.frequency_2, phase_rad)
         return samples_arr
 
+    def get_samples_into(self, time_offset, n, out, sample_rate):
+        out = out[:n]
+        self._sine_into(out, time_offset, sample_rate,
+                        self.amplitude_1, self.frequency_1, np.pi * self.phase_1 / 180)
+        self._sine_into(out, time_offset, sample_rate,
+                        self.amplitude_2, self.frequency_2, np.pi * self.phase_2 / 180, 'mul')
+
+    def get_offset_key(self, offset_bin, sample_rate):
+        return self._get_phase_offset_key(offset_bin, sample_rate, self.frequency_1, self.frequency_2)
+
 
 class TripleSinSum(SamplingBase):
     """
@@ -291,6 +331,19 @@ class TripleSinSum(SamplingBase):
         samples_arr += self._get_sine(time_array, self.amplitude_3, self.frequency_3, phase_rad)
         return samples_arr
 
+    def get_samples_into(self, time_offset, n, out, sample_rate):
+        out = out[:n]
+        self._sine_into(out, time_offset, sample_rate,
+                        self.amplitude_1, self.frequency_1, np.pi * self.phase_1 / 180)
+        self._sine_into(out, time_offset, sample_rate,
+                        self.amplitude_2, self.frequency_2, np.pi * self.phase_2 / 180, 'add')
+        self._sine_into(out, time_offset, sample_rate,
+                        self.amplitude_3, self.frequency_3, np.pi * self.phase_3 / 180, 'add')
+
+    def get_offset_key(self, offset_bin, sample_rate):
+        return self._get_phase_offset_key(offset_bin, sample_rate,
+                                          self.frequency_1, self.frequency_2, self.frequency_3)
+
 
 class TripleSinProduct(SamplingBase):
     """
@@ -371,6 +424,19 @@ class TripleSinProduct(SamplingBase):
         samples_arr *= self._get_sine(time_array, self.amplitude_3, self.frequency_3, phase_rad)
         return samples_arr
 
+    def get_samples_into(self, time_offset, n, out, sample_rate):
+        out = out[:n]
+        self._sine_into(out, time_offset, sample_rate,
+                        self.amplitude_1, self.frequency_1, np.pi * self.phase_1 / 180)
+        self._sine_into(out, time_offset, sample_rate,
+                        self.amplitude_2, self.frequency_2, np.pi * self.phase_2 / 180, 'mul')
+        self._sine_into(out, time_offset, sample_rate,
+                        self.amplitude_3, self.frequency_3, np.pi * self.phase_3 / 180, 'mul')
+
+    def get_offset_key(self, offset_bin, sample_rate):
+        return self._get_phase_offset_key(offset_bin, sample_rate,
+                                          self.frequency_1, self.frequency_2, self.frequency_3)
+
 
 class Chirp(SamplingBase):
     """
@@ -413,6 +479,25 @@ class Chirp(SamplingBase):
                         time_array - time_array[0]) / time_diff / 2) + phase_rad)
         return samples_arr
 
+    def get_samples_into(self, time_offset, n, out, sample_rate):
+        if n < 2:
+            return super().get_samples_into(time_offset, n, out, sample_rate)
+        # Same as get_samples without creating the time array first. The phase is calculated in
+        # float64 (out may have lower precision) with in-place operations on two work arrays.
+        freq_diff = self.stop_freq - self.start_freq
+        time_diff = (n - 1) / sample_rate
+        rel_time = np.arange(n, dtype='float64')
+        rel_time /= sample_rate
+        samples = rel_time * (freq_diff / time_diff / 2)
+        samples += self.start_freq
+        rel_time += time_offset
+        samples *= rel_time
+        samples *= 2 * np.pi
+        samples += np.deg2rad(self.phase)
+        np.sin(samples, out=samples)
+        np.multiply(samples, self.amplitude, out=out[:n], casting='same_kind')
+
+
 class AllenEberlyChirp(SamplingBase):
 
     """
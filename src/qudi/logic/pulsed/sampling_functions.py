@@ -28,6 +28,7 @@ import copy
 import logging
 import numpy as np
 from enum import Enum, EnumMeta
+from fractions import Fraction
 
 from qudi.util.helpers import iter_modules_recursive
 
@@ -145,6 +146,133 @@ class SamplingBase:
             dict_repr['params'][param] = getattr(self, param)
         return dict_repr
 
+    def get_offset_key(self, offset_bin, sample_rate):
+        """
+        Hashable key describing the dependency of the samples on the absolute start time
+        (offset_bin / sample_rate) of a time array. Time arrays of equal length and sample rate
+        yield identical samples if their keys are equal. Used by the SequenceGeneratorLogic to reuse
+        already sampled elements.
+
+        The default implementation returns the offset_bin itself. Time invariant sampling functions
+        may return a constant and periodic functions the phase at the start time.
+
+        @param int offset_bin: absolute sample index of the first sample
+        @param float sample_rate: sample rate in Hz
+        @return: hashable key
+        """
+        return int(offset_bin)
+
+    @staticmethod
+    def _get_phase_offset_key(offset_bin, sample_rate, *frequencies):
+        """
+        Offset key for sampling functions composed of sine waves. Returns the phase of each
+        frequency at the start time as exact fraction of a full period.
+        """
+        start_time = Fraction(int(offset_bin)) / Fraction(sample_rate)
+        return tuple((start_time * Fraction(freq)) % 1 for freq in frequencies)
+
+    def get_samples_into(self, time_offset, n, out, sample_rate):
+        """
+        Calculates the samples for the time array time_offset + np.arange(n) / sample_rate and
+        writes them into the preallocated array out. Used by the SequenceGeneratorLogic to sample
+        directly into the (float32) waveform arrays.
+
+        The default implementation calls get_samples. Sampling functions may override this method
+        to avoid temporary arrays or to use faster algorithms.
+
+        @param float time_offset: time of the first sample in s
+        @param int n: number of samples to calculate
+        @param numpy.ndarray out: array of at least length n to write the samples into
+        @param float sample_rate: sample rate in Hz
+        """
+        time_array = time_offset + np.arange(n, dtype='float64') / sample_rate
+        out[:n] = self.get_samples(time_array)
+
+    # Minimum number of samples and block size for the block-wise sine synthesis in _sine_into
+    _sine_block_length = 4096
+    # Number of blocks to process at once in _sine_into
+    _sine_blocks_per_step = 64
+
+    @classmethod
+    def _sine_into(cls, out, time_offset, sample_rate, amplitude, frequency, phase, mode='set'):
+        """
+        Calculates amplitude * sin(2*pi*frequency*t + phase) for t = time_offset + k / sample_rate
+        and writes it into out (mode 'set'), adds it to out (mode 'add') or multiplies it with out
+        (mode 'mul').
+
+        Long arrays are synthesized block by block. A single block of sine and cosine values is
+        rotated to the phase at the start of each block (sin(a + b) = sin(a)cos(b) + cos(a)sin(b)),
+        so np.sin/np.cos only need to be evaluated once per block. The phase of each block start
+        is calculated directly from the time, so rounding errors do not accumulate.
+
+        @param numpy.ndarray out: float array to write into
+        @param float time_offset: time of the first sample in s
+        @param float sample_rate: sample rate in Hz
+        @param float amplitude: amplitude of the sine
+        @param float frequency: frequency of the sine in Hz
+        @param float phase: phase of the sine in rad
+        @param str mode: 'set', 'add' or 'mul'
+        """
+        n = len(out)
+        step = 2 * np.pi * frequency / sample_rate
+        cycles = frequency * time_offset
+        start_phase = 2 * np.pi * (cycles - np.floor(cycles)) + phase
+        block_length = cls._sine_block_length
+        n_blocks = n // block_length
+
+        if n_blocks < 2:
+            samples = np.arange(n, dtype='float64')
+            samples *= step
+            samples += start_phase
+            np.sin(samples, out=samples)
+            samples *= amplitude
+            if mode == 'add':
+                np.add(out, samples, out=out, casting='same_kind')
+            elif mode == 'mul':
+                np.multiply(out, samples, out=out, casting='same_kind')
+            else:
+                out[:] = samples
+            return
+
+        block_phases = np.arange(block_length, dtype='float64') * step
+        block_sin = (amplitude * np.sin(block_phases)).astype(out.dtype)
+        block_cos = (amplitude * np.cos(block_phases)).astype(out.dtype)
+        start_phases = start_phase + np.arange(n_blocks, dtype='float64') * (block_length * step)
+        start_sin = np.sin(start_phases).astype(out.dtype)[:, np.newaxis]
+        start_cos = np.cos(start_phases).astype(out.dtype)[:, np.newaxis]
+
+        out_blocks = out[:n_blocks * block_length].reshape(n_blocks, block_length)
+        blocks_per_step = min(n_blocks, cls._sine_blocks_per_step)
+        buffer = np.empty((blocks_per_step, block_length), dtype=out.dtype)
+        buffer_2 = np.empty((blocks_per_step, block_length), dtype=out.dtype)
+        for first in range(0, n_blocks, blocks_per_step):
+            rows = slice(first, min(first + blocks_per_step, n_blocks))
+            n_rows = rows.stop - rows.start
+            tmp = buffer[:n_rows]
+            np.multiply(block_sin, start_cos[rows], out=tmp)
+            if mode == 'set':
+                np.multiply(block_cos, start_sin[rows], out=out_blocks[rows])
+                out_blocks[rows] += tmp
+                continue
+            tmp_2 = buffer_2[:n_rows]
+            np.multiply(block_cos, start_sin[rows], out=tmp_2)
+            tmp += tmp_2
+            if mode == 'add':
+                out_blocks[rows] += tmp
+            else:
+                out_blocks[rows] *= tmp
+
+        # remaining samples
+        remaining = n_blocks * block_length
+        if remaining < n:
+            cls._sine_into(out[remaining:],
+                           time_offset + remaining / sample_rate,
+                           sample_rate,
+                           amplitude,
+                           frequency,
+                           phase,
+                           mode)
+
 
 class SamplingFunctions:
     """
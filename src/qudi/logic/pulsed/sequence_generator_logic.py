@@ -28,6 +28,11 @@ import copy
 import traceback
 import datetime
 import re
+import json
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from PySide2 import QtCore
 from qudi.core.statusvariable import StatusVar
@@ -36,14 +41,87 @@ from qudi.core.configoption import ConfigOption
 from qudi.util.paths import get_home_dir
 from qudi.util.helpers import natural_sort
 from qudi.util.network import netobtain
+from qudi.util.mutex import Mutex
 from qudi.core.module import LogicBase
 from qudi.logic.pulsed.pulse_objects import PulseBlock, PulseBlockEnsemble, PulseSequence
 from qudi.logic.pulsed.pulse_objects import PulseObjectGenerator, PulseBlockElement
 from qudi.logic.pulsed.sampling_functions import SamplingFunctions
+from qudi.logic.pulsed.waveform_cache import WaveformCache, get_content_hash
+from qudi.logic.pulsed.asset_store import PulseAssetStore, LazyAssetDict
+from qudi.logic.pulsed.pulser_benchmark import get_benchmark_key
 from qudi.interface.pulser_interface import SequenceOption
+from qudi.interface.mixins.digital_pattern_pulser import DigitalPatternPulserMixin
 from qudi.util.benchmark import BenchmarkTool
 
 
+class _SampleMemo:
+    """
+    Thread-safe memo table of analog samples of PulseBlockElement segments with least recently used
+    eviction. Entries are identified by the sampling function (type and parameters), the number of
+    samples, the sample rate and the offset key of the sampling function (see
+    SamplingBase.get_offset_key).
+    """
+
+    def __init__(self, max_bytes, min_samples=256):
+        self.max_bytes = max_bytes
+        self.min_samples = min_samples
+        self.hits = 0
+        self.misses = 0
+        self._lock = Mutex()
+        self._table = OrderedDict()
+        self._bytes = 0
+
+    def clear(self):
+        with self._lock:
+            self._table = OrderedDict()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def get_key(self, pulse_function, number_of_samples, offset_bin, sample_rate):
+        """ Returns the memo key of a segment or None if the segment should not be memoized """
+        if number_of_samples < self.min_samples or self.max_bytes <= 0:
+            return None
+        try:
+            key = (type(pulse_function).__name__,
+                   tuple(getattr(pulse_function, param) for param in pulse_function.params),
+                   int(number_of_samples),
+                   float(sample_rate),
+                   pulse_function.get_offset_key(offset_bin, sample_rate))
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            samples = self._table.get(key)
+            if samples is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._table.move_to_end(key)
+            return samples
+
+    def put(self, key, samples):
+        """ Store samples (converted to float32) and return the stored array """
+        if key is None:
+            return samples
+        samples = np.array(samples, dtype='float32')
+        if samples.nbytes > self.max_bytes:
+            return samples
+        with self._lock:
+            if key not in self._table:
+                self._table[key] = samples
+                self._bytes += samples.nbytes
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._table.popitem(last=False)
+                    self._bytes -= evicted.nbytes
+        return samples
+
+
 class SequenceGeneratorLogic(LogicBase):
     """
     This is the Logic class for the pulse (sequence) generation.
@@ -66,6 +144,9 @@ class SequenceGeneratorLogic(LogicBase):
         #     additional_predefined_methods_path: # optional
         #     additional_sampling_functions_path: # optional
         #     assets_storage_path: # optional
+        #     sampling_threads: 0 # optional, number of threads used for sampling (0: CPU count)
+        #     waveform_cache_size: 0 # optional, max. bytes of sampled waveforms cached on disk
+        #     pipelined_writing: True # optional, sample next chunk while writing the previous one
         connect:
             pulsegenerator: 'pulser_dummy'
     """
@@ -87,6 +168,31 @@ class SequenceGeneratorLogic(LogicBase):
                                                    missing='nothing')
     _info_on_estimated_upload_time = ConfigOption(name='info_on_estimated_upload_time', default=60, missing='nothing')
     _disable_bench_prompt = ConfigOption(name='disable_benchmark_prompt', default=False, missing='nothing')
+    # Number of threads sampling the elements of a waveform chunk concurrently.
+    # 0 uses the number of CPU cores, 1 disables concurrent sampling.
+    _sampling_threads = ConfigOption(name='sampling_threads', default=0, missing='nothing')
+    # Maximum size in bytes of the local disk cache for sampled waveforms. 0 disables the cache.
+    _waveform_cache_size = ConfigOption(name='waveform_cache_size', default=0, missing='nothing')
+    # Sample the next waveform chunk in a background thread while the previous chunk is written to
+    # the device. Only used if a waveform is written in more than one chunk (see overhead_bytes).
+    _pipelined_writing = ConfigOption(name='pipelined_writing', default=True, missing='nothing')
+
+    # Element segments are grouped into sampling tasks of at least this number of samples
+    _min_samples_per_sampling_task = 2 ** 16
+    # Size limit of the element samples memo if overhead_bytes is not set
+    _default_sample_memo_bytes = 2 ** 28
+    # Fraction of overhead_bytes reserved for the element samples memo. The sample arrays use the
+    # remaining bytes, so both together stay within overhead_bytes.
+    _sample_memo_fraction = 0.25
+    # File name of the pulse object database in the assets storage directory
+    _asset_store_filename = 'pulse_assets.db'
+    # Sub-directory of the assets storage directory legacy pickle files are moved to after import
+    _pickled_assets_backup_dir = 'pickled_assets_backup'
+    # Structured array data type of compiled PulseBlocks (see _get_block_table)
+    _element_table_dtype = np.dtype([('init_length_s', 'float64'),
+                                     ('increment_s', 'float64'),
+                                     ('digital_state', 'uint64'),
+                                     ('laser_on', 'bool')])
 
     # status vars
     # Global parameters describing the channel usage and common parameters used during pulsed object
@@ -115,6 +221,16 @@ class SequenceGeneratorLogic(LogicBase):
     _benchmark_write_state = StatusVar(representer=_benchmark_write.save, constructor=_benchmark_write.load_from_dict)
     _benchmark_load = BenchmarkTool()
     _benchmark_load_state = StatusVar(representer=_benchmark_load.save, constructor=_benchmark_load.load_from_dict)
+    _benchmark_batch = BenchmarkTool()
+    _benchmark_batch_state = StatusVar(representer=_benchmark_batch.save, constructor=_benchmark_batch.load_from_dict)
+    # Sampling (CPU) and device write (I/O) times of waveforms measured separately
+    _benchmark_sampling = BenchmarkTool()
+    _benchmark_sampling_state = StatusVar(representer=_benchmark_sampling.save, constructor=_benchmark_sampling.load_from_dict)
+    _benchmark_upload = BenchmarkTool()
+    _benchmark_upload_state = StatusVar(representer=_benchmark_upload.save, constructor=_benchmark_upload.load_from_dict)
+    # Saved states of all benchmarks above for each pulse generator class and channel config
+    # (see pulser_benchmark.get_benchmark_key). Only the benchmarks of the current key are active.
+    _benchmark_models = StatusVar(name='benchmark_models', default=dict())
 
     # define signals
     sigBlockDictUpdated = QtCore.Signal(dict)
@@ -128,8 +244,11 @@ class SequenceGeneratorLogic(LogicBase):
     sigAvailableWaveformsUpdated = QtCore.Signal(list)
     sigAvailableSequencesUpdated = QtCore.Signal(list)
     sigBenchmarkComplete = QtCore.Signal()
+    # Sampling progress (fraction of samples written) and estimated remaining time in s (-1 if unknown)
+    sigSamplingProgress = QtCore.Signal(float, float)
 
     sigPredefinedSequenceGenerated = QtCore.Signal(object, bool)
+    sigPredefinedBatchGenerated = QtCore.Signal(list)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -154,11 +273,38 @@ class SequenceGeneratorLogic(LogicBase):
         # Get instance of PulseObjectGenerator which takes care of collecting all predefined methods
         self._pog = None
 
+        # Thread pool used to sample waveform chunks
+        self._sampling_executor = None
+        # Single thread executor sampling ahead while waveform chunks are written to the device
+        self._pipeline_executor = None
+        # Memo table of sampled element segments used to avoid sampling identical elements again
+        self._sample_memo = None
+        # Compiled PulseBlock element tables and PulseBlockEnsemble analysis results
+        self._block_table_cache = dict()
+        self._ensemble_analysis_cache = dict()
+
+        # Benchmark key (pulse generator class and active channels) of the active benchmarks
+        self._benchmark_key = None
+        # Number of samples to write, samples written and start time of the current sampling run
+        self._sampling_progress = None
+
+        # Local disk cache of sampled waveforms
+        self._waveform_cache = None
+        # Content hash and device waveform names of all waveforms written to the device.
+        # Keys are the waveform names (excluding the channel suffix).
+        self._device_waveforms = dict()
+
         # The created pulse objects (PulseBlock, PulseBlockEnsemble, PulseSequence) are saved in
         # these dictionaries. The keys are the names.
         self._saved_pulse_blocks = dict()
         self._saved_pulse_block_ensembles = dict()
         self._saved_pulse_sequences = dict()
+        # Database storing the pulse objects. Objects are only loaded from it when accessed.
+        self._asset_store = None
+        # Waveforms and sequences present on the device. Used to invalidate the sampling
+        # information of lazily loaded PulseBlockEnsembles and PulseSequences.
+        self._stored_assets_waveforms = set()
+        self._stored_assets_sequences = set()
 
     def on_activate(self):
         """ Initialisation performed during activation of the module.
@@ -204,25 +350,64 @@ class SequenceGeneratorLogic(LogicBase):
 
         # Read back settings from device and update instance variables accordingly
         self._read_settings_from_device()
+        self._select_benchmark_models()
+        self.__upload_speed = self.get_speed_write_load()
 
-        # Update saved blocks/ensembles/sequences from serialized files
-        self._saved_pulse_blocks = dict()
-        self._saved_pulse_block_ensembles = dict()
-        self._saved_pulse_sequences = dict()
-        self._update_blocks_from_file()
-        self._update_ensembles_from_file()
-        self._update_sequences_from_file()
+        # Update saved blocks/ensembles/sequences from asset database
+        self._asset_store = PulseAssetStore(os.path.join(self._assets_storage_dir,
+                                                         self._asset_store_filename))
+        self._import_pickled_assets()
+        self._update_blocks_from_store()
+        self._update_ensembles_from_store()
+        self._update_sequences_from_store()
 
         # Get instance of PulseObjectGenerator which takes care of collecting all predefined methods
         self._pog = PulseObjectGenerator(sequencegeneratorlogic=self)
         self._pog.activate_plugins()
 
+        # Create thread pool for concurrent sampling
+        sampling_threads = int(self._sampling_threads)
+        if sampling_threads < 1:
+            sampling_threads = os.cpu_count() or 1
+        if sampling_threads > 1:
+            self._sampling_executor = ThreadPoolExecutor(max_workers=sampling_threads,
+                                                         thread_name_prefix='pulse_sampling')
+        # Single background thread sampling waveform chunks while the logic thread writes
+        if self._pipelined_writing:
+            self._pipeline_executor = ThreadPoolExecutor(max_workers=1,
+                                                         thread_name_prefix='pulse_pipeline')
+
+        # Element samples memo takes its share of the memory available for sampling
+        if self._overhead_bytes > 0:
+            sample_memo_bytes = int(self._overhead_bytes * self._sample_memo_fraction)
+        else:
+            sample_memo_bytes = self._default_sample_memo_bytes
+        self._sample_memo = _SampleMemo(max_bytes=sample_memo_bytes)
+
+        # Create waveform cache
+        self._waveform_cache = WaveformCache(
+            cache_dir=os.path.join(self._assets_storage_dir, 'waveform_cache'),
+            max_bytes=self._waveform_cache_size
+        )
+        self._device_waveforms = dict()
+
         self.__sequence_generation_in_progress = False
         return
 
     def on_deactivate(self):
         """ Deinitialisation performed during deactivation of the module.
         """
+        self._store_benchmark_models()
+        if self._sampling_executor is not None:
+            self._sampling_executor.shutdown(wait=True)
+            self._sampling_executor = None
+        if self._pipeline_executor is not None:
+            self._pipeline_executor.shutdown(wait=True)
+            self._pipeline_executor = None
+        self._sample_memo = None
+        if self._asset_store is not None:
+            self._asset_store.close()
+            self._asset_store = None
         return
 
     # @_saved_pulse_blocks.constructor
@@ -442,6 +627,7 @@ class SequenceGeneratorLogic(LogicBase):
                 self.__interleave = self.pulsegenerator().set_interleave(
                     bool(settings_dict['interleave']))
 
+            self._select_benchmark_models()
             self.__upload_speed = self.get_speed_write_load()
 
         elif len(kwargs) != 0 or isinstance(settings_dict, dict):
@@ -468,15 +654,19 @@ class SequenceGeneratorLogic(LogicBase):
             self.log.error('Can´t clear the pulser as it is running. Switch off the pulser and try again.')
             return -1
         self.pulsegenerator().clear_all()
-        # Delete all sampling information from all PulseBlockEnsembles and PulseSequences
-        for seq_name in self.saved_pulse_sequences:
-            seq = self.saved_pulse_sequences[seq_name]
-            seq.sampling_information = dict()
-            self.save_sequence(seq)
-        for ens_name in self.saved_pulse_block_ensembles:
-            ens = self.saved_pulse_block_ensembles[ens_name]
-            ens.sampling_information = dict()
-            self.save_ensemble(ens)
+        self._device_waveforms = dict()
+        # Delete all sampling information from all PulseBlockEnsembles and PulseSequences.
+        # Objects not loaded yet will drop their sampling information when loaded.
+        self._stored_assets_waveforms = set()
+        self._stored_assets_sequences = set()
+        for seq_name in self._saved_pulse_sequences.loaded_names():
+            self._saved_pulse_sequences[seq_name].sampling_information = dict()
+        for ens_name in self._saved_pulse_block_ensembles.loaded_names():
+            self._saved_pulse_block_ensembles[ens_name].sampling_information = dict()
+        self._save_sequences_to_store()
+        self._save_ensembles_to_store()
+        self.sigSequenceDictUpdated.emit(self.saved_pulse_sequences)
+        self.sigEnsembleDictUpdated.emit(self.saved_pulse_block_ensembles)
         self.sigAvailableWaveformsUpdated.emit(self.sampled_waveforms)
         self.sigAvailableSequencesUpdated.emit(self.sampled_sequences)
         self.sigLoadedAssetUpdated.emit('', '')
@@ -740,7 +930,8 @@ class SequenceGeneratorLogic(LogicBase):
         @param PulseBlock block: PulseBlock instance to save
         """
         self._saved_pulse_blocks[block.name] = block
-        self._save_block_to_file(block)
+        self._block_table_cache.pop(block.name, None)
+        self._save_block_to_store(block)
         self.sigBlockDictUpdated.emit(self._saved_pulse_blocks)
         return
 
@@ -763,18 +954,17 @@ class SequenceGeneratorLogic(LogicBase):
         # Delete from dict
         if name in self.saved_pulse_blocks:
             del (self._saved_pulse_blocks[name])
+        self._block_table_cache.pop(name, None)
 
         # Delete from disk
-        filepath = os.path.join(self._assets_storage_dir, '{0}.block'.format(name))
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        self._asset_store.delete('block', name)
 
         self.sigBlockDictUpdated.emit(self.saved_pulse_blocks)
         return
 
     def _load_block_from_file(self, block_name):
         """
-        De-serializes a PulseBlock instance from file.
+        De-serializes a PulseBlock instance from a legacy pickle file.
 
         @param str block_name: The name of the PulseBlock instance to de-serialize
         @return PulseBlock: The de-serialized PulseBlock instance
@@ -795,44 +985,59 @@ class SequenceGeneratorLogic(LogicBase):
                 self.log.debug('{0!s}'.format(traceback.format_exc()))
         return block
 
-    def _update_blocks_from_file(self):
+    def _load_block_from_store(self, block_name):
         """
-        Update the saved_pulse_blocks dict by de-serializing stored file.
-        """
-        # Get all files in asset directory ending on ".block" and extract a sorted list of
-        # PulseBlock names
-        with os.scandir(self._assets_storage_dir) as scan:
-            names = natural_sort(f.name[:-6] for f in scan if f.is_file and f.name.endswith('.block'))
+        Creates a PulseBlock instance from its dict representation in the asset database.
 
-        # Load all blocks from file
-        for block_name in names:
-            block = self._load_block_from_file(block_name)
-            if block is not None:
-                self._saved_pulse_blocks[block_name] = block
+        @param str block_name: The name of the PulseBlock instance to load
+        @return PulseBlock: The loaded PulseBlock instance (None if loading failed)
+        """
+        try:
+            block_dict = self._asset_store.load('block', block_name)
+            if block_dict is None:
+                return None
+            return PulseBlock.block_from_dict(block_dict)
+        except pickle.UnpicklingError:
+            self.log.error('Failed to de-serialize PulseBlock "{0}" from asset database. '
+                           'Deleting broken entry.'.format(block_name))
+            self._asset_store.delete('block', block_name)
+        except:
+            self.log.error('Failed to load PulseBlock "{0}" from asset database.\n'
+                           'For better debugging I dumped the traceback to debug.'.format(block_name))
+            self.log.debug('{0!s}'.format(traceback.format_exc()))
+        return None
 
+    def _update_blocks_from_store(self):
+        """
+        Update the saved_pulse_blocks dict with the names of all PulseBlocks in the asset database.
+        The PulseBlock instances are loaded when accessed for the first time.
+        """
+        names = natural_sort(self._asset_store.names('block'))
+        self._saved_pulse_blocks = LazyAssetDict(self._load_block_from_store, names)
+        self._block_table_cache = dict()
         self.sigBlockDictUpdated.emit(self._saved_pulse_blocks)
         return
 
-    def _save_block_to_file(self, block):
+    def _save_block_to_store(self, block):
         """
-        Saves a single PulseBlock instance to file by serialization using pickle.
+        Saves a single PulseBlock instance to the asset database.
 
         @param PulseBlock block: The PulseBlock instance to be saved
         """
-        filename = '{0}.block'.format(block.name)
         try:
-            with open(os.path.join(self._assets_storage_dir, filename), 'wb') as file:
-                pickle.dump(block, file)
+            self._asset_store.store('block', block.name, block.get_dict_representation())
         except:
-            self.log.error('Failed to serialize PulseBlock "{0}" to file.'.format(block.name))
+            self.log.exception('Failed to save PulseBlock "{0}" to asset database.'
+                               ''.format(block.name))
         return
 
-    def _save_blocks_to_file(self):
+    def _save_blocks_to_store(self):
         """
-        Saves the saved_pulse_blocks dict items to files.
+        Saves all loaded saved_pulse_blocks dict items to the asset database.
         """
-        for block in self._saved_pulse_blocks.values():
-            self._save_block_to_file(block)
+        with self._asset_store.batch():
+            for name in self._saved_pulse_blocks.loaded_names():
+                self._save_block_to_store(self._saved_pulse_blocks[name])
         return
 
     def save_ensemble(self, ensemble):
@@ -841,7 +1046,7 @@ class SequenceGeneratorLogic(LogicBase):
         @param PulseBlockEnsemble ensemble: PulseBlockEnsemble instance to save
         """
         self._saved_pulse_block_ensembles[ensemble.name] = ensemble
-        self._save_ensemble_to_file(ensemble)
+        self._save_ensemble_to_store(ensemble)
         self.sigEnsembleDictUpdated.emit(self.saved_pulse_block_ensembles)
         return
 
@@ -864,24 +1069,23 @@ class SequenceGeneratorLogic(LogicBase):
         # Delete from dict
         if name in self.saved_pulse_block_ensembles:
             # check if ensemble has already been sampled and delete associated waveforms
-            if self.saved_pulse_block_ensembles[name].sampling_information:
-                self._delete_waveform(
-                    self.saved_pulse_block_ensembles[name].sampling_information['waveforms'])
+            ensemble = self.saved_pulse_block_ensembles.get(name)
+            if ensemble is not None and ensemble.sampling_information:
+                self._delete_waveform(ensemble.sampling_information['waveforms'])
                 self.sigAvailableWaveformsUpdated.emit(self.sampled_waveforms)
             # delete PulseBlockEnsemble
-            del self._saved_pulse_block_ensembles[name]
+            self._saved_pulse_block_ensembles.pop(name, None)
+        self._ensemble_analysis_cache.pop(name, None)
 
         # Delete from disk
-        filepath = os.path.join(self._assets_storage_dir, '{0}.ensemble'.format(name))
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        self._asset_store.delete('ensemble', name)
 
         self.sigEnsembleDictUpdated.emit(self.saved_pulse_block_ensembles)
         return
 
     def _load_ensemble_from_file(self, ensemble_name):
         """
-        De-serializes a PulseBlockEnsemble instance from file.
+        De-serializes a PulseBlockEnsemble instance from a legacy pickle file.
 
         @param str ensemble_name: The name of the PulseBlockEnsemble instance to de-serialize
         @return PulseBlockEnsemble: The de-serialized PulseBlockEnsemble instance
@@ -898,53 +1102,74 @@ class SequenceGeneratorLogic(LogicBase):
                 os.remove(filepath)
         return ensemble
 
-    def _update_ensembles_from_file(self):
+    def _load_ensemble_from_store(self, ensemble_name):
         """
-        Update the saved_pulse_block_ensembles dict from temporary file.
+        Creates a PulseBlockEnsemble instance from its dict representation in the asset database.
+        Outdated sampling information (waveforms no longer present on the device) is removed.
+
+        @param str ensemble_name: The name of the PulseBlockEnsemble instance to load
+        @return PulseBlockEnsemble: The loaded PulseBlockEnsemble instance (None if loading failed)
         """
-        # Get all files in asset directory ending on ".ensemble" and extract a sorted list of
-        # PulseBlockEnsemble names
-        with os.scandir(self._assets_storage_dir) as scan:
-            names = natural_sort(f.name[:-9] for f in scan if f.is_file and f.name.endswith('.ensemble'))
+        try:
+            ensemble_dict = self._asset_store.load('ensemble', ensemble_name)
+            if ensemble_dict is None:
+                return None
+            ensemble = PulseBlockEnsemble.ensemble_from_dict(ensemble_dict)
+        except pickle.UnpicklingError:
+            self.log.error('Failed to de-serialize PulseBlockEnsemble "{0}" from asset database. '
+                           'Deleting broken entry.'.format(ensemble_name))
+            self._asset_store.delete('ensemble', ensemble_name)
+            return None
+        except:
+            self.log.error('Failed to load PulseBlockEnsemble "{0}" from asset database.\n'
+                           'For better debugging I dumped the traceback to debug.'
+                           ''.format(ensemble_name))
+            self.log.debug('{0!s}'.format(traceback.format_exc()))
+            return None
+
+        if ensemble.sampling_information.get('waveforms'):
+            waveform_set = set(ensemble.sampling_information['waveforms'])
+            if not self._stored_assets_waveforms.issuperset(waveform_set):
+                ensemble.sampling_information = dict()
+        return ensemble
+
+    def _update_ensembles_from_store(self):
+        """
+        Update the saved_pulse_block_ensembles dict with the names of all PulseBlockEnsembles in
+        the asset database. The PulseBlockEnsemble instances are loaded when accessed for the first
+        time.
+        """
+        names = natural_sort(self._asset_store.names('ensemble'))
 
         # Get all waveforms currently stored on pulser hardware in order to delete outdated
-        # sampling_information dicts
-        sampled_waveforms = set(self.sampled_waveforms)
-
-        # Load all ensembles from file
-        for ensemble_name in names:
-            ensemble = self._load_ensemble_from_file(ensemble_name)
-            if ensemble is not None:
-                if ensemble.sampling_information.get('waveforms'):
-                    waveform_set = set(ensemble.sampling_information['waveforms'])
-                    if not sampled_waveforms.issuperset(waveform_set):
-                        ensemble.sampling_information = dict()
-                self._saved_pulse_block_ensembles[ensemble_name] = ensemble
+        # sampling_information dicts upon loading
+        self._stored_assets_waveforms = set(self.sampled_waveforms)
 
+        self._saved_pulse_block_ensembles = LazyAssetDict(self._load_ensemble_from_store, names)
+        self._ensemble_analysis_cache = dict()
         self.sigEnsembleDictUpdated.emit(self.saved_pulse_block_ensembles)
         return
 
-    def _save_ensemble_to_file(self, ensemble):
+    def _save_ensemble_to_store(self, ensemble):
         """
-        Saves a single PulseBlockEnsemble instance to file by serialization using pickle.
+        Saves a single PulseBlockEnsemble instance to the asset database.
 
         @param PulseBlockEnsemble ensemble: The PulseBlockEnsemble instance to be saved
         """
-        filename = '{0}.ensemble'.format(ensemble.name)
         try:
-            with open(os.path.join(self._assets_storage_dir, filename), 'wb') as file:
-                pickle.dump(ensemble, file)
+            self._asset_store.store('ensemble', ensemble.name, ensemble.get_dict_representation())
         except:
-            self.log.error('Failed to serialize PulseBlockEnsemble "{0}" to file.'
-                           ''.format(ensemble.name))
+            self.log.exception('Failed to save PulseBlockEnsemble "{0}" to asset database.'
+                               ''.format(ensemble.name))
         return
 
-    def _save_ensembles_to_file(self):
+    def _save_ensembles_to_store(self):
         """
-        Saves the saved_pulse_block_ensembles dict items to files.
+        Saves all loaded saved_pulse_block_ensembles dict items to the asset database.
         """
-        for ensemble in self.saved_pulse_block_ensembles.values():
-            self._save_ensemble_to_file(ensemble)
+        with self._asset_store.batch():
+            for name in self._saved_pulse_block_ensembles.loaded_names():
+                self._save_ensemble_to_store(self._saved_pulse_block_ensembles[name])
         return
 
     def save_sequence(self, sequence):
@@ -956,7 +1181,7 @@ class SequenceGeneratorLogic(LogicBase):
         @return: str: name of the serialized object, if needed.
         """
         self._saved_pulse_sequences[sequence.name] = sequence
-        self._save_sequence_to_file(sequence)
+        self._save_sequence_to_store(sequence)
         self.sigSequenceDictUpdated.emit(self.saved_pulse_sequences)
         return
 
@@ -979,44 +1204,43 @@ class SequenceGeneratorLogic(LogicBase):
         if name in self.saved_pulse_sequences:
             # check if sequence has already been sampled and delete associated sequence from pulser.
             # Also delete associated waveforms if sequence has been sampled within rotating frame.
-            if self.saved_pulse_sequences[name].sampling_information:
+            sequence = self.saved_pulse_sequences.get(name)
+            if sequence is not None and sequence.sampling_information:
                 self._delete_sequence(name)
-                if self.saved_pulse_sequences[name].rotating_frame:
-                    self._delete_waveform(
-                        self.saved_pulse_sequences[name].sampling_information['waveforms'])
+                if sequence.rotating_frame:
+                    self._delete_waveform(sequence.sampling_information['waveforms'])
                     self.sigAvailableWaveformsUpdated.emit(self.sampled_waveforms)
             # delete PulseSequence
-            del self._saved_pulse_sequences[name]
+            self._saved_pulse_sequences.pop(name, None)
 
         # Delete from disk
-        filepath = os.path.join(self._assets_storage_dir, '{0}.sequence'.format(name))
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        self._asset_store.delete('sequence', name)
 
         self.sigSequenceDictUpdated.emit(self.saved_pulse_sequences)
         return
 
     def _load_sequence_from_file(self, sequence_name):
         """
-        De-serializes a PulseSequence instance from file.
+        De-serializes a PulseSequence instance from a legacy pickle file.
 
         @param str sequence_name: The name of the PulseSequence instance to de-serialize
         @return PulseSequence: The de-serialized PulseSequence instance
         """
         filepath = os.path.join(self._assets_storage_dir, '{0}.sequence'.format(sequence_name))
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, 'rb') as file:
-                    sequence = pickle.load(file)
-                # FIXME: Due to the pickling the dict namespace merging gets lost on the way.
-                # Restored it here but a better way needs to be found.
-                for step in range(len(sequence)):
-                    sequence[step].__dict__ = sequence[step]
-            except pickle.UnpicklingError:
-                self.log.error('Failed to de-serialize PulseSequence "{0}" from file.'
-                               ''.format(sequence_name))
-                os.remove(filepath)
-                return None
+        if not os.path.exists(filepath):
+            return None
+        try:
+            with open(filepath, 'rb') as file:
+                sequence = pickle.load(file)
+            # FIXME: Due to the pickling the dict namespace merging gets lost on the way.
+            # Restored it here but a better way needs to be found.
+            for step in range(len(sequence)):
+                sequence[step].__dict__ = sequence[step]
+        except pickle.UnpicklingError:
+            self.log.error('Failed to de-serialize PulseSequence "{0}" from file.'
+                           ''.format(sequence_name))
+            os.remove(filepath)
+            return None
 
         # Conversion for backwards compatibility
         if len(sequence) > 0 and not isinstance(sequence[0].flag_high, list):
@@ -1057,58 +1281,125 @@ class SequenceGeneratorLogic(LogicBase):
                                    ''.format(sequence_name))
                     os.remove(filepath)
                     return None
-            self._save_sequence_to_file(sequence)
         return sequence
 
-    def _update_sequences_from_file(self):
+    def _load_sequence_from_store(self, sequence_name):
         """
-        Update the saved_pulse_sequences dict from files.
+        Creates a PulseSequence instance from its dict representation in the asset database.
+        Outdated sampling information (sequence or waveforms no longer present on the device) is
+        removed.
+
+        @param str sequence_name: The name of the PulseSequence instance to load
+        @return PulseSequence: The loaded PulseSequence instance (None if loading failed)
         """
-        # Get all files in asset directory ending on ".sequence" and extract a sorted list of
-        # PulseSequence names
-        with os.scandir(self._assets_storage_dir) as scan:
-            names = natural_sort(f.name[:-9] for f in scan if f.is_file and f.name.endswith('.sequence'))
+        try:
+            sequence_dict = self._asset_store.load('sequence', sequence_name)
+            if sequence_dict is None:
+                return None
+            sequence = PulseSequence.sequence_from_dict(sequence_dict)
+        except pickle.UnpicklingError:
+            self.log.error('Failed to de-serialize PulseSequence "{0}" from asset database. '
+                           'Deleting broken entry.'.format(sequence_name))
+            self._asset_store.delete('sequence', sequence_name)
+            return None
+        except:
+            self.log.error('Failed to load PulseSequence "{0}" from asset database.\n'
+                           'For better debugging I dumped the traceback to debug.'
+                           ''.format(sequence_name))
+            self.log.debug('{0!s}'.format(traceback.format_exc()))
+            return None
+
+        if sequence.name not in self._stored_assets_sequences:
+            sequence.sampling_information = dict()
+        elif sequence.sampling_information:
+            waveform_set = set(sequence.sampling_information['waveforms'])
+            if not self._stored_assets_waveforms.issuperset(waveform_set):
+                sequence.sampling_information = dict()
+        return sequence
+
+    def _update_sequences_from_store(self):
+        """
+        Update the saved_pulse_sequences dict with the names of all PulseSequences in the asset
+        database. The PulseSequence instances are loaded when accessed for the first time.
+        """
+        names = natural_sort(self._asset_store.names('sequence'))
 
         # Get all waveforms and sequences currently stored on pulser hardware in order to delete
-        # outdated sampling_information dicts
-        sampled_waveforms = set(self.sampled_waveforms)
-        sampled_sequences = set(self.sampled_sequences)
-
-        # Load all sequences from file
-        for sequence_name in names:
-            sequence = self._load_sequence_from_file(sequence_name)
-            if sequence is not None:
-                if sequence.name not in sampled_sequences:
-                    sequence.sampling_information = dict()
-                elif sequence.sampling_information:
-                    waveform_set = set(sequence.sampling_information['waveforms'])
-                    if not sampled_waveforms.issuperset(waveform_set):
-                        sequence.sampling_information = dict()
-                self._saved_pulse_sequences[sequence_name] = sequence
+        # outdated sampling_information dicts upon loading
+        self._stored_assets_waveforms = set(self.sampled_waveforms)
+        self._stored_assets_sequences = set(self.sampled_sequences)
 
+        self._saved_pulse_sequences = LazyAssetDict(self._load_sequence_from_store, names)
         self.sigSequenceDictUpdated.emit(self.saved_pulse_sequences)
         return
 
-    def _save_sequence_to_file(self, sequence):
+    def _save_sequence_to_store(self, sequence):
         """
-        Saves a single PulseSequence instance to file by serialization using pickle.
+        Saves a single PulseSequence instance to the asset database.
 
         @param PulseSequence sequence: The PulseSequence instance to be saved
         """
-        filename = '{0}.sequence'.format(sequence.name)
         try:
-            with open(os.path.join(self._assets_storage_dir, filename), 'wb') as file:
-                pickle.dump(sequence, file)
+            sequence_dict = sequence.get_dict_representation()
+            # Store the sequence steps as plain dicts
+            sequence_dict['ensemble_list'] = [dict(step) for step in sequence_dict['ensemble_list']]
+            self._asset_store.store('sequence', sequence.name, sequence_dict)
         except:
-            self.log.error('Failed to serialize PulseSequence "{0}" to file.'.format(sequence.name))
+            self.log.exception('Failed to save PulseSequence "{0}" to asset database.'
+                               ''.format(sequence.name))
         return
 
-    def _save_sequences_to_file(self):
+    def _save_sequences_to_store(self):
         """
-        Saves the saved_pulse_sequences dict items to files.
+        Saves all loaded saved_pulse_sequences dict items to the asset database.
         """
-        for sequence in self.saved_pulse_sequences.values():
-            self._save_sequence_to_file(sequence)
+        with self._asset_store.batch():
+            for name in self._saved_pulse_sequences.loaded_names():
+                self._save_sequence_to_store(self._saved_pulse_sequences[name])
+        return
+
+    def _import_pickled_assets(self):
+        """
+        Imports PulseBlocks, PulseBlockEnsembles and PulseSequences from pickle files (one file per
+        object) created by older versions of this module into the asset database.
+        Imported files are moved into a backup sub-directory of the assets storage directory.
+        """
+        file_lists = {'block': list(), 'ensemble': list(), 'sequence': list()}
+        with os.scandir(self._assets_storage_dir) as scan:
+            for entry in scan:
+                if not entry.is_file():
+                    continue
+                name, extension = os.path.splitext(entry.name)
+                if extension[1:] in file_lists:
+                    file_lists[extension[1:]].append(name)
+        if not any(file_lists.values()):
+            return
+
+        self.log.info('Importing {0:d} pickled pulse objects from "{1}" into asset database.'
+                      ''.format(sum(len(names) for names in file_lists.values()),
+                                self._assets_storage_dir))
+        backup_dir = os.path.join(self._assets_storage_dir, self._pickled_assets_backup_dir)
+        if not os.path.exists(backup_dir):
+            os.makedirs(backup_dir)
+        with self._asset_store.batch():
+            for name in file_lists['block']:
+                block = self._load_block_from_file(name)
+                if block is not None:
+                    self._save_block_to_store(block)
+            for name in file_lists['ensemble']:
+                ensemble = self._load_ensemble_from_file(name)
+                if ensemble is not None:
+                    self._save_ensemble_to_store(ensemble)
+            for name in file_lists['sequence']:
+                sequence = self._load_sequence_from_file(name)
+                if sequence is not None:
+                    self._save_sequence_to_store(sequence)
+        for kind, names in file_lists.items():
+            for name in names:
+                filename = '{0}.{1}'.format(name, kind)
+                filepath = os.path.join(self._assets_storage_dir, filename)
+                if os.path.exists(filepath):
+                    os.replace(filepath, os.path.join(backup_dir, filename))
         return
 
     def generate_predefined_sequence(self, predefined_sequence_name, kwargs_dict):
@@ -1118,13 +1409,53 @@ class SequenceGeneratorLogic(LogicBase):
         @param kwargs_dict:
         @return:
         """
+        gen_params = self.generate_method_params[predefined_sequence_name]
+        created = self._call_predefined_method(predefined_sequence_name, kwargs_dict)
+        if created is None:
+            self.sigPredefinedSequenceGenerated.emit(None, False)
+            return
+        blocks, ensembles, sequences = created
+
+        # Save objects
+        with self._asset_store.batch():
+            for block in blocks:
+                self.save_block(block)
+            for ensemble in ensembles:
+                ensemble.sampling_information = dict()
+                ensemble.generation_method_parameters = kwargs_dict
+                self.save_ensemble(ensemble)
+
+        if self.pulse_generator_constraints.sequence_option == SequenceOption.FORCED and len(sequences) < 1:
+            self.log.info('Adding default sequence for: {0:s}'.format(predefined_sequence_name))
+            self._add_default_sequence(ensembles, sequences)
+            if len(sequences) > 0:
+                self.log.debug('New default PulseSequence is: {0:s} length {1:d}'
+                               ''.format(sequences[0].name, len(sequences)))
+
+        with self._asset_store.batch():
+            for sequence in sequences:
+                sequence.sampling_information = dict()
+                self.save_sequence(sequence)
+
+        created_name = gen_params.get('name') if 'name' not in kwargs_dict else kwargs_dict['name']
+        self.sigPredefinedSequenceGenerated.emit(created_name, len(sequences) > 0)
+        return
+
+    def _call_predefined_method(self, predefined_sequence_name, kwargs_dict):
+        """
+        Calls a predefined generate method with the matching parameters from kwargs_dict. Unknown
+        parameters are removed from kwargs_dict.
+
+        @param str predefined_sequence_name: name of the predefined generate method
+        @param dict kwargs_dict: generate method parameters
+        @return tuple: (blocks, ensembles, sequences) lists of created objects or None if failed
+        """
         gen_method = self.generate_methods[predefined_sequence_name]
         gen_params = self.generate_method_params[predefined_sequence_name]
         if 'name' not in gen_params:
             self.log.error('Mandatory generation parameter "name" not found in generate method '
                            '"{0}" arguments. Generation failed.'.format(predefined_sequence_name))
-            self.sigPredefinedSequenceGenerated.emit(None, False)
-            return
+            return None
 
         # match parameters to method and throw out unwanted ones
         thrown_out_params = [param for param in kwargs_dict if param not in gen_params]
@@ -1135,35 +1466,243 @@ class SequenceGeneratorLogic(LogicBase):
                            '{1}'.format(predefined_sequence_name, thrown_out_params))
 
         try:
-            blocks, ensembles, sequences = gen_method(**kwargs_dict)
+            return gen_method(**kwargs_dict)
         except:
             self.log.exception('Generation of predefined sequence "{0}" failed with exception:'
                                ''.format(predefined_sequence_name))
-            self.sigPredefinedSequenceGenerated.emit(None, False)
-            return
+            return None
 
-        # Save objects
-        for block in blocks:
-            self.save_block(block)
-        for ensemble in ensembles:
-            ensemble.sampling_information = dict()
-            ensemble.generation_method_parameters = kwargs_dict
-            self.save_ensemble(ensemble)
+    @QtCore.Slot(str, list)
+    @QtCore.Slot(str, list, bool)
+    @QtCore.Slot(str, list, bool, str)
+    def generate_predefined_sequence_batch(self, predefined_sequence_name, kwargs_list,
+                                           sample=False, sequence_name=''):
+        """
+        Generates several parameter variants of a predefined method at once, e.g. a Rabi
+        measurement for a list of microwave amplitudes or an XY8 tau sweep for different orders N.
 
-        if self.pulse_generator_constraints.sequence_option == SequenceOption.FORCED and len(sequences) < 1:
-            self.log.info('Adding default sequence for: {0:s}'.format(predefined_sequence_name))
-            self._add_default_sequence(ensembles, sequences)
-            if len(sequences) > 0:
-                self.log.debug('New default PulseSequence is: {0:s} length {1:d}'
-                               ''.format(sequences[0].name, len(sequences)))
+        The predefined method is called once for each kwargs dict in kwargs_list. Variants without
+        "name" parameter are named "<default name>_<index>". PulseBlocks with identical content are
+        only saved once and shared between the generated PulseBlockEnsembles. All objects are saved
+        in a single asset database transaction.
 
-        for sequence in sequences:
-            sequence.sampling_information = dict()
-            self.save_sequence(sequence)
+        If sample is True, all generated PulseBlockEnsembles are sampled and written to the pulse
+        generator in a single session, so the element samples memo is shared between all variants.
+        If a sequence_name is given and the pulse generator supports sequencing, the variants are
+        combined into a single PulseSequence (one step per variant) instead, which is sampled and
+        written as a whole.
 
-        created_name = gen_params.get('name') if 'name' not in kwargs_dict else kwargs_dict['name']
-        self.sigPredefinedSequenceGenerated.emit(created_name, len(sequences) > 0)
-        return
+        The total time needed for the batch is added to a BenchmarkTool (samples vs. time) in order
+        to estimate the duration of subsequent batches.
+
+        @param str predefined_sequence_name: name of the predefined generate method
+        @param list kwargs_list: list of generate method parameter dicts, one for each variant
+        @param bool sample: sample and write the generated variants to the pulse generator
+        @param str sequence_name: optional, name of the PulseSequence combining all variants
+        @return list: names of the generated PulseBlockEnsembles (and PulseSequence if created)
+        """
+        start_time = time.perf_counter()
+        default_name = self.generate_method_params[predefined_sequence_name].get('name', 'batch')
+
+        blocks = dict()
+        block_names_by_content = dict()
+        ensembles = list()
+        sequences = list()
+        for index, kwargs_dict in enumerate(kwargs_list):
+            kwargs_dict = dict(kwargs_dict)
+            kwargs_dict.setdefault('name', '{0}_{1:d}'.format(default_name, index))
+            created = self._call_predefined_method(predefined_sequence_name, kwargs_dict)
+            if created is None:
+                self.sigPredefinedBatchGenerated.emit(list())
+                return list()
+            variant_blocks, variant_ensembles, variant_sequences = created
+
+            # Share blocks with identical content between variants. Blocks that have the same name
+            # as a block of another variant but a different content are renamed.
+            renamed_blocks = dict()
+            for block in variant_blocks:
+                content_hash = get_content_hash(block.get_dict_representation()['element_list'])
+                shared_name = block_names_by_content.get(content_hash)
+                if shared_name is not None:
+                    renamed_blocks[block.name] = shared_name
+                    continue
+                if block.name in blocks:
+                    new_name = '{0}_{1}'.format(block.name, kwargs_dict['name'])
+                    renamed_blocks[block.name] = new_name
+                    block.name = new_name
+                blocks[block.name] = block
+                block_names_by_content[content_hash] = block.name
+            for ensemble in variant_ensembles:
+                ensemble.block_list = [(renamed_blocks.get(block_name, block_name), reps) for
+                                       block_name, reps in ensemble.block_list]
+                ensemble.sampling_information = dict()
+                ensemble.generation_method_parameters = kwargs_dict
+                ensembles.append(ensemble)
+            sequences.extend(variant_sequences)
+
+        if sequence_name:
+            if self.pulse_generator_constraints.sequence_option == SequenceOption.NON:
+                self.log.error('Unable to combine batch of "{0}" into PulseSequence "{1}". The '
+                               'pulse generator does not support sequencing.'
+                               ''.format(predefined_sequence_name, sequence_name))
+            else:
+                sequence = PulseSequence(name=sequence_name, rotating_frame=False)
+                for ensemble in ensembles:
+                    sequence.append(ensemble.name)
+                    sequence[-1].repetitions = 0
+                sequence[-1].go_to = 1
+                sequence.refresh_parameters()
+                sequence.measurement_information = self._combine_measurement_information(
+                    ensembles, gated=bool(self.generation_parameters.get('gate_channel')))
+                sequences.append(sequence)
+
+        # Save all objects at once
+        with self._asset_store.batch():
+            for block in blocks.values():
+                self._saved_pulse_blocks[block.name] = block
+                self._block_table_cache.pop(block.name, None)
+                self._save_block_to_store(block)
+            for ensemble in ensembles:
+                self._saved_pulse_block_ensembles[ensemble.name] = ensemble
+                self._ensemble_analysis_cache.pop(ensemble.name, None)
+                self._save_ensemble_to_store(ensemble)
+            for sequence in sequences:
+                sequence.sampling_information = dict()
+                self._saved_pulse_sequences[sequence.name] = sequence
+                self._save_sequence_to_store(sequence)
+        self.sigBlockDictUpdated.emit(self._saved_pulse_blocks)
+        self.sigEnsembleDictUpdated.emit(self._saved_pulse_block_ensembles)
+        self.sigSequenceDictUpdated.emit(self._saved_pulse_sequences)
+        self.log.debug('Generated {0:d} variants of "{1}" sharing {2:d} PulseBlocks.'
+                       ''.format(len(kwargs_list), predefined_sequence_name, len(blocks)))
+
+        created_names = [ensemble.name for ensemble in ensembles]
+        if sequence_name and sequence_name in self._saved_pulse_sequences:
+            created_names.append(sequence_name)
+            self._check_batch_counting_length(self._saved_pulse_sequences[sequence_name],
+                                              ensembles)
+
+        if sample and ensembles:
+            number_of_samples = sum(self.analyze_block_ensemble(ensemble)['number_of_samples'] for
+                                    ensemble in ensembles)
+            t_est = self._benchmark_batch.estimate_time(number_of_samples)
+            if t_est > self._info_on_estimated_upload_time:
+                now = datetime.datetime.now()
+                self.log.info('Estimated finish of sampling and writing batch of "{0}": '
+                              '{1:%Y-%m-%d %H:%M:%S} ({2:d} s)'
+                              ''.format(predefined_sequence_name,
+                                        now + datetime.timedelta(0, t_est),
+                                        int(t_est)))
+            if sequence_name and sequence_name in self._saved_pulse_sequences:
+                self.sample_pulse_sequence(sequence_name)
+                success = bool(self._saved_pulse_sequences[sequence_name].sampling_information)
+            else:
+                success = self._sample_pulse_block_ensemble_batch(ensembles)
+            if success:
+                self._benchmark_batch.add_benchmark(time.perf_counter() - start_time,
+                                                    number_of_samples)
+            self.log.info('Time needed for generating, sampling and writing {0:d} variants of '
+                          '"{1}" ({2:d} samples) to device: {3:.3f} s'
+                          ''.format(len(ensembles), predefined_sequence_name,
+                                    int(number_of_samples), time.perf_counter() - start_time))
+        else:
+            self.log.info('Time needed for generating {0:d} variants of "{1}": {2:.3f} s'
+                          ''.format(len(ensembles), predefined_sequence_name,
+                                    time.perf_counter() - start_time))
+
+        self.sigPredefinedBatchGenerated.emit(created_names)
+        return created_names
+
+    def _sample_pulse_block_ensemble_batch(self, ensembles):
+        """
+        Samples and writes several PulseBlockEnsembles in a single locked session. The element
+        samples memo is only cleared once at the beginning.
+
+        @param list ensembles: PulseBlockEnsemble instances to sample
+        @return bool: True if all ensembles have been written successfully
+        """
+        if self.module_state() != 'idle':
+            self.log.error('Cannot sample batch of PulseBlockEnsembles because the '
+                           'SequenceGeneratorLogic is still busy (locked).\nFunction call ignored.')
+            return False
+        self.__sequence_generation_in_progress = True
+        self.module_state.lock()
+        self._sample_memo.clear()
+        self._start_sampling_progress(
+            sum(self.analyze_block_ensemble(ensemble)['number_of_samples'] for ensemble in ensembles))
+        success = True
+        try:
+            for ensemble in ensembles:
+                offset_bin, waveforms, ensemble_info = self.sample_pulse_block_ensemble(ensemble)
+                if offset_bin < 0:
+                    success = False
+                    break
+        finally:
+            self.module_state.unlock()
+            self.__sequence_generation_in_progress = False
+        return success
+
+    @staticmethod
+    def _combine_measurement_information(ensembles, gated):
+        """
+        Combines the measurement information of several PulseBlockEnsembles played once one after
+        another. Laser pulses and controlled variables are concatenated.
+
+        In gated mode the counting length is the length of a single gate, i.e. the maximum of all
+        ensembles. In ungated mode each counting length is the duration of the whole ensemble, so
+        the combined counting length is the sum of all ensembles.
+
+        @param list ensembles: PulseBlockEnsemble instances in playback order
+        @param bool gated: Flag indicating if a gate channel is used for the fast counter
+        @return dict: combined measurement information (empty dict if not combinable)
+        """
+        infos = [ensemble.measurement_information for ensemble in ensembles]
+        if not infos or not all(infos):
+            return dict()
+        combined = copy.deepcopy(infos[0])
+        for info in infos[1:]:
+            if info.get('alternating') != combined.get('alternating') or info.get(
+                    'units') != combined.get('units'):
+                return dict()
+        laser_offset = 0
+        laser_ignore_list = list()
+        for info in infos:
+            laser_ignore_list.extend(laser_offset + ii for ii in info.get('laser_ignore_list', []))
+            laser_offset += info.get('number_of_lasers', 0)
+        combined['number_of_lasers'] = laser_offset
+        combined['laser_ignore_list'] = laser_ignore_list
+        combined['controlled_variable'] = np.concatenate(
+            [np.asarray(info.get('controlled_variable', [])) for info in infos])
+        if all('counting_length' in info for info in infos):
+            counting_lengths = [info['counting_length'] for info in infos]
+            if gated:
+                combined['counting_length'] = max(counting_lengths)
+            else:
+                combined['counting_length'] = sum(counting_lengths)
+        return combined
+
+    def _check_batch_counting_length(self, sequence, ensembles):
+        """
+        Checks if the counting length of a PulseSequence combining a batch of PulseBlockEnsembles
+        covers all of them. Without gate channel the fast counter must record the whole sequence,
+        i.e. the sum of all ensemble durations.
+
+        @param PulseSequence sequence: PulseSequence combining the ensembles (played once each)
+        @param list ensembles: PulseBlockEnsemble instances in playback order
+        @return bool: Flag indicating if the counting length is consistent
+        """
+        counting_length = sequence.measurement_information.get('counting_length')
+        if counting_length is None or self.generation_parameters.get('gate_channel'):
+            return True
+        sequence_length = sum(
+            self.analyze_block_ensemble(ensemble).get('ideal_length', 0) for ensemble in ensembles
+        )
+        if abs(counting_length - sequence_length) > 1 / self.__sample_rate:
+            self.log.warning('Counting length of PulseSequence "{0}" ({1:.6e} s) does not match '
+                             'the total length of all combined PulseBlockEnsembles ({2:.6e} s).'
+                             ''.format(sequence.name, counting_length, sequence_length))
+            return False
+        return True
 
     def _add_default_sequence(self, ensembles, sequences):
         if not isinstance(ensembles, (list, tuple)) or len(ensembles) < 1:
@@ -1260,6 +1799,11 @@ class SequenceGeneratorLogic(LogicBase):
         PulseBlocks are actually present in saved blocks and the channel activation matches the
         current pulse settings.
 
+        The PulseBlocks are compiled into element tables (see _get_block_table) and the analysis is
+        performed on the expanded tables using cumulative sums. Results are cached per ensemble
+        name until the block list, the sample rate, the laser channel or any involved PulseBlock
+        (via save_block) changes.
+
         @param ensemble: A PulseBlockEnsemble object (see logic.pulse_objects.py) or the name of one
         @return: number_of_samples (int): The total number of samples in a Waveform provided the
                                               current sample_rate and PulseBlockEnsemble object.
@@ -1290,94 +1834,70 @@ class SequenceGeneratorLogic(LogicBase):
         laser_channel = self.generation_parameters['gate_channel'] if self.generation_parameters[
             'gate_channel'] else self.generation_parameters['laser_channel']
 
-        # memorize the digital channel state of the previous element
-        tmp_digital_high = dict()
-        # memorize the laser_on flag of the previous element (in case of non-digital laser channel)
-        tmp_laser_on = False
         # Set of used analog and digital channels
         digital_channels = set()
         analog_channels = set()
-        # check for active channels and initialize tmp_digital_high/tmp_laser_on with the state of
-        # the very last element in the ensemble
         if len(ensemble) > 0:
             block = self.get_block(ensemble[0][0])
             digital_channels = block.digital_channels
             analog_channels = block.analog_channels
-            block = self.get_block(ensemble[-1][0])
-            if len(block) > 0:
-                tmp_digital_high = block[-1].digital_high.copy()
-                tmp_laser_on = block[-1].laser_on
-            else:
-                tmp_digital_high = {chnl: False for chnl in digital_channels}
-                tmp_laser_on = False
-
-        # dicts containing the bins where the digital channels are rising/falling
-        digital_rising_bins = {chnl: list() for chnl in digital_channels}
-        digital_falling_bins = {chnl: list() for chnl in digital_channels}
-        laser_rising_bins = list()
-        laser_falling_bins = list()
-
-        # Array to store the length in bins for all elements including repetitions in the order
-        # they are occuring in the waveform later on.
-        elements_length_bins = list()
-
-        # variables to keep track of the current timeframe
-        current_end_time = 0.0
-        current_start_bin = 0
-
-        # Loop through all blocks in the ensemble
-        for block_name, reps in ensemble:
-            # Get the stored PulseBlock instance
-            block = self.get_block(block_name)
-
-            # Iterate over all repetitions of the current block
-            for rep_no in range(reps + 1):
-                # Iterate over the Block_Elements inside the current block
-                for element in block:
-                    # save bin position if a transition from low to high or vice versa has occurred
-                    # in a digital channel
-                    if tmp_digital_high != element.digital_high:
-                        for chnl, state in element.digital_high.items():
-                            if not tmp_digital_high[chnl] and state:
-                                digital_rising_bins[chnl].append(current_start_bin)
-                            elif tmp_digital_high[chnl] and not state:
-                                digital_falling_bins[chnl].append(current_start_bin)
-                        tmp_digital_high = element.digital_high.copy()
-
-                    if not laser_channel.startswith('d') and tmp_laser_on != element.laser_on:
-                        if not tmp_laser_on and element.laser_on:
-                            laser_rising_bins.append(current_start_bin)
-                        else:
-                            laser_falling_bins.append(current_start_bin)
-                        tmp_laser_on = element.laser_on
-
-                    # Calculate length of the current element with current repetition count in sec
-                    # and add this to the ideal end time for the sequence up until this point.
-                    current_end_time += element.init_length_s + rep_no * element.increment_s
-
-                    # Nearest possible match including the discretization in bins
-                    current_end_bin = int(np.rint(current_end_time * self.__sample_rate))
-
-                    # append current element length in discrete bins to temporary array
-                    elements_length_bins.append(current_end_bin - current_start_bin)
-
-                    # advance bin offset for next element
-                    current_start_bin = current_end_bin
-
-        elements_length_bins = np.array(elements_length_bins, dtype='int64')
-
-        # convert rising/falling indices to numpy.ndarrays. Remove duplicates.
-        for chnl in digital_channels:
-            digital_rising_bins[chnl] = sorted(set(digital_rising_bins[chnl]))
-            digital_falling_bins[chnl] = sorted(set(digital_falling_bins[chnl]))
-            digital_rising_bins[chnl] = np.array(digital_rising_bins[chnl], dtype='int64')
-            digital_falling_bins[chnl] = np.array(digital_falling_bins[chnl], dtype='int64')
+        channel_order = tuple(natural_sort(digital_channels))
+
+        # Compile all PulseBlocks into element tables and return cached analysis results if
+        # nothing has changed since the last analysis of this ensemble.
+        block_tables = [self._get_block_table(block_name, channel_order)
+                        for block_name, reps in ensemble]
+        cache_key = (tuple((block_name, reps) for block_name, reps in ensemble),
+                     channel_order,
+                     laser_channel,
+                     self.__sample_rate)
+        cached = self._ensemble_analysis_cache.get(ensemble.name)
+        if cached is not None and cached[0] == cache_key and len(cached[1]) == len(
+                block_tables) and all(x is y for x, y in zip(cached[1], block_tables)):
+            return_dict = copy.deepcopy(cached[2])
+            return_dict['generation_parameters'] = self.generation_parameters.copy()
+            return return_dict
+
+        elements, repetitions = self._expand_block_tables(ensemble, block_tables)
+
+        # Length of each element with current repetition count in sec and the ideal end time of
+        # each element. Nearest possible match including the discretization in bins.
+        end_times = np.cumsum(elements['init_length_s'] + repetitions * elements['increment_s'])
+        end_bins = np.rint(end_times * self.__sample_rate).astype('int64')
+        start_bins = np.empty_like(end_bins)
+        start_bins[:1] = 0
+        start_bins[1:] = end_bins[:-1]
+        elements_length_bins = end_bins - start_bins
+
+        # Digital channel state and laser_on flag of the previous element. The very first element
+        # is compared to the very last element of the ensemble.
+        previous_state = np.empty_like(elements['digital_state'])
+        previous_laser_on = np.empty_like(elements['laser_on'])
+        if len(elements) > 0:
+            last_table = block_tables[-1]
+            previous_state[0] = last_table['digital_state'][-1] if len(last_table) > 0 else 0
+            previous_laser_on[0] = last_table['laser_on'][-1] if len(last_table) > 0 else False
+            previous_state[1:] = elements['digital_state'][:-1]
+            previous_laser_on[1:] = elements['laser_on'][:-1]
+        rising_state = elements['digital_state'] & ~previous_state
+        falling_state = ~elements['digital_state'] & previous_state
+
+        # dicts containing the bins where the digital channels are rising/falling.
+        # Remove duplicates.
+        digital_rising_bins = dict()
+        digital_falling_bins = dict()
+        for bit, chnl in enumerate(channel_order):
+            mask = np.uint64(1 << bit)
+            digital_rising_bins[chnl] = np.unique(start_bins[(rising_state & mask) != 0])
+            digital_falling_bins[chnl] = np.unique(start_bins[(falling_state & mask) != 0])
         if laser_channel.startswith('d'):
             laser_rising_bins = digital_rising_bins[laser_channel]
             laser_falling_bins = digital_falling_bins[laser_channel]
         else:
-            laser_rising_bins = np.array(sorted(set(laser_rising_bins)), dtype='int64')
-            laser_falling_bins = np.array(sorted(set(laser_falling_bins)), dtype='int64')
+            laser_rising_bins = np.unique(
+                start_bins[elements['laser_on'] & ~previous_laser_on])
+            laser_falling_bins = np.unique(
+                start_bins[~elements['laser_on'] & previous_laser_on])
 
         return_dict = dict()
         return_dict['number_of_samples'] = np.sum(elements_length_bins)
@@ -1389,11 +1909,103 @@ class SequenceGeneratorLogic(LogicBase):
         return_dict['digital_channels'] = digital_channels
         return_dict['channel_set'] = analog_channels.union(digital_channels)
         return_dict['generation_parameters'] = self.generation_parameters.copy()
-        return_dict['ideal_length'] = current_end_time
+        return_dict['ideal_length'] = float(end_times[-1]) if len(end_times) > 0 else 0.0
         return_dict['laser_rising_bins'] = laser_rising_bins
         return_dict['laser_falling_bins'] = laser_falling_bins
+
+        self._ensemble_analysis_cache[ensemble.name] = (cache_key,
+                                                        block_tables,
+                                                        copy.deepcopy(return_dict))
         return return_dict
 
+    def _expand_block_tables(self, ensemble, block_tables):
+        """
+        Expands the element tables of all blocks of an ensemble including repetitions in the order
+        they are occurring in the waveform later on.
+
+        @param PulseBlockEnsemble ensemble: the ensemble the block tables belong to
+        @param list block_tables: element tables (see _get_block_table) of the ensemble blocks
+        @return (numpy.ndarray, numpy.ndarray): expanded element table and repetition index of each
+                                                element
+        """
+        element_tables = list()
+        repetitions = list()
+        for (block_name, reps), table in zip(ensemble, block_tables):
+            if len(table) == 0:
+                continue
+            element_tables.append(np.tile(table, reps + 1))
+            repetitions.append(np.repeat(np.arange(reps + 1, dtype='float64'), len(table)))
+        if element_tables:
+            return np.concatenate(element_tables), np.concatenate(repetitions)
+        return np.empty(0, dtype=self._element_table_dtype), np.empty(0, dtype='float64')
+
+    def compile_digital_pattern(self, ensemble, ensemble_info=None):
+        """
+        Compiles a PulseBlockEnsemble into a run-length encoded digital pattern without sampling.
+        The run boundaries are identical to the element transitions determined by
+        analyze_block_ensemble, i.e. the pattern describes exactly the same digital samples as
+        sample_pulse_block_ensemble would create. Consecutive elements with equal digital states are
+        merged into a single run and elements of zero length are dropped.
+
+        @param str|PulseBlockEnsemble ensemble: PulseBlockEnsemble instance or name of a saved
+                                                PulseBlockEnsemble
+        @param dict ensemble_info: optional, result of analyze_block_ensemble for this ensemble
+        @return (numpy.ndarray, dict): run lengths in samples (int64) and dict with the digital
+                                       channel descriptors as keys and bool arrays holding the
+                                       channel state in each run as values
+        """
+        if isinstance(ensemble, str):
+            ensemble = self.get_ensemble(ensemble)
+        if ensemble_info is None:
+            ensemble_info = self.analyze_block_ensemble(ensemble)
+        channel_order = tuple(natural_sort(ensemble_info['digital_channels']))
+
+        block_tables = [self._get_block_table(block_name, channel_order)
+                        for block_name, reps in ensemble]
+        elements, _ = self._expand_block_tables(ensemble, block_tables)
+        lengths = np.asarray(ensemble_info['elements_length_bins'], dtype='int64')
+        non_empty = lengths > 0
+        lengths = lengths[non_empty]
+        states = elements['digital_state'][non_empty]
+
+        # Merge consecutive elements with identical digital states
+        run_starts = np.flatnonzero(np.concatenate(([len(states) > 0], states[1:] != states[:-1])))
+        run_lengths = np.add.reduceat(lengths, run_starts) if len(run_starts) > 0 else lengths[:0]
+        run_states = states[run_starts]
+        digital_states = dict()
+        for bit, chnl in enumerate(channel_order):
+            digital_states[chnl] = (run_states & np.uint64(1 << bit)) != 0
+        return run_lengths, digital_states
+
+    def _get_block_table(self, block_name, channel_order):
+        """
+        Compiles a saved PulseBlock into a structured numpy array with one entry per
+        PulseBlockElement (see _element_table_dtype). The digital channel states are stored as bit
+        mask with bit positions according to channel_order.
+        Compiled tables are cached until the block is saved or deleted.
+
+        @param str block_name: Name of the saved PulseBlock
+        @param tuple channel_order: digital channel descriptors in bit order
+        @return numpy.ndarray: element table
+        """
+        block = self.get_block(block_name)
+        cached = self._block_table_cache.get(block_name)
+        if cached is not None and cached[0] is block and cached[1] == channel_order:
+            return cached[2]
+
+        table = np.zeros(len(block), dtype=self._element_table_dtype)
+        for ii, element in enumerate(block):
+            digital_state = 0
+            for bit, chnl in enumerate(channel_order):
+                if element.digital_high.get(chnl, False):
+                    digital_state |= 1 << bit
+            table[ii] = (element.init_length_s,
+                         element.increment_s,
+                         digital_state,
+                         element.laser_on)
+        self._block_table_cache[block_name] = (block, channel_order, table)
+        return table
+
     def analyze_sequence(self, sequence):
         """
         This helper method runs through each step of a PulseSequence object and extracts
@@ -1693,6 +2305,11 @@ class SequenceGeneratorLogic(LogicBase):
         The chunkwise write mode is used to save memory usage at the expense of time.
         In other words: The whole sample arrays are never created at any time. This results in more
         function calls and general overhead causing much longer time to complete.
+        The element segments within each chunk are sampled concurrently by a thread pool
+        (ConfigOption "sampling_threads"). Chunks are written to the device in order.
+        Purely digital ensembles are not sampled at all if the pulse generator implements
+        DigitalPatternPulserMixin. Instead the run-length encoded pattern created by
+        compile_digital_pattern is written in a single call.
 
         In addition the pulse_block_ensemble gets analyzed and important parameters used during
         sampling get stored in the ensemble object "sampling_information" attribute.
@@ -1715,6 +2332,7 @@ class SequenceGeneratorLogic(LogicBase):
         # lock module if it's not already locked (sequence sampling in progress)
         if self.module_state() == 'idle':
             self.module_state.lock()
+            self._sample_memo.clear()
         elif not self.__sequence_generation_in_progress:
             self.sigSampleEnsembleComplete.emit(None)
             return -1, list(), dict()
@@ -1722,9 +2340,6 @@ class SequenceGeneratorLogic(LogicBase):
         # Set the waveform name (excluding the device specific channel naming suffix, i.e. '_ch1')
         waveform_name = name_tag if name_tag else ensemble.name
 
-        # check for old waveforms associated with the ensemble and delete them from pulse generator.
-        self._delete_waveform_by_nametag(waveform_name)
-
         # Take current time
         start_time = time.time()
 
@@ -1779,11 +2394,20 @@ class SequenceGeneratorLogic(LogicBase):
         # Calculate the bytes estimate for the entire ensemble
         bytes_per_ensemble = bytes_per_sample * ensemble_info['number_of_samples']
 
-        # Determine the size of the sample arrays to be written as a whole.
-        if bytes_per_ensemble <= self._overhead_bytes or self._overhead_bytes == 0:
+        # Determine the size of the sample arrays to be written as a whole. The element samples
+        # memo is counted against overhead_bytes.
+        sample_array_bytes = self._overhead_bytes - self._sample_memo.max_bytes
+        if self._overhead_bytes == 0 or bytes_per_ensemble <= sample_array_bytes:
             array_length = ensemble_info['number_of_samples']
         else:
-            array_length = self._overhead_bytes // bytes_per_sample
+            array_length = max(1, sample_array_bytes // bytes_per_sample)
+        # If the ensemble is sampled in several chunks and pipelining is enabled, a second set of
+        # sample arrays is sampled while the first one is written to the device. The sampled chunks
+        # are halved in this case to keep both sets within overhead_bytes. Chunks read from the
+        # waveform cache or digital patterns are written with the full array length.
+        pipelined = (self._pipeline_executor is not None and
+                     array_length < ensemble_info['number_of_samples'])
+        sampling_length = max(1, array_length // 2) if pipelined else array_length
 
         n_max_samples = self.pulsegenerator().get_constraints().waveform_length.max
         if n_max_samples > 0. and ensemble_info['number_of_samples'] > n_max_samples:
@@ -1795,26 +2419,39 @@ class SequenceGeneratorLogic(LogicBase):
             self.sigSampleEnsembleComplete.emit(None)
             return -1, list(), dict()
 
-        # Allocate the sample arrays that are used for a single write command
-        analog_samples = dict()
-        digital_samples = dict()
-        try:
-            for chnl in ensemble_info['analog_channels']:
-                analog_samples[chnl] = np.empty(array_length, dtype='float32')
-            for chnl in ensemble_info['digital_channels']:
-                digital_samples[chnl] = np.empty(array_length, dtype=bool)
-        except MemoryError:
-            self.log.error('Sampling of PulseBlockEnsemble "{0}" failed due to a MemoryError.\n'
-                           'The sample array needed is too large to allocate in memory.\n'
-                           'Try using the overhead_bytes ConfigOption to limit memory usage.'
-                           ''.format(ensemble.name))
-            if not self.__sequence_generation_in_progress:
-                self.module_state.unlock()
-            self.sigSampleEnsembleComplete.emit(None)
-            return -1, list(), dict()
+        # Sequence sampling keeps track of the progress of all its ensembles
+        if not self.__sequence_generation_in_progress:
+            self._start_sampling_progress(ensemble_info['number_of_samples'])
 
-        t_est_upload = self._benchmark_write.estimate_time(ensemble_info['number_of_samples'])
-        if t_est_upload > self._info_on_estimated_upload_time:
+        # Skip sampling and writing if the very same waveform is already present on the device
+        content_hash = self._get_ensemble_content_hash(ensemble, offset_bin, sampling_length)
+        device_entry = self._device_waveforms.get(waveform_name)
+        if device_entry is not None and device_entry['hash'] == content_hash:
+            ready_waveforms = self.sampled_waveforms
+            if all(wfm in ready_waveforms for wfm in device_entry['waveforms']):
+                self.log.info('PulseBlockEnsemble "{0}" is already present on the device. '
+                              'Skipping sampling.'.format(ensemble.name))
+                if ensemble.rotating_frame:
+                    offset_bin += ensemble_info['number_of_samples']
+                if waveform_name == ensemble.name:
+                    ensemble.sampling_information = dict()
+                    ensemble.sampling_information.update(ensemble_info)
+                    ensemble.sampling_information['pulse_generator_settings'] = self.pulse_generator_settings
+                    ensemble.sampling_information['waveforms'] = device_entry['waveforms']
+                    self.save_ensemble(ensemble)
+                self._advance_sampling_progress(ensemble_info['number_of_samples'])
+                if not self.__sequence_generation_in_progress:
+                    self.module_state.unlock()
+                self.sigAvailableWaveformsUpdated.emit(self.sampled_waveforms)
+                self.sigSampleEnsembleComplete.emit(ensemble)
+                return offset_bin, list(device_entry['waveforms']), ensemble_info
+
+        # check for old waveforms associated with the ensemble and delete them from pulse generator.
+        self._delete_waveform_by_nametag(waveform_name)
+
+        t_est_upload = self.estimate_sampling_time(ensemble_info['number_of_samples'])
+        if t_est_upload > self._info_on_estimated_upload_time and not self._use_digital_pattern(
+                ensemble_info):
             now = datetime.datetime.now()
             self.log.info("Estimated finish of writing for long waveform:"
                           " {0:%Y-%m-%d %H:%M:%S} ({1:d} s)".format(
@@ -1822,103 +2459,140 @@ class SequenceGeneratorLogic(LogicBase):
 
         # integer to keep track of the sampls already processed
         processed_samples = 0
-        # Index to keep track of the samples written into the preallocated samples array
-        array_write_index = 0
-        # Keep track of the number of elements already written
-        element_count = 0
+        # time spent sampling each chunk and total time spent in write_waveform calls
+        sampling_times = list()
+        write_time = 0
         # set of written waveform names on the device
         written_waveforms = set()
-        # Iterate over all blocks within the PulseBlockEnsemble object
-        for block_name, reps in ensemble.block_list:
-            block = self.get_block(block_name)
-            # Iterate over all repetitions of the current block
-            for rep_no in range(reps + 1):
-                # Iterate over the PulseBlockElement instances inside the current block
-                for element in block.element_list:
-                    digital_high = element.digital_high
-                    pulse_function = element.pulse_function
-                    element_length_bins = ensemble_info['elements_length_bins'][element_count]
-
-                    # Indicator on how many samples of this element have been written already
-                    element_samples_written = 0
-
-                    while element_samples_written != element_length_bins:
-                        samples_to_add = min(array_length - array_write_index,
-                                             element_length_bins - element_samples_written)
-                        # create floating point time array for the current element inside rotating
-                        # frame if analog samples are to be calculated.
-                        if pulse_function:
-                            time_arr = (offset_bin + np.arange(
-                                samples_to_add, dtype='float64')) / self.__sample_rate
-
-                        # Calculate respective part of the sample arrays
-                        for chnl in digital_high:
-                            digital_samples[chnl][array_write_index:array_write_index + samples_to_add] = digital_high[
-                                chnl]
-                        for chnl in pulse_function:
-                            analog_samples[chnl][array_write_index:array_write_index + samples_to_add] = pulse_function[
-                                                                                                             chnl].get_samples(
-                                time_arr) #/ (self.__analog_levels[0][chnl] / 2)
-
-                        # Free memory
-                        if pulse_function:
-                            del time_arr
-
-                        element_samples_written += samples_to_add
-                        array_write_index += samples_to_add
-                        processed_samples += samples_to_add
-                        # if the rotating frame should be preserved (default) increment the offset
-                        # counter for the time array.
-                        if ensemble.rotating_frame:
-                            offset_bin += samples_to_add
-
-                        # Check if the temporary sample array is full and write to the device if so.
-                        if array_write_index == array_length:
-                            # Set first/last chunk flags
-                            is_first_chunk = array_write_index == processed_samples
-                            is_last_chunk = processed_samples == ensemble_info['number_of_samples']
-                            written_samples, wfm_list = self.pulsegenerator().write_waveform(
-                                name=waveform_name,
-                                analog_samples=analog_samples,
-                                digital_samples=digital_samples,
-                                is_first_chunk=is_first_chunk,
-                                is_last_chunk=is_last_chunk,
-                                total_number_of_samples=ensemble_info['number_of_samples'])
-
-                            # Update written waveforms set
-                            written_waveforms.update(wfm_list)
-
-                            # check if write process was successful
-                            if written_samples != array_length:
-                                self.log.error('Sampling of block "{0}" in ensemble "{1}" failed. '
-                                               'Write to device was unsuccessful.\nThe number of '
-                                               'actually written samples ({2:d}) does not match '
-                                               'the number of samples staged to write ({3:d}).'
-                                               ''.format(block_name, ensemble.name, written_samples,
-                                                         array_length))
-                                if not self.__sequence_generation_in_progress:
-                                    self.module_state.unlock()
-                                self.sigAvailableWaveformsUpdated.emit(self.sampled_waveforms)
-                                self.sigSampleEnsembleComplete.emit(None)
-                                return -1, list(), dict()
-
-                            # Reset array write start pointer
-                            array_write_index = 0
-
-                            # check if the temporary write array needs to be truncated for the next
-                            # part. (because it is the last part of the ensemble to write which can
-                            # be shorter than the previous chunks)
-                            if array_length > ensemble_info['number_of_samples'] - processed_samples:
-                                array_length = ensemble_info['number_of_samples'] - processed_samples
-                                analog_samples = dict()
-                                digital_samples = dict()
-                                for chnl in ensemble_info['analog_channels']:
-                                    analog_samples[chnl] = np.empty(array_length, dtype='float32')
-                                for chnl in ensemble_info['digital_channels']:
-                                    digital_samples[chnl] = np.empty(array_length, dtype=bool)
-
-                    # Increment element index
-                    element_count += 1
+        cache_entry = None
+        # Purely digital waveforms are handed over as run-length encoded pattern to pulse
+        # generators supporting it. No samples are created at all in this case.
+        if self._use_digital_pattern(ensemble_info):
+            run_lengths, digital_states = self.compile_digital_pattern(ensemble, ensemble_info)
+            written_samples, wfm_list = self.pulsegenerator().write_digital_pattern(
+                name=waveform_name,
+                run_lengths=run_lengths,
+                digital_states=digital_states,
+                total_number_of_samples=ensemble_info['number_of_samples'])
+            written_waveforms.update(wfm_list)
+            if written_samples != ensemble_info['number_of_samples']:
+                self.log.error('Writing of digital pattern for ensemble "{0}" failed.\nThe number '
+                               'of actually written samples ({1:d}) does not match the number of '
+                               'samples in the ensemble ({2:d}).'
+                               ''.format(ensemble.name, written_samples,
+                                         ensemble_info['number_of_samples']))
+                if not self.__sequence_generation_in_progress:
+                    self.module_state.unlock()
+                self.sigAvailableWaveformsUpdated.emit(self.sampled_waveforms)
+                self.sigSampleEnsembleComplete.emit(None)
+                return -1, list(), dict()
+            processed_samples = written_samples
+            self._advance_sampling_progress(written_samples)
+        else:
+            # Read waveform chunks from the local disk cache if available. Otherwise sample the chunks
+            # and store them in the cache.
+            cache_writer = None
+            cache_entry = self._waveform_cache.get(content_hash)
+            if cache_entry is not None:
+                self.log.debug('Writing PulseBlockEnsemble "{0}" from waveform cache.'
+                               ''.format(ensemble.name))
+                chunks = self._waveform_cache.iter_chunks(cache_entry, array_length)
+            else:
+                # Allocate the sample arrays that are used for a single write command (two sets if
+                # sampling and writing are pipelined).
+                sample_buffers = list()
+                try:
+                    for buffer_index in range(2 if pipelined else 1):
+                        analog_samples = dict()
+                        digital_samples = dict()
+                        for chnl in ensemble_info['analog_channels']:
+                            analog_samples[chnl] = np.empty(sampling_length, dtype='float32')
+                        for chnl in ensemble_info['digital_channels']:
+                            digital_samples[chnl] = np.empty(sampling_length, dtype=bool)
+                        sample_buffers.append((analog_samples, digital_samples))
+                except MemoryError:
+                    self.log.error('Sampling of PulseBlockEnsemble "{0}" failed due to a MemoryError.\n'
+                                   'The sample array needed is too large to allocate in memory.\n'
+                                   'Try using the overhead_bytes ConfigOption to limit memory usage.'
+                                   ''.format(ensemble.name))
+                    if not self.__sequence_generation_in_progress:
+                        self.module_state.unlock()
+                    self.sigSampleEnsembleComplete.emit(None)
+                    return -1, list(), dict()
+                cache_writer = self._waveform_cache.open_writer(content_hash,
+                                                                ensemble_info['analog_channels'],
+                                                                ensemble_info['digital_channels'])
+                if pipelined:
+                    chunks = self._iter_pipelined_chunks(ensemble,
+                                                         ensemble_info,
+                                                         offset_bin,
+                                                         sample_buffers,
+                                                         sampling_times)
+                else:
+                    chunks = self._iter_sampled_chunks(ensemble,
+                                                       ensemble_info,
+                                                       offset_bin,
+                                                       analog_samples,
+                                                       digital_samples,
+                                                       sampling_times)
+
+            # Iterate over all chunks of the ensemble and write them to the device.
+            try:
+                for analog_samples, digital_samples in chunks:
+                    array_length = len(next(iter(analog_samples.values()))) if analog_samples else len(
+                        next(iter(digital_samples.values())))
+                    processed_samples += array_length
+                    if cache_writer is not None:
+                        cache_writer.append(analog_samples, digital_samples)
+
+                    # Set first/last chunk flags
+                    is_first_chunk = array_length == processed_samples
+                    is_last_chunk = processed_samples == ensemble_info['number_of_samples']
+                    write_start = time.perf_counter()
+                    written_samples, wfm_list = self.pulsegenerator().write_waveform(
+                        name=waveform_name,
+                        analog_samples=analog_samples,
+                        digital_samples=digital_samples,
+                        is_first_chunk=is_first_chunk,
+                        is_last_chunk=is_last_chunk,
+                        total_number_of_samples=ensemble_info['number_of_samples'])
+                    write_time += time.perf_counter() - write_start
+
+                    # Update written waveforms set
+                    written_waveforms.update(wfm_list)
+                    self._advance_sampling_progress(array_length)
+
+                    # check if write process was successful
+                    if written_samples != array_length:
+                        self.log.error('Sampling of ensemble "{0}" failed. '
+                                       'Write to device was unsuccessful.\nThe number of '
+                                       'actually written samples ({1:d}) does not match '
+                                       'the number of samples staged to write ({2:d}).'
+                                       ''.format(ensemble.name, written_samples, array_length))
+                        if cache_writer is not None:
+                            cache_writer.abort()
+                        if not self.__sequence_generation_in_progress:
+                            self.module_state.unlock()
+                        self.sigAvailableWaveformsUpdated.emit(self.sampled_waveforms)
+                        self.sigSampleEnsembleComplete.emit(None)
+                        return -1, list(), dict()
+            except:
+                if cache_writer is not None:
+                    cache_writer.abort()
+                raise
+            finally:
+                # Stop sampling ahead if writing has been aborted
+                chunks.close()
+            if cache_writer is not None:
+                cache_writer.commit()
+
+        # Remember the waveform content present on the device
+        self._device_waveforms[waveform_name] = {'hash': content_hash,
+                                                 'waveforms': natural_sort(written_waveforms)}
+
+        # if the rotating frame should be preserved (default) increment the offset counter
+        if ensemble.rotating_frame:
+            offset_bin += processed_samples
 
         # Save sampling related parameters to the sampling_information container within the
         # PulseBlockEnsemble.
@@ -1933,13 +2607,28 @@ class SequenceGeneratorLogic(LogicBase):
 
         self.log.info('Time needed for sampling and writing PulseBlockEnsemble {0} to device: {1} sec'
                       ''.format(ensemble.name, int(np.rint(time.time() - start_time))))
+        self.log.debug('Element sample memo: {0:d} hits, {1:d} misses'
+                       ''.format(self._sample_memo.hits, self._sample_memo.misses))
         self.log.debug('Estimated {:.3f} s from current estimated write speed {:.2f} MSa/s'
                        ' from {} benchmarks'.format(
             self._benchmark_write.estimate_time(ensemble_info['number_of_samples']),
             self._benchmark_write.estimate_speed() / 1e6,
             self._benchmark_write.n_benchmarks))
 
-        self._benchmark_write.add_benchmark(time.time() - start_time, ensemble_info['number_of_samples'])
+        # Writing from waveform cache or digital patterns does not include sampling time
+        if cache_entry is None and not self._use_digital_pattern(ensemble_info):
+            self._benchmark_write.add_benchmark(time.time() - start_time,
+                                                ensemble_info['number_of_samples'])
+            self._benchmark_sampling.add_benchmark(sum(sampling_times),
+                                                   ensemble_info['number_of_samples'])
+            self._benchmark_upload.add_benchmark(write_time, ensemble_info['number_of_samples'])
+            self.log.debug('Sampling {0:.3f} s ({1:.2f} MSa/s), writing {2:.3f} s ({3:.2f} MSa/s) '
+                           'in {4:d} chunks'.format(
+                sum(sampling_times),
+                ensemble_info['number_of_samples'] / max(sum(sampling_times), 1e-9) / 1e6,
+                write_time,
+                ensemble_info['number_of_samples'] / max(write_time, 1e-9) / 1e6,
+                len(sampling_times)))
 
         if ensemble_info['number_of_samples'] == 0:
             self.log.warning('Empty waveform (0 samples) created from PulseBlockEnsemble "{0}".'
@@ -1950,6 +2639,245 @@ class SequenceGeneratorLogic(LogicBase):
         self.sigSampleEnsembleComplete.emit(ensemble)
         return offset_bin, natural_sort(written_waveforms), ensemble_info
 
+    def _use_digital_pattern(self, ensemble_info):
+        """ Check if an analyzed ensemble can be written as run-length encoded digital pattern,
+        i.e. it has no analog channels and the pulse generator implements DigitalPatternPulserMixin.
+        """
+        return not ensemble_info['analog_channels'] and isinstance(self.pulsegenerator(),
+                                                                   DigitalPatternPulserMixin)
+
+    def _get_ensemble_content_hash(self, ensemble, offset_bin, chunk_length):
+        """ Hash of everything the samples of a PulseBlockEnsemble depend on, i.e. the content of
+        all PulseBlocks, the rotating frame offset, the pulse generator settings and the chunk
+        length (elements are sampled in parts if they are split by chunk borders).
+
+        @param PulseBlockEnsemble ensemble: The ensemble to hash
+        @param int offset_bin: Rotating frame offset of the first sample
+        @param int chunk_length: Number of samples sampled at once
+        @return str: hex digest content hash
+        """
+        generator_settings = self.pulse_generator_settings
+        generator_settings.pop('upload_speed', None)
+        blocks = {block_name: self.get_block(block_name).get_dict_representation()['element_list']
+                  for block_name, reps in ensemble.block_list}
+        return get_content_hash(ensemble.block_list,
+                                blocks,
+                                bool(ensemble.rotating_frame),
+                                int(offset_bin),
+                                int(chunk_length),
+                                generator_settings)
+
+    def _iter_sampled_chunks(self, ensemble, ensemble_info, offset_bin, analog_samples,
+                             digital_samples, sampling_times=None):
+        """ Generator sampling a PulseBlockEnsemble chunk by chunk into the given preallocated
+        sample arrays. The arrays are reallocated for the last chunk if it is shorter.
+
+        @param list sampling_times: optional, the time needed to sample each chunk is appended
+        @return tuple: (analog_samples, digital_samples) dicts of sample arrays for each channel
+        """
+        array_length = len(next(iter(analog_samples.values()))) if analog_samples else len(
+            next(iter(digital_samples.values())))
+        for chunk_length, segments in self._iter_ensemble_chunks(ensemble,
+                                                                 ensemble_info,
+                                                                 array_length,
+                                                                 offset_bin):
+            # check if the temporary write array needs to be truncated for this part.
+            # (because it is the last part of the ensemble to write which can be shorter than the
+            # previous chunks)
+            if chunk_length != array_length:
+                array_length = chunk_length
+                analog_samples = dict()
+                digital_samples = dict()
+                for chnl in ensemble_info['analog_channels']:
+                    analog_samples[chnl] = np.empty(array_length, dtype='float32')
+                for chnl in ensemble_info['digital_channels']:
+                    digital_samples[chnl] = np.empty(array_length, dtype=bool)
+
+            sampling_start = time.perf_counter()
+            self._sample_element_segments(segments, analog_samples, digital_samples)
+            if sampling_times is not None:
+                sampling_times.append(time.perf_counter() - sampling_start)
+            yield analog_samples, digital_samples
+
+    def _iter_pipelined_chunks(self, ensemble, ensemble_info, offset_bin, sample_buffers,
+                               sampling_times=None):
+        """ Generator yielding the same chunks as _iter_sampled_chunks. The chunks are sampled in
+        the pipeline thread, so the next chunk is sampled while the caller writes the previous one
+        to the device.
+
+        The sample arrays are taken from sample_buffers (list of (analog_samples, digital_samples)
+        tuples, usually two). A set of arrays is only sampled again after the caller requested the
+        next chunk, i.e. the yielded arrays are valid until the next iteration. Closing the
+        generator stops the sampling.
+
+        @param list sample_buffers: preallocated sets of sample arrays with the chunk length
+        @param list sampling_times: optional, the time needed to sample each chunk is appended
+        @return tuple: (analog_samples, digital_samples) dicts of sample arrays for each channel
+        """
+        free_buffers = queue.Queue()
+        for sample_buffer in sample_buffers:
+            free_buffers.put(sample_buffer)
+        sampled_chunks = queue.Queue()
+        stop_event = threading.Event()
+        analog_buffer, digital_buffer = sample_buffers[0]
+        array_length = len(next(iter(analog_buffer.values()))) if analog_buffer else len(
+            next(iter(digital_buffer.values())))
+
+        def sample_chunks():
+            try:
+                for chunk_length, segments in self._iter_ensemble_chunks(ensemble,
+                                                                         ensemble_info,
+                                                                         array_length,
+                                                                         offset_bin):
+                    sample_buffer = free_buffers.get()
+                    if stop_event.is_set():
+                        return
+                    analog_samples, digital_samples = sample_buffer
+                    # Use views on the arrays for the last chunk if it is shorter
+                    if chunk_length != array_length:
+                        analog_samples = {chnl: samples[:chunk_length] for chnl, samples in
+                                          analog_samples.items()}
+                        digital_samples = {chnl: samples[:chunk_length] for chnl, samples in
+                                           digital_samples.items()}
+                    sampling_start = time.perf_counter()
+                    self._sample_element_segments(segments, analog_samples, digital_samples)
+                    sampled_chunks.put((sample_buffer,
+                                        analog_samples,
+                                        digital_samples,
+                                        time.perf_counter() - sampling_start))
+                sampled_chunks.put(None)
+            except BaseException as err:
+                sampled_chunks.put(err)
+
+        future = self._pipeline_executor.submit(sample_chunks)
+        try:
+            while True:
+                chunk = sampled_chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                sample_buffer, analog_samples, digital_samples, sampling_time = chunk
+                if sampling_times is not None:
+                    sampling_times.append(sampling_time)
+                yield analog_samples, digital_samples
+                free_buffers.put(sample_buffer)
+        finally:
+            stop_event.set()
+            free_buffers.put(None)
+            future.result()
+
+    def _iter_ensemble_chunks(self, ensemble, ensemble_info, chunk_length, offset_bin):
+        """ Generator splitting a PulseBlockEnsemble into consecutive chunks of samples to be
+        written to the device at once.
+
+        Yields a tuple (chunk_length, segments) for each chunk. The segments are a list of tuples
+        (block_name, element, array_index, number_of_samples, offset_bin) describing which part of
+        a PulseBlockElement to sample at which position of the chunk sample arrays. The offset_bin
+        is the absolute sample index within the rotating frame the segment starts with.
+        Elements are only split at chunk borders, so all segments are independent of each other.
+
+        @param PulseBlockEnsemble ensemble: The ensemble to split into chunks
+        @param dict ensemble_info: Ensemble information as returned by analyze_block_ensemble
+        @param int chunk_length: Maximum number of samples in one chunk
+        @param int offset_bin: Rotating frame offset of the first sample
+        """
+        remaining_samples = ensemble_info['number_of_samples']
+        current_length = min(chunk_length, remaining_samples)
+        segments = list()
+        array_write_index = 0
+        element_count = 0
+        for block_name, reps in ensemble.block_list:
+            block = self.get_block(block_name)
+            for rep_no in range(reps + 1):
+                for element in block.element_list:
+                    element_length_bins = ensemble_info['elements_length_bins'][element_count]
+                    element_count += 1
+                    element_samples_written = 0
+                    while element_samples_written != element_length_bins:
+                        samples_to_add = min(current_length - array_write_index,
+                                             element_length_bins - element_samples_written)
+                        segments.append(
+                            (block_name, element, array_write_index, samples_to_add, offset_bin)
+                        )
+                        element_samples_written += samples_to_add
+                        array_write_index += samples_to_add
+                        if ensemble.rotating_frame:
+                            offset_bin += samples_to_add
+                        if array_write_index == current_length:
+                            yield current_length, segments
+                            remaining_samples -= current_length
+                            current_length = min(chunk_length, remaining_samples)
+                            segments = list()
+                            array_write_index = 0
+
+    def _sample_element_segments(self, segments, analog_samples, digital_samples):
+        """ Samples element segments (see _iter_ensemble_chunks) into the given sample arrays.
+        Segments are grouped into tasks of at least _min_samples_per_sampling_task samples which are
+        processed by the sampling thread pool if there is more than one task.
+
+        @param list segments: element segments to sample
+        @param dict analog_samples: sample arrays (float32) for each analog channel
+        @param dict digital_samples: sample arrays (bool) for each digital channel
+        """
+        tasks = list()
+        task = list()
+        task_samples = 0
+        for segment in segments:
+            task.append(segment)
+            task_samples += segment[3]
+            if task_samples >= self._min_samples_per_sampling_task:
+                tasks.append(task)
+                task = list()
+                task_samples = 0
+        if task:
+            tasks.append(task)
+
+        if self._sampling_executor is None or len(tasks) < 2:
+            for task in tasks:
+                self._sample_segment_task(task, analog_samples, digital_samples)
+            return
+
+        futures = [self._sampling_executor.submit(self._sample_segment_task,
+                                                  task,
+                                                  analog_samples,
+                                                  digital_samples) for task in tasks]
+        wait(futures)
+        # Raise exceptions of failed tasks
+        for future in futures:
+            future.result()
+        return
+
+    def _sample_segment_task(self, segments, analog_samples, digital_samples):
+        """ Samples a list of element segments. Each segment writes to a separate part of the
+        sample arrays, so this can safely run in multiple threads at once.
+        Analog samples of segments already sampled before (same sampling function, length and
+        offset key) are copied from the sample memo instead of sampling them again. All other
+        analog samples are written directly into the sample arrays (see get_samples_into).
+        """
+        sample_rate = self.__sample_rate
+        memo = self._sample_memo
+        for block_name, element, array_index, samples_to_add, offset_bin in segments:
+            digital_high = element.digital_high
+            pulse_function = element.pulse_function
+            array_slice = slice(array_index, array_index + samples_to_add)
+            # Calculate respective part of the sample arrays
+            for chnl in digital_high:
+                digital_samples[chnl][array_slice] = digital_high[chnl]
+            for chnl, func in pulse_function.items():
+                key = memo.get_key(func, samples_to_add, offset_bin, sample_rate)
+                samples = memo.get(key)
+                if samples is None:
+                    # sample directly into the sample array (time offset inside rotating frame)
+                    func.get_samples_into(offset_bin / sample_rate,
+                                          samples_to_add,
+                                          analog_samples[chnl][array_slice],
+                                          sample_rate)
+                    memo.put(key, analog_samples[chnl][array_slice])
+                else:
+                    analog_samples[chnl][array_slice] = samples
+        return
+
     @QtCore.Slot(str)
     def sample_pulse_sequence(self, sequence):
         """ Samples the PulseSequence object, which serves as the construction plan.
@@ -1985,6 +2913,7 @@ class SequenceGeneratorLogic(LogicBase):
         if self.module_state() == 'idle':
             self.__sequence_generation_in_progress = True
             self.module_state.lock()
+            self._sample_memo.clear()
         else:
             self.log.error('Cannot sample sequence "{0}" because the SequenceGeneratorLogic is '
                            'still busy (locked).\nFunction call ignored.'.format(sequence.name))
@@ -2004,6 +2933,23 @@ class SequenceGeneratorLogic(LogicBase):
         # Take current time
         start_time = time.time()
 
+        # Total number of samples of all sequence steps for progress reporting. Steps of already
+        # sampled ensembles are counted as done once they are reached.
+        total_samples = 0
+        counted_ensembles = set()
+        for seq_step in sequence:
+            if sequence.rotating_frame or seq_step.ensemble not in counted_ensembles:
+                counted_ensembles.add(seq_step.ensemble)
+                total_samples += self.analyze_block_ensemble(
+                    seq_step.ensemble)['number_of_samples']
+        self._start_sampling_progress(total_samples)
+        t_est = self.estimate_sampling_time(total_samples)
+        if t_est > self._info_on_estimated_upload_time:
+            now = datetime.datetime.now()
+            self.log.info('Estimated finish of sampling and writing PulseSequence "{0}": '
+                          '{1:%Y-%m-%d %H:%M:%S} ({2:d} s)'
+                          ''.format(sequence.name, now + datetime.timedelta(0, t_est), int(t_est)))
+
         # Produce a set of created waveforms
         written_waveforms = set()
         # Keep track of generated PulseBlockEnsembles and their corresponding ensemble_info dict
@@ -2056,6 +3002,8 @@ class SequenceGeneratorLogic(LogicBase):
             else:
                 self.log.debug('Waveform already sampled: {0}'.format(name_tag))
                 ensemble_info = self.get_ensemble(name_tag).sampling_information.copy()
+                if name_tag not in generated_ensembles:
+                    self._advance_sampling_progress(ensemble_info['number_of_samples'])
                 del(ensemble_info['pulse_generator_settings'])
                 generated_ensembles[name_tag] = ensemble_info
 
@@ -2102,6 +3050,12 @@ class SequenceGeneratorLogic(LogicBase):
         for wfm in names:
             if wfm in current_waveforms:
                 self.pulsegenerator().delete_waveform(wfm)
+        # Forget about deleted waveforms present on the device
+        names = set(names)
+        self._stored_assets_waveforms.difference_update(names)
+        for waveform_name, entry in list(self._device_waveforms.items()):
+            if names.intersection(entry['waveforms']):
+                del self._device_waveforms[waveform_name]
         self.sigAvailableWaveformsUpdated.emit(self.sampled_waveforms)
         return
 
@@ -2126,6 +3080,7 @@ class SequenceGeneratorLogic(LogicBase):
         for seq in names:
             if seq in current_sequences:
                 self.pulsegenerator().delete_sequence(seq)
+        self._stored_assets_sequences.difference_update(names)
         self.sigAvailableSequencesUpdated.emit(self.sampled_sequences)
         return
     
@@ -2346,3 +3301,105 @@ class SequenceGeneratorLogic(LogicBase):
             return speed_combined
 
         return np.nan
+
+    def estimate_sampling_time(self, number_of_samples):
+        """
+        Estimate the time needed to sample and write a waveform to the pulse generator based on the
+        benchmarks of the current pulse generator and channel config.
+
+        @param int number_of_samples: number of samples of the waveform
+        @return float: estimated time in s, -1 if no valid benchmark is available
+        """
+        t_est = self._benchmark_write.estimate_time(number_of_samples)
+        if not t_est >= 0:
+            # Fall back to separate sampling and upload benchmarks (e.g. imported models)
+            t_est = self._benchmark_sampling.estimate_time(number_of_samples) + \
+                    self._benchmark_upload.estimate_time(number_of_samples)
+            if not (t_est >= 0 and self._benchmark_sampling.sanity and self._benchmark_upload.sanity):
+                return -1
+        return float(t_est)
+
+    @property
+    def benchmark_key(self):
+        """ Key of the benchmark models of the current pulse generator and channel config """
+        return get_benchmark_key(self.pulsegenerator(), self.__activation_config[1])
+
+    @property
+    def _benchmark_tools(self):
+        return {'write': self._benchmark_write,
+                'load': self._benchmark_load,
+                'batch': self._benchmark_batch,
+                'sampling': self._benchmark_sampling,
+                'upload': self._benchmark_upload}
+
+    def _store_benchmark_models(self):
+        """ Save the state of the active benchmarks under the current benchmark key """
+        if self._benchmark_key is not None:
+            self._benchmark_models[self._benchmark_key] = {
+                kind: tool.save() for kind, tool in self._benchmark_tools.items()
+            }
+
+    def _select_benchmark_models(self):
+        """
+        Activate the benchmarks of the current pulse generator and channel config. The benchmarks
+        of the previous config are kept in _benchmark_models.
+        """
+        key = self.benchmark_key
+        if key == self._benchmark_key:
+            return
+        self._store_benchmark_models()
+        models = self._benchmark_models.get(key)
+        # Benchmarks restored from the legacy StatusVars (no models saved yet) are kept for the
+        # first config
+        if models is not None or self._benchmark_key is not None:
+            for kind, tool in self._benchmark_tools.items():
+                tool.reset()
+                if models is not None and kind in models:
+                    tool.load_from_dict(saved_dict=copy.deepcopy(models[kind]))
+        self._benchmark_key = key
+        self.log.debug('Using benchmark models "{0}".'.format(key))
+
+    def import_benchmark_models(self, file_path):
+        """
+        Import benchmark models from a JSON file created by the pulser benchmark suite
+        (see qudi.logic.pulsed.pulser_benchmark). Models of the current pulse generator and channel
+        config are activated immediately.
+
+        @param str file_path: path of the JSON file
+        """
+        try:
+            with open(file_path, 'r') as file:
+                models = json.load(file)
+        except (OSError, ValueError):
+            self.log.exception('Unable to import benchmark models from "{0}":'.format(file_path))
+            return
+        self._store_benchmark_models()
+        for key, kind_models in models.items():
+            self._benchmark_models.setdefault(key, dict()).update(kind_models)
+        if self._benchmark_key in models:
+            # Force reloading the active benchmarks
+            self._benchmark_key = None
+            self._select_benchmark_models()
+        self.__upload_speed = self.get_speed_write_load()
+        self.log.info('Imported benchmark models for {0}.'.format(natural_sort(models)))
+
+    def _start_sampling_progress(self, number_of_samples):
+        self._sampling_progress = {'total': int(number_of_samples),
+                                   'done': 0,
+                                   'start': time.perf_counter(),
+                                   't_est': self.estimate_sampling_time(number_of_samples)}
+        self.sigSamplingProgress.emit(0., float(self._sampling_progress['t_est']))
+
+    def _advance_sampling_progress(self, number_of_samples):
+        """ Add written samples to the sampling progress and emit sigSamplingProgress with the
+        fraction done and the estimated remaining time. The remaining time is extrapolated from the
+        elapsed time once samples have been written.
+        """
+        progress = self._sampling_progress
+        if progress is None or progress['total'] <= 0:
+            return
+        progress['done'] = min(progress['done'] + int(number_of_samples), progress['total'])
+        fraction = progress['done'] / progress['total']
+        elapsed = time.perf_counter() - progress['start']
+        remaining = elapsed * (1 - fraction) / fraction if fraction > 0 else progress['t_est']
+        self.sigSamplingProgress.emit(float(fraction), float(remaining))
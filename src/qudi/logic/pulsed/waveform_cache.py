@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+This file contains a content addressed disk cache for sampled waveforms used by the
+SequenceGeneratorLogic.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import logging
+import numpy as np
+
+from qudi.util.npy_stream import NpyStreamWriter
+
+
+def _canonical_default(obj):
+    """ json serialization fallback creating an order independent representation of sets """
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
+    return repr(obj)
+
+
+def get_content_hash(*args):
+    """
+    Creates a hex digest hash of arbitrary (nested) python objects consisting of dict, list, tuple,
+    set and scalar types. Dict keys and set items are sorted, so the hash does not depend on their
+    order.
+
+    @param args: The objects to hash
+    @return str: sha1 hex digest
+    """
+    content = json.dumps(args, sort_keys=True, default=_canonical_default)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class WaveformCache:
+    """
+    Disk cache storing sampled waveforms as .npy files (one per channel) in a directory.
+    Waveforms are identified by a content hash (see get_content_hash) and read back memory-mapped,
+    so cached waveforms can be uploaded to a pulse generator chunk by chunk without sampling.
+
+    The total size of the cache is limited to max_bytes. Least recently used waveforms are removed
+    first. A max_bytes of 0 disables the cache.
+    """
+    _meta_extension = '.meta'
+
+    def __init__(self, cache_dir, max_bytes=0):
+        self._cache_dir = cache_dir
+        self._max_bytes = max(0, int(max_bytes))
+        self.log = logging.getLogger(__name__)
+        if self.enabled and not os.path.exists(self._cache_dir):
+            os.makedirs(self._cache_dir)
+
+    @property
+    def enabled(self):
+        return self._max_bytes > 0
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    def _channel_path(self, key, channel):
+        return os.path.join(self._cache_dir, '{0}.{1}.npy'.format(key, channel))
+
+    def _meta_path(self, key):
+        return os.path.join(self._cache_dir, key + self._meta_extension)
+
+    def get(self, key):
+        """
+        Get a cached waveform.
+
+        @param str key: content hash of the waveform
+        @return dict: dict with keys 'number_of_samples', 'analog_samples' and 'digital_samples'
+                      (memory-mapped sample arrays for each channel) or None if not cached
+        """
+        if not self.enabled:
+            return None
+        meta_path = self._meta_path(key)
+        if not os.path.isfile(meta_path):
+            return None
+        try:
+            with open(meta_path, 'rb') as file:
+                meta = pickle.load(file)
+            entry = {'number_of_samples': meta['number_of_samples'],
+                     'analog_samples': dict(),
+                     'digital_samples': dict()}
+            for chnl in meta['analog_channels']:
+                entry['analog_samples'][chnl] = np.load(self._channel_path(key, chnl),
+                                                        mmap_mode='r')
+            for chnl in meta['digital_channels']:
+                entry['digital_samples'][chnl] = np.load(self._channel_path(key, chnl),
+                                                         mmap_mode='r')
+        except:
+            self.log.exception('Failed to read cached waveform "{0}". Removing it from cache.'
+                               ''.format(key))
+            self.remove(key)
+            return None
+        # mark as recently used
+        os.utime(meta_path)
+        return entry
+
+    def iter_chunks(self, entry, chunk_length):
+        """
+        Generator yielding consecutive chunks of a cached waveform.
+
+        @param dict entry: cached waveform as returned by get
+        @param int chunk_length: maximum number of samples per chunk
+        @return tuple: (analog_samples, digital_samples) dicts of sample arrays for each channel
+        """
+        chunk_length = max(1, int(chunk_length))
+        for start in range(0, entry['number_of_samples'], chunk_length):
+            stop = min(start + chunk_length, entry['number_of_samples'])
+            analog_samples = {chnl: np.asarray(samples[start:stop]) for chnl, samples in
+                              entry['analog_samples'].items()}
+            digital_samples = {chnl: np.asarray(samples[start:stop]) for chnl, samples in
+                               entry['digital_samples'].items()}
+            yield analog_samples, digital_samples
+
+    def open_writer(self, key, analog_channels, digital_channels):
+        """
+        Create a writer to store a new waveform in the cache chunk by chunk.
+
+        @param str key: content hash of the waveform
+        @param iterable analog_channels: analog channel descriptors
+        @param iterable digital_channels: digital channel descriptors
+        @return WaveformCacheWriter: the opened writer or None if the cache is disabled
+        """
+        if not self.enabled:
+            return None
+        try:
+            return WaveformCacheWriter(self, key, analog_channels, digital_channels)
+        except:
+            self.log.exception('Unable to write waveform "{0}" to cache.'.format(key))
+            return None
+
+    def remove(self, key):
+        """ Remove a waveform from the cache """
+        for filename in os.listdir(self._cache_dir):
+            if filename.startswith(key + '.'):
+                try:
+                    os.remove(os.path.join(self._cache_dir, filename))
+                except OSError:
+                    self.log.warning('Unable to remove cached waveform file "{0}".'
+                                     ''.format(filename))
+
+    def clear(self):
+        """ Remove all waveforms from the cache """
+        if not os.path.isdir(self._cache_dir):
+            return
+        for key in self._stored_keys():
+            self.remove(key)
+
+    def _stored_keys(self):
+        return [filename[:-len(self._meta_extension)] for filename in os.listdir(self._cache_dir)
+                if filename.endswith(self._meta_extension)]
+
+    def _evict(self):
+        """ Remove least recently used waveforms until the cache size is within max_bytes """
+        entries = list()
+        total_bytes = 0
+        for key in self._stored_keys():
+            size = sum(os.path.getsize(os.path.join(self._cache_dir, filename)) for filename in
+                       os.listdir(self._cache_dir) if filename.startswith(key + '.'))
+            entries.append((os.path.getmtime(self._meta_path(key)), size, key))
+            total_bytes += size
+        for last_used, size, key in sorted(entries):
+            if total_bytes <= self._max_bytes:
+                break
+            self.remove(key)
+            total_bytes -= size
+
+
+class WaveformCacheWriter:
+    """
+    Streams a waveform chunk by chunk into the WaveformCache. The waveform is only available from
+    the cache after commit has been called.
+    """
+
+    def __init__(self, cache, key, analog_channels, digital_channels):
+        self._cache = cache
+        self._key = key
+        self._number_of_samples = 0
+        self._analog_writers = dict()
+        self._digital_writers = dict()
+        try:
+            for chnl in analog_channels:
+                self._analog_writers[chnl] = NpyStreamWriter(cache._channel_path(key, chnl),
+                                                             dtype=np.float32)
+                self._analog_writers[chnl].open()
+            for chnl in digital_channels:
+                self._digital_writers[chnl] = NpyStreamWriter(cache._channel_path(key, chnl),
+                                                              dtype=bool)
+                self._digital_writers[chnl].open()
+        except:
+            self.abort()
+            raise
+
+    def append(self, analog_samples, digital_samples):
+        """
+        Append a chunk of samples.
+
+        @param dict analog_samples: sample arrays for each analog channel
+        @param dict digital_samples: sample arrays for each digital channel
+        """
+        for chnl, writer in self._analog_writers.items():
+            writer.append(analog_samples[chnl])
+        for chnl, writer in self._digital_writers.items():
+            writer.append(digital_samples[chnl])
+        if analog_samples:
+            self._number_of_samples += len(next(iter(analog_samples.values())))
+        elif digital_samples:
+            self._number_of_samples += len(next(iter(digital_samples.values())))
+
+    def commit(self):
+        """ Finish writing and make the waveform available in the cache """
+        try:
+            self._close_writers()
+            with open(self._cache._meta_path(self._key), 'wb') as file:
+                pickle.dump({'number_of_samples': self._number_of_samples,
+                             'analog_channels': list(self._analog_writers),
+                             'digital_channels': list(self._digital_writers)},
+                            file)
+        except:
+            self._cache.log.exception('Unable to write waveform "{0}" to cache.'
+                                      ''.format(self._key))
+            self._cache.remove(self._key)
+            return
+        self._cache._evict()
+
+    def abort(self):
+        """ Discard all samples written so far """
+        try:
+            self._close_writers()
+        except:
+            pass
+        self._cache.remove(self._key)
+
+    def _close_writers(self):
+        writers = list(self._analog_writers.values()) + list(self._digital_writers.values())
+        self._analog_writers = {chnl: None for chnl in self._analog_writers}
+        self._digital_writers = {chnl: None for chnl in self._digital_writers}
+        error = None
+        for writer in writers:
+            if writer is None:
+                continue
+            try:
+                writer.close()
+            except Exception as err:
+                error = err
+        if error is not None:
+            raise error
@@ -19,6 +19,7 @@ You should have received a copy of the GNU Lesser General Public License along w
 If not, see <https://www.gnu.org/licenses/>.
 """
 
+import os
 import numpy as np
 import datetime as dt
 import matplotlib.pyplot as plt
@@ -35,8 +36,13 @@ from qudi.util.helpers import is_integer_type
 from qudi.util.network import netobtain
 from qudi.interface.data_instream_interface import StreamingMode, SampleTiming
 from qudi.interface.data_instream_interface import DataInStreamConstraints
-from qudi.util.datastorage import TextDataStorage
+from qudi.util.datastorage import TextDataStorage, NpyDataStorage, get_timestamp_filename
 from qudi.util.units import ScaledFloat
+from qudi.util.ring_buffer import RingBuffer
+from qudi.util.minmax_pyramid import MinMaxPyramid
+from qudi.util.npy_stream import NpyStreamWriter
+from qudi.util.stream_filters import BoxcarFilter, DecimatingMeanFilter, CicDecimator
+from qudi.util.shared_stream import SharedStreamBuffer
 
 
 class TimeSeriesReaderLogic(LogicBase):
@@ -51,10 +57,16 @@ class TimeSeriesReaderLogic(LogicBase):
             max_frame_rate: 20  # optional (default: 20Hz)
             channel_buffer_size: 1048576  # optional (default: 1MSample)
             max_raw_data_bytes: 1073741824  # optional (default: 1GB)
+            record_to_disk: False  # optional, stream recorded raw data to binary .npy files
+            record_chunk_size: 65536  # optional, samples per channel written to disk at once
+            record_text_export: False  # optional, export streamed recordings to text when done
+            oversampling_filter_order: 1  # optional, >1 uses a CIC filter of that order
+            use_shared_memory: True  # optional, use shared memory for remote streamers on same host
         connect:
             streamer: <streamer_name>
     """
     # declare signals
+    # decimated copies of the (averaged) data trace, see get_trace_view
     sigDataChanged = QtCore.Signal(object, object, object, object)
     sigNewRawData = QtCore.Signal(object, object)  # raw data samples, timestamp samples (optional)
     sigStatusChanged = QtCore.Signal(bool, bool)
@@ -75,6 +87,26 @@ class TimeSeriesReaderLogic(LogicBase):
                                        default=1024**3,
                                        missing='info',
                                        constructor=lambda x: int(round(x)))
+    _record_to_disk = ConfigOption(name='record_to_disk',
+                                   default=False,
+                                   missing='info',
+                                   constructor=lambda x: bool(x))
+    _record_chunk_size = ConfigOption(name='record_chunk_size',
+                                      default=65536,
+                                      missing='nothing',
+                                      constructor=lambda x: int(round(x)))
+    _record_text_export = ConfigOption(name='record_text_export',
+                                       default=False,
+                                       missing='nothing',
+                                       constructor=lambda x: bool(x))
+    _oversampling_filter_order = ConfigOption(name='oversampling_filter_order',
+                                              default=1,
+                                              missing='nothing',
+                                              constructor=lambda x: max(1, int(x)))
+    _use_shared_memory = ConfigOption(name='use_shared_memory',
+                                      default=True,
+                                      missing='nothing',
+                                      constructor=lambda x: bool(x))
 
     # status vars
     _trace_window_size = StatusVar('trace_window_size', default=6)
@@ -102,10 +134,21 @@ class TimeSeriesReaderLogic(LogicBase):
         # Data arrays
         self._data_buffer = None
         self._times_buffer = None
+        # Circular buffers holding the running trace window
         self._trace_data = None
         self._trace_times = None
         self._trace_data_averaged = None
-        self.__moving_filter = None
+        # Min/max decimation pyramids of the trace buffers for display
+        self._trace_pyramid = None
+        self._trace_averaged_pyramid = None
+        self._trace_view_points = 4096
+        # Snapshot of the latest values, replaced (not modified) with each data block
+        self._latest_values = (dict(), None)
+        # Stateful stream filters for oversampling and moving average
+        self._oversampling_filter = None
+        self._times_oversampling_filter = None
+        self._moving_average_filter = None
+        self._averaged_channel_indices = None
 
         # for data recording
         self._recorded_raw_data = None
@@ -113,9 +156,15 @@ class TimeSeriesReaderLogic(LogicBase):
         self._recorded_sample_count = 0
         self._data_recording_active = False
         self._record_start_time = None
+        # for streaming recorded data to disk
+        self._recording_data_writer = None
+        self._recording_times_writer = None
+        self._last_recording = None
 
         # important to know for method of reading the buffer
         self._streamer_is_remote = False
+        # shared memory ring buffer to transfer data from remote streamers on the same host
+        self._shared_stream = None
 
     def on_activate(self) -> None:
         """ Initialisation performed during activation of the module. """
@@ -126,7 +175,7 @@ class TimeSeriesReaderLogic(LogicBase):
         constraints = streamer.constraints
         if type(constraints) != type(netobtain(constraints)):
             self._streamer_is_remote = True
-            self.log.debug('Streamer is a remote module. Do not use a shared buffer.')
+            self.log.debug('Streamer is a remote module. Do not use a local shared buffer.')
 
         # Flag to stop the loop and process variables
         self._recorded_raw_data = None
@@ -178,6 +227,7 @@ class TimeSeriesReaderLogic(LogicBase):
             if self.module_state() == 'locked':
                 self._stop()
         finally:
+            self._close_shared_stream()
             # Free (potentially) large raw data buffers
             self._data_buffer = None
             self._times_buffer = None
@@ -189,20 +239,45 @@ class TimeSeriesReaderLogic(LogicBase):
         constraints = self.streamer_constraints
         trace_dtype = np.float64 if is_integer_type(constraints.data_type) else constraints.data_type
 
-        # processed data arrays
-        self._trace_data = np.zeros(
-            [window_size + self._moving_average_width // 2, channel_count],
+        # processed data ring buffers
+        self._trace_data = RingBuffer(size=window_size + self._moving_average_width // 2,
+                                      channel_count=channel_count,
+                                      dtype=trace_dtype)
+        self._trace_data_averaged = RingBuffer(
+            size=window_size - self._moving_average_width // 2,
+            channel_count=averaged_channel_count,
             dtype=trace_dtype
         )
-        self._trace_data_averaged = np.zeros(
-            [window_size - self._moving_average_width // 2, averaged_channel_count],
-            dtype=trace_dtype
-        )
-        self._trace_times = np.arange(window_size, dtype=np.float64)
+        trace_times = np.arange(window_size, dtype=np.float64)
         if constraints.sample_timing == SampleTiming.TIMESTAMP:
-            self._trace_times -= window_size
+            trace_times -= window_size
         if constraints.sample_timing != SampleTiming.RANDOM:
-            self._trace_times /= self.data_rate
+            trace_times /= self.data_rate
+        self._trace_times = RingBuffer(size=window_size, dtype=np.float64)
+        self._trace_times.set_data(trace_times)
+        self._trace_pyramid = MinMaxPyramid(self._trace_data)
+        self._trace_averaged_pyramid = MinMaxPyramid(self._trace_data_averaged)
+        self._latest_values = (dict(), None)
+
+        # stream filters (reset filter states)
+        if self._oversampling_filter_order > 1:
+            self._oversampling_filter = CicDecimator(factor=self._oversampling_factor,
+                                                     order=self._oversampling_filter_order)
+            # Same group delay as the data filter. Timestamps start in steady state, since a
+            # zero filter history would distort the first timestamps.
+            self._times_oversampling_filter = CicDecimator(factor=self._oversampling_factor,
+                                                           order=self._oversampling_filter_order,
+                                                           steady_state_start=True)
+        else:
+            self._oversampling_filter = DecimatingMeanFilter(factor=self._oversampling_factor)
+            self._times_oversampling_filter = DecimatingMeanFilter(
+                factor=self._oversampling_factor
+            )
+        self._moving_average_filter = BoxcarFilter(width=self._moving_average_width)
+        active_channels = self.active_channel_names
+        self._averaged_channel_indices = [
+            active_channels.index(ch) for ch in self._averaged_channels
+        ]
 
         # raw data buffers
         self._data_buffer = np.empty(channel_count * self._channel_buffer_size,
@@ -211,6 +286,45 @@ class TimeSeriesReaderLogic(LogicBase):
             self._times_buffer = np.zeros(self._channel_buffer_size, dtype=np.float64)
         else:
             self._times_buffer = None
+        if self._streamer_is_remote and self._use_shared_memory:
+            self._init_shared_stream()
+
+    def _init_shared_stream(self) -> None:
+        """ Create a shared memory ring buffer and let the remote streamer attach to it.
+        Falls back to transferring data via the remote connection if the streamer does not support
+        shared streams (see qudi.interface.mixins.shared_stream.SharedStreamMixin) or is not
+        running on the same host.
+        """
+        self._close_shared_stream()
+        constraints = self.streamer_constraints
+        stream = SharedStreamBuffer.create(
+            capacity=self._channel_buffer_size,
+            channel_count=len(self.active_channel_names),
+            dtype=constraints.data_type,
+            timestamps=constraints.sample_timing == SampleTiming.TIMESTAMP
+        )
+        try:
+            self._streamer().attach_shared_stream(stream.name)
+        except Exception as err:
+            stream.close()
+            stream.unlink()
+            self.log.info(f'Unable to use shared memory to transfer data from remote streamer. '
+                          f'Falling back to remote connection. ({err})')
+        else:
+            self._shared_stream = stream
+            self.log.debug(f'Remote streamer attached to shared memory buffer "{stream.name}".')
+
+    def _close_shared_stream(self) -> None:
+        stream = self._shared_stream
+        self._shared_stream = None
+        if stream is not None:
+            try:
+                self._streamer().detach_shared_stream()
+            except Exception:
+                self.log.exception('Error while detaching remote streamer from shared memory:')
+            finally:
+                stream.close()
+                stream.unlink()
 
     @property
     def streamer_constraints(self) -> DataInStreamConstraints:
@@ -288,12 +402,16 @@ class TimeSeriesReaderLogic(LogicBase):
     @property
     def trace_data(self) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
         """ Read-only property returning the x-axis of the data trace and a dictionary of the
-        corresponding trace data arrays for each channel
+        corresponding trace data arrays for each channel.
+
+        The returned arrays are views into the running trace buffers and will change with the
+        next data frame. Copy them if you need to keep the data.
         """
-        data_offset = self._trace_data.shape[0] - self._moving_average_width // 2
-        data = {ch: self._trace_data[:data_offset, i] for i, ch in
+        data_offset = self._trace_data.size - self._moving_average_width // 2
+        trace_view = self._trace_data.view()
+        data = {ch: trace_view[:data_offset, i] for i, ch in
                 enumerate(self.active_channel_names)}
-        return self._trace_times, data
+        return self._trace_times.view(), data
 
     @property
     def averaged_trace_data(self) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
@@ -302,9 +420,77 @@ class TimeSeriesReaderLogic(LogicBase):
         """
         if not self.averaged_channel_names or self.moving_average_width <= 1:
             return None, None
-        data = {ch: self._trace_data_averaged[:, i] for i, ch in
-                enumerate(self.averaged_channel_names)}
-        return self._trace_times[-self._trace_data_averaged.shape[0]:], data
+        averaged_view = self._trace_data_averaged.view()
+        data = {ch: averaged_view[:, i] for i, ch in enumerate(self.averaged_channel_names)}
+        return self._trace_times.latest(self._trace_data_averaged.size), data
+
+    def get_trace_view(self,
+                       t_start: Optional[float] = None,
+                       t_stop: Optional[float] = None,
+                       max_points: Optional[int] = 4096
+                       ) -> Tuple[np.ndarray, Dict[str, np.ndarray],
+                                  Optional[np.ndarray], Optional[Dict[str, np.ndarray]]]:
+        """ Returns a decimated view of the (averaged) data trace within the x-axis interval
+        [t_start, t_stop] containing approximately <max_points> points per channel at most.
+        Omitting t_start or t_stop extends the interval to the respective end of the trace window.
+
+        Long traces are decimated using min/max pyramids that are updated with each new data frame,
+        so the cost of this call does not scale with the trace window size and all peaks are
+        preserved. Returns copies of the data in the same format as
+        (*trace_data, *averaged_trace_data).
+        """
+        with self._threadlock:
+            return self._get_trace_view(t_start, t_stop, max_points)
+
+    def _get_trace_view(self,
+                        t_start: Union[None, float],
+                        t_stop: Union[None, float],
+                        max_points: int
+                        ) -> Tuple[np.ndarray, Dict[str, np.ndarray],
+                                   Optional[np.ndarray], Optional[Dict[str, np.ndarray]]]:
+        max_points = max(2, int(max_points))
+        times = self._trace_times.view()
+        window_size = times.size
+        start = 0 if t_start is None else int(np.searchsorted(times, t_start, side='left'))
+        stop = window_size if t_stop is None else int(np.searchsorted(times, t_stop, side='right'))
+        indices, values = self._trace_pyramid.get_view(start, stop, max_points)
+        data = {ch: values[:, i] for i, ch in enumerate(self.active_channel_names)}
+        if not self.averaged_channel_names or self.moving_average_width <= 1:
+            return times[indices], data, None, None
+        offset = window_size - self._trace_data_averaged.size
+        avg_indices, avg_values = self._trace_averaged_pyramid.get_view(
+            max(start - offset, 0), max(stop - offset, 0), max_points
+        )
+        avg_data = {ch: avg_values[:, i] for i, ch in enumerate(self.averaged_channel_names)}
+        return times[indices], data, times[avg_indices + offset], avg_data
+
+    @property
+    def trace_view_points(self) -> int:
+        """ Maximum number of points per channel of the decimated trace emitted with
+        sigDataChanged
+        """
+        return self._trace_view_points
+
+    @trace_view_points.setter
+    def trace_view_points(self, max_points: int) -> None:
+        self._trace_view_points = max(2, int(max_points))
+
+    @property
+    def latest_values(self) -> Tuple[Dict[str, float], Optional[Dict[str, float]]]:
+        """ Read-only property returning the latest values of trace_data and averaged_trace_data
+        for each channel. Returns a snapshot taken with the last data block without acquiring the
+        lock held during the hardware read.
+        """
+        return self._latest_values
+
+    def _get_latest_values(self) -> Tuple[Dict[str, float], Optional[Dict[str, float]]]:
+        data_offset = self._trace_data.size - self._moving_average_width // 2
+        latest = self._trace_data.view()[data_offset - 1]
+        values = {ch: latest[i] for i, ch in enumerate(self.active_channel_names)}
+        if not self.averaged_channel_names or self.moving_average_width <= 1:
+            return values, None
+        latest = self._trace_data_averaged.view()[-1]
+        return values, {ch: latest[i] for i, ch in enumerate(self.averaged_channel_names)}
 
     @property
     def trace_settings(self) -> Dict[str, Union[int, float]]:
@@ -386,8 +572,6 @@ class TimeSeriesReaderLogic(LogicBase):
                 self._oversampling_factor = settings['oversampling_factor']
                 self._moving_average_width = settings['moving_average_width']
                 self._trace_window_size = settings['trace_window_size']
-                self.__moving_filter = np.full(shape=self._moving_average_width,
-                                               fill_value=1.0 / self._moving_average_width)
                 self._samples_per_frame = max(1, int(round(self.data_rate / self._max_frame_rate)))
                 self._init_data_arrays()
         except:
@@ -398,7 +582,7 @@ class TimeSeriesReaderLogic(LogicBase):
             if restart:
                 self.start_reading()
             else:
-                self.sigDataChanged.emit(*self.trace_data, *self.averaged_trace_data)
+                self.sigDataChanged.emit(*self.get_trace_view(max_points=self._trace_view_points))
 
     @QtCore.Slot(list, list)
     def set_channel_settings(self, enabled: Sequence[str], averaged: Sequence[str]) -> None:
@@ -434,7 +618,7 @@ class TimeSeriesReaderLogic(LogicBase):
             if restart:
                 self.start_reading()
             else:
-                self.sigDataChanged.emit(*self.trace_data, *self.averaged_trace_data)
+                self.sigDataChanged.emit(*self.get_trace_view(max_points=self._trace_view_points))
 
     @QtCore.Slot()
     def start_reading(self) -> None:
@@ -448,8 +632,8 @@ class TimeSeriesReaderLogic(LogicBase):
             self.module_state.lock()
             try:
                 if self._data_recording_active:
-                    self._init_recording_arrays()
                     self._record_start_time = dt.datetime.now()
+                    self._init_recording_arrays()
                 self._streamer().start_stream()
             except:
                 self.module_state.unlock()
@@ -503,6 +687,13 @@ class TimeSeriesReaderLogic(LogicBase):
                         streamer.read_data_into_buffer(data_buffer=self._data_buffer,
                                                        samples_per_channel=samples_to_read,
                                                        timestamp_buffer=self._times_buffer)
+                    elif self._shared_stream is not None:
+                        # streamer is remote but on the same host. Only the sample count is passed
+                        # via the remote connection, the data itself via shared memory.
+                        samples_to_read = streamer.read_data_into_shared_stream(samples_to_read)
+                        self._shared_stream.read_into(data_buffer=self._data_buffer,
+                                                      samples_per_channel=samples_to_read,
+                                                      timestamp_buffer=self._times_buffer)
                     else:
                         # streamer is remote, we need to have a new buffer created and passed to us
                         self._data_buffer, self._times_buffer = streamer.read_data(number_of_samples=samples_to_read)
@@ -522,8 +713,11 @@ class TimeSeriesReaderLogic(LogicBase):
                     if self._data_recording_active:
                         self._add_to_recording_array(data_view, times_view)
                     self.sigNewRawData.emit(data_view, times_view)
+                    self._latest_values = self._get_latest_values()
                     # Emit update signal
-                    self.sigDataChanged.emit(*self.trace_data, *self.averaged_trace_data)
+                    self.sigDataChanged.emit(
+                        *self._get_trace_view(None, None, self._trace_view_points)
+                    )
                 except Exception as e:
                     self.log.warning(f'Reading data from streamer went wrong: {e}')
                     self._stop_cleanup()
@@ -531,19 +725,11 @@ class TimeSeriesReaderLogic(LogicBase):
                 self._sigNextDataFrame.emit()
 
     def _process_trace_times(self, times_buffer: np.ndarray) -> None:
-        if self.oversampling_factor > 1:
-            times_buffer = times_buffer.reshape(
-                (times_buffer.size // self.oversampling_factor, self.oversampling_factor)
-            )
-            times_buffer = np.mean(times_buffer, axis=1)
-
-        # discard data outside time frame
-        times_buffer = times_buffer[-self._trace_times.size:]
+        # Down-sample according to oversampling factor
+        times_buffer = self._times_oversampling_filter.process(times_buffer)
 
-        # Roll data array to have a continuously running time trace
-        self._trace_times = np.roll(self._trace_times, -times_buffer.size)
-        # Insert new data
-        self._trace_times[-times_buffer.size:] = times_buffer
+        # Append new data to the circular buffer (data outside the time frame is discarded)
+        self._trace_times.write(times_buffer)
 
     def _process_trace_data(self, data_buffer: np.ndarray) -> None:
         """ Processes raw data from the streaming device """
@@ -551,39 +737,26 @@ class TimeSeriesReaderLogic(LogicBase):
         samples_per_channel = data_buffer.size // channel_count
         data_view = data_buffer.reshape([samples_per_channel, channel_count])
         # Down-sample and average according to oversampling factor
-        if self.oversampling_factor > 1:
-            data_view = data_view.reshape(
-                [samples_per_channel // self.oversampling_factor,
-                 self.oversampling_factor,
-                 channel_count]
+        data_view = self._oversampling_filter.process(data_view)
+
+        # Append new data to the circular buffer to have a continuously running time trace.
+        # Data outside the time frame is discarded.
+        self._trace_data.write(data_view)
+        self._trace_pyramid.update(data_view)
+
+        # Calculate moving average for all averaged channels at once. The running sum filter keeps
+        # its state between frames, so only the new samples need to be processed.
+        if self.moving_average_width > 1 and self._averaged_channel_indices:
+            averaged = self._moving_average_filter.process(
+                data_view[:, self._averaged_channel_indices]
             )
-            data_view = np.mean(data_view, axis=1)
-
-        # discard data outside time frame
-        data_view = data_view[-self._trace_data.shape[0]:, :]
-        new_channel_samples = data_view.shape[0]
-
-        # Roll data array to have a continuously running time trace
-        self._trace_data = np.roll(self._trace_data, -new_channel_samples, axis=0)
-        # Insert new data
-        self._trace_data[-new_channel_samples:, :] = data_view
-
-        # Calculate moving average by using numpy.convolve with a normalized uniform filter
-        if self.moving_average_width > 1 and self.averaged_channel_names:
-            # Only convolve the new data and roll the previously calculated moving average
-            self._trace_data_averaged = np.roll(self._trace_data_averaged,
-                                                -new_channel_samples,
-                                                axis=0)
-            offset = new_channel_samples + len(self.__moving_filter) - 1
-            for i, ch in enumerate(self.averaged_channel_names):
-                data_index = self.active_channel_names.index(ch)
-                self._trace_data_averaged[-new_channel_samples:, i] = np.convolve(
-                    self._trace_data[-offset:, data_index],
-                    self.__moving_filter,
-                    mode='valid'
-                )
+            self._trace_data_averaged.write(averaged)
+            self._trace_averaged_pyramid.update(averaged)
 
     def _init_recording_arrays(self) -> None:
+        if self._record_to_disk:
+            self._init_recording_files()
+            return
         constraints = self.streamer_constraints
         try:
             sample_bytes = np.finfo(constraints.data_type).bits // 8
@@ -608,6 +781,33 @@ class TimeSeriesReaderLogic(LogicBase):
                                            dtype=constraints.data_type)
         self._recorded_sample_count = 0
 
+    def _init_recording_files(self) -> None:
+        """ Opens binary .npy files to continuously write recorded raw data (and timestamps) to.
+        Only a fixed number of data chunks is buffered in memory while recording.
+        """
+        constraints = self.streamer_constraints
+        channel_count = len(self.active_channel_names)
+        file_path = os.path.join(
+            self.module_default_data_dir,
+            get_timestamp_filename(timestamp=self._record_start_time, nametag='data_trace')
+        )
+        self._recording_data_writer = NpyStreamWriter(file_path + '.npy',
+                                                      dtype=constraints.data_type,
+                                                      row_shape=(channel_count,),
+                                                      chunk_rows=self._record_chunk_size)
+        if constraints.sample_timing == SampleTiming.TIMESTAMP:
+            self._recording_times_writer = NpyStreamWriter(file_path + '_timestamps.npy',
+                                                           dtype=np.float64,
+                                                           chunk_rows=self._record_chunk_size)
+        else:
+            self._recording_times_writer = None
+        self._recorded_raw_data = None
+        self._recorded_raw_times = None
+        self._recorded_sample_count = 0
+        self._recording_data_writer.open()
+        if self._recording_times_writer is not None:
+            self._recording_times_writer.open()
+
     def _expand_recording_arrays(self) -> int:
         total_samples = self._recorded_raw_data.size
         channel_count = len(self.active_channel_names)
@@ -632,6 +832,15 @@ class TimeSeriesReaderLogic(LogicBase):
 
     def _add_to_recording_array(self, data, times=None) -> None:
         channel_count = len(self.active_channel_names)
+        if self._recording_data_writer is not None:
+            new_samples = data.size // channel_count
+            self._recording_data_writer.append(
+                data[:new_samples * channel_count].reshape([new_samples, channel_count])
+            )
+            if self._recording_times_writer is not None:
+                self._recording_times_writer.append(times[:new_samples])
+            self._recorded_sample_count += new_samples
+            return
         free_samples_per_channel = (self._recorded_raw_data.size // channel_count) - \
             self._recorded_sample_count
         new_samples = data.size // channel_count
@@ -665,6 +874,8 @@ class TimeSeriesReaderLogic(LogicBase):
         """ Will start to continuously accumulate raw data from the streaming hardware (without
         running average and oversampling). Data will be saved to file once the trace acquisition is
         stopped.
+        If ConfigOption "record_to_disk" is set, the data is continuously streamed into binary
+        .npy files while recording instead of being accumulated in memory.
         If the streamer is not running it will be started in order to have data to save.
         """
         with self._threadlock:
@@ -673,8 +884,8 @@ class TimeSeriesReaderLogic(LogicBase):
             else:
                 self._data_recording_active = True
                 if self.module_state() == 'locked':
-                    self._init_recording_arrays()
                     self._record_start_time = dt.datetime.now()
+                    self._init_recording_arrays()
                     self.sigStatusChanged.emit(True, True)
                 else:
                     self.start_reading()
@@ -697,6 +908,9 @@ class TimeSeriesReaderLogic(LogicBase):
 
     def _save_recorded_data(self, name_tag='', save_figure=True):
         """ Save the recorded counter trace data and writes it to a file """
+        if self._recording_data_writer is not None:
+            self._finish_recording_files(save_figure=save_figure)
+            return
         try:
             constraints = self.streamer_constraints
             metadata = {
@@ -734,24 +948,115 @@ class TimeSeriesReaderLogic(LogicBase):
             self.log.exception('Something went wrong while saving raw data:')
             raise
 
-    def _draw_raw_data_thumbnail(self, data: np.ndarray) -> plt.Figure:
-        """ Draw figure to save with data file """
+    def _finish_recording_files(self, save_figure=True):
+        """ Close the binary recording files and save metadata and thumbnail alongside """
+        data_writer = self._recording_data_writer
+        times_writer = self._recording_times_writer
+        self._recording_data_writer = None
+        self._recording_times_writer = None
+        try:
+            try:
+                data_writer.close()
+            finally:
+                if times_writer is not None:
+                    times_writer.close()
+            constraints = self.streamer_constraints
+            metadata = {
+                'Start recoding time': self._record_start_time.strftime('%d.%m.%Y, %H:%M:%S.%f'),
+                'Sample rate (Hz)'   : self.sampling_rate,
+                'Sample timing'      : constraints.sample_timing.name
+            }
+            if times_writer is not None:
+                metadata['Timestamp file'] = os.path.basename(times_writer.file_path)
+            column_headers = [
+                f'{ch} ({constraints.channel_units[ch]})' for ch in self.active_channel_names
+            ]
+            self._last_recording = {
+                'data_file'     : data_writer.file_path,
+                'times_file'    : None if times_writer is None else times_writer.file_path,
+                'metadata'      : metadata,
+                'column_headers': column_headers,
+                'timestamp'     : self._record_start_time
+            }
+
+            # Save metadata alongside the binary data the same way NpyDataStorage does
+            file_path = os.path.splitext(data_writer.file_path)[0]
+            storage = NpyDataStorage(root_dir=self.module_default_data_dir)
+            header = storage.create_header(self._record_start_time,
+                                           np.dtype(constraints.data_type),
+                                           metadata=metadata,
+                                           column_headers=column_headers)
+            with open(file_path + '_metadata.txt', 'w') as file:
+                file.write(header)
+
+            if save_figure and self._recorded_sample_count > 0:
+                # Only load a strided subset of the memory-mapped data for plotting
+                data = np.load(data_writer.file_path, mmap_mode='r')
+                step = max(1, -(-data.shape[0] // 20000))
+                data = np.array(data[::step])
+                if times_writer is not None:
+                    times = np.load(times_writer.file_path, mmap_mode='r')
+                    data = np.column_stack([np.array(times[::step]), data])
+                fig = self._draw_raw_data_thumbnail(data, sample_step=step)
+                storage.save_thumbnail(mpl_figure=fig, file_path=file_path)
+        except:
+            self.log.exception('Something went wrong while saving raw data:')
+            raise
+        if self._record_text_export:
+            self.export_recording_to_text()
+
+    def export_recording_to_text(self) -> str:
+        """ Exports the last recording streamed to binary files (see ConfigOption
+        "record_to_disk") as text data file next to the binary file.
+        The data is converted chunk by chunk in order to keep memory consumption low.
+        Returns the path of the text file.
+        """
+        if self._last_recording is None:
+            raise RuntimeError('No recording streamed to binary file available for export.')
+        try:
+            recording = self._last_recording
+            data = np.load(recording['data_file'], mmap_mode='r')
+            column_headers = list(recording['column_headers'])
+            if recording['times_file'] is None:
+                times = None
+            else:
+                times = np.load(recording['times_file'], mmap_mode='r')
+                column_headers.insert(0, 'Time (s)')
+            storage = TextDataStorage(root_dir=os.path.dirname(recording['data_file']))
+            filename = os.path.splitext(os.path.basename(recording['data_file']))[0] + \
+                storage.file_extension
+            file_path = storage.new_file(timestamp=recording['timestamp'],
+                                         metadata=recording['metadata'],
+                                         column_headers=column_headers,
+                                         filename=filename)[0]
+            for start in range(0, data.shape[0], self._record_chunk_size):
+                stop = start + self._record_chunk_size
+                chunk = np.asarray(data[start:stop])
+                if times is not None:
+                    chunk = np.column_stack([times[start:stop], chunk])
+                storage.append_file(chunk, file_path)
+        except:
+            self.log.exception('Something went wrong while exporting recorded data to text:')
+            raise
+        return file_path
+
+    def _draw_raw_data_thumbnail(self, data: np.ndarray, sample_step: int = 1) -> plt.Figure:
+        """ Draw figure to save with data file. <sample_step> is the stride the data has been
+        taken from the recorded samples with.
+        """
         constraints = self.streamer_constraints
         # Handle excessive data size for plotting. Artefacts may occur due to IIR decimation filter.
-        decimate_factor = 0
+        sample_step = int(sample_step)
         while data.shape[0] >= 20000:
             print(data.shape[0])
-            decimate_factor += 2
+            sample_step *= 2
             data = decimate(data, q=2, axis=0)
 
         if constraints.sample_timing == SampleTiming.RANDOM:
-            x = np.arange(data.shape[0])
+            x = np.arange(data.shape[0]) * sample_step
             x_label = 'Sample Index'
         elif constraints.sample_timing == SampleTiming.CONSTANT:
-            if decimate_factor > 0:
-                x = np.arange(data.shape[0]) / (self.sampling_rate / decimate_factor)
-            else:
-                x = np.arange(data.shape[0]) / self.sampling_rate
+            x = np.arange(data.shape[0]) * sample_step / self.sampling_rate
             x_label = 'Time (s)'
         else:
             x = data[:, 0] - data[0, 0]
@@ -788,9 +1093,9 @@ class TimeSeriesReaderLogic(LogicBase):
             ]
             nametag = f'trace_snapshot_{name_tag}' if name_tag else 'trace_snapshot'
 
-            data_offset = self._trace_data.shape[0] - self._moving_average_width // 2
-            data = self._trace_data[:data_offset, :]
-            x = self._trace_times
+            data_offset = self._trace_data.size - self._moving_average_width // 2
+            data = self._trace_data.view()[:data_offset, :].copy()
+            x = self._trace_times.view().copy()
             try:
                 fig = self._draw_trace_snapshot_thumbnail(x, data) if save_figure else None
             finally:
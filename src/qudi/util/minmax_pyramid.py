@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module contains an incrementally updated min/max decimation pyramid for RingBuffer objects.
+It can be used to display very long data traces with a limited number of points while preserving
+all peaks.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+__all__ = ['MinMaxPyramid']
+
+import numpy as np
+from typing import Optional, Tuple
+
+from qudi.util.ring_buffer import RingBuffer
+
+
+class _MinMaxLevel:
+    """ A single pyramid level holding min/max values of bins with fixed size """
+
+    def __init__(self, bin_size: int, capacity: int, factor: int, row_shape: tuple, dtype):
+        self.bin_size = bin_size
+        self.capacity = capacity
+        channel_count = row_shape[0] if row_shape else None
+        self.mins = RingBuffer(size=capacity, channel_count=channel_count, dtype=dtype)
+        self.maxs = RingBuffer(size=capacity, channel_count=channel_count, dtype=dtype)
+        # Incomplete bin made up of values from the next finer level
+        self._pending_mins = np.empty((factor, *row_shape), dtype=dtype)
+        self._pending_maxs = np.empty((factor, *row_shape), dtype=dtype)
+        self._pending_count = 0
+        self._factor = factor
+
+    def reduce(self, mins: np.ndarray, maxs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Combine values of the next finer level into bins of this level. Returns min/max values
+        of all bins completed during this call.
+        """
+        if self._pending_count > 0:
+            mins = np.concatenate([self._pending_mins[:self._pending_count], mins], axis=0)
+            maxs = np.concatenate([self._pending_maxs[:self._pending_count], maxs], axis=0)
+        groups = mins.shape[0] // self._factor
+        used = groups * self._factor
+        self._pending_count = mins.shape[0] - used
+        self._pending_mins[:self._pending_count] = mins[used:]
+        self._pending_maxs[:self._pending_count] = maxs[used:]
+        row_shape = mins.shape[1:]
+        bin_mins = mins[:used].reshape([groups, self._factor, *row_shape]).min(axis=1)
+        bin_maxs = maxs[:used].reshape([groups, self._factor, *row_shape]).max(axis=1)
+        self.mins.write(bin_mins)
+        self.maxs.write(bin_maxs)
+        return bin_mins, bin_maxs
+
+
+class MinMaxPyramid:
+    """ Min/max decimation pyramid attached to a RingBuffer.
+
+    Each pyramid level k holds the minimum and maximum values of consecutive bins of
+    <factor>**k samples. Bins are aligned to the total number of samples written, so the levels
+    can be updated incrementally with each new data frame at a cost proportional to the number of
+    new samples. Levels are created until fewer than <min_bins> bins fit into the buffer. With the
+    default of a single bin, a view of the whole buffer can be reduced to a handful of points.
+
+    New data must be passed to "update" right after it has been written to the RingBuffer.
+    """
+
+    def __init__(self, buffer: RingBuffer, factor: Optional[int] = 4,
+                 min_bins: Optional[int] = 1):
+        if factor < 2:
+            raise ValueError(f'MinMaxPyramid factor must be integer value >= 2 '
+                             f'(received: {factor:d})')
+        self._buffer = buffer
+        self._factor = int(factor)
+        self._levels = list()
+        row_shape = tuple(buffer.shape[1:])
+        bin_size = self._factor
+        while buffer.size // bin_size >= max(1, min_bins):
+            self._levels.append(_MinMaxLevel(bin_size=bin_size,
+                                             capacity=buffer.size // bin_size + 2,
+                                             factor=self._factor,
+                                             row_shape=row_shape,
+                                             dtype=buffer.dtype))
+            bin_size *= self._factor
+        # Build all levels from the current buffer content
+        self._total_samples = 0
+        self.update(buffer.view())
+
+    @property
+    def level_count(self) -> int:
+        return len(self._levels)
+
+    def update(self, data: np.ndarray) -> None:
+        """ Propagate new samples (just written to the RingBuffer) through all pyramid levels """
+        self._total_samples += data.shape[0]
+        mins = maxs = data
+        for level in self._levels:
+            if mins.shape[0] == 0:
+                break
+            mins, maxs = level.reduce(mins, maxs)
+
+    def get_view(self,
+                 start: Optional[int] = None,
+                 stop: Optional[int] = None,
+                 max_points: Optional[int] = 4096) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns a decimated representation of the buffer range [start, stop) with at most
+        <max_points> points. Indices are relative to the ordered buffer view.
+
+        If the range holds more than <max_points> samples, each bin of the finest suitable pyramid
+        level is represented by two points (bin minimum followed by bin maximum) located at the
+        bin center. The outermost points are located at the first and last sample of the range.
+        Partial bins at the range borders are evaluated from the raw data, so all peaks within the
+        range are preserved exactly. If even the coarsest level yields too many bins, adjacent bins
+        are merged.
+
+        Returns a tuple of (integer sample index array, value array). The arrays are copies.
+        """
+        size = self._buffer.size
+        start = 0 if start is None else min(max(int(start), 0), size)
+        stop = size if stop is None else min(max(int(stop), start), size)
+        count = stop - start
+        raw_view = self._buffer.view()
+        if count <= max_points:
+            return np.arange(start, stop), raw_view[start:stop].copy()
+
+        if self._levels:
+            # Finest level fitting into max_points. Fall back to coarsest level.
+            level = self._levels[-1]
+            for candidate in self._levels:
+                if 2 * (count // candidate.bin_size + 2) <= max_points:
+                    level = candidate
+                    break
+            bin_size = level.bin_size
+
+            # absolute sample counts
+            offset = self._total_samples - size
+            abs_start = offset + start
+            abs_stop = offset + stop
+            first_bin = -(-abs_start // bin_size)
+            last_bin = abs_stop // bin_size
+            completed_bins = self._total_samples // bin_size
+            first_bin = max(first_bin, completed_bins - level.capacity)
+
+        if not self._levels or first_bin >= last_bin:
+            # No complete bin within the range. Decimate the raw data instead.
+            positions = np.arange(start, stop)
+            mins = maxs = raw_view[start:stop]
+        else:
+            positions = list()
+            mins = list()
+            maxs = list()
+            # leading partial bin from raw data
+            head_stop = first_bin * bin_size - offset
+            if head_stop > start:
+                positions.append(np.array([(start + head_stop) // 2]))
+                mins.append(raw_view[start:head_stop].min(axis=0, keepdims=True))
+                maxs.append(raw_view[start:head_stop].max(axis=0, keepdims=True))
+            # complete bins from pyramid level
+            ring_offset = completed_bins - level.capacity
+            bins = np.arange(first_bin, last_bin)
+            positions.append(bins * bin_size + bin_size // 2 - offset)
+            mins.append(level.mins.view()[first_bin - ring_offset:last_bin - ring_offset])
+            maxs.append(level.maxs.view()[first_bin - ring_offset:last_bin - ring_offset])
+            # trailing partial bin from raw data
+            tail_start = last_bin * bin_size - offset
+            if stop > tail_start:
+                positions.append(np.array([(tail_start + stop) // 2]))
+                mins.append(raw_view[tail_start:stop].min(axis=0, keepdims=True))
+                maxs.append(raw_view[tail_start:stop].max(axis=0, keepdims=True))
+
+            positions = np.concatenate(positions)
+            mins = np.concatenate(mins, axis=0)
+            maxs = np.concatenate(maxs, axis=0)
+        # Merge adjacent bins if there are still too many to fit into max_points
+        bin_count = max(1, max_points // 2)
+        if positions.size > bin_count:
+            group_starts = (np.arange(bin_count) * positions.size) // bin_count
+            group_stops = np.append(group_starts[1:], positions.size)
+            positions = (positions[group_starts] + positions[group_stops - 1]) // 2
+            mins = np.minimum.reduceat(mins, group_starts, axis=0)
+            maxs = np.maximum.reduceat(maxs, group_starts, axis=0)
+        values = np.stack([mins, maxs], axis=1).reshape([2 * mins.shape[0], *mins.shape[1:]])
+        positions = np.repeat(positions, 2)
+        # Outermost points are located at the range borders, so the view spans the entire range
+        positions[0] = start
+        positions[-1] = stop - 1
+        return positions, values
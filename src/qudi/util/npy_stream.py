@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module contains a helper to continuously stream data into a memory-mappable binary .npy file.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+__all__ = ['NpyStreamWriter']
+
+import os
+import queue
+import struct
+import threading
+import numpy as np
+from typing import Optional, Union, Tuple
+
+
+class NpyStreamWriter:
+    """ Appends rows of data to a binary .npy file while the total number of rows is not known in
+    advance.
+
+    Data is copied into a fixed pool of preallocated chunk buffers that are written to disk by a
+    dedicated writer thread. If the writer thread can not keep up, append blocks until a chunk
+    buffer has been freed. Memory consumption is therefore bounded by
+    <chunk_count> * <chunk_rows> rows.
+
+    The .npy header is written upon opening with enough room reserved to update the array shape
+    once the writer is closed. The resulting file can be loaded with numpy.load (including
+    mmap_mode) or qudi.util.datastorage.NpyDataStorage.
+
+    Usage:
+
+        with NpyStreamWriter(file_path, dtype=np.float64, row_shape=(2,)) as writer:
+            writer.append(data_2d)
+    """
+    _MAGIC = b'\x93NUMPY\x01\x00'
+
+    def __init__(self,
+                 file_path: str,
+                 dtype: Union[type, np.dtype],
+                 row_shape: Optional[Tuple[int, ...]] = None,
+                 chunk_rows: Optional[int] = 65536,
+                 chunk_count: Optional[int] = 8):
+        self._file_path = file_path
+        self._dtype = np.dtype(dtype)
+        self._row_shape = tuple() if row_shape is None else tuple(int(x) for x in row_shape)
+        self._chunk_rows = max(1, int(chunk_rows))
+        self._chunk_count = max(2, int(chunk_count))
+        self._header_size = self._get_header_size()
+
+        self._file = None
+        self._thread = None
+        self._free_chunks = None
+        self._write_queue = None
+        self._writer_error = None
+        self._current_chunk = None
+        self._current_rows = 0
+        self._rows_appended = 0
+        self._rows_written = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    @property
+    def rows_appended(self) -> int:
+        """ Total number of rows handed to this writer so far """
+        return self._rows_appended
+
+    @property
+    def rows_written(self) -> int:
+        """ Number of rows actually written to disk so far """
+        return self._rows_written
+
+    @property
+    def max_buffer_bytes(self) -> int:
+        """ Upper bound of the memory used for chunk buffers in bytes """
+        row_bytes = self._dtype.itemsize * int(np.prod(self._row_shape, dtype=np.int64))
+        return self._chunk_count * self._chunk_rows * row_bytes
+
+    def open(self) -> None:
+        """ Create (or overwrite) the file, write the header and start the writer thread """
+        if self.is_open:
+            raise RuntimeError(f'NpyStreamWriter for "{self._file_path}" is already open.')
+        os.makedirs(os.path.dirname(os.path.abspath(self._file_path)), exist_ok=True)
+        self._file = open(self._file_path, 'wb')
+        self._file.write(self._get_header(0))
+        self._free_chunks = queue.Queue()
+        for _ in range(self._chunk_count):
+            self._free_chunks.put(
+                np.empty((self._chunk_rows, *self._row_shape), dtype=self._dtype)
+            )
+        self._write_queue = queue.Queue()
+        self._writer_error = None
+        self._current_chunk = self._free_chunks.get()
+        self._current_rows = 0
+        self._rows_appended = 0
+        self._rows_written = 0
+        self._thread = threading.Thread(target=self._write_loop,
+                                        name=f'npy-stream-writer:{os.path.basename(self._file_path)}',
+                                        daemon=True)
+        self._thread.start()
+
+    def append(self, data: np.ndarray) -> None:
+        """ Append rows of data. The shape of each row must match row_shape. The data is copied,
+        so the caller may reuse the data buffer immediately after this call returns.
+        """
+        if not self.is_open:
+            raise RuntimeError('Unable to append data. NpyStreamWriter is not open.')
+        self._raise_writer_error()
+        data = np.asarray(data).reshape((-1, *self._row_shape))
+        offset = 0
+        total_rows = data.shape[0]
+        while offset < total_rows:
+            rows = min(self._chunk_rows - self._current_rows, total_rows - offset)
+            self._current_chunk[self._current_rows:self._current_rows + rows] = \
+                data[offset:offset + rows]
+            self._current_rows += rows
+            offset += rows
+            if self._current_rows == self._chunk_rows:
+                self._submit_current_chunk()
+                # Blocks if all chunk buffers are queued for writing (backpressure)
+                self._current_chunk = self._free_chunks.get()
+        self._rows_appended += total_rows
+
+    def close(self) -> int:
+        """ Flush all pending data, finalize the header and close the file.
+        Returns the total number of rows written.
+        """
+        if not self.is_open:
+            return self._rows_written
+        try:
+            if self._current_rows > 0:
+                self._submit_current_chunk()
+            self._write_queue.put(None)
+            self._thread.join()
+            self._file.seek(0)
+            self._file.write(self._get_header(self._rows_written))
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread = None
+            self._current_chunk = None
+            self._free_chunks = None
+            self._write_queue = None
+        self._raise_writer_error()
+        return self._rows_written
+
+    def _submit_current_chunk(self) -> None:
+        self._write_queue.put((self._current_chunk, self._current_rows))
+        self._current_chunk = None
+        self._current_rows = 0
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            chunk, rows = item
+            try:
+                if self._writer_error is None:
+                    self._file.write(chunk[:rows].tobytes())
+                    self._rows_written += rows
+            except Exception as err:
+                self._writer_error = err
+            finally:
+                self._free_chunks.put(chunk)
+
+    def _raise_writer_error(self) -> None:
+        if self._writer_error is not None:
+            raise IOError(
+                f'Error while writing data to "{self._file_path}"'
+            ) from self._writer_error
+
+    def _get_header(self, rows: int) -> bytes:
+        header = repr({'descr'        : np.lib.format.dtype_to_descr(self._dtype),
+                       'fortran_order': False,
+                       'shape'        : (int(rows), *self._row_shape)})
+        header = header.ljust(self._header_size - len(self._MAGIC) - 3) + '\n'
+        return self._MAGIC + struct.pack('<H', len(header)) + header.encode('latin1')
+
+    def _get_header_size(self) -> int:
+        # Reserve enough header space for the largest possible number of rows and align the
+        # start of the data to 64 bytes as done by numpy.
+        header = repr({'descr'        : np.lib.format.dtype_to_descr(self._dtype),
+                       'fortran_order': False,
+                       'shape'        : (np.iinfo(np.int64).max, *self._row_shape)})
+        size = len(self._MAGIC) + 2 + len(header) + 1
+        return 64 * ((size + 63) // 64)
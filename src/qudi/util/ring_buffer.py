@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module contains a fixed-size circular buffer for continuously running data traces.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+__all__ = ['RingBuffer']
+
+import numpy as np
+from typing import Optional, Union, Any
+
+
+class RingBuffer:
+    """ Fixed-size circular buffer holding the last <size> samples of a (multi-channel) data
+    stream. Samples are stored along the first axis, channels (if any) along the second axis.
+
+    Every sample is written twice into a storage array of twice the buffer size (mirrored
+    storage). This way the buffer contents are always available as contiguous, chronologically
+    ordered numpy view without copying or rolling any data. The cost of writing scales with the
+    number of new samples only, independent of the buffer size.
+
+    Views returned by this object share memory with the buffer and will change as new data is
+    written. Copy them if you need to keep a snapshot.
+    """
+
+    def __init__(self,
+                 size: int,
+                 channel_count: Optional[int] = None,
+                 dtype: Union[type, np.dtype] = np.float64,
+                 fill_value: Any = 0):
+        size = int(size)
+        if size < 1:
+            raise ValueError(f'RingBuffer size must be integer value >= 1 (received: {size:d})')
+        self._size = size
+        if channel_count is None:
+            shape = (2 * size,)
+        else:
+            shape = (2 * size, int(channel_count))
+        self._buffer = np.full(shape, fill_value, dtype=dtype)
+        # Index of the oldest sample in the buffer. Always within [0, size).
+        self._head = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def size(self) -> int:
+        """ Number of samples (per channel) held by the buffer """
+        return self._size
+
+    @property
+    def shape(self) -> tuple:
+        """ Shape of the ordered buffer view """
+        return (self._size, *self._buffer.shape[1:])
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._buffer.dtype
+
+    def fill(self, value: Any) -> None:
+        """ Overwrite the entire buffer contents with a constant value and reset the write pointer.
+        """
+        self._buffer[:] = value
+        self._head = 0
+
+    def set_data(self, data: np.ndarray) -> None:
+        """ Overwrite the entire buffer contents with an array of matching shape """
+        self._buffer[:self._size] = data
+        self._buffer[self._size:] = data
+        self._head = 0
+
+    def write(self, data: np.ndarray) -> None:
+        """ Append new samples to the buffer, discarding the oldest samples.
+        If more samples than the buffer size are provided, only the last <size> samples are
+        written.
+        """
+        data = data[-self._size:]
+        count = data.shape[0]
+        if count == 0:
+            return
+        start = self._head
+        end = start + count
+        # Primary copy. Since start < size and count <= size this is always contiguous.
+        self._buffer[start:end] = data
+        # Mirrored copy
+        if end <= self._size:
+            self._buffer[start + self._size:end + self._size] = data
+        else:
+            split = self._size - start
+            self._buffer[start + self._size:] = data[:split]
+            self._buffer[:end - self._size] = data[split:]
+        self._head = end % self._size
+
+    def view(self) -> np.ndarray:
+        """ Returns the chronologically ordered buffer contents as contiguous numpy view """
+        return self._buffer[self._head:self._head + self._size]
+
+    def latest(self, count: int) -> np.ndarray:
+        """ Returns a view of the <count> newest samples in chronological order """
+        count = min(max(int(count), 0), self._size)
+        end = self._head + self._size
+        return self._buffer[end - count:end]
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module contains a lock-free single-producer single-consumer ring buffer living in shared
+memory. It can be used to transfer streamed data between processes on the same host without
+serializing the data.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+__all__ = ['SharedStreamBuffer']
+
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Optional, Union, List, Tuple
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """ Attach to an existing shared memory block without registering it with the resource tracker
+    of this process. Otherwise the block would be destroyed once the attaching process exits.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, create=False, track=False)
+    except TypeError:
+        # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name, create=False)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
+
+
+class SharedStreamBuffer:
+    """ Ring buffer in shared memory for multi-channel sample streams (with optional timestamps).
+
+    Exactly one producer (writing samples) and one consumer (reading samples) may use the buffer
+    at the same time, each possibly living in a different process. Synchronization is done
+    without locks by two monotonic sample counters in the buffer header: The producer only ever
+    advances the write counter after the data has been written and the consumer only advances
+    the read counter after the data has been read.
+
+    Samples of all channels are stored interleaved, i.e. each segment view can be unraveled with:
+
+        data_view.reshape([<samples_per_channel>, <channel_count>])
+
+    The process creating the buffer (usually the consumer) is responsible for unlinking it. All
+    views obtained from this object must be released before calling close.
+    """
+    _HEADER_BYTES = 128
+    _DESCR_OFFSET = 64
+    _DESCR_BYTES = 64
+    # int64 header fields
+    _WRITE_COUNT = 0
+    _READ_COUNT = 1
+    _CAPACITY = 2
+    _CHANNEL_COUNT = 3
+    _HAS_TIMESTAMPS = 4
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+        self._header = np.ndarray((5,), dtype=np.int64, buffer=shm.buf)
+        descr = bytes(shm.buf[self._DESCR_OFFSET:self._DESCR_OFFSET + self._DESCR_BYTES])
+        self._dtype = np.dtype(descr.rstrip(b'\x00').decode('ascii'))
+        self._capacity = int(self._header[self._CAPACITY])
+        self._channel_count = int(self._header[self._CHANNEL_COUNT])
+        data_bytes = self._capacity * self._channel_count * self._dtype.itemsize
+        self._data = np.ndarray((self._capacity * self._channel_count,),
+                                dtype=self._dtype,
+                                buffer=shm.buf,
+                                offset=self._HEADER_BYTES)
+        if self._header[self._HAS_TIMESTAMPS]:
+            self._timestamps = np.ndarray((self._capacity,),
+                                          dtype=np.float64,
+                                          buffer=shm.buf,
+                                          offset=self._HEADER_BYTES + 8 * -(-data_bytes // 8))
+        else:
+            self._timestamps = None
+
+    @classmethod
+    def create(cls,
+               capacity: int,
+               channel_count: int,
+               dtype: Union[type, np.dtype],
+               timestamps: Optional[bool] = False,
+               name: Optional[str] = None) -> 'SharedStreamBuffer':
+        """ Create a new shared memory ring buffer holding up to <capacity> samples per channel """
+        capacity = int(capacity)
+        channel_count = int(channel_count)
+        if capacity < 1 or channel_count < 1:
+            raise ValueError('SharedStreamBuffer capacity and channel_count must be >= 1')
+        dtype = np.dtype(dtype)
+        descr = dtype.str.encode('ascii')
+        if len(descr) > cls._DESCR_BYTES:
+            raise ValueError(f'Unsupported data type for SharedStreamBuffer: {dtype}')
+        data_bytes = 8 * -(-(capacity * channel_count * dtype.itemsize) // 8)
+        size = cls._HEADER_BYTES + data_bytes + (8 * capacity if timestamps else 0)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((5,), dtype=np.int64, buffer=shm.buf)
+        header[:] = (0, 0, capacity, channel_count, int(bool(timestamps)))
+        shm.buf[cls._DESCR_OFFSET:cls._DESCR_OFFSET + len(descr)] = descr
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedStreamBuffer':
+        """ Attach to an existing shared memory ring buffer by name """
+        return cls(_attach_shared_memory(name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def capacity(self) -> int:
+        """ Maximum number of samples per channel the buffer can hold """
+        return self._capacity
+
+    @property
+    def channel_count(self) -> int:
+        return self._channel_count
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def has_timestamps(self) -> bool:
+        return self._timestamps is not None
+
+    @property
+    def available(self) -> int:
+        """ Number of samples per channel ready to be read by the consumer """
+        return int(self._header[self._WRITE_COUNT] - self._header[self._READ_COUNT])
+
+    @property
+    def free(self) -> int:
+        """ Number of samples per channel that can be written by the producer """
+        return self._capacity - self.available
+
+    def _segments(self, start_count: int, samples: int
+                  ) -> List[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        segments = list()
+        start = start_count % self._capacity
+        while samples > 0:
+            count = min(samples, self._capacity - start)
+            data_view = self._data[start * self._channel_count:(start + count) * self._channel_count]
+            if self._timestamps is None:
+                segments.append((data_view, None))
+            else:
+                segments.append((data_view, self._timestamps[start:start + count]))
+            samples -= count
+            start = 0
+        return segments
+
+    def writable_segments(self, samples: int) -> List[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """ Producer side. Returns up to two (data, timestamps) segment views for the next
+        <samples> samples per channel to write. Call "commit" after the data has been written.
+        """
+        if samples > self.free:
+            raise OverflowError(f'Not enough free space in SharedStreamBuffer to write {samples:d} '
+                                f'samples (free: {self.free:d}).')
+        return self._segments(int(self._header[self._WRITE_COUNT]), samples)
+
+    def commit(self, samples: int) -> None:
+        """ Producer side. Publish <samples> samples per channel written to the writable segments
+        """
+        self._header[self._WRITE_COUNT] += samples
+
+    def readable_segments(self, samples: int) -> List[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """ Consumer side. Returns up to two (data, timestamps) segment views of the next
+        <samples> samples per channel to read. Call "release" after the data has been consumed.
+        """
+        if samples > self.available:
+            raise ValueError(f'Unable to read {samples:d} samples from SharedStreamBuffer '
+                             f'(available: {self.available:d}).')
+        return self._segments(int(self._header[self._READ_COUNT]), samples)
+
+    def release(self, samples: int) -> None:
+        """ Consumer side. Free <samples> samples per channel that have been consumed """
+        self._header[self._READ_COUNT] += samples
+
+    def write(self, data: np.ndarray, timestamps: Optional[np.ndarray] = None) -> int:
+        """ Producer side. Copy interleaved samples (and timestamps) into the buffer.
+        Returns the number of samples per channel written.
+        """
+        data = np.asarray(data).reshape(-1)
+        samples = data.size // self._channel_count
+        offset = 0
+        for data_view, times_view in self.writable_segments(samples):
+            count = data_view.size // self._channel_count
+            data_view[:] = data[offset * self._channel_count:(offset + count) * self._channel_count]
+            if times_view is not None:
+                times_view[:] = timestamps[offset:offset + count]
+            offset += count
+        self.commit(samples)
+        return samples
+
+    def read_into(self,
+                  data_buffer: np.ndarray,
+                  samples_per_channel: int,
+                  timestamp_buffer: Optional[np.ndarray] = None) -> int:
+        """ Consumer side. Copy <samples_per_channel> samples (and timestamps) into the provided
+        1D buffer arrays. Returns the number of samples per channel read.
+        """
+        offset = 0
+        for data_view, times_view in self.readable_segments(samples_per_channel):
+            count = data_view.size // self._channel_count
+            data_buffer[offset * self._channel_count:(offset + count) * self._channel_count] = \
+                data_view
+            if times_view is not None and timestamp_buffer is not None:
+                timestamp_buffer[offset:offset + count] = times_view
+            offset += count
+        self.release(samples_per_channel)
+        return samples_per_channel
+
+    def close(self) -> None:
+        """ Release the shared memory block in this process. All views obtained from this object
+        must be released before.
+        """
+        self._header = self._data = self._timestamps = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """ Destroy the shared memory block. Only the creating process should call this. """
+        if self._owner:
+            self._shm.unlink()
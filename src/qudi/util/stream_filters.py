@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module contains stateful filters to process continuous data streams frame by frame.
+
+All filters operate along the first axis (samples) and process all channels (second axis) at once.
+Filter states are kept between calls to "process", so splitting a data stream into arbitrary
+frames yields the same result as processing the entire stream at once.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+__all__ = ['StreamFilter', 'BoxcarFilter', 'DecimatingMeanFilter', 'CicDecimator']
+
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from qudi.util.ring_buffer import RingBuffer
+
+
+class StreamFilter(ABC):
+    """ Base class for stateful stream filters """
+
+    @abstractmethod
+    def process(self, data: np.ndarray) -> np.ndarray:
+        """ Filter the next frame of samples (1D or 2D array with samples along first axis) and
+        return the filtered samples.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def reset(self) -> None:
+        """ Reset the filter state as if no data has been processed yet """
+        raise NotImplementedError
+
+
+class BoxcarFilter(StreamFilter):
+    """ Causal moving average filter of a given width implemented as running sum.
+    Each output sample is the mean of the last <width> input samples (including itself). The
+    filter history is initialized with zeros or, if <steady_state_start> is True, with the first
+    sample processed in order to avoid start-up transients.
+
+    The computational cost per frame scales with the number of new samples only and does not
+    depend on the filter width. In order to avoid accumulation of rounding errors, the running sum
+    is periodically recalculated from the filter history.
+    """
+    _resync_interval = 65536
+
+    def __init__(self, width: int, steady_state_start: Optional[bool] = False):
+        width = int(width)
+        if width < 1:
+            raise ValueError(f'Boxcar filter width must be integer value >= 1 '
+                             f'(received: {width:d})')
+        self._width = width
+        self._steady_state_start = bool(steady_state_start)
+        self._history = None
+        self._sum = None
+        self._samples_since_resync = 0
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    def reset(self) -> None:
+        self._history = None
+        self._sum = None
+        self._samples_since_resync = 0
+
+    def process(self, data: np.ndarray) -> np.ndarray:
+        data = np.asarray(data, dtype=np.float64)
+        sample_count = data.shape[0]
+        if self._history is None or self._history.shape[1:] != data.shape[1:]:
+            if sample_count == 0:
+                return data.copy()
+            self._history = RingBuffer(size=self._width,
+                                       channel_count=data.shape[1] if data.ndim > 1 else None,
+                                       dtype=np.float64)
+            if self._steady_state_start:
+                self._history.fill(data[0])
+            self._sum = self._history.view().sum(axis=0)
+            self._samples_since_resync = 0
+        if sample_count == 0:
+            return data.copy()
+
+        # Samples dropping out of the filter window for each new sample
+        history_count = min(sample_count, self._width)
+        dropped = np.empty_like(data)
+        dropped[:history_count] = self._history.view()[:history_count]
+        dropped[history_count:] = data[:sample_count - history_count]
+
+        running_sum = np.cumsum(data - dropped, axis=0)
+        running_sum += self._sum
+        self._sum = running_sum[-1].copy()
+        self._history.write(data)
+
+        self._samples_since_resync += sample_count
+        if self._samples_since_resync >= max(self._width, self._resync_interval):
+            self._sum = self._history.view().sum(axis=0)
+            self._samples_since_resync = 0
+
+        running_sum /= self._width
+        return running_sum
+
+
+class DecimatingMeanFilter(StreamFilter):
+    """ Averages consecutive blocks of <factor> samples into a single output sample.
+    Samples not filling a complete block are kept until the next call.
+    """
+
+    def __init__(self, factor: int):
+        factor = int(factor)
+        if factor < 1:
+            raise ValueError(f'Decimation factor must be integer value >= 1 '
+                             f'(received: {factor:d})')
+        self._factor = factor
+        self._remainder = None
+
+    @property
+    def factor(self) -> int:
+        return self._factor
+
+    def reset(self) -> None:
+        self._remainder = None
+
+    def process(self, data: np.ndarray) -> np.ndarray:
+        data = np.asarray(data)
+        if self._factor == 1:
+            return data
+        if self._remainder is not None and self._remainder.shape[0] > 0:
+            data = np.concatenate([self._remainder, data], axis=0)
+        usable_samples = (data.shape[0] // self._factor) * self._factor
+        self._remainder = data[usable_samples:].copy()
+        data = data[:usable_samples].reshape(
+            [usable_samples // self._factor, self._factor, *data.shape[1:]]
+        )
+        return np.mean(data, axis=1)
+
+
+class CicDecimator(StreamFilter):
+    """ Cascaded integrator-comb (CIC) decimation filter with differential delay of 1.
+
+    The filter is implemented as <order> cascaded boxcar filters of width <factor> followed by
+    down-sampling by <factor>, which is mathematically equivalent to the recursive CIC structure
+    but numerically stable for floating point data. The output is normalized to unity DC gain.
+    A first order CIC decimator is identical to DecimatingMeanFilter.
+
+    The group delay of the filter is <order> * (<factor> - 1) / 2 input samples. Filtering the
+    timestamps of the data with a CIC decimator of the same factor and order keeps both aligned.
+    <steady_state_start> is passed on to the boxcar filter stages, see BoxcarFilter.
+    """
+
+    def __init__(self, factor: int, order: int = 3, steady_state_start: Optional[bool] = False):
+        factor = int(factor)
+        order = int(order)
+        if factor < 1:
+            raise ValueError(f'Decimation factor must be integer value >= 1 '
+                             f'(received: {factor:d})')
+        if order < 1:
+            raise ValueError(f'CIC filter order must be integer value >= 1 (received: {order:d})')
+        self._factor = factor
+        self._stages = [BoxcarFilter(factor, steady_state_start) for _ in range(order)]
+        self._sample_count = 0
+
+    @property
+    def factor(self) -> int:
+        return self._factor
+
+    @property
+    def order(self) -> int:
+        return len(self._stages)
+
+    def reset(self) -> None:
+        for stage in self._stages:
+            stage.reset()
+        self._sample_count = 0
+
+    def process(self, data: np.ndarray) -> np.ndarray:
+        for stage in self._stages:
+            data = stage.process(data)
+        # Pick every <factor>-th sample, aligned to the total number of processed samples
+        start = (-self._sample_count - 1) % self._factor
+        self._sample_count += data.shape[0]
+        return data[start::self._factor]
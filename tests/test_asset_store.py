@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the SQLite pulse asset store and the lazily loading asset dict.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import pytest
+
+# The asset store uses the qudi-core Mutex
+pytest.importorskip('qudi.util.mutex')
+
+from qudi.logic.pulsed.asset_store import PulseAssetStore, LazyAssetDict
+
+
+@pytest.fixture
+def store(tmp_path):
+    asset_store = PulseAssetStore(str(tmp_path / 'pulse_assets.db'))
+    yield asset_store
+    asset_store.close()
+
+
+def test_store_load_delete(store):
+    block = {'name': 'laser', 'element_list': [{'init_length_s': 3e-6}]}
+    store.store('block', 'laser', block)
+    store.store('ensemble', 'laser', {'name': 'laser', 'block_list': [('laser', 0)]})
+    assert store.load('block', 'laser') == block
+    assert store.names('block') == ['laser']
+    assert store.names('sequence') == []
+
+    store.store('block', 'laser', {'name': 'laser', 'element_list': []})
+    assert store.load('block', 'laser')['element_list'] == []
+
+    store.delete('block', 'laser')
+    store.delete('block', 'not_stored')
+    assert store.load('block', 'laser') is None
+    assert store.names('ensemble') == ['laser']
+
+
+def test_persistence_and_batch(tmp_path):
+    path = str(tmp_path / 'pulse_assets.db')
+    store = PulseAssetStore(path)
+    with store.batch():
+        with store.batch():
+            for ii in range(10):
+                store.store('block', 'block_{0:d}'.format(ii), {'index': ii})
+        store.delete('block', 'block_3')
+    store.close()
+
+    store = PulseAssetStore(path)
+    try:
+        assert sorted(store.names('block')) == sorted('block_{0:d}'.format(ii)
+                                                      for ii in range(10) if ii != 3)
+        assert store.load('block', 'block_7') == {'index': 7}
+    finally:
+        store.close()
+
+
+def test_invalid_kind(store):
+    with pytest.raises(ValueError):
+        store.store('waveform', 'wfm', {})
+    with pytest.raises(ValueError):
+        store.names('waveform')
+
+
+def test_lazy_asset_dict_loads_on_access():
+    loaded = list()
+
+    def loader(name):
+        loaded.append(name)
+        return None if name == 'missing' else name.upper()
+
+    assets = LazyAssetDict(loader, names=['a', 'b', 'missing'])
+    assert len(assets) == 3
+    assert 'a' in assets
+    assert not assets.is_loaded('a')
+    assert loaded == []
+
+    assert assets['a'] == 'A'
+    assert assets['a'] == 'A'
+    assert loaded == ['a']
+    assert assets.loaded_names() == ['a']
+
+    # Objects the loader can not provide are dropped
+    with pytest.raises(KeyError):
+        assets['missing']
+    assert 'missing' not in assets
+    assert assets.get('missing', 'default') == 'default'
+
+    assets['c'] = 'C'
+    assert assets.is_loaded('c')
+    assert sorted(assets.loaded_names()) == ['a', 'c']
+
+
+def test_lazy_asset_dict_never_exposes_placeholders():
+    assets = LazyAssetDict(lambda name: None if name == 'missing' else name * 2,
+                           names=['x', 'y', 'missing'])
+    assert dict(assets) == {'x': 'xx', 'y': 'yy'}
+
+    assets = LazyAssetDict(lambda name: name * 2, names=['x', 'y'])
+    assert sorted(assets.values()) == ['xx', 'yy']
+    assert assets.copy() == {'x': 'xx', 'y': 'yy'}
+    assert assets.pop('x') == 'xx'
+    assert assets.pop('x', None) is None
+    with pytest.raises(KeyError):
+        assets.pop('x')
+    assert list(assets) == ['y']
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the vectorized basic pulse analysis methods against the previous per-pulse
+implementations using random laser data.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import warnings
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from qudi.logic.pulsed.pulsed_analysis_methods.basic_analysis_methods import BasicPulseAnalyzer
+
+BIN_WIDTH = 1e-9
+NUMBER_OF_BINS = 600
+
+# (signal_start, signal_end, norm_start, norm_end) in s
+WINDOWS = [
+    (0.0, 200e-9, 300e-9, 500e-9),
+    (10e-9, 11e-9, 590e-9, 700e-9),  # normalization window partially beyond the data
+    (100e-9, 100e-9, 300e-9, 500e-9),  # empty signal window
+    (0.0, 200e-9, 650e-9, 700e-9),  # normalization window beyond the data
+    (250e-9, 120e-9, 400e-9, 300e-9),  # reversed windows
+]
+
+
+def make_analyzer(bin_width=BIN_WIDTH):
+    """ Analysis methods only access the fast counter settings of the measurement logic """
+    return BasicPulseAnalyzer(SimpleNamespace(fast_counter_settings={'bin_width': bin_width}))
+
+
+def make_laser_data(seed, number_of_lasers=50):
+    rng = np.random.default_rng(seed)
+    laser_data = rng.poisson(3, (number_of_lasers, NUMBER_OF_BINS)).astype(np.int64)
+    # Laser pulses without any counts and without counts in the signal window only
+    laser_data[3] = 0
+    laser_data[7, :300] = 0
+    return laser_data
+
+
+def window_sum_mean(laser_arr, start_bin, end_bin):
+    tmp_data = laser_arr[start_bin:end_bin]
+    window_sum = np.sum(tmp_data)
+    window_mean = (window_sum / len(tmp_data)) if len(tmp_data) != 0 else 0.0
+    return window_sum, window_mean
+
+
+def reference_mean_norm(laser_data, signal_start, signal_end, norm_start, norm_end):
+    """ Per-pulse implementation of BasicPulseAnalyzer.analyse_mean_norm """
+    signal_data = np.empty(laser_data.shape[0], dtype=float)
+    error_data = np.empty(laser_data.shape[0], dtype=float)
+    for ii, laser_arr in enumerate(laser_data):
+        reference_sum, reference_mean = window_sum_mean(laser_arr,
+                                                        round(norm_start / BIN_WIDTH),
+                                                        round(norm_end / BIN_WIDTH))
+        signal_sum, signal_mean = window_sum_mean(laser_arr,
+                                                  round(signal_start / BIN_WIDTH),
+                                                  round(signal_end / BIN_WIDTH))
+        if reference_mean > 0 and signal_mean >= 0:
+            signal_data[ii] = signal_mean / reference_mean
+        else:
+            signal_data[ii] = 0.0
+        if reference_sum > 0 and signal_sum > 0:
+            error_data[ii] = signal_data[ii] * np.sqrt(1 / signal_sum + 1 / reference_sum)
+        else:
+            error_data[ii] = 0.0
+    return signal_data, error_data
+
+
+def reference_sum(laser_data, signal_start, signal_end):
+    """ Per-pulse implementation of BasicPulseAnalyzer.analyse_sum """
+    signal_data = np.empty(laser_data.shape[0], dtype=float)
+    error_data = np.empty(laser_data.shape[0], dtype=float)
+    for ii, laser_arr in enumerate(laser_data):
+        signal = laser_arr[round(signal_start / BIN_WIDTH):round(signal_end / BIN_WIDTH)].sum()
+        if signal < 0 or signal != signal:
+            signal_data[ii] = 0.0
+            error_data[ii] = 0.0
+        else:
+            signal_data[ii] = signal
+            error_data[ii] = np.sqrt(signal)
+    return signal_data, error_data
+
+
+def reference_mean(laser_data, signal_start, signal_end):
+    """ Per-pulse implementation of BasicPulseAnalyzer.analyse_mean """
+    signal_start_bin = round(signal_start / BIN_WIDTH)
+    signal_end_bin = round(signal_end / BIN_WIDTH)
+    signal_data = np.empty(laser_data.shape[0], dtype=float)
+    error_data = np.empty(laser_data.shape[0], dtype=float)
+    for ii, laser_arr in enumerate(laser_data):
+        with warnings.catch_warnings(), np.errstate(divide='ignore', invalid='ignore'):
+            # The mean of an empty window is NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            signal = laser_arr[signal_start_bin:signal_end_bin].mean()
+            signal_sum = laser_arr[signal_start_bin:signal_end_bin].sum()
+            signal_error = np.sqrt(signal_sum) / (signal_end_bin - signal_start_bin)
+        if signal < 0 or signal != signal:
+            signal_data[ii] = 0.0
+            error_data[ii] = 0.0
+        else:
+            signal_data[ii] = signal
+            error_data[ii] = signal_error
+    return signal_data, error_data
+
+
+def reference_mean_reference(laser_data, signal_start, signal_end, norm_start, norm_end):
+    """ Per-pulse implementation of BasicPulseAnalyzer.analyse_mean_reference """
+    signal_data = np.empty(laser_data.shape[0], dtype=float)
+    error_data = np.empty(laser_data.shape[0], dtype=float)
+    for ii, laser_arr in enumerate(laser_data):
+        reference_sum, reference_mean = window_sum_mean(laser_arr,
+                                                        round(norm_start / BIN_WIDTH),
+                                                        round(norm_end / BIN_WIDTH))
+        signal_sum, signal_mean = window_sum_mean(laser_arr,
+                                                  round(signal_start / BIN_WIDTH),
+                                                  round(signal_end / BIN_WIDTH))
+        signal_data[ii] = signal_mean - reference_mean
+        with np.errstate(divide='ignore', invalid='ignore'):
+            error_data[ii] = signal_data[ii] * np.sqrt(1 / np.abs(signal_sum) +
+                                                       1 / np.abs(reference_sum))
+    return signal_data, error_data
+
+
+def assert_results_equal(result, expected):
+    assert len(result) == 2
+    for data, expected_data in zip(result, expected):
+        assert data.shape == expected_data.shape
+        np.testing.assert_allclose(data, expected_data, rtol=1e-12, atol=0)
+
+
+@pytest.mark.parametrize('windows', WINDOWS)
+@pytest.mark.parametrize('seed', [0, 1])
+def test_analyse_mean_norm(windows, seed):
+    laser_data = make_laser_data(seed)
+    result = make_analyzer().analyse_mean_norm(laser_data, *windows)
+    assert_results_equal(result, reference_mean_norm(laser_data, *windows))
+
+
+@pytest.mark.parametrize('windows', WINDOWS)
+@pytest.mark.parametrize('seed', [0, 1])
+def test_analyse_sum(windows, seed):
+    laser_data = make_laser_data(seed)
+    result = make_analyzer().analyse_sum(laser_data, *windows[:2])
+    assert_results_equal(result, reference_sum(laser_data, *windows[:2]))
+
+
+@pytest.mark.parametrize('windows', WINDOWS)
+@pytest.mark.parametrize('seed', [0, 1])
+def test_analyse_mean(windows, seed):
+    laser_data = make_laser_data(seed)
+    result = make_analyzer().analyse_mean(laser_data, *windows[:2])
+    assert_results_equal(result, reference_mean(laser_data, *windows[:2]))
+
+
+@pytest.mark.parametrize('windows', WINDOWS)
+@pytest.mark.parametrize('seed', [0, 1])
+def test_analyse_mean_reference(windows, seed):
+    laser_data = make_laser_data(seed)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = make_analyzer().analyse_mean_reference(laser_data, *windows)
+    assert_results_equal(result, reference_mean_reference(laser_data, *windows))
+
+
+def test_invalid_bin_width_returns_zeros():
+    laser_data = make_laser_data(2)
+    analyzer = make_analyzer(bin_width=None)
+    for method in (analyzer.analyse_mean_norm,
+                   analyzer.analyse_sum,
+                   analyzer.analyse_mean,
+                   analyzer.analyse_mean_reference):
+        signal_data, error_data = method(laser_data)
+        assert not signal_data.any()
+        assert not error_data.any()
+        assert signal_data.shape == error_data.shape == (laser_data.shape[0],)
+
+
+@pytest.mark.parametrize('name', ['mean_norm', 'sum', 'mean', 'mean_reference'])
+@pytest.mark.parametrize('windows', WINDOWS)
+def test_running_window_sums(name, windows):
+    """ Window sums of partial data add up to the window sums of the accumulated data """
+    analyzer = make_analyzer()
+    window_sums = getattr(analyzer, f'window_sums_{name}')
+    signal_from_window_sums = getattr(analyzer, f'signal_from_window_sums_{name}')
+    windows = windows[:2] if name in ('sum', 'mean') else windows
+    intervals = [make_laser_data(seed) for seed in range(3, 6)]
+    laser_data = np.sum(intervals, axis=0)
+
+    running_sums = np.zeros_like(window_sums(intervals[0], *windows))
+    for interval in intervals:
+        running_sums += window_sums(interval, *windows)
+    np.testing.assert_array_equal(running_sums, window_sums(laser_data, *windows))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = getattr(analyzer, f'analyse_{name}')(laser_data, *windows)
+        result = signal_from_window_sums(running_sums, laser_data.shape[1], *windows)
+    assert_results_equal(result, expected)
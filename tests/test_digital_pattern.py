@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the run-length encoded digital patterns compiled by SequenceGeneratorLogic against the
+digital samples of each PulseBlockElement.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+import pytest
+
+# SequenceGeneratorLogic is a qudi module and needs qudi-core and Qt
+pytest.importorskip('PySide2')
+pytest.importorskip('qudi.core.module')
+
+from qudi.logic.pulsed.sequence_generator_logic import SequenceGeneratorLogic
+from qudi.logic.pulsed.pulse_objects import PulseBlock, PulseBlockElement, PulseBlockEnsemble
+
+SAMPLE_RATE = 1e9
+DIGITAL_CHANNELS = ('d_ch1', 'd_ch2', 'd_ch10')
+
+
+def make_element(length_bins, increment_bins=0, high=()):
+    return PulseBlockElement(init_length_s=length_bins / SAMPLE_RATE,
+                             increment_s=increment_bins / SAMPLE_RATE,
+                             digital_high={chnl: chnl in high for chnl in DIGITAL_CHANNELS})
+
+
+def make_logic(tmp_path, blocks):
+    logic = SequenceGeneratorLogic(qudi_main_weakref=None,
+                                   name='sequencegenerator',
+                                   config={'assets_storage_path': str(tmp_path)})
+    for block in blocks:
+        logic._saved_pulse_blocks[block.name] = block
+    return logic
+
+
+def expand_ensemble(ensemble, blocks):
+    """ Element lengths in bins (as analyze_block_ensemble) and digital samples of each channel
+    sampled element by element
+    """
+    lengths = list()
+    samples = {chnl: list() for chnl in DIGITAL_CHANNELS}
+    for block_name, reps in ensemble:
+        for rep_no in range(reps + 1):
+            for element in blocks[block_name]:
+                length = int(round((element.init_length_s + rep_no * element.increment_s) *
+                                   SAMPLE_RATE))
+                lengths.append(length)
+                for chnl in DIGITAL_CHANNELS:
+                    samples[chnl].append(np.full(length, element.digital_high[chnl]))
+    ensemble_info = {'digital_channels': set(DIGITAL_CHANNELS),
+                     'elements_length_bins': np.array(lengths, dtype='int64'),
+                     'number_of_samples': int(sum(lengths))}
+    return ensemble_info, {chnl: np.concatenate(arr) for chnl, arr in samples.items()}
+
+
+def test_pattern_matches_samples(tmp_path):
+    laser = PulseBlock('laser', [make_element(300, high=('d_ch1',)),
+                                 make_element(100, high=('d_ch1',)),
+                                 make_element(0, high=('d_ch2',)),
+                                 make_element(50)])
+    tau = PulseBlock('tau', [make_element(10, increment_bins=7, high=('d_ch10',)),
+                             make_element(20, high=('d_ch2', 'd_ch10'))])
+    blocks = {block.name: block for block in (laser, tau)}
+    ensemble = PulseBlockEnsemble('rabi', block_list=[('laser', 0), ('tau', 4), ('laser', 1)])
+    ensemble_info, expected = expand_ensemble(ensemble, blocks)
+
+    logic = make_logic(tmp_path, blocks.values())
+    run_lengths, digital_states = logic.compile_digital_pattern(ensemble, ensemble_info)
+
+    assert run_lengths.dtype == np.int64
+    assert np.all(run_lengths > 0)
+    assert run_lengths.sum() == ensemble_info['number_of_samples']
+    assert set(digital_states) == set(DIGITAL_CHANNELS)
+    for chnl in DIGITAL_CHANNELS:
+        assert digital_states[chnl].shape == run_lengths.shape
+        np.testing.assert_array_equal(np.repeat(digital_states[chnl], run_lengths), expected[chnl])
+    # Consecutive runs differ in at least one channel
+    states = np.stack([digital_states[chnl] for chnl in DIGITAL_CHANNELS], axis=1)
+    assert np.all(np.any(states[1:] != states[:-1], axis=1))
+
+
+def test_identical_states_merge_into_single_run(tmp_path):
+    block = PulseBlock('idle', [make_element(5, high=('d_ch2',)), make_element(7, high=('d_ch2',))])
+    ensemble = PulseBlockEnsemble('idle', block_list=[('idle', 9)])
+    ensemble_info, _ = expand_ensemble(ensemble, {'idle': block})
+
+    logic = make_logic(tmp_path, [block])
+    run_lengths, digital_states = logic.compile_digital_pattern(ensemble, ensemble_info)
+
+    np.testing.assert_array_equal(run_lengths, [120])
+    assert digital_states['d_ch2'].tolist() == [True]
+    assert digital_states['d_ch1'].tolist() == [False]
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the FastComTec list file streamer reading a list file while it is being written.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import time
+import numpy as np
+import pytest
+
+from qudi.hardware.fastcomtec.fastcomtec_readout import ListFileStreamer
+
+HEADER = b'[MPA4A] 1\r\nrange=4096\r\ntimepreset=0.000\r\n[DATA]\r\n'
+
+
+def make_records(seed, count=20000):
+    return np.random.default_rng(seed).integers(0, 2 ** 63, count, dtype=np.uint64)
+
+
+def write_in_pieces(file, data, seed, max_piece=5000):
+    """ Write bytes in pieces of random length, splitting records and header lines """
+    rng = np.random.default_rng(seed)
+    start = 0
+    while start < len(data):
+        stop = start + int(rng.integers(1, max_piece))
+        file.write(data[start:stop])
+        file.flush()
+        start = stop
+
+
+def collect_until_stopped(streamer, timeout=10):
+    records = [streamer.get_records()]
+    streamer.stop(timeout=timeout)
+    records.append(streamer.get_records())
+    return np.concatenate(records)
+
+
+@pytest.mark.parametrize('chunk_records,chunk_count', [(65536, 8), (100, 2), (1, 2)])
+def test_streams_all_records(tmp_path, chunk_records, chunk_count):
+    path = tmp_path / 'list.lst'
+    records = make_records(chunk_records)
+    streamer = ListFileStreamer(str(path), chunk_records=chunk_records, chunk_count=chunk_count,
+                                poll_interval=0.001)
+    streamer.start()
+    assert streamer.is_running
+    collected = list()
+    with open(path, 'wb') as file:
+        write_in_pieces(file, HEADER + records.tobytes(), seed=chunk_count)
+        time.sleep(0.01)
+        collected.append(streamer.get_records())
+    collected.append(collect_until_stopped(streamer))
+
+    assert not streamer.is_running
+    np.testing.assert_array_equal(np.concatenate(collected), records)
+    assert streamer.records_read == records.size
+
+
+def test_incomplete_record_is_kept(tmp_path):
+    path = tmp_path / 'list.lst'
+    records = make_records(0, count=10)
+    data = HEADER + records.tobytes()
+    streamer = ListFileStreamer(str(path), poll_interval=0.001)
+    with open(path, 'wb') as file:
+        file.write(data[:-3])
+    streamer.start()
+    time.sleep(0.05)
+    np.testing.assert_array_equal(streamer.get_records(), records[:-1])
+    with open(path, 'ab') as file:
+        file.write(data[-3:])
+    np.testing.assert_array_equal(collect_until_stopped(streamer), records[-1:])
+
+
+def test_stop_before_file_exists(tmp_path):
+    streamer = ListFileStreamer(str(tmp_path / 'missing.lst'), poll_interval=0.001)
+    assert streamer.get_records().size == 0
+    streamer.start()
+    with pytest.raises(RuntimeError):
+        streamer.start()
+    streamer.stop(timeout=10)
+    assert streamer.get_records().size == 0
+    assert streamer.records_read == 0
+
+
+def test_custom_record_dtype(tmp_path):
+    path = tmp_path / 'list.lst'
+    records = np.arange(1000, dtype='<u4')
+    with open(path, 'wb') as file:
+        file.write(b'[DATA]\n' + records.tobytes())
+    streamer = ListFileStreamer(str(path), record_dtype='<u4', chunk_records=64,
+                                poll_interval=0.001)
+    streamer.start()
+    collected = collect_until_stopped(streamer)
+    assert collected.dtype == np.dtype('<u4')
+    np.testing.assert_array_equal(collected, records)
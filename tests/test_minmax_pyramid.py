@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the incrementally updated min/max decimation pyramid used for long time series views.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+import pytest
+
+from qudi.util.ring_buffer import RingBuffer
+from qudi.util.minmax_pyramid import MinMaxPyramid
+
+BUFFER_SIZE = 10000
+CHANNEL_COUNT = 2
+
+
+def make_streaming_pyramid(seed, frame_count=50):
+    """ Buffer and pyramid fed with random frames, as done by TimeSeriesReaderLogic """
+    rng = np.random.default_rng(seed)
+    buffer = RingBuffer(size=BUFFER_SIZE, channel_count=CHANNEL_COUNT)
+    pyramid = MinMaxPyramid(buffer)
+    for frame_size in rng.integers(1, 3000, frame_count):
+        data = rng.normal(size=(frame_size, CHANNEL_COUNT))
+        buffer.write(data)
+        pyramid.update(data)
+    return buffer, pyramid
+
+
+@pytest.mark.parametrize('start,stop,max_points', [(None, None, 4096),
+                                                   (None, None, 100),
+                                                   (None, None, 2),
+                                                   (123, 9876, 500),
+                                                   (5000, 5010, 4),
+                                                   (7, 8000, 3)])
+def test_view_preserves_extrema(start, stop, max_points):
+    buffer, pyramid = make_streaming_pyramid(seed=max_points)
+    positions, values = pyramid.get_view(start, stop, max_points)
+    raw = buffer.view()[start:stop]
+    first = 0 if start is None else start
+    last = BUFFER_SIZE - 1 if stop is None else stop - 1
+
+    assert positions.size == values.shape[0] <= max(max_points, 2)
+    assert values.shape[1:] == (CHANNEL_COUNT,)
+    assert positions[0] == first
+    assert positions[-1] == last
+    assert np.all(np.diff(positions) >= 0)
+    np.testing.assert_array_equal(values.min(axis=0), raw.min(axis=0))
+    np.testing.assert_array_equal(values.max(axis=0), raw.max(axis=0))
+
+
+def test_short_range_returns_raw_data():
+    buffer, pyramid = make_streaming_pyramid(seed=0)
+    positions, values = pyramid.get_view(100, 150, max_points=64)
+    np.testing.assert_array_equal(positions, np.arange(100, 150))
+    np.testing.assert_array_equal(values, buffer.view()[100:150])
+    # The view is a copy
+    values[:] = np.nan
+    assert not np.isnan(buffer.view()).any()
+
+
+def test_partial_windows_follow_peaks():
+    """ Peaks written in between are found in every view covering them """
+    buffer = RingBuffer(size=BUFFER_SIZE)
+    pyramid = MinMaxPyramid(buffer, factor=4)
+    rng = np.random.default_rng(1)
+    for frame_size in rng.integers(1, 2000, 30):
+        data = rng.uniform(-1, 1, frame_size)
+        peak_index = rng.integers(frame_size)
+        data[peak_index] = 10
+        buffer.write(data)
+        pyramid.update(data)
+        peak_position = BUFFER_SIZE - frame_size + peak_index
+        positions, values = pyramid.get_view(peak_position - 1000, BUFFER_SIZE, max_points=32)
+        assert values.max() == 10
+
+
+def test_level_count():
+    buffer = RingBuffer(size=4 ** 5)
+    assert MinMaxPyramid(buffer, factor=4).level_count == 5
+    assert MinMaxPyramid(buffer, factor=4, min_bins=16).level_count == 3
+
+
+def test_invalid_factor():
+    with pytest.raises(ValueError):
+        MinMaxPyramid(RingBuffer(size=100), factor=1)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the mirrored circular buffer against a plain array holding the last samples of a stream.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+import pytest
+
+from qudi.util.ring_buffer import RingBuffer
+
+
+@pytest.mark.parametrize('channel_count', [None, 3])
+def test_view_holds_last_samples(channel_count):
+    size = 50
+    rng = np.random.default_rng(0)
+    buffer = RingBuffer(size=size, channel_count=channel_count, fill_value=-1)
+    shape = (size,) if channel_count is None else (size, channel_count)
+    expected = np.full(shape, -1.0)
+    for frame_size in rng.integers(0, 2 * size, 100):
+        data = rng.normal(size=(frame_size, *shape[1:]))
+        buffer.write(data)
+        expected = np.concatenate([expected, data], axis=0)[-size:]
+        view = buffer.view()
+        assert view.shape == buffer.shape == shape
+        np.testing.assert_array_equal(view, expected)
+        assert view.base is not None  # view, not a copy
+
+
+def test_latest():
+    buffer = RingBuffer(size=10, dtype=np.int64)
+    buffer.write(np.arange(23))
+    np.testing.assert_array_equal(buffer.latest(4), [19, 20, 21, 22])
+    np.testing.assert_array_equal(buffer.latest(100), np.arange(13, 23))
+    assert buffer.latest(0).size == 0
+
+
+def test_fill_and_set_data():
+    buffer = RingBuffer(size=5, channel_count=2, dtype=np.int64)
+    buffer.write(np.ones((3, 2), dtype=np.int64))
+    buffer.fill(7)
+    np.testing.assert_array_equal(buffer.view(), np.full((5, 2), 7))
+    data = np.arange(10).reshape(5, 2)
+    buffer.set_data(data)
+    np.testing.assert_array_equal(buffer.view(), data)
+    buffer.write(np.array([[10, 11]]))
+    np.testing.assert_array_equal(buffer.view(), np.arange(2, 12).reshape(5, 2))
+
+
+def test_properties():
+    buffer = RingBuffer(size=8, channel_count=2, dtype=np.float32)
+    assert len(buffer) == buffer.size == 8
+    assert buffer.shape == (8, 2)
+    assert buffer.dtype == np.float32
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        RingBuffer(size=0)
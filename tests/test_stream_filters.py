@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the stateful stream filters against reference implementations processing the entire
+stream at once.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+import pytest
+
+from qudi.util.stream_filters import BoxcarFilter, DecimatingMeanFilter, CicDecimator
+
+FRAME_SIZES = [1, 7, 64, 333, 1000]
+
+
+def make_stream(seed, sample_count=5000, channel_count=3):
+    return np.random.default_rng(seed).normal(size=(sample_count, channel_count))
+
+
+def process_in_frames(stream_filter, data, seed):
+    """ Process data split into frames of random size and concatenate the filter output """
+    rng = np.random.default_rng(seed)
+    results = list()
+    start = 0
+    while start < data.shape[0]:
+        stop = start + int(rng.choice(FRAME_SIZES))
+        results.append(stream_filter.process(data[start:stop]))
+        start = stop
+    return np.concatenate(results, axis=0)
+
+
+def boxcar_reference(data, width):
+    """ Causal moving average with zero initial history """
+    padded = np.concatenate([np.zeros((width - 1, *data.shape[1:])), data], axis=0)
+    cumsum = np.concatenate([np.zeros((1, *data.shape[1:])), np.cumsum(padded, axis=0)], axis=0)
+    return (cumsum[width:] - cumsum[:-width]) / width
+
+
+@pytest.mark.parametrize('width', [1, 2, 10, 257])
+def test_boxcar_filter_matches_reference(width):
+    data = make_stream(width)
+    filtered = process_in_frames(BoxcarFilter(width), data, seed=width)
+    np.testing.assert_allclose(filtered, boxcar_reference(data, width), atol=1e-12)
+
+
+def test_boxcar_filter_steady_state_start():
+    data = np.full((100, 2), 3.5)
+    filtered = BoxcarFilter(16, steady_state_start=True).process(data)
+    np.testing.assert_allclose(filtered, data)
+
+
+def test_boxcar_filter_1d():
+    data = make_stream(1)[:, 0]
+    filtered = process_in_frames(BoxcarFilter(5), data, seed=1)
+    np.testing.assert_allclose(filtered, boxcar_reference(data, 5), atol=1e-12)
+
+
+@pytest.mark.parametrize('factor', [1, 3, 10])
+def test_decimating_mean_filter_matches_reference(factor):
+    data = make_stream(factor)
+    filtered = process_in_frames(DecimatingMeanFilter(factor), data, seed=factor)
+    usable = (data.shape[0] // factor) * factor
+    expected = data[:usable].reshape(usable // factor, factor, -1).mean(axis=1)
+    np.testing.assert_allclose(filtered, expected)
+
+
+@pytest.mark.parametrize('factor', [2, 5, 16])
+def test_first_order_cic_equals_decimating_mean(factor):
+    data = make_stream(factor)
+    cic = process_in_frames(CicDecimator(factor, order=1), data, seed=factor)
+    mean = process_in_frames(DecimatingMeanFilter(factor), data, seed=factor + 1)
+    np.testing.assert_allclose(cic, mean, atol=1e-12)
+
+
+@pytest.mark.parametrize('factor,order', [(4, 2), (10, 3)])
+def test_cic_decimator_matches_reference(factor, order):
+    data = make_stream(factor * order)
+    filtered = process_in_frames(CicDecimator(factor, order), data, seed=order)
+    expected = data
+    for _ in range(order):
+        expected = boxcar_reference(expected, factor)
+    np.testing.assert_allclose(filtered, expected[factor - 1::factor], atol=1e-12)
+
+
+def test_cic_decimator_unity_dc_gain():
+    data = np.full((1000, 1), 2.0)
+    filtered = CicDecimator(8, order=3, steady_state_start=True).process(data)
+    np.testing.assert_allclose(filtered, 2.0)
+
+
+def test_reset_restores_initial_state():
+    data = make_stream(0, sample_count=200)
+    for stream_filter in (BoxcarFilter(7), DecimatingMeanFilter(3), CicDecimator(4, 2)):
+        first = stream_filter.process(data)
+        stream_filter.reset()
+        np.testing.assert_allclose(stream_filter.process(data), first)
+
+
+@pytest.mark.parametrize('factory', [lambda: BoxcarFilter(0),
+                                     lambda: DecimatingMeanFilter(0),
+                                     lambda: CicDecimator(0),
+                                     lambda: CicDecimator(2, order=0)])
+def test_invalid_parameters(factory):
+    with pytest.raises(ValueError):
+        factory()
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the vectorized PicoHarp300 TTTR decoder against a per-record reference implementation
+using synthetic T2 and T3 record streams.
+
+Copyright (c) 2021, the qudi developers. See the AUTHORS.md file at the top-level directory of this
+distribution and on <https://github.com/Ulm-IQO/qudi-iqo-modules/>
+
+This file is part of qudi.
+
+Qudi is free software: you can redistribute it and/or modify it under the terms of
+the GNU Lesser General Public License as published by the Free Software Foundation,
+either version 3 of the License, or (at your option) any later version.
+
+Qudi is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License along with qudi.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+import pytest
+
+from qudi.hardware.picoquant.tttr_decoder import PicoHarpTTTRDecoder
+
+T3_RESOLUTION_PS = 8
+BIN_WIDTH_PS = 400
+NUMBER_OF_BINS = 50
+NUMBER_OF_GATES = 16
+SWEEP_MARKER = 1
+SWEEP_PERIOD = 20  # sync periods per sweep
+
+
+def make_t3_records(seed, number_of_syncs=3 * 65536 + 1234, number_of_photons=5000):
+    """ Synthetic T3 record stream with photons, sweep markers, other markers and nsync overflows.
+
+    @return numpy.ndarray: uint32 records
+    """
+    rng = np.random.default_rng(seed)
+    events = list()
+    # (sync index, order within sync, record without nsync)
+    for sync in range(3, number_of_syncs, SWEEP_PERIOD):
+        events.append((sync, 0, (15 << 28) | (SWEEP_MARKER << 16)))
+    for sync in rng.integers(0, number_of_syncs, 50):
+        events.append((int(sync), 0, (15 << 28) | (4 << 16)))
+    for sync in rng.integers(0, number_of_syncs, number_of_photons):
+        channel = int(rng.integers(1, 5))
+        dtime = int(rng.integers(0, 4096))
+        events.append((int(sync), 1, (channel << 28) | (dtime << 16)))
+    events.sort(key=lambda event: event[:2])
+
+    records = list()
+    overflows = 0
+    for sync, _, record in events:
+        while sync // PicoHarpTTTRDecoder.T3_WRAPAROUND > overflows:
+            records.append(15 << 28)
+            overflows += 1
+        records.append(record | (sync % PicoHarpTTTRDecoder.T3_WRAPAROUND))
+    return np.array(records, dtype=np.uint32)
+
+
+def make_t2_records(seed, number_of_syncs=26000, number_of_photons=8000, sync_period=25000):
+    """ Synthetic T2 record stream (4 ps time tags) with sync records, photons, sweep markers,
+    other markers and time tag overflows. Starts with photons before the first sync record.
+
+    @return numpy.ndarray: uint32 records
+    """
+    rng = np.random.default_rng(seed)
+    first_sync = 1000
+    end_time = first_sync + number_of_syncs * sync_period
+    events = list()
+    # (time, order for equal times, channel, marker bits)
+    for index in range(number_of_syncs):
+        time = first_sync + index * sync_period
+        events.append((time, 0, 0, 0))
+        if index % SWEEP_PERIOD == 3:
+            events.append((time + 16, 1, 15, SWEEP_MARKER))
+    for time in rng.integers(first_sync, end_time, 50):
+        events.append((int(time) & ~0xF, 1, 15, 4))
+    events.extend((5, 2, 1, 0) for _ in range(3))
+    for time in rng.integers(0, end_time, number_of_photons):
+        events.append((int(time), 2, int(rng.integers(1, 5)), 0))
+    events.sort(key=lambda event: event[:2])
+
+    records = list()
+    overflows = 0
+    for time, _, channel, marker_bits in events:
+        while time // PicoHarpTTTRDecoder.T2_WRAPAROUND > overflows:
+            records.append(15 << 28)
+            overflows += 1
+        time_tag = time % PicoHarpTTTRDecoder.T2_WRAPAROUND
+        if channel == 15:
+            time_tag = (time_tag & ~0xF) | marker_bits
+        records.append((channel << 28) | time_tag)
+    return np.array(records, dtype=np.uint32)
+
+
+class ReferenceDecoder:
+    """ Straightforward per-record implementation of the PicoHarpTTTRDecoder semantics """
+
+    def __init__(self, mode, number_of_gates=0):
+        self.mode = mode
+        self.resolution_ps = PicoHarpTTTRDecoder.T2_RESOLUTION_PS if mode == 2 else T3_RESOLUTION_PS
+        self.number_of_gates = number_of_gates
+        if number_of_gates > 0:
+            self.histogram = np.zeros((number_of_gates, NUMBER_OF_BINS), dtype=np.int64)
+        else:
+            self.histogram = np.zeros(NUMBER_OF_BINS, dtype=np.int64)
+        self.elapsed_sweeps = 0
+        self.photons = list()
+        self.marker_bits = list()
+        self.overflows = 0
+        self.reset()
+
+    def reset(self):
+        self._overflows = 0
+        self._sync_count = 0
+        self._last_sync_time = -1
+        self._sweep_start_sync = -1
+        self._sweeps_offset = self.elapsed_sweeps
+
+    def process(self, records):
+        wraparound = PicoHarpTTTRDecoder.T2_WRAPAROUND if self.mode == 2 else \
+            PicoHarpTTTRDecoder.T3_WRAPAROUND
+        for record in records.tolist():
+            channel = record >> 28
+            if self.mode == 2:
+                time_tag = record & 0x0FFFFFFF
+                marker_bits = time_tag & 0xF
+            else:
+                time_tag = record & 0xFFFF
+                dtime = (record >> 16) & 0xFFF
+                marker_bits = dtime & 0xF
+            if channel == 15 and marker_bits == 0:
+                self._overflows += 1
+                self.overflows += 1
+            time = time_tag + self._overflows * wraparound
+
+            if self.mode == 2:
+                sync_index = self._sync_count - 1
+                if channel == 0:
+                    self._sync_count += 1
+                    self._last_sync_time = time
+                    continue
+                delay_ps = (time - self._last_sync_time) * self.resolution_ps
+            else:
+                sync_index = time
+                self._sync_count = time + 1
+                delay_ps = dtime * self.resolution_ps
+
+            if channel == 15:
+                if marker_bits != 0:
+                    self.marker_bits.append(marker_bits)
+                    if self.number_of_gates > 0 and marker_bits & SWEEP_MARKER:
+                        self._sweep_start_sync = sync_index
+                        self.elapsed_sweeps += 1
+                continue
+
+            if sync_index < 0:
+                delay_ps = -1
+            self.photons.append((channel, sync_index, delay_ps))
+            bin_index = int(delay_ps // BIN_WIDTH_PS)
+            if not 0 <= bin_index < NUMBER_OF_BINS:
+                continue
+            if self.number_of_gates > 0:
+                gate = sync_index - self._sweep_start_sync
+                if self._sweep_start_sync >= 0 and 0 <= gate < self.number_of_gates:
+                    self.histogram[gate, bin_index] += 1
+            else:
+                self.histogram[bin_index] += 1
+        if self.number_of_gates == 0:
+            self.elapsed_sweeps = self._sweeps_offset + self._sync_count
+
+
+def make_records(mode, seed):
+    return make_t2_records(seed) if mode == 2 else make_t3_records(seed)
+
+
+def make_decoder(mode, number_of_gates):
+    return PicoHarpTTTRDecoder(mode=mode,
+                               resolution_ps=T3_RESOLUTION_PS,
+                               bin_width_ps=BIN_WIDTH_PS,
+                               number_of_bins=NUMBER_OF_BINS,
+                               number_of_gates=number_of_gates,
+                               sweep_marker=SWEEP_MARKER)
+
+
+def split_blocks(records, seed):
+    """ Split records into blocks of random size, including splits right after each overflow """
+    rng = np.random.default_rng(seed)
+    splits = set(rng.integers(1, records.size, 40).tolist())
+    overflow_indices = np.flatnonzero(records == np.uint32(15 << 28))
+    splits.update((overflow_indices + 1).tolist())
+    splits.update(overflow_indices.tolist())
+    splits.discard(0)
+    return np.split(records, sorted(splits))
+
+
+def decode_blocks(decoder, blocks):
+    decoded = [decoder.process(block) for block in blocks]
+    channels = np.concatenate([block.channels for block in decoded])
+    sync_indices = np.concatenate([block.sync_indices for block in decoded])
+    delays = np.concatenate([block.sync_delays_ps for block in decoded])
+    marker_bits = np.concatenate([block.marker_bits for block in decoded])
+    return channels, sync_indices, delays, marker_bits
+
+
+@pytest.mark.parametrize('mode', [2, 3])
+def test_overflow_unwrap_across_blocks(mode):
+    records = make_records(mode, seed=1)
+    reference = ReferenceDecoder(mode)
+    reference.process(records)
+    assert reference.overflows >= 3
+
+    for blocks in ([records], split_blocks(records, seed=2), np.array_split(records, 997)):
+        decoder = make_decoder(mode, 0)
+        channels, sync_indices, delays, _ = decode_blocks(decoder, blocks)
+        expected = np.array(reference.photons)
+        np.testing.assert_array_equal(channels, expected[:, 0])
+        np.testing.assert_array_equal(sync_indices, expected[:, 1])
+        np.testing.assert_array_equal(delays, expected[:, 2])
+        assert decoder.overflows == reference.overflows
+
+
+@pytest.mark.parametrize('mode', [2, 3])
+def test_marker_separation(mode):
+    records = make_records(mode, seed=3)
+    reference = ReferenceDecoder(mode)
+    reference.process(records)
+
+    decoder = make_decoder(mode, 0)
+    channels, _, _, marker_bits = decode_blocks(decoder, split_blocks(records, seed=4))
+    np.testing.assert_array_equal(marker_bits, reference.marker_bits)
+    assert set(np.unique(marker_bits).tolist()) == {SWEEP_MARKER, 4}
+    assert not np.any(channels == 15)
+    if mode == 2:
+        assert not np.any(channels == 0)
+    assert decoder.markers == len(reference.marker_bits)
+    assert decoder.photons == len(reference.photons)
+    assert decoder.records == records.size
+
+
+@pytest.mark.parametrize('mode', [2, 3])
+@pytest.mark.parametrize('number_of_gates', [0, NUMBER_OF_GATES])
+def test_histogram_matches_reference(mode, number_of_gates):
+    records = make_records(mode, seed=5)
+    reference = ReferenceDecoder(mode, number_of_gates)
+    reference.process(records)
+    assert reference.histogram.sum() > 0
+
+    decoder = make_decoder(mode, number_of_gates)
+    decode_blocks(decoder, split_blocks(records, seed=6))
+    np.testing.assert_array_equal(decoder.histogram, reference.histogram)
+    assert decoder.elapsed_sweeps == reference.elapsed_sweeps
+
+
+@pytest.mark.parametrize('mode', [2, 3])
+@pytest.mark.parametrize('number_of_gates', [0, NUMBER_OF_GATES])
+def test_pause_continue_keeps_histogram_and_sweeps(mode, number_of_gates):
+    first_run = make_records(mode, seed=7)
+    second_run = make_records(mode, seed=8)[:5000]
+    reference = ReferenceDecoder(mode, number_of_gates)
+    reference.process(first_run)
+    sweeps_before_pause = reference.elapsed_sweeps
+    reference.reset()
+    reference.process(second_run)
+
+    decoder = make_decoder(mode, number_of_gates)
+    decode_blocks(decoder, split_blocks(first_run, seed=9))
+    assert decoder.elapsed_sweeps == sweeps_before_pause
+    # continue_measure restarts the device and thereby the time reference
+    decoder.reset(clear_histogram=False)
+    decode_blocks(decoder, split_blocks(second_run, seed=10))
+
+    np.testing.assert_array_equal(decoder.histogram, reference.histogram)
+    assert decoder.elapsed_sweeps == reference.elapsed_sweeps
+    assert decoder.elapsed_sweeps > sweeps_before_pause
+
+    decoder.reset()
+    assert decoder.elapsed_sweeps == 0
+    assert not decoder.histogram.any()